@@ -8,16 +8,19 @@ from pynput.mouse import Listener as MouseListener
 from pynput.mouse import Button
 import pyautogui
 import os
-from datetime import datetime
 import subprocess
 
 # 导入OCR模块（这会触发模型预加载）
 print("正在启动OCR应用...")
-from lib.ocr import ocr
+from lib.ocr import grab_region, ocr_image
 from lib.tts_service import SiliconFlowTTS
+from lib.pipeline import DubbingPipeline
+from lib.admission import AdmissionController, DEFAULT_MAX_WAIT
+from lib.session import SessionRecorder
+from lib.ref.bundle import load_runtime_bundle
 
 class OCRApp:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, record_path: str | None = None, max_wait: float | None = DEFAULT_MAX_WAIT):
         # 绑定主 root（外部创建并隐藏）
         self.root = root
         self.settings_window = None
@@ -28,27 +31,36 @@ class OCRApp:
         self.end_pos = None
         self.overlay_window = None
         self.overlay_canvas = None
-        self.last_ocr_time = 0  # 添加防抖时间记录
         self.last_selection_time = 0  # 添加选择防抖时间记录
         # 状态提示窗口
         self.status_window = None
         self.status_label = None
         
-        # TTS 客户端（若无API Key则内部降级为不可用）
-        self.tts = SiliconFlowTTS()
+        # TTS 客户端（若无API Key则内部降级为不可用）；运行时资源包中有音色快照时不阻塞拉取音色列表
+        bundle = load_runtime_bundle()
+        self.tts = SiliconFlowTTS(voice_snapshot=bundle.voice_snapshot if bundle else None)
         
-        # 最近一次有效的角色名，用于当本轮未识别到角色名时回退使用
-        self.last_char_name = None
+        # 识别与配音流水线（无界面部分，批处理模式复用同一套逻辑）
+        self.pipeline = DubbingPipeline(ocr_func=ocr_image, tts=self.tts, on_status=self.show_status)
+        
+        # 触发准入控制：流水线空闲时立即执行，忙时把连按合并为最新一次（替代固定1秒冷却）；
+        # 按最近耗时估计的等待超过 max_wait 时忽略新的触发
+        self.admission = AdmissionController(self.run_recognition, max_wait=max_wait)
+        self.space_held = False  # 忽略按住空格时的系统自动重复
         
         # 加载保存的区域设置
         self.load_regions()
         
+        # 会话录制（--record 开启），用于离线回放与延迟基准测试
+        self.recorder = SessionRecorder(record_path, regions=self.regions) if record_path else None
+        
         # 启动键盘监听
         self.start_keyboard_listener()
         
         print("OCR应用已启动")
         print("快捷键说明:")
         print("- 空格键: 识别当前设置的区域")
+        print("- F8: 重播上一句（不进行OCR和网络请求）")
         print("- F12: 打开设置界面")
         print("- Shift+Ctrl+Q: 退出应用")
 
@@ -187,8 +199,13 @@ class OCRApp:
             try:
                 # 空格键 - 识别文字
                 if key == keyboard.Key.space:
-                    self.show_status("ocr识别")
-                    self.recognize_text()
+                    if not self.space_held:
+                        self.space_held = True
+                        self.admission.submit()
+                
+                # F8 - 重播上一句
+                elif key == keyboard.Key.f8:
+                    self.replay_last_line()
                 
                 # F12 - 打开设置
                 elif key == keyboard.Key.f12:
@@ -204,7 +221,8 @@ class OCRApp:
                 pass
          
         def on_release(key):
-            pass
+            if key == keyboard.Key.space:
+                self.space_held = False
          
         self.current_modifiers = set()
          
@@ -226,97 +244,48 @@ class OCRApp:
         self.listener.start()
     
     def recognize_text(self):
-        """识别文字并驱动TTS（当可用）"""
-        # 检查是否在冷却期内
-        current_time = time.time()
-        if current_time - self.last_ocr_time < 1.0:  # 1秒防抖
-            print(f"OCR冷却中，还需等待 {1.0 - (current_time - self.last_ocr_time):.1f} 秒")
-            return
-        
-        # 更新最后OCR时间
-        self.last_ocr_time = current_time
-        
+        """识别文字并驱动TTS（当可用），返回完整识别结果"""
+        result = self.run_recognition(time.time())
+        return result['final_text'] if result else ''
+    
+    def run_recognition(self, trigger_time: float):
+        """执行一次识别与配音，返回流水线结果（含各阶段耗时）；由准入控制在后台线程调用"""
         if not self.regions:
             print("没有设置识别区域，请先按F12打开设置")
             self.show_status("等待", duration_ms=800)
-            return
+            return None
         
+        self.show_status("ocr识别")
         print(f"开始识别 {len(self.regions)} 个区域...")
         
-        name_text = None
-        content_text = None
-        all_results = []  # 存储所有区域的识别结果（拼接用）
-        
+        crops = []
         for i, region in enumerate(self.regions):
             try:
-                result = ocr(region['start'], region['end'])
-                name = region.get('name', f'区域{i+1}')
-                if result:
-                    print(f"[{name}] {result}")
-                    all_results.append(result)
-                    # 简单的命名约定：包含“名”/"name" 的区域当作角色名；包含“文案”/"text" 的区域当作文案
-                    lname = name.lower()
-                    if ('名' in name) or ('name' in lname):
-                        name_text = result.strip()
-                    if ('文案' in name) or ('text' in lname) or ('台词' in name) or ('对白' in name):
-                        content_text = result.strip()
-                else:
-                    print(f"[{name}] 未识别到文字")
+                crops.append((region, grab_region(region['start'], region['end'])))
             except Exception as e:
-                print(f"[{name}] 识别失败: {e}")
-        
-        # 将所有结果拼接成一个字符串
-        final_text = ''
-        if all_results:
-            final_text = ' '.join(all_results)
-            print(f"\n完整识别结果: {final_text}")
-        else:
-            print("\n未识别到任何文字")
-        
-        # 角色名回退逻辑：若本轮未识别到角色名，则沿用上一次有效角色名
-        if name_text:
-            self.last_char_name = name_text
-        elif self.last_char_name:
-            name_text = self.last_char_name
-            print(f"角色名未识别，沿用上一次角色：{name_text}")
+                print(f"[{region.get('name', f'区域{i+1}')}] 截图失败: {e}")
         
-        # 若具备角色名与文案，尝试用硅基流动TTS
-        try:
-            if name_text and content_text and hasattr(self, 'tts') and self.tts.api_key:
-                # 查找参考音频和文本（limit=1）
-                from lib.ref.loader import find_audio_with_text_by_char_name
-                ref_results = find_audio_with_text_by_char_name(name_text, limit=1)
-                print(ref_results)
-                voice_uri = None
-                if ref_results:
-                    self.show_status("正在上传音色")
-                    ref_data = ref_results[0]
-                    ref_path = ref_data['file_path']
-                    ref_text = ref_data['voice_text']
-                    # 以角色名为key，上传或复用音色，使用参考文本
-                    voice_uri = self.tts.ensure_voice(name_key=name_text, wav_path=ref_path, ref_text=ref_text)
-                
-                # 合成
-                self.show_status("正在tts")
-                audio_bytes = self.tts.synthesize(content_text, voice_uri=voice_uri)
-                if audio_bytes:
-                    os.makedirs('lib/voc_tmp', exist_ok=True)
-                    ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    out_path = os.path.abspath(os.path.join('lib/voc_tmp', f'tts_{ts}.wav'))
-                    with open(out_path, 'wb') as f:
-                        f.write(audio_bytes)
-                    print(f"TTS已生成: {out_path}")
-                    # 自动播放并恢复等待状态
-                    self.play_audio(out_path)
-                    self.show_status("等待", duration_ms=1000)
-                else:
-                    print("TTS生成失败或未返回音频。")
-                    self.show_status("等待", duration_ms=1000)
-        except Exception as e:
-            print(f"TTS流程异常: {e}")
+        result = self.pipeline.run(crops)
+        if result['audio_path']:
+            # 自动播放并恢复等待状态
+            self.play_audio(result['audio_path'])
+            self.show_status("等待", duration_ms=1000)
+        elif result['speaker'] and result['content_text'] and self.pipeline.tts_available:
             self.show_status("等待", duration_ms=1000)
+        if self.recorder:
+            # 开始播放后再录制，截图编码与写盘在后台线程进行，不推迟出声
+            self.recorder.record_async(trigger_time, crops, result)
         
-        return final_text
+        return result
+    
+    def replay_last_line(self):
+        """重播最近一次合成（或复用）的台词音频，不触发OCR与TTS"""
+        path = self.pipeline.last_audio_path
+        if not path or not os.path.exists(path):
+            print("没有可重播的台词")
+            return
+        print(f"重播上一句: {path}")
+        self.play_audio(path)
     
     def open_settings(self):
         """打开设置界面"""
@@ -854,7 +823,7 @@ class OCRApp:
             messagebox.showwarning("警告", "没有设置识别区域")
             return
         
-        self.recognize_text()
+        self.admission.submit()
     
     def close_settings(self):
         """关闭设置窗口"""
@@ -864,6 +833,9 @@ class OCRApp:
     def quit_app(self):
         """退出应用"""
         print("正在退出OCR应用...")
+        stats = self.admission.snapshot()
+        print(f"触发统计: 共 {stats['triggers']} 次，执行 {stats['completed']} 次，合并 {stats['coalesced']} 次，"
+              f"忽略 {stats['rejected']} 次")
         
         # 停止所有监听器
         try:
@@ -878,6 +850,13 @@ class OCRApp:
         except Exception as e:
             print(f"停止鼠标监听器时出错: {e}")
         
+        # 保存会话录制
+        try:
+            if self.recorder:
+                self.recorder.close()
+        except Exception as e:
+            print(f"保存会话录制时出错: {e}")
+        
         # 关闭状态窗口
         try:
             self.hide_status()
@@ -918,10 +897,17 @@ class OCRApp:
 
 def main():
     """主函数"""
+    import argparse
+    parser = argparse.ArgumentParser(description="明日方舟自动配音")
+    parser.add_argument("--record", default=None, help="录制会话到指定存档（.zip），供 replay_session.py 回放")
+    parser.add_argument("--max-wait", type=float, default=DEFAULT_MAX_WAIT,
+                        help=f"流水线忙时预计等待超过该秒数则忽略新的触发（默认 {DEFAULT_MAX_WAIT:g}，<=0 表示不限）")
+    args = parser.parse_args()
+    
     # 创建主窗口（隐藏），先创建 root 再实例化 App，避免多 root 导致 Toplevel 不刷新
     root = tk.Tk()
     root.withdraw()
-    app = OCRApp(root)
+    app = OCRApp(root, record_path=args.record, max_wait=args.max_wait if args.max_wait > 0 else None)
     
     # 运行主循环
     try:
@@ -933,6 +919,8 @@ def main():
         print(f"程序运行出错: {e}")
         app.quit_app()
     finally:
+        if app.recorder:
+            app.recorder.close()
         print("程序已退出")
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无界面批处理：对一个目录中的截图逐帧执行 裁剪 → OCR → 角色名解析 → TTS 合成，
+并以 JSONL 输出每帧的结果和各阶段耗时。不依赖 Tk / pynput / 屏幕。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+from lib.bench import summarize_latencies, format_latency_summary
+from lib.pipeline import DubbingPipeline
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+def list_frames(images_dir: str) -> List[str]:
+    """按文件名排序列出目录中的截图"""
+    names = [n for n in os.listdir(images_dir) if n.lower().endswith(IMAGE_EXTENSIONS)]
+    names.sort()
+    return [os.path.join(images_dir, n) for n in names]
+
+
+def load_regions(regions_file: str) -> List[Dict]:
+    with open(regions_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR→TTS 无界面批处理工具")
+    parser.add_argument("images_dir", help="截图目录（整屏截图，坐标与 regions.json 一致）")
+    parser.add_argument("--regions", default="regions.json", help="区域配置文件")
+    parser.add_argument("--output", default="batch_results.jsonl", help="逐帧结果输出（JSONL）")
+    parser.add_argument("--out-dir", default="lib/voc_tmp", help="合成音频输出目录")
+    parser.add_argument("--endpoint", default=None, help="TTS 服务地址（例如本地替身服务 http://127.0.0.1:8765/v1）")
+    parser.add_argument("--api-key", default=None, help="TTS API Key（默认读取 .env / 环境变量）")
+    parser.add_argument("--no-tts", action="store_true", help="只做OCR与角色名解析，不调用TTS")
+
+    args = parser.parse_args()
+
+    frames = list_frames(args.images_dir)
+    if not frames:
+        print(f"❌ 目录中没有截图: {args.images_dir}")
+        return 1
+    regions = load_regions(args.regions)
+    if not regions:
+        print(f"❌ 区域配置为空: {args.regions}")
+        return 1
+
+    # 延迟导入：OCR 模型加载较慢，--help 等场景无需加载
+    from PIL import Image
+    from lib.ocr import crop_region, ocr_image
+
+    tts = None
+    if not args.no_tts:
+        from lib.tts_service import SiliconFlowTTS
+        tts = SiliconFlowTTS(base_url=args.endpoint, api_key=args.api_key)
+
+    pipeline = DubbingPipeline(ocr_func=ocr_image, tts=tts, output_dir=args.out_dir)
+
+    print(f"共 {len(frames)} 帧，{len(regions)} 个区域")
+    totals = []
+    started = time.perf_counter()
+    with open(args.output, 'w', encoding='utf-8') as out:
+        for index, frame_path in enumerate(frames):
+            t0 = time.perf_counter()
+            with Image.open(frame_path) as frame:
+                frame.load()
+                crops = [(region, crop_region(frame, region['start'], region['end'])) for region in regions]
+            load_time = time.perf_counter() - t0
+
+            result = pipeline.run(crops)
+            result['timings']['load'] = load_time
+            record = {'index': index, 'frame': os.path.basename(frame_path), **result}
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            totals.append(result['timings']['total'])
+            print(f"[{index + 1}/{len(frames)}] {record['frame']} 角色={result['speaker']} 总耗时={result['timings']['total']:.3f}s")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ 结果已写入 {args.output}")
+    print(f"总耗时: {elapsed:.2f}s, 单帧流水线耗时: {format_latency_summary(summarize_latencies(totals))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成运行时资源包 lib/ref/runtime.bundle：干员名索引、每名干员质量分最高的参考音频及台词、TTS 音色快照。
+应用启动与首次触发只读取这一个文件，不导入 pandas、不读取 CSV/parquet、不扫描 lib/voc。
+干员表、语音数据或参考音频更新后需重新运行（否则应用检测到资源包过期，不再使用它）。
+"""
+
+import argparse
+import sys
+import time
+
+from lib.ref.bundle import RUNTIME_BUNDLE_PATH, RuntimeBundle, build_payload
+from lib.ref import loader
+from lib.ref.resolver import operator_aliases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成运行时资源包")
+    parser.add_argument("--output", default=RUNTIME_BUNDLE_PATH, help="资源包文件（默认 lib/ref/runtime.bundle）")
+    parser.add_argument("--endpoint", default=None, help="TTS 服务地址（默认读取 .env / 环境变量）")
+    parser.add_argument("--api-key", default=None, help="TTS API Key（默认读取 .env / 环境变量）")
+    parser.add_argument("--no-voices", action="store_true", help="不写入 TTS 音色快照")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    operators_df = loader.load_operators()
+    operators = []
+    for chinese, english, url in zip(operators_df['chinese_name'], operators_df['english_name'], operators_df['url']):
+        if isinstance(chinese, str):
+            operators.append((chinese, english if isinstance(english, str) else None, url if isinstance(url, str) else None))
+
+    references = {}
+    for chinese, _, _ in operators:
+        refs = loader.find_new_audio_by_char_name(chinese, limit=1)
+        if refs:
+            references[chinese] = refs[0]
+
+    voice_snapshot = None
+    if not args.no_voices:
+        from lib.tts_service import SiliconFlowTTS
+        tts = SiliconFlowTTS(base_url=args.endpoint, api_key=args.api_key)
+        if tts.api_key:
+            voice_snapshot = {'base_url': tts.base_url, 'voices': dict(tts.role_name)}
+
+    payload = build_payload(args.output, operators, operator_aliases(operators_df), references, voice_snapshot)
+    size = RuntimeBundle.dump(args.output, payload)
+    print(f"✅ 运行时资源包已生成: {args.output}（{size / 1024:.1f} KiB，{time.perf_counter() - t0:.1f}s）")
+    print(f"   干员 {len(operators)}，有参考音频 {len(references)}，"
+          f"音色快照 {len(voice_snapshot['voices']) if voice_snapshot else 0}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
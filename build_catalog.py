@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编译资源目录 lib/ref/catalog.sqlite：把干员表（lib/operators.csv、parsed_operators.csv）、
+语音文本（lib/voc_data/voice_data_*.csv）、本地参考音频（lib/voc）及其音频元数据汇总到一个带索引的 SQLite 文件。
+再次运行时只重建来源有变化的干员；编译完成后 loader 的查询全部走资源目录。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from lib.ref.audio_meta import ClipMetaIndex
+from lib.ref.catalog import AssetCatalog
+from lib.ref.loader import (CATALOG_PATH, CLIP_META_PATH, OPERATORS_CSV_PATH, PARSED_OPERATORS_CSV_PATH,
+                            VOC_DATA_DIR, VOC_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="编译资源目录（干员、别名、语音文本、参考音频与元数据）")
+    parser.add_argument("--output", default=CATALOG_PATH, help="资源目录文件（默认 lib/ref/catalog.sqlite）")
+    parser.add_argument("--operators-csv", default=OPERATORS_CSV_PATH, help="干员中英文对照表")
+    parser.add_argument("--parsed-operators", default=PARSED_OPERATORS_CSV_PATH, help="干员页面列表")
+    parser.add_argument("--voc-data-dir", default=VOC_DATA_DIR, help="语音数据CSV目录")
+    parser.add_argument("--voc-dir", default=VOC_DIR, help="参考音频目录")
+    parser.add_argument("--only", nargs="+", default=None, help="只检查/更新这些干员")
+    parser.add_argument("--force", action="store_true", help="忽略来源指纹，全部重建")
+    parser.add_argument("--no-audio-meta", action="store_true", help="不分析音频（没有元数据时按文件名顺序选择参考音频）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行分析线程数")
+    args = parser.parse_args()
+
+    # 已有的 clip_meta.json 中文件未变化的元数据直接复用
+    known_meta = ClipMetaIndex(CLIP_META_PATH).clips
+
+    t0 = time.perf_counter()
+    stats = AssetCatalog.compile(
+        args.output, args.operators_csv, args.parsed_operators, args.voc_data_dir, args.voc_dir,
+        only=args.only, analyze_audio=not args.no_audio_meta, workers=args.workers, force=args.force,
+        known_meta=known_meta,
+    )
+    elapsed = time.perf_counter() - t0
+
+    catalog = AssetCatalog(args.output)
+    counts = catalog.stats()
+    catalog.close()
+    print(f"✅ 资源目录已更新: {args.output}（{elapsed:.1f}s）")
+    print(f"   干员 {counts['operators']}，别名 {counts['aliases']}，台词 {counts['voice_lines']}，参考音频 {counts['clips']}")
+    print(f"   干员单元: 更新 {stats['units_updated']}，未变化 {stats['units_unchanged']}，删除 {stats['units_removed']}")
+    print(f"   音频元数据: 新分析 {stats['clips_analyzed']}，复用 {stats['clips_reused']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+参考音频元数据预处理：读取 lib/voc 下每个 wav 的文件头（时长、采样率、声道），
+并计算能量/静音统计，写入 lib/ref/clip_meta.json。只分析新增或有变化的文件。
+loader 查找参考音频时据此挑选质量分最高的片段，查找时不再解码音频。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from lib.ref.audio_meta import ClipMetaIndex, DEFAULT_TARGET_DURATION, describe, score_clip
+from lib.ref.loader import CLIP_META_PATH, VOC_DIR, _VocIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="参考音频元数据预处理")
+    parser.add_argument("--voc-dir", default=VOC_DIR, help="参考音频目录（默认 lib/voc）")
+    parser.add_argument("--output", default=CLIP_META_PATH, help="元数据索引文件（默认 lib/ref/clip_meta.json）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行分析线程数")
+    parser.add_argument("--show", default=None, help="分析完成后列出该干员的片段排名")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.voc_dir):
+        print(f"❌ 参考音频目录不存在: {args.voc_dir}")
+        return 1
+
+    index = ClipMetaIndex(args.output)
+    t0 = time.perf_counter()
+    stats = index.update(args.voc_dir, workers=args.workers)
+    index.save()
+    elapsed = time.perf_counter() - t0
+    print(f"✅ 元数据已保存: {args.output}")
+    print(f"   新分析 {stats['analyzed']}，未变化 {stats['unchanged']}，已删除 {stats['removed']}，"
+          f"失败 {stats['failed']}，耗时 {elapsed:.1f}s")
+
+    if args.show:
+        clips = _VocIndex(args.voc_dir).lookup(args.show)
+        lo, hi = DEFAULT_TARGET_DURATION
+        print(f"\n干员 '{args.show}' 的片段排名（目标时长 {lo:.0f}~{hi:.0f}s）:")
+        ranked = sorted(((score_clip(index.get(c['filename']) or {}), c) for c in clips), key=lambda x: -x[0])
+        for score, clip in ranked:
+            print(f"  {score:.3f}  {clip['filename']}  {describe(index.get(clip['filename']) or {'error': '无元数据'})}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,11 +12,14 @@ import argparse
 from typing import Dict, List, Set
 import json
 
+from lib.ref.audio_codec import scan_audio
+
 class OperatorResourceChecker:
     def __init__(self, voc_data_dir: str = "lib/voc_data", voc_dir: str = "lib/voc"):
         self.voc_data_dir = Path(voc_data_dir)
         self.voc_dir = Path(voc_dir)
         self.operators_csv = Path("parsed_operators.csv")
+        self._audio_by_prefix = None
         
         if not self.voc_data_dir.exists():
             raise FileNotFoundError(f"语音数据目录不存在: {self.voc_data_dir}")
@@ -45,15 +48,30 @@ class OperatorResourceChecker:
     def get_operator_audio_files(self) -> Dict[str, Set[str]]:
         """获取所有干员音频文件"""
         audio_files = {}
-        for file_path in self.voc_dir.glob("*.wav"):
-            parts = file_path.stem.split("_")
+        # 压缩存储的 .wavz 与打包存储中的片段按对应的 .wav 文件名计入
+        for name in scan_audio(str(self.voc_dir)):
+            parts = name[:-4].split("_")
             if len(parts) >= 2:
                 operator_name = parts[0]
                 if operator_name not in audio_files:
                     audio_files[operator_name] = set()
-                audio_files[operator_name].add(file_path.name)
+                audio_files[operator_name].add(name)
         return audio_files
     
+    def get_audio_by_prefix(self) -> Dict[str, Set[str]]:
+        """音频文件名按每个"_"之前的前缀分组（与 glob(f"{干员名}_*.wav") 一致）；
+        只扫描一次目录（含打包存储），不再为每名干员 glob 一遍"""
+        if self._audio_by_prefix is None:
+            by_prefix = {}
+            for name in scan_audio(str(self.voc_dir)):
+                stem = name[:-4]
+                pos = stem.find("_")
+                while pos != -1:
+                    by_prefix.setdefault(stem[:pos], set()).add(name)
+                    pos = stem.find("_", pos + 1)
+            self._audio_by_prefix = by_prefix
+        return self._audio_by_prefix
+    
     def check_operator_voice_data(self, operator_name: str, voice_data_file: str) -> Dict:
         """检查单个干员的语音数据完整性"""
         result = {
@@ -75,9 +93,7 @@ class OperatorResourceChecker:
             df = pd.read_csv(voice_data_file)
             result["voice_entries"] = len(df)
             
-            operator_audio_files = set()
-            for file_path in self.voc_dir.glob(f"{operator_name}_*.wav"):
-                operator_audio_files.add(file_path.name)
+            operator_audio_files = self.get_audio_by_prefix().get(operator_name, set())
             
             result["total_actual_audio"] = len(operator_audio_files)
             result["total_expected_audio"] = len(df)
@@ -102,6 +118,7 @@ class OperatorResourceChecker:
     def check_all_operators(self) -> Dict:
         """检查所有干员的资源完整性"""
         print("开始检查干员资源完整性...")
+        self._audio_by_prefix = None
         
         all_operators = self.get_all_operators()
         voice_data_files = self.get_operator_voice_data_files()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+音频无损压缩：把 lib/voc 中的 wav 并行压缩为 .wavz（解码后与原文件逐字节相同，下载清单无需改动），
+或用 --decompress 全部还原。索引、资源检查、参考音频读取都能直接使用压缩文件。
+运行前后报告磁盘占用；--bench N 抽取 N 个压缩片段测量解码耗时。
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.ref.audio_codec import (COMPRESSED_SUFFIX, WAV_SUFFIX, compress_file, corpus_usage, decode_wavz,
+                                 decompress_file)
+
+
+def format_size(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+def describe_usage(usage) -> str:
+    total = usage['wav_bytes'] + usage['compressed_bytes']
+    return (f"wav {usage['wav_files']} 个 {format_size(usage['wav_bytes'])}，"
+            f"压缩 {usage['compressed_files']} 个 {format_size(usage['compressed_bytes'])}，"
+            f"合计 {format_size(total)}")
+
+
+def bench_decode(voc_dir: str, count: int) -> None:
+    """抽样测量解码耗时（直接解码，不经过缓存）"""
+    names = sorted(name for name in os.listdir(voc_dir) if name.endswith(COMPRESSED_SUFFIX))
+    if not names:
+        print("没有压缩文件，跳过解码测试")
+        return
+    sample = random.Random(0).sample(names, min(count, len(names)))
+    timings = []
+    for name in sample:
+        with open(os.path.join(voc_dir, name), 'rb') as f:
+            blob = f.read()
+        start = time.perf_counter()
+        decode_wavz(blob)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"解码 {len(timings)} 个片段：平均 {sum(timings) / len(timings):.1f}ms，"
+          f"中位数 {timings[len(timings) // 2]:.1f}ms，最大 {timings[-1]:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lib/voc 音频无损压缩/还原")
+    parser.add_argument("--voc-dir", default=os.path.join("lib", "voc"), help="音频目录（默认 lib/voc）")
+    parser.add_argument("--decompress", action="store_true", help="把 .wavz 还原为 wav")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行线程数")
+    parser.add_argument("--level", type=int, default=6, choices=range(1, 10), metavar="1-9",
+                        help="zlib 压缩级别（默认 6）")
+    parser.add_argument("--bench", type=int, default=0, metavar="N", help="完成后抽取 N 个片段测量解码耗时")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.voc_dir):
+        print(f"❌ 音频目录不存在: {args.voc_dir}")
+        return 1
+
+    before = corpus_usage(args.voc_dir)
+    print(f"处理前: {describe_usage(before)}")
+
+    suffix = COMPRESSED_SUFFIX if args.decompress else WAV_SUFFIX
+    paths = sorted(os.path.join(args.voc_dir, name) for name in os.listdir(args.voc_dir)
+                   if name.endswith(suffix) and not name.startswith('.'))
+
+    def work(path):
+        try:
+            if args.decompress:
+                return path, decompress_file(path), None
+            return path, compress_file(path, args.level), None
+        except (OSError, ValueError) as e:
+            return path, None, e
+
+    t0 = time.perf_counter()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        for path, _, error in pool.map(work, paths):
+            if error is not None:
+                failed += 1
+                print(f"❌ {os.path.basename(path)}: {error}")
+    elapsed = time.perf_counter() - t0
+    action = "还原" if args.decompress else "压缩"
+    print(f"{action} {len(paths) - failed}/{len(paths)} 个文件，耗时 {elapsed:.1f}s")
+
+    after = corpus_usage(args.voc_dir)
+    print(f"处理后: {describe_usage(after)}")
+    total_before = before['wav_bytes'] + before['compressed_bytes']
+    total_after = after['wav_bytes'] + after['compressed_bytes']
+    if total_before:
+        print(f"✅ 占用 {format_size(total_before)} -> {format_size(total_after)}"
+              f"（{total_after / total_before:.1%}）")
+
+    if args.bench:
+        bench_decode(args.voc_dir, args.bench)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
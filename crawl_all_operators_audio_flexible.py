@@ -1,7 +1,7 @@
+import argparse
 import re
 import os
 import pandas as pd
-from bs4 import BeautifulSoup
 import requests
 from urllib.parse import quote, unquote
 import time
@@ -11,6 +11,21 @@ from pathlib import Path
 from typing import Dict, List, Set, Tuple
 # 新增：导入资源检查器
 from check_operator_resources import OperatorResourceChecker
+from lib.crawl.extract import LANG_MAP_DISPLAY_TO_KIND, extract_voice_data_fast
+from lib.crawl.journal import CrawlJournal
+from lib.crawl.fetch import DEFAULT_WORKERS, Fetcher, run_parallel
+from lib.crawl.manifest import DownloadManifest
+from lib.crawl.offline import csv_language
+from lib.crawl.page_cache import PageCache
+from lib.crawl.planner import CrawlPlan, plan_operator, scan_voc
+from lib.ref.audio_codec import compress_file
+
+# 所有请求共用一个下载引擎：按主机限速（prts.wiki 页面 / torappu.prts.wiki 音频），遵守 Retry-After
+FETCHER = Fetcher()
+# 下载清单（lib/voc_manifest.json）：记录每个音频的大小与 SHA-256，verify_downloads.py 据此校验
+MANIFEST = DownloadManifest()
+# 语音记录页面缓存（html/，gzip 压缩 + ETag/Last-Modified）
+PAGE_CACHE = PageCache("html")
 
 def parse_html_links(html_file='in.html'):
     """解析HTML文件中的干员语音记录链接"""
@@ -55,15 +70,7 @@ def parse_html_links(html_file='in.html'):
     
     return operators
 
-# 新增：报告解析与语言映射工具
-LANG_MAP_DISPLAY_TO_KIND = {
-    '中文': '中文',
-    '日语': '日文',
-    '日文': '日文',
-    '英语': '英文',
-    '英文': '英文',
-}
-
+# 新增：报告解析（语言映射见 lib/crawl/extract.py）
 
 def parse_missing_audio_language_report(report_file: str = 'resource_check_report.txt') -> Dict[str, str]:
     """解析报告中"缺少音频文件的干员"段落，返回 {干员: 语言}，未标注语言或标注"无"的不返回。
@@ -102,38 +109,29 @@ def parse_missing_audio_language_report(report_file: str = 'resource_check_repor
         return mappings
 
 
-def map_display_lang_to_kind_name(display_lang: str) -> Tuple[str, str]:
-    """将显示语言映射为 (数据块语言标签, 下载路径基准)。
-    返回 (kind_name, base_path)，其中 base_path 为 voice_cn 或 voice。"""
-    kind = LANG_MAP_DISPLAY_TO_KIND.get(display_lang, '中文')
-    base_path = 'voice_cn' if kind == '中文' else 'voice'
-    return kind, base_path
-
-def crawl_operator_page(url, operator_name):
-    """爬取干员语音记录页面的HTML内容"""
+def crawl_operator_page(url, operator_name, fetcher=None, page_cache=None):
+    """爬取干员语音记录页面的HTML内容。
+    页面压缩保存在 html/ 下，再次爬取时发送条件请求，页面未变化（304）时直接使用缓存"""
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    fetcher = fetcher or FETCHER
+    page_cache = page_cache or PAGE_CACHE
     
     try:
         print(f"正在爬取 {operator_name} 的语音记录页面...")
         print(f"URL: {url}")
         
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
+        html, status = page_cache.fetch(fetcher, url, operator_name)
+        page_cache.save_index()
         
-        # 保存完整的HTML内容
-        html_filename = f"html/{operator_name}_page.html"
-        os.makedirs("html", exist_ok=True)
-        
-        with open(html_filename, 'w', encoding='utf-8') as f:
-            f.write(response.text)
-        
-        print(f"✅ 已保存完整HTML到: {html_filename}")
-        print(f"HTML大小: {len(response.text)} 字符")
+        if status == 'not_modified':
+            print(f"✅ 页面未变化（304），使用缓存: {page_cache.path_for(operator_name)}")
+        elif status == 'unchanged':
+            print(f"✅ 页面内容未变化: {page_cache.path_for(operator_name)}")
+        else:
+            print(f"✅ 已保存完整HTML到: {page_cache.path_for(operator_name)}")
+        print(f"HTML大小: {len(html)} 字符")
         
-        return response.text
+        return html
         
     except requests.exceptions.RequestException as e:
         print(f"❌ 爬取失败: {e}")
@@ -142,94 +140,49 @@ def crawl_operator_page(url, operator_name):
 # 修改：支持按语言提取文本与下载路径
 
 def extract_voice_data_from_html(html_content, operator_name, preferred_language: str = '中文'):
-    """从HTML内容中按语言提取语音数据，并构建对应语言的下载地址"""
+    """从HTML内容中按语言提取语音数据，并构建对应语言的下载地址。
+    只解析 voice-data-root 子树（见 lib/crawl/extract.py），结果与整页 BeautifulSoup 解析一致"""
     
-    # 使用BeautifulSoup解析HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # 查找voice-data-root元素
-    voice_root = soup.find('div', id='voice-data-root')
-    if not voice_root:
+    voice_data = extract_voice_data_fast(html_content, operator_name, preferred_language=preferred_language)
+    if voice_data is None:
         print(f"未找到 {operator_name} 的voice-data-root元素")
         return []
     
-    # 获取干员信息
-    voice_key = voice_root.get('data-voice-key', '')
-    voice_base = voice_root.get('data-voice-base', '')
-    
-    voice_data = []
-    
-    # 语言映射
-    kind_name, base_path = map_display_lang_to_kind_name(preferred_language)
-    
-    # 查找所有voice-data-item元素
-    voice_items = voice_root.find_all('div', class_='voice-data-item')
-    
-    for item in voice_items:
-        title = item.get('data-title', '')
-        voice_index = item.get('data-voice-index', '')
-        voice_filename = item.get('data-voice-filename', '')
-        cond = item.get('data-cond', '')
-        
-        # 选取目标语言文本，若没有则回退中文，再回退为空
-        detail = item.find('div', {'data-kind-name': kind_name})
-        text_value = detail.get_text(strip=True) if detail else ''
-        if not text_value and kind_name != '中文':
-            cn_detail = item.find('div', {'data-kind-name': '中文'})
-            text_value = cn_detail.get_text(strip=True) if cn_detail else ''
-        
-        # 构建语音文件URL - 根据语言选择 voice_cn 或 voice，文件名统一小写
-        corrected_filename = voice_filename.lower()
-        voice_url = f"https://torappu.prts.wiki/assets/audio/{base_path}/{voice_key}/{corrected_filename}?filename={quote(title)}.wav"
-        
-        # 构建本地文件名（使用文本的MD5哈希值）
-        safe_title = re.sub(r'[<>:"/\\|?*]', '_', title)
-        selected_text_md5 = hashlib.md5(text_value.encode('utf-8')).hexdigest()
-        base_filename = f"{operator_name}_{safe_title}_{selected_text_md5}"
-        local_filename = f"{base_filename}.wav"
-        
-        voice_data.append({
-            'operator_name': operator_name,
-            'voice_key': voice_key,
-            'title': title,
-            'voice_index': voice_index,
-            'voice_filename': voice_filename,
-            'condition': cond,
-            'chinese_text': text_value,  # 按需求将字段“中文文本”复用为所选语言文本
-            'selected_language': preferred_language,
-            'selected_text_md5': selected_text_md5,
-            'voice_url': voice_url,
-            'local_filename': local_filename
-        })
-    
     return voice_data
 
-def download_voice_file(url, local_filename, voice_key=None, title=None):
-    """下载语音文件，如果中文失败则尝试日文"""
+def compress_downloaded(filepath):
+    """下载完成后无损压缩为 .wavz；压缩或校验失败时保留原 wav（下载本身已成功，不影响结果）"""
+    try:
+        compress_file(filepath)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 压缩失败，保留原 wav: {e}")
+
+
+def download_voice_file(url, local_filename, voice_key=None, title=None, fetcher=None, manifest=None, compress=False):
+    """下载语音文件，如果中文失败则尝试日文（可在多个线程中并发调用）。
+    文件先写入 .part 再原子改名，中断后再次下载会断点续传；完成后记入下载清单。
+    compress=True 时下载完成后无损压缩为同名 .wavz（清单仍记录原 wav 的大小与哈希）"""
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    fetcher = fetcher or FETCHER
+    manifest = manifest or MANIFEST
     
     try:
         print(f"正在下载: {local_filename}")
         
-        response = requests.get(url, headers=headers, timeout=30, stream=True)
-        response.raise_for_status()
-        
         # 创建lib/voc目录
         os.makedirs("lib/voc", exist_ok=True)
         
         # 保存文件
         filepath = os.path.join("lib/voc", local_filename)
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        _, digest = fetcher.download(url, filepath)
+        manifest.record(local_filename, filepath, digest, url)
+        if compress:
+            compress_downloaded(filepath)
         
         print(f"✅ 已下载: {filepath}")
         return True, "chinese"
         
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, OSError) as e:
         print(f"❌ 中文语音下载失败: {e}")
         
         # 如果中文失败且提供了voice_key和title，尝试日文语音
@@ -251,21 +204,18 @@ def download_voice_file(url, local_filename, voice_key=None, title=None):
                     japanese_url = f"https://torappu.prts.wiki/assets/audio/voice/{voice_key}/{original_filename}?filename={quote(title)}.wav"
                     print(f"尝试下载其他语种语音: {japanese_url}")
                     
-                    response = requests.get(japanese_url, headers=headers, timeout=30, stream=True)
-                    response.raise_for_status()
-                    
                     # 修改文件名，添加其他语种标识
                     japanese_filename = local_filename.replace('.wav', '_其他语种.wav')
                     filepath = os.path.join("lib/voc", japanese_filename)
-                    
-                    with open(filepath, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
+                    _, digest = fetcher.download(japanese_url, filepath)
+                    manifest.record(japanese_filename, filepath, digest, japanese_url)
+                    if compress:
+                        compress_downloaded(filepath)
                     
                     print(f"✅ 已下载其他语种语音: {filepath}")
                     return True, "japanese"
                     
-            except requests.exceptions.RequestException as e2:
+            except (requests.exceptions.RequestException, OSError) as e2:
                 print(f"❌ 其他语种语音也下载失败: {e2}")
         
         return False, "failed"
@@ -292,8 +242,14 @@ def save_voice_data_to_csv(voice_data, output_file):
 
 # 修改：加入 preferred_language 支持
 
-def process_operator(operator, download_audio=True, max_audio_files=None, preferred_language: str = '中文'):
-    """处理单个干员的语音数据（支持按语言）"""
+def process_operator(operator, download_audio=True, max_audio_files=None, preferred_language: str = '中文',
+                     fetcher=None, workers: int = DEFAULT_WORKERS, voc_files=None, dry_run=False,
+                     compress=False):
+    """处理单个干员的语音数据（支持按语言）。
+    页面上的记录先与本地CSV和音频文件比较（lib/crawl/planner.py），只重写有变化的CSV、只下载新增/变化/缺失的音频；
+    dry_run=True 时只生成计划不执行。音频由 workers 个线程并发下载，请求频率由 fetcher 的主机限速控制。
+    voc_files 为 lib/voc 的文件名集合（多名干员共用一次扫描），为 None 时现扫描；
+    compress=True 时音频下载后压缩存储（lib/ref/audio_codec.py）"""
     
     operator_name = operator['display_name']
     url = operator['full_url']
@@ -303,7 +259,7 @@ def process_operator(operator, download_audio=True, max_audio_files=None, prefer
     print(f"{'='*60}")
     
     # 爬取HTML页面
-    html_content = crawl_operator_page(url, operator_name)
+    html_content = crawl_operator_page(url, operator_name, fetcher=fetcher)
     
     if html_content is None:
         print(f"❌ {operator_name} HTML爬取失败，跳过")
@@ -318,9 +274,21 @@ def process_operator(operator, download_audio=True, max_audio_files=None, prefer
     
     print(f"✅ {operator_name} 找到 {len(voice_data)} 条语音记录")
     
-    # 保存语音数据到CSV
-    csv_file = f"voice_data_{operator_name}.csv"
-    save_voice_data_to_csv(voice_data, csv_file)
+    # 与本地状态比较，得到最小工作列表
+    if voc_files is None:
+        voc_files = scan_voc("lib/voc")
+    plan = plan_operator(operator_name, voice_data, preferred_language, "lib/voc_data", "lib/voc", voc_files,
+                         manifest=MANIFEST, max_audio_files=max_audio_files if download_audio else 0)
+    reasons = '，'.join(f"{k} {v}" for k, v in plan.reasons.items() if v) or '无'
+    print(f"计划: {plan.status}，下载 {len(plan.downloads)} 个（{reasons}），"
+          f"{'重写CSV' if plan.write_csv else 'CSV无变化'}，过期文件 {len(plan.obsolete)} 个")
+    if dry_run:
+        return voice_data, {'operator_name': operator_name, 'plan': plan}
+    
+    # 保存语音数据到CSV（内容有变化时）
+    if plan.write_csv:
+        csv_file = f"voice_data_{operator_name}.csv"
+        save_voice_data_to_csv(voice_data, csv_file)
     
     # 下载音频文件
     if download_audio:
@@ -330,24 +298,25 @@ def process_operator(operator, download_audio=True, max_audio_files=None, prefer
         japanese_count = 0
         failed_count = 0
         
-        if max_audio_files is None:
-            # 下载所有音频文件
-            download_count = len(voice_data)
-            voice_items = voice_data
-        else:
-            # 下载指定数量的音频文件
-            download_count = min(max_audio_files, len(voice_data))
-            voice_items = voice_data[:download_count]
+        # 只下载计划中的文件（已按下载数量选择截取过）
+        voice_items = plan.downloads
+        download_count = len(voice_items)
         
-        for i, item in enumerate(voice_items, 1):
-            print(f"\n下载第 {i}/{download_count} 个文件:")
-            success, voice_type = download_voice_file(
+        def download(item):
+            return download_voice_file(
                 item['voice_url'], 
                 item['local_filename'],
                 voice_key=item['voice_key'],
-                title=item['title']
+                title=item['title'],
+                fetcher=fetcher,
+                compress=compress
             )
+        
+        for item, outcome in zip(voice_items, run_parallel(download, voice_items, workers=workers)):
+            success, voice_type = outcome if isinstance(outcome, tuple) else (False, "failed")
             if success:
+                voc_files.add(item['local_filename'] if voice_type == "chinese"
+                              else item['local_filename'].replace('.wav', '_其他语种.wav'))
                 success_count += 1
                 if voice_type == "chinese":
                     chinese_count += 1
@@ -355,7 +324,7 @@ def process_operator(operator, download_audio=True, max_audio_files=None, prefer
                     japanese_count += 1
             else:
                 failed_count += 1
-            time.sleep(1)  # 避免请求过于频繁
+        MANIFEST.save()
         
         print(f"\n{operator_name} 下载完成: {success_count}/{download_count} 个文件成功")
         print(f"  中文语音: {chinese_count} 个")
@@ -373,14 +342,54 @@ def process_operator(operator, download_audio=True, max_audio_files=None, prefer
             'failed_count': failed_count,
             'has_japanese': japanese_count > 0,
             'selected_language': preferred_language,
+            'plan': plan,
         }
         
         return voice_data, result_info
     
     return voice_data, None
 
+def ask_max_audio_files():
+    """询问每个干员下载多少个音频文件（None 表示全部）"""
+    print(f"\n请选择每个干员下载的音频文件数量：")
+    print("1. 下载所有音频文件")
+    print("2. 下载前5个音频文件")
+    print("3. 自定义数量")
+    
+    audio_choice = input("请输入选择 (1/2/3): ").strip()
+    
+    if audio_choice == "1":
+        max_audio_files = None  # 下载所有
+        print("将下载每个干员的所有音频文件")
+    elif audio_choice == "2":
+        max_audio_files = 5
+        print("将下载每个干员的前5个音频文件")
+    elif audio_choice == "3":
+        try:
+            max_audio_files = int(input("请输入每个干员要下载的音频文件数量: "))
+            print(f"将下载每个干员的前{max_audio_files}个音频文件")
+        except ValueError:
+            print("输入无效，使用默认值5")
+            max_audio_files = 5
+    else:
+        print("输入无效，使用默认值5")
+        max_audio_files = 5
+    return max_audio_files
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="爬取所有干员的语音数据和音频（增量：只处理有变化的记录）")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="只访问页面（条件请求）并报告会新增/更新/下载的内容，不写CSV、不下载音频")
+    parser.add_argument("--plan-output", default=None, help="把增量计划保存为 JSON 文件")
+    parser.add_argument("--max-audio-files", default=None,
+                        help="每个干员下载的音频数量（整数或 all）；指定后不再交互询问。"
+                             "无人值守的批量爬取请使用 run_crawl_jobs.py")
+    parser.add_argument("--compress", action="store_true",
+                        help="音频下载后无损压缩为 .wavz（文件名不变，读取时透明解码）")
+    parser.add_argument("--resume", action="store_true",
+                        help="继续上次中断的爬取（跳过爬取日志中已完成的干员，沿用上次的下载数量）")
+    args = parser.parse_args()
     
     print("开始爬取所有干员的音频数据...")
     print("=" * 80)
@@ -410,10 +419,7 @@ def main():
         else:
             print(f"检测到已存在的用户报告 {user_report_path}，不会覆盖。")
         
-        incomplete_set = set(results.get('incomplete_operators', []))
         missing_audio_set = set(results.get('missing_audio', []))
-        # 需要继续用中文下载的：不完整但已存在部分音频
-        need_cn_download = incomplete_set - missing_audio_set
         # 从用户报告读取对缺少音频的语言标注
         lang_map = parse_missing_audio_language_report(user_report_path)
         # 需要按标注语言下载的：缺少音频且已标注语言为英语/日语
@@ -427,9 +433,8 @@ def main():
             print(f"⚠️ 以下干员缺少音频且未标注或标注为'无'，此次跳过: {', '.join(pending_names)}")
     except Exception as e:
         print(f"资源预检查失败（可能是首次执行或目录为空），将继续全部流程：{e}")
-        results = None
-        need_cn_download = set()
         need_special_download = {}
+        pending_names = []
     
     # 解析in.html文件中的所有干员链接
     print("1. 解析in.html文件中的干员链接...")
@@ -449,24 +454,18 @@ def main():
     if len(operators) > 10:
         print(f"... 还有 {len(operators) - 10} 个干员")
     
-    # 根据预检查结果过滤待处理干员
-    allowed_names = set(op['display_name'] for op in operators)
+    # 选择每名干员的提取语言；是否需要下载由逐条比较的增量计划决定（不再只看预检查的粗略分类）
     selected_name_to_lang: Dict[str, str] = {}
-    if results is not None:
-        # 1) 继续下载 voice_cn 的不完整干员
-        for name in need_cn_download:
-            if name in allowed_names:
-                selected_name_to_lang[name] = '中文'
-        # 2) 对缺少音频但已标注语言的干员，按该语言处理（路径使用 voice）
-        for name, display_lang in need_special_download.items():
-            if name in allowed_names:
-                selected_name_to_lang[name] = display_lang
-        if not selected_name_to_lang:
-            print("当前无需要下载的干员（要么资源已完整，要么缺少音频但尚未标注语言）。")
-    else:
-        # 无检查结果时，默认全部中文
-        for op in operators:
-            selected_name_to_lang[op['display_name']] = '中文'
+    skipped_names = set(pending_names)
+    for op in operators:
+        name = op['display_name']
+        if name in need_special_download:
+            # 缺少音频且已标注语言的干员，按该语言处理（路径使用 voice）
+            selected_name_to_lang[name] = need_special_download[name]
+        elif name not in skipped_names:
+            # 其余干员沿用已有 CSV 记录的语言，没有时为中文
+            csv_path = os.path.join("lib", "voc_data", f"voice_data_{name}.csv")
+            selected_name_to_lang[name] = csv_language(csv_path) or '中文'
     
     # 将 operators 过滤到需要处理的集合
     operators_to_process = [
@@ -485,32 +484,27 @@ def main():
     if len(operators_to_process) > 10:
         print(f"... 还有 {len(operators_to_process) - 10} 名")
     
-    # 询问每个干员下载多少个音频文件
-    print(f"\n请选择每个干员下载的音频文件数量：")
-    print("1. 下载所有音频文件")
-    print("2. 下载前5个音频文件")
-    print("3. 自定义数量")
-    
-    audio_choice = input("请输入选择 (1/2/3): ").strip()
-    
-    if audio_choice == "1":
-        max_audio_files = None  # 下载所有
-        print("将下载每个干员的所有音频文件")
-    elif audio_choice == "2":
-        max_audio_files = 5
-        print("将下载每个干员的前5个音频文件")
-    elif audio_choice == "3":
-        try:
-            max_audio_files = int(input("请输入每个干员要下载的音频文件数量: "))
-            print(f"将下载每个干员的前{max_audio_files}个音频文件")
-        except ValueError:
-            print("输入无效，使用默认值5")
-            max_audio_files = 5
+    journal = CrawlJournal()
+    resumed = journal.unfinished_run() if args.resume and not args.dry_run else None
+    if args.resume and not args.dry_run and resumed is None:
+        print("爬取日志中没有未完成的爬取，将开始新的爬取。")
+    
+    if resumed is not None:
+        run_id = resumed['run']
+        max_audio_files = resumed.get('settings', {}).get('max_audio_files')
+        done_names = journal.completed(run_id)
+        operators_to_process = [op for op in operators_to_process if op['display_name'] not in done_names]
+        print(f"继续爬取 {run_id}：已完成 {len(done_names)} 名，剩余 {len(operators_to_process)} 名")
     else:
-        print("输入无效，使用默认值5")
-        max_audio_files = 5
+        if args.max_audio_files is not None:
+            max_audio_files = None if args.max_audio_files == 'all' else int(args.max_audio_files)
+        else:
+            max_audio_files = ask_max_audio_files()
+        run_id = None if args.dry_run else journal.start_run({'max_audio_files': max_audio_files})
+    
+    voc_files = scan_voc("lib/voc")
+    crawl_plan = CrawlPlan()
     
-    all_voice_data = []
     success_count = 0
     failed_operators = []
     japanese_operators = []  # 使用其他语种语音的干员
@@ -518,48 +512,71 @@ def main():
     
     for i, operator in enumerate(operators_to_process, 1):
         print(f"\n处理进度: {i}/{len(operators_to_process)} ({i/len(operators_to_process)*100:.1f}%)")
+        preferred_language = operator.get('preferred_language', '中文')
+        voice_data, result_info = None, None
         try:
-            preferred_language = operator.get('preferred_language', '中文')
-            result = process_operator(operator, download_audio=True, max_audio_files=max_audio_files, preferred_language=preferred_language)
+            result = process_operator(operator, download_audio=True, max_audio_files=max_audio_files,
+                                      preferred_language=preferred_language, voc_files=voc_files,
+                                      dry_run=args.dry_run, compress=args.compress)
             if result:
                 voice_data, result_info = result
-                if voice_data:
-                    all_voice_data.extend(voice_data)
-                    success_count += 1
-                    
-                    # 记录处理结果
-                    if result_info:
-                        operator_results.append(result_info)
-                        # 如果使用了其他语种语音，添加到特殊列表
-                        if result_info['has_japanese'] or result_info.get('selected_language') in ('日语','日文','英语','英文'):
-                            japanese_operators.append({
-                                'name': result_info['operator_name'],
-                                'other_voice_count': result_info['japanese_count'],
-                                'chinese_count': result_info['chinese_count'],
-                                'total_download': result_info['download_count']
-                            })
-                else:
-                    failed_operators.append(operator['display_name'])
-            else:
-                failed_operators.append(operator['display_name'])
         except Exception as e:
             print(f"❌ 处理 {operator['display_name']} 时出错: {e}")
-            failed_operators.append(operator['display_name'])
         
-        # 每处理10个干员保存一次进度
-        if i % 10 == 0:
-            progress_csv_file = f"voice_data_progress_{i}.csv"
-            save_voice_data_to_csv(all_voice_data, progress_csv_file)
-            print(f"✅ 已保存进度到 lib/voc_data/{progress_csv_file}")
+        if result_info and result_info.get('plan') is not None:
+            crawl_plan.add(result_info['plan'])
+        if args.dry_run:
+            continue
         
-        time.sleep(1)  # 干员之间稍作休息
+        # 每名干员的结果立即追加到爬取日志（中断后可用 --resume 继续）
+        if not voice_data:
+            failed_operators.append(operator['display_name'])
+            journal.record_operator(run_id, operator['display_name'], preferred_language, 'failed')
+            continue
+        success_count += 1
+        journal_result = {k: v for k, v in (result_info or {}).items() if k != 'plan'}
+        if result_info and result_info.get('plan') is not None:
+            journal_result['plan'] = result_info['plan'].status
+        journal.record_operator(run_id, operator['display_name'], preferred_language, 'done',
+                                result=journal_result, records=voice_data)
+        
+        # 记录处理结果
+        if result_info:
+            operator_results.append(result_info)
+            # 如果使用了其他语种语音，添加到特殊列表
+            if result_info['has_japanese'] or result_info.get('selected_language') in ('日语','日文','英语','英文'):
+                japanese_operators.append({
+                    'name': result_info['operator_name'],
+                    'other_voice_count': result_info['japanese_count'],
+                    'chinese_count': result_info['chinese_count'],
+                    'total_download': result_info['download_count']
+                })
+    
+    print(f"\n{'='*60}")
+    print("🗂️ 增量计划")
+    print(f"{'='*60}")
+    print(crawl_plan.describe())
+    if args.plan_output:
+        crawl_plan.save(args.plan_output)
+        print(f"✅ 增量计划已保存到 {args.plan_output}")
+    if args.dry_run:
+        print(PAGE_CACHE.summary())
+        print("\n预览模式：未写入CSV，未下载音频。")
+        return
     
-    # 保存所有语音数据到总CSV文件
-    if all_voice_data:
-        total_csv_file = "all_voice_data_complete.csv"
-        save_voice_data_to_csv(all_voice_data, total_csv_file)
-        print(f"\n✅ 总共处理了 {len(all_voice_data)} 条语音记录")
-        print(f"✅ 总数据已保存到 lib/voc_data/{total_csv_file}")
+    # 由爬取日志流式生成总CSV文件（包括继续爬取前已完成的干员）
+    run_summary = journal.run_summary(run_id)
+    journal.finish_run(run_id, {k: v for k, v in run_summary.items() if k != 'failed_operators'})
+    journal.close()
+    total_csv_file = os.path.join("lib", "voc_data", "all_voice_data_complete.csv")
+    os.makedirs(os.path.dirname(total_csv_file), exist_ok=True)
+    total_records = journal.materialize(run_id, total_csv_file)
+    # 汇总 CSV 已生成，删去更早的已完成 run，避免日志无限增长
+    journal.compact(keep_run=run_id)
+    if total_records:
+        print(f"\n✅ 总共处理了 {total_records} 条语音记录")
+        print(f"✅ 总数据已保存到 {total_csv_file}（爬取日志: {journal.path}）")
+    failed_operators = run_summary['failed_operators']
     
     # 保存失败列表
     if failed_operators:
@@ -601,6 +618,8 @@ def main():
     print(f"成功处理干员: {success_count}/{len(operators_to_process)}")
     print(f"使用其他语种语音的干员: {len(japanese_operators)} 个")
     print(f"处理失败的干员: {len(failed_operators)} 个")
+    print(f"下载引擎: {FETCHER.stats.summary()}")
+    print(PAGE_CACHE.summary())
     
     if operator_results:
         total_chinese = sum(r['chinese_count'] for r in operator_results)
@@ -0,0 +1,130 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# 满载时可接受的预计等待（秒）；超过时拒绝新触发，而不是让它排在一次慢请求之后很久才出声
+DEFAULT_MAX_WAIT = 5.0
+
+
+class AdmissionController:
+    """触发准入控制，替代固定冷却时间的防抖。
+    - 流水线占用（进行中的任务数）低于 capacity 时立即受理触发，在后台线程执行 run(trigger_time)
+    - 满载时把触发合并为"最新一次"：当前任务结束后只补跑一次，合并掉的触发计入 coalesced
+    - run() 返回带 'timings' 的字典时，按阶段维护耗时的指数滑动平均，估算当前任务还需多久结束；
+      满载且预计等待超过 max_wait 时拒绝本次触发（计入 rejected），已排队的触发不受影响
+    """
+
+    def __init__(self, run: Callable[[float], Any], capacity: int = 1, alpha: float = 0.3,
+                 max_wait: Optional[float] = DEFAULT_MAX_WAIT) -> None:
+        self.run = run
+        self.capacity = max(1, capacity)
+        self.alpha = alpha
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._pending = False
+        self._pending_time = 0.0  # 排队触发的按键时间（time.time()）
+        self._run_started: Dict[int, float] = {}  # 工作线程 ident -> 本轮开始时间
+        self.stage_ewma: Dict[str, float] = {}
+        self.stats: Dict[str, int] = {'triggers': 0, 'accepted': 0, 'coalesced': 0, 'rejected': 0,
+                                      'completed': 0, 'failed': 0}
+
+    @property
+    def busy(self) -> bool:
+        return self._inflight >= self.capacity
+
+    def submit(self, trigger_time: Optional[float] = None) -> str:
+        """提交一次触发，返回 'accepted'（立即执行）、'queued'（排队等待当前任务结束）、
+        'coalesced'（覆盖了尚未执行的排队触发）或 'rejected'（预计等待超过 max_wait，忽略本次）"""
+        trigger_time = time.time() if trigger_time is None else trigger_time
+        with self._lock:
+            self.stats['triggers'] += 1
+            if self._inflight < self.capacity:
+                self._inflight += 1
+                self.stats['accepted'] += 1
+                threading.Thread(target=self._worker, args=(trigger_time,), daemon=True).start()
+                return 'accepted'
+            wait = self._estimated_wait_locked()
+            if self.max_wait is not None and wait > self.max_wait:
+                self.stats['rejected'] += 1
+                rejected = self.stats['rejected']
+            else:
+                rejected = None
+                # 已有待执行触发时本次覆盖它（只保留最新一次）
+                outcome = 'coalesced' if self._pending else 'queued'
+                if self._pending:
+                    self.stats['coalesced'] += 1
+                self._pending = True
+                self._pending_time = trigger_time
+                coalesced = self.stats['coalesced']
+        if rejected is not None:
+            print(f"流水线忙，预计还需 {wait:.1f} 秒，超过 {self.max_wait:.1f} 秒，本次触发已忽略（累计 {rejected} 次）")
+            return 'rejected'
+        print(f"流水线忙，触发已排队（预计 {wait:.1f} 秒后处理最新一次，累计合并 {coalesced} 次）")
+        return outcome
+
+    def estimated_wait(self) -> float:
+        """按最近各阶段耗时估算当前任务还需多久结束（秒）"""
+        with self._lock:
+            return self._estimated_wait_locked()
+
+    def _estimated_wait_locked(self) -> float:
+        if not self._run_started:
+            return 0.0
+        expected = self.stage_ewma.get('total', 0.0)
+        elapsed = time.perf_counter() - min(self._run_started.values())
+        return max(0.0, expected - elapsed)
+
+    def observe(self, timings: Dict[str, float]) -> None:
+        """记录一次流水线各阶段耗时（秒）"""
+        with self._lock:
+            for stage, seconds in timings.items():
+                if seconds is None:
+                    continue
+                prev = self.stage_ewma.get(stage)
+                self.stage_ewma[stage] = seconds if prev is None else prev + self.alpha * (seconds - prev)
+
+    def _worker(self, trigger_time: float) -> None:
+        ident = threading.get_ident()
+        while True:
+            with self._lock:
+                self._run_started[ident] = time.perf_counter()
+            try:
+                result = self.run(trigger_time)
+                if isinstance(result, dict) and isinstance(result.get('timings'), dict):
+                    self.observe(result['timings'])
+                with self._lock:
+                    self.stats['completed'] += 1
+            except Exception as e:
+                print(f"流水线执行异常: {e}")
+                with self._lock:
+                    self.stats['failed'] += 1
+            with self._lock:
+                del self._run_started[ident]
+                if self._pending:
+                    # 补跑合并后的最新一次触发，占用名额不释放
+                    self._pending = False
+                    trigger_time = self._pending_time
+                    continue
+                self._inflight -= 1
+                return
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """等待所有任务（含待补跑的触发）完成，主要用于测试与退出"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            with self._lock:
+                if self._inflight == 0 and not self._pending:
+                    return True
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                'inflight': self._inflight,
+                'pending': self._pending,
+                'stage_ewma': dict(self.stage_ewma),
+            }
@@ -0,0 +1,44 @@
+import math
+from typing import Dict, Iterable, List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """对已排序的数据按线性插值取百分位（pct 取值 0~100）。"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lo = math.floor(rank)
+    hi = math.ceil(rank)
+    if lo == hi:
+        return sorted_values[lo]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (rank - lo)
+
+
+def summarize_latencies(values: Iterable[float]) -> Dict[str, float]:
+    """汇总一组耗时（秒），返回 count/mean/min/p50/p90/p99/max。"""
+    data = sorted(v for v in values if v is not None)
+    if not data:
+        return {'count': 0, 'mean': 0.0, 'min': 0.0, 'p50': 0.0, 'p90': 0.0, 'p99': 0.0, 'max': 0.0}
+    return {
+        'count': len(data),
+        'mean': sum(data) / len(data),
+        'min': data[0],
+        'p50': percentile(data, 50),
+        'p90': percentile(data, 90),
+        'p99': percentile(data, 99),
+        'max': data[-1],
+    }
+
+
+def format_latency_summary(summary: Dict[str, float], unit: str = 'ms') -> str:
+    """将 summarize_latencies 的结果格式化为一行文本。"""
+    scale = 1000.0 if unit == 'ms' else 1.0
+    if not summary.get('count'):
+        return "n=0"
+    return (
+        f"n={summary['count']} mean={summary['mean'] * scale:.1f}{unit} "
+        f"p50={summary['p50'] * scale:.1f}{unit} p90={summary['p90'] * scale:.1f}{unit} "
+        f"p99={summary['p99'] * scale:.1f}{unit} max={summary['max'] * scale:.1f}{unit}"
+    )
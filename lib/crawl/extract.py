@@ -0,0 +1,171 @@
+import hashlib
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # 没有 lxml 时使用 BeautifulSoup 解析整页
+    etree = lxml_html = None
+
+# 从干员语音记录页面提取语音数据。
+# 页面有几百 KB，而语音数据只在 <div id="voice-data-root"> 中：快速路径先在原始 HTML 中定位这个 div
+# 并截取到与之配对的 </div>，只用 lxml 解析这一小段；定位失败时回退为 lxml 解析整页。
+# 两条路径的输出与原先 BeautifulSoup(html.parser) 的实现逐条一致（extract_voice_data_bs4 保留作对照）。
+LANG_MAP_DISPLAY_TO_KIND = {
+    '中文': '中文',
+    '日语': '日文',
+    '日文': '日文',
+    '英语': '英文',
+    '英文': '英文',
+}
+AUDIO_BASE_URL = 'https://torappu.prts.wiki/assets/audio'
+
+_ROOT_RE = re.compile(r'<div\b[^>]*\bid\s*=\s*["\']?voice-data-root\b', re.IGNORECASE)
+# 注释与脚本中的 div 标签不参与配对
+_DIV_RE = re.compile(r'<!--.*?-->|<script\b.*?</script\s*>|<(/?)div\b[^>]*>', re.IGNORECASE | re.DOTALL)
+_ITEM_XPATH = ".//div[contains(concat(' ', normalize-space(@class), ' '), ' voice-data-item ')]"
+
+
+def map_display_lang_to_kind_name(display_lang: str) -> Tuple[str, str]:
+    """将显示语言映射为 (数据块语言标签, 下载路径基准)。
+    返回 (kind_name, base_path)，其中 base_path 为 voice_cn 或 voice。"""
+    kind = LANG_MAP_DISPLAY_TO_KIND.get(display_lang, '中文')
+    base_path = 'voice_cn' if kind == '中文' else 'voice'
+    return kind, base_path
+
+
+def build_record(operator_name: str, voice_key: str, title: str, voice_index: str, voice_filename: str,
+                 cond: str, text_value: str, preferred_language: str) -> Dict[str, str]:
+    """由页面上的一条语音构建记录（下载地址、按文本 MD5 命名的本地文件名）"""
+    _, base_path = map_display_lang_to_kind_name(preferred_language)
+    # 构建语音文件URL - 根据语言选择 voice_cn 或 voice，文件名统一小写
+    corrected_filename = voice_filename.lower()
+    voice_url = f"{AUDIO_BASE_URL}/{base_path}/{voice_key}/{corrected_filename}?filename={quote(title)}.wav"
+
+    # 构建本地文件名（使用文本的MD5哈希值）
+    safe_title = re.sub(r'[<>:"/\\|?*]', '_', title)
+    selected_text_md5 = hashlib.md5(text_value.encode('utf-8')).hexdigest()
+    local_filename = f"{operator_name}_{safe_title}_{selected_text_md5}.wav"
+
+    return {
+        'operator_name': operator_name,
+        'voice_key': voice_key,
+        'title': title,
+        'voice_index': voice_index,
+        'voice_filename': voice_filename,
+        'condition': cond,
+        'chinese_text': text_value,  # 按需求将字段“中文文本”复用为所选语言文本
+        'selected_language': preferred_language,
+        'selected_text_md5': selected_text_md5,
+        'voice_url': voice_url,
+        'local_filename': local_filename
+    }
+
+
+def extract_voice_data_bs4(html_content: str, operator_name: str,
+                           preferred_language: str = '中文') -> Optional[List[Dict[str, str]]]:
+    """BeautifulSoup(html.parser) 解析整页；没有 voice-data-root 时返回 None"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    voice_root = soup.find('div', id='voice-data-root')
+    if not voice_root:
+        return None
+
+    voice_key = voice_root.get('data-voice-key', '')
+    kind_name, _ = map_display_lang_to_kind_name(preferred_language)
+    voice_data = []
+    for item in voice_root.find_all('div', class_='voice-data-item'):
+        # 选取目标语言文本，若没有则回退中文，再回退为空
+        detail = item.find('div', {'data-kind-name': kind_name})
+        text_value = detail.get_text(strip=True) if detail else ''
+        if not text_value and kind_name != '中文':
+            cn_detail = item.find('div', {'data-kind-name': '中文'})
+            text_value = cn_detail.get_text(strip=True) if cn_detail else ''
+        voice_data.append(build_record(
+            operator_name, voice_key, item.get('data-title', ''), item.get('data-voice-index', ''),
+            item.get('data-voice-filename', ''), item.get('data-cond', ''), text_value, preferred_language))
+    return voice_data
+
+
+def _strings(el) -> Iterator[str]:
+    # 与 BeautifulSoup 的 get_text 一致：元素文本与子节点尾随文本，跳过注释/处理指令自身的内容
+    if isinstance(el.tag, str) and el.text:
+        yield el.text
+    for child in el:
+        yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _text(el) -> str:
+    """等价于 BeautifulSoup 的 get_text(strip=True)"""
+    return ''.join(s.strip() for s in _strings(el) if s.strip())
+
+
+def _slice_root(html_content: str) -> Optional[str]:
+    """截取 voice-data-root 这个 div 的完整源码（按 div 开闭标签配对），找不到或不配对时返回 None"""
+    match = _ROOT_RE.search(html_content)
+    if not match:
+        return None
+    depth = 0
+    for tag in _DIV_RE.finditer(html_content, match.start()):
+        if tag.group(1) is None:
+            continue
+        if tag.group(1):
+            depth -= 1
+            if depth == 0:
+                return html_content[match.start():tag.end()]
+        elif not tag.group(0).endswith('/>'):
+            depth += 1
+    return None
+
+
+def _find_root(html_content: str):
+    snippet = _slice_root(html_content)
+    if snippet is not None:
+        try:
+            root = lxml_html.fragment_fromstring(snippet)
+            if root.get('id') == 'voice-data-root':
+                return root
+        except (etree.ParserError, ValueError):
+            pass
+    # 回退：解析整页
+    try:
+        doc = lxml_html.document_fromstring(html_content)
+    except (etree.ParserError, ValueError):
+        return None
+    found = doc.xpath("//div[@id='voice-data-root']")
+    return found[0] if found else None
+
+
+def extract_voice_data_fast(html_content: str, operator_name: str,
+                            preferred_language: str = '中文') -> Optional[List[Dict[str, str]]]:
+    """只解析 voice-data-root 子树（lxml）；没有 voice-data-root 时返回 None"""
+    if lxml_html is None:
+        return extract_voice_data_bs4(html_content, operator_name, preferred_language)
+    voice_root = _find_root(html_content)
+    if voice_root is None:
+        return None
+
+    voice_key = voice_root.get('data-voice-key', '')
+    kind_name, _ = map_display_lang_to_kind_name(preferred_language)
+    voice_data = []
+    for item in voice_root.xpath(_ITEM_XPATH):
+        details = {}
+        for div in item.iterdescendants('div'):
+            kind = div.get('data-kind-name')
+            if kind is not None and kind not in details:
+                details[kind] = div
+        detail = details.get(kind_name)
+        text_value = _text(detail) if detail is not None else ''
+        if not text_value and kind_name != '中文':
+            cn_detail = details.get('中文')
+            text_value = _text(cn_detail) if cn_detail is not None else ''
+        voice_data.append(build_record(
+            operator_name, voice_key, item.get('data-title', ''), item.get('data-voice-index', ''),
+            item.get('data-voice-filename', ''), item.get('data-cond', ''), text_value, preferred_language))
+    return voice_data
+
@@ -0,0 +1,351 @@
+import email.utils
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+try:
+    from .manifest import PART_SUFFIX, file_sha256
+except ImportError:
+    from manifest import PART_SUFFIX, file_sha256
+
+# 爬虫的下载引擎：有界线程池 + 按主机的令牌桶限速。
+# prts.wiki（页面）与 torappu.prts.wiki（音频）分别限速；429/503 时遵守 Retry-After，
+# 暂停的是整个主机的令牌桶，其余线程也一起等待，不会在限流期间继续请求。
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+# 主机 -> (每秒请求数, 突发容量)
+DEFAULT_HOST_RATES: Dict[str, Tuple[float, int]] = {
+    'prts.wiki': (1.0, 2),
+    'torappu.prts.wiki': (4.0, 4),
+}
+DEFAULT_RATE: Tuple[float, int] = (2.0, 2)
+DEFAULT_WORKERS = 6
+RETRY_STATUS = (429, 500, 502, 503, 504)
+MAX_RETRY_AFTER = 300.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Retry-After 头 -> 等待秒数。支持秒数与 HTTP 日期两种格式，无法解析时返回 None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+class TokenBucket:
+    """令牌桶：平均每秒 rate 个请求，最多积攒 burst 个。pause(seconds) 让桶在这段时间内不发放令牌"""
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """取一个令牌，返回调用方还需等待的秒数（令牌可以预支，等待时间由调用方在锁外完成）"""
+        with self._lock:
+            now = self._clock()
+            if now < self._paused_until:
+                self._updated = self._paused_until
+                self._tokens = min(self._tokens, 0.0)
+            elif self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1.0
+            start = max(now, self._paused_until)
+            if self._tokens >= 0 or self.rate <= 0:
+                return start - now
+            return start - now + (-self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """阻塞直到可以发出下一个请求，返回实际等待的秒数"""
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            until = self._clock() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = min(self._tokens, 0.0)
+
+
+class SharedTokenBucket(TokenBucket):
+    """状态（令牌数、更新时间、暂停截止时间）放在共享内存中的令牌桶，多个工作进程共用同一个速率。
+    需在创建进程池之前创建，并通过 initializer 参数传给工作进程；时钟为 time.monotonic（各进程一致）"""
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, context=None) -> None:
+        self._state = (context or multiprocessing).Array('d', 3)
+        super().__init__(rate, burst, clock, sleep)
+        self._lock = self._state.get_lock()
+
+    def _field(index: int):
+        def get(self) -> float:
+            return self._state[index]
+
+        def set(self, value: float) -> None:
+            self._state[index] = value
+        return property(get, set)
+
+    _tokens = _field(0)
+    _updated = _field(1)
+    _paused_until = _field(2)
+    del _field
+
+
+class HostRateLimiter:
+    """按主机名分配令牌桶；未配置的主机使用 default"""
+
+    def __init__(self, rates: Optional[Dict[str, Tuple[float, int]]] = None,
+                 default: Tuple[float, int] = DEFAULT_RATE) -> None:
+        self.rates = dict(DEFAULT_HOST_RATES if rates is None else rates)
+        self.default = default
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url_or_host: str) -> str:
+        host = urlsplit(url_or_host).hostname if '//' in url_or_host else url_or_host
+        return (host or '').lower()
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        host = self._host(url_or_host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.rates.get(host, self.default)
+                bucket = TokenBucket(rate, burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url: str) -> float:
+        return self.bucket(url).acquire()
+
+    def pause(self, url: str, seconds: float) -> None:
+        self.bucket(url).pause(seconds)
+
+
+class SharedHostRateLimiter(HostRateLimiter):
+    """多进程共享的主机限速：为已配置的主机预先创建共享令牌桶，其余主机共用一个默认速率的桶。
+    限速对所有工作进程合计生效（而不是每个进程各自按该速率请求）"""
+
+    def __init__(self, rates: Optional[Dict[str, Tuple[float, int]]] = None,
+                 default: Tuple[float, int] = DEFAULT_RATE, context=None) -> None:
+        super().__init__(rates, default)
+        for host, (rate, burst) in self.rates.items():
+            self._buckets[host.lower()] = SharedTokenBucket(rate, burst, context=context)
+        self._default_bucket = SharedTokenBucket(*default, context=context)
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        return self._buckets.get(self._host(url_or_host), self._default_bucket)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class IncompleteDownload(OSError):
+    """下载的字节数与服务器声明的长度不一致"""
+
+
+class FetchStats:
+    """线程安全的下载统计：请求数、成功/失败、重试、限流、字节数与吞吐"""
+
+    FIELDS = ('requests', 'ok', 'failed', 'retries', 'throttled', 'bytes')
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.waited = 0.0
+        self.counts: Dict[str, int] = {k: 0 for k in self.FIELDS}
+
+    def add(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += n
+
+    def add_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waited += seconds
+
+    def absorb(self, snapshot: Dict[str, Any]) -> None:
+        """累加另一个 FetchStats 的 snapshot()（多进程爬取时汇总各工作进程的统计）"""
+        with self._lock:
+            for key in self.FIELDS:
+                self.counts[key] += snapshot.get(key, 0)
+            self.waited += snapshot.get('waited', 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = dict(self.counts)
+            data['waited'] = self.waited
+        elapsed = time.monotonic() - self.started
+        data['elapsed'] = elapsed
+        data['files_per_sec'] = data['ok'] / elapsed if elapsed > 0 else 0.0
+        data['mb_per_sec'] = data['bytes'] / elapsed / 1e6 if elapsed > 0 else 0.0
+        return data
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        return (f"请求 {s['requests']} 次，成功 {s['ok']}，失败 {s['failed']}，重试 {s['retries']}，"
+                f"限流 {s['throttled']}，{s['bytes'] / 1e6:.1f} MB / {s['elapsed']:.1f}s "
+                f"({s['files_per_sec']:.2f} 个/s, {s['mb_per_sec']:.2f} MB/s)")
+
+
+class Fetcher:
+    """带限速与重试的 HTTP 客户端，可被多个线程共享（每个线程各自持有一个 requests.Session 复用连接）"""
+
+    def __init__(self, limiter: Optional[HostRateLimiter] = None, max_retries: int = 4, timeout: float = 30,
+                 backoff: float = 1.0, headers: Optional[Dict[str, str]] = None,
+                 stats: Optional[FetchStats] = None) -> None:
+        self.limiter = limiter or HostRateLimiter()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+        self.stats = stats or FetchStats()
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    def _retry_delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    def get(self, url: str, stream: bool = False, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """GET 请求。限流/服务端错误/连接错误按 Retry-After 或指数退避重试；
+        重试用尽后返回最后一次响应（由调用方 raise_for_status）或抛出最后一次的连接异常"""
+        attempt = 0
+        while True:
+            self.stats.add_wait(self.limiter.acquire(url))
+            self.stats.add('requests')
+            try:
+                response = self._session().get(url, headers=headers, timeout=self.timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                response.close()
+                if response.status_code in (429, 503):
+                    self.stats.add('throttled')
+                delay = min(MAX_RETRY_AFTER, retry_after) if retry_after is not None else self._retry_delay(attempt)
+                # 主机整体暂停，避免其它线程在限流期间继续请求
+                self.limiter.pause(url, delay)
+            attempt += 1
+            self.stats.add('retries')
+            if delay > 0:
+                time.sleep(delay)
+
+    def download(self, url: str, path: str, chunk_size: int = 65536, resume: bool = True) -> Tuple[int, str]:
+        """下载到 path，返回 (字节数, SHA-256)。
+        数据先写入 path + '.part'，长度校验通过后原子改名，中断不会留下半截的最终文件；
+        传输中断或再次下载时若 .part 已存在，用 Range 请求从断点续传（服务器不支持时从头下载）。
+        HTTP 错误时抛出 requests.exceptions.HTTPError，长度不符且重试用尽时抛出 IncompleteDownload"""
+        part = path + PART_SUFFIX
+        attempt = 0
+        try:
+            while True:
+                offset = os.path.getsize(part) if resume and os.path.exists(part) else 0
+                response = self.get(url, stream=True, headers={'Range': f'bytes={offset}-'} if offset else None)
+                expected, received, done = None, 0, False
+                try:
+                    if response.status_code == 416:
+                        # 断点超出文件长度（远端文件已变化）：丢弃 .part 从头下载
+                        os.remove(part)
+                    else:
+                        response.raise_for_status()
+                        if response.status_code != 206:
+                            offset = 0
+                        expected = _expected_size(response, offset)
+                        received = offset
+                        with open(part, 'ab' if offset else 'wb') as f:
+                            for chunk in response.iter_content(chunk_size=chunk_size):
+                                f.write(chunk)
+                                received += len(chunk)
+                        done = expected is None or received == expected
+                except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError,
+                        requests.exceptions.Timeout):
+                    if attempt >= self.max_retries:
+                        raise
+                finally:
+                    response.close()
+                if done:
+                    break
+                if attempt >= self.max_retries:
+                    raise IncompleteDownload(f"{url}: 收到 {received} 字节，应为 {expected} 字节")
+                attempt += 1
+                self.stats.add('retries')
+            digest = file_sha256(part)
+            os.replace(part, path)
+        except (requests.exceptions.RequestException, OSError):
+            self.stats.add('failed')
+            raise
+        self.stats.add('ok')
+        self.stats.add('bytes', received)
+        return received, digest
+
+
+def _expected_size(response: requests.Response, offset: int) -> Optional[int]:
+    """根据 Content-Range / Content-Length 计算完整文件的长度，未知时返回 None"""
+    content_range = response.headers.get('Content-Range', '')
+    if response.status_code == 206 and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get('Content-Length')
+    if length and length.isdigit() and 'gzip' not in response.headers.get('Content-Encoding', ''):
+        return offset + int(length)
+    return None
+
+
+def run_parallel(func: Callable[[Any], Any], items: Iterable[Any], workers: int = DEFAULT_WORKERS) -> List[Any]:
+    """在有界线程池中执行 func，结果保持输入顺序；单个任务的异常作为结果返回而不是中断整批"""
+    def call(item):
+        try:
+            return func(item)
+        except Exception as e:
+            return e
+
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(call, items))
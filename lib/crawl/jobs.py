@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .extract import LANG_MAP_DISPLAY_TO_KIND
+    from .offline import CSV_PREFIX, csv_language
+except ImportError:
+    from extract import LANG_MAP_DISPLAY_TO_KIND
+    from offline import CSV_PREFIX, csv_language
+
+# 爬取任务清单（JSON），供无人值守的定时爬取使用，取代交互式选择下载数量：
+#   {
+#     "source": "in.html",                                   干员链接来源
+#     "defaults": {"language": "auto", "max_audio_files": null},
+#     "operators": "all",                                    或列表：["阿米娅", {"name": "12F", "language": "日语", "max_audio_files": 5}]
+#     "exclude": ["某干员"],
+#     "compress": false                                      音频下载后无损压缩为 .wavz
+#   }
+# language 为 "auto" 时沿用已有 CSV 记录的语言（没有时为中文）；max_audio_files 为 null 表示全部。
+JOB_LANGUAGE_AUTO = 'auto'
+JOB_FIELDS = ('language', 'max_audio_files')
+DEFAULT_JOB_MANIFEST: Dict[str, Any] = {
+    'source': 'in.html',
+    'defaults': {'language': JOB_LANGUAGE_AUTO, 'max_audio_files': None},
+    'operators': 'all',
+    'exclude': [],
+    'compress': False,
+}
+
+
+class CrawlJob:
+    def __init__(self, index: int, name: str, url: str, language: str, max_audio_files: Optional[int],
+                 compress: bool = False) -> None:
+        self.index = index
+        self.name = name
+        self.url = url
+        self.language = language
+        self.max_audio_files = max_audio_files
+        self.compress = compress
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'index': self.index, 'name': self.name, 'url': self.url, 'language': self.language,
+                'max_audio_files': self.max_audio_files, 'compress': self.compress}
+
+
+def _check_options(options: Dict[str, Any], where: str) -> None:
+    language = options.get('language', JOB_LANGUAGE_AUTO)
+    if language != JOB_LANGUAGE_AUTO and language not in LANG_MAP_DISPLAY_TO_KIND:
+        raise ValueError(f"{where}: 未知的语言 {language!r}（可选 auto、{'、'.join(sorted(LANG_MAP_DISPLAY_TO_KIND))}）")
+    limit = options.get('max_audio_files')
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 0):
+        raise ValueError(f"{where}: max_audio_files 应为非负整数或 null，而不是 {limit!r}")
+
+
+def validate_job_manifest(data: Dict[str, Any]) -> Dict[str, Any]:
+    """检查任务清单并补全默认值，格式错误时抛出 ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError("任务清单应为 JSON 对象")
+    manifest = {**DEFAULT_JOB_MANIFEST, **data}
+    manifest['defaults'] = {**DEFAULT_JOB_MANIFEST['defaults'], **(data.get('defaults') or {})}
+    _check_options(manifest['defaults'], 'defaults')
+
+    operators = manifest['operators']
+    if operators != 'all':
+        if not isinstance(operators, list):
+            raise ValueError("operators 应为 \"all\" 或干员列表")
+        entries = []
+        for i, entry in enumerate(operators):
+            if isinstance(entry, str):
+                entry = {'name': entry}
+            if not isinstance(entry, dict) or not entry.get('name'):
+                raise ValueError(f"operators[{i}]: 应为干员名或包含 name 的对象")
+            _check_options({**manifest['defaults'], **entry}, f"operators[{i}] ({entry['name']})")
+            entries.append(entry)
+        manifest['operators'] = entries
+    if not isinstance(manifest['exclude'], list):
+        raise ValueError("exclude 应为干员名列表")
+    if not isinstance(manifest['compress'], bool):
+        raise ValueError("compress 应为 true 或 false")
+    return manifest
+
+
+def load_job_manifest(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"任务清单不是有效的 JSON: {e}") from e
+    return validate_job_manifest(data)
+
+
+def manifest_digest(manifest: Dict[str, Any]) -> str:
+    """任务清单内容的摘要，继续爬取时用来确认清单没有改变"""
+    canonical = json.dumps(manifest, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def build_jobs(manifest: Dict[str, Any], operators: List[Dict[str, str]],
+               csv_dir: str) -> Tuple[List[CrawlJob], List[str]]:
+    """按任务清单与干员链接（display_name / full_url）生成任务列表，返回 (任务, 链接中找不到的干员名)。
+    任务顺序：operators 为 "all" 时与链接顺序一致，否则与清单顺序一致"""
+    urls = {op['display_name']: op['full_url'] for op in operators}
+    if manifest['operators'] == 'all':
+        entries = [{'name': op['display_name']} for op in operators]
+    else:
+        entries = manifest['operators']
+    excluded = set(manifest['exclude'])
+
+    jobs: List[CrawlJob] = []
+    missing: List[str] = []
+    seen = set()
+    for entry in entries:
+        name = entry['name']
+        if name in excluded or name in seen:
+            continue
+        seen.add(name)
+        if name not in urls:
+            missing.append(name)
+            continue
+        options = {**manifest['defaults'], **{k: entry[k] for k in JOB_FIELDS if k in entry}}
+        language = options['language']
+        if language == JOB_LANGUAGE_AUTO:
+            language = csv_language(os.path.join(csv_dir, f"{CSV_PREFIX}{name}.csv")) or '中文'
+        jobs.append(CrawlJob(len(jobs), name, urls[name], language, options['max_audio_files'],
+                             manifest['compress']))
+    return jobs, missing
@@ -0,0 +1,205 @@
+import csv
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+# 爬取日志：只追加的 JSONL 文件，每完成一名干员写一行（语音记录 + 下载结果）并立即落盘。
+# 取代每 10 名干员重写一次的 voice_data_progress_<i>.csv：写入量与本次结果成正比，内存中不再累积全部记录。
+# 一次爬取为一个 run：
+#   {"type": "run_start", "run": ..., "settings": {...}}
+#   {"type": "operator", "run": ..., "name": ..., "language": ..., "status": "done"/"failed", "result": {...}, "records": [...]}
+#   {"type": "run_end", "run": ..., "summary": {...}}
+# 没有 run_end 的 run 可以继续（跳过已完成的干员）；汇总 CSV 由日志一次流式读取生成。
+# 生成汇总 CSV 后调用 compact() 删去更早的已完成 run，日志只保留最近一次完成的 run 与未完成的 run，不会无限增长。
+DEFAULT_JOURNAL_PATH = os.path.join('lib', 'crawl_journal.jsonl')
+
+
+class CrawlJournal:
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def entries(self, run_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """逐行读取日志（可只读取一个 run）；崩溃时写了一半的行会被跳过"""
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if run_id is None or entry.get('run') == run_id:
+                    yield entry
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # 上次崩溃留下不完整的最后一行时，先换行，避免与新记录连在一起
+                torn = False
+                if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                    with open(self.path, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        torn = f.read(1) != b'\n'
+                self._file = open(self.path, 'a', encoding='utf-8')
+                if torn:
+                    self._file.write('\n')
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def start_run(self, settings: Optional[Dict[str, Any]] = None) -> str:
+        run_id = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:6]
+        self._append({'type': 'run_start', 'run': run_id, 'time': time.time(), 'settings': settings or {}})
+        return run_id
+
+    def unfinished_run(self) -> Optional[Dict[str, Any]]:
+        """最后一个没有 run_end 的 run 的 run_start 记录（没有则返回 None）"""
+        last = None
+        for entry in self.entries():
+            if entry.get('type') == 'run_start':
+                last = entry
+            elif entry.get('type') == 'run_end' and last is not None and entry.get('run') == last['run']:
+                last = None
+        return last
+
+    def completed(self, run_id: str) -> Set[str]:
+        """该 run 中已成功完成的干员"""
+        return {entry['name'] for entry in self.entries(run_id)
+                if entry.get('type') == 'operator' and entry.get('status') == 'done'}
+
+    def record_operator(self, run_id: str, name: str, language: str, status: str,
+                        result: Optional[Dict[str, Any]] = None,
+                        records: Optional[List[Dict[str, Any]]] = None) -> None:
+        self._append({'type': 'operator', 'run': run_id, 'name': name, 'language': language, 'status': status,
+                      'time': time.time(), 'result': result or {}, 'records': records or []})
+
+    def finish_run(self, run_id: str, summary: Optional[Dict[str, Any]] = None) -> None:
+        self._append({'type': 'run_end', 'run': run_id, 'time': time.time(), 'summary': summary or {}})
+
+    def run_summary(self, run_id: str) -> Dict[str, Any]:
+        """流式统计一个 run：完成/失败的干员、记录数与各项下载计数之和"""
+        summary: Dict[str, Any] = {'done': 0, 'failed': 0, 'records': 0, 'failed_operators': [], 'result_totals': {}}
+        for entry in self.entries(run_id):
+            if entry.get('type') != 'operator':
+                continue
+            if entry['status'] != 'done':
+                summary['failed'] += 1
+                summary['failed_operators'].append(entry['name'])
+                continue
+            summary['done'] += 1
+            summary['records'] += len(entry.get('records', []))
+            for key, value in entry.get('result', {}).items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    summary['result_totals'][key] = summary['result_totals'].get(key, 0) + value
+        # 继续运行时失败后又完成的干员不算失败
+        done = self.completed(run_id) if summary['failed'] else set()
+        summary['failed_operators'] = sorted(set(summary['failed_operators']) - done)
+        summary['failed'] = len(summary['failed_operators'])
+        return summary
+
+    def _done_offsets(self, run_id: str) -> Dict[str, int]:
+        """该 run 中每名完成干员最后一条记录在文件中的偏移"""
+        offsets: Dict[str, int] = {}
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return offsets
+        with f:
+            offset = 0
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = None
+                if (entry and entry.get('type') == 'operator' and entry.get('run') == run_id
+                        and entry.get('status') == 'done'):
+                    offsets[entry['name']] = offset
+                offset += len(line)
+        return offsets
+
+    def _ordered_entries(self, run_id: str, order: List[str]) -> Iterator[Dict[str, Any]]:
+        """按 order 给出的干员顺序读取完成记录（先记下偏移，再逐条 seek 读取，内存中不保留记录）"""
+        offsets = self._done_offsets(run_id)
+        with open(self.path, 'rb') as f:
+            for name in order:
+                if name in offsets:
+                    f.seek(offsets[name])
+                    yield json.loads(f.readline())
+
+    def materialize(self, run_id: str, out_path: str, order: Optional[List[str]] = None) -> int:
+        """把一个 run 中完成干员的全部语音记录流式写成一个 CSV（先写临时文件再改名），返回记录数。
+        order 为干员名列表时按该顺序输出（多进程爬取的完成顺序不固定，按任务顺序输出保证结果确定）"""
+        count = 0
+        writer = None
+        tmp_path = out_path + '.tmp'
+        if order is None:
+            entries = (e for e in self.entries(run_id) if e.get('type') == 'operator' and e.get('status') == 'done')
+        else:
+            entries = self._ordered_entries(run_id, order)
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for entry in entries:
+                for record in entry.get('records', []):
+                    if writer is None:
+                        writer = csv.DictWriter(f, fieldnames=list(record), lineterminator='\n',
+                                                extrasaction='ignore')
+                        writer.writeheader()
+                    writer.writerow(record)
+                    count += 1
+        if count:
+            os.replace(tmp_path, out_path)
+        else:
+            os.remove(tmp_path)
+        return count
+
+    def compact(self, keep_run: Optional[str] = None) -> int:
+        """删去旧的已完成 run：只保留 keep_run（默认为最后一个完成的 run）与所有未完成的 run。
+        先写临时文件再改名，中途崩溃时原日志不受影响；返回删去的 run 数"""
+        started: List[str] = []
+        finished: Set[str] = set()
+        for entry in self.entries():
+            if entry.get('type') == 'run_start':
+                started.append(entry['run'])
+            elif entry.get('type') == 'run_end':
+                finished.add(entry['run'])
+        if keep_run is None:
+            keep_run = next((run for run in reversed(started) if run in finished), None)
+        keep = {run for run in started if run not in finished}
+        if keep_run is not None:
+            keep.add(keep_run)
+        removed = len(set(started) - keep)
+        if not removed:
+            return 0
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                for line in src:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get('run') in keep:
+                        dst.write(line if line.endswith(b'\n') else line + b'\n')
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp_path, self.path)
+        return removed
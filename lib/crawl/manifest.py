@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+try:
+    from ..ref.audio_codec import COMPRESSED_SUFFIX, audio_size, audio_stat, read_audio_bytes, scan_audio
+except ImportError:
+    from lib.ref.audio_codec import COMPRESSED_SUFFIX, audio_size, audio_stat, read_audio_bytes, scan_audio
+
+# 下载清单：记录每个已完成下载的文件大小、SHA-256 与来源 URL（JSON，结构与 clip_meta.json 类似）
+#   {'version': 1, 'files': {文件名: {'size': .., 'sha256': .., 'url': .., 'mtime_ns': ..}}}
+# 文件先写入 <文件名>.part，完整下载并校验长度后才改名为最终文件名，
+# 因此 lib/voc 中出现的 wav 一定是完整的；清单用于事后校验整个语料库。
+# 压缩存储的 .wavz（lib/ref/audio_codec.py）解码后与原 wav 逐字节相同，按原文件名、大小与哈希校验；
+# 打包存储（lib/ref/audio_pack.py）中的片段同样按原文件名校验。
+MANIFEST_VERSION = 1
+PART_SUFFIX = '.part'
+DEFAULT_MANIFEST_PATH = os.path.join('lib', 'voc_manifest.json')
+VERIFY_STATUSES = ('ok', 'missing', 'size_mismatch', 'hash_mismatch', 'truncated', 'untracked')
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def audio_sha256(path: str) -> str:
+    """登记的 .wav 路径对应原 wav 的 SHA-256（压缩或打包存储时按解码结果计算）"""
+    if os.path.exists(path):
+        return file_sha256(path)
+    return hashlib.sha256(read_audio_bytes(path, cache=False)).hexdigest()
+
+
+def wav_truncated(path: str) -> bool:
+    """根据 RIFF 头声明的长度判断 wav 是否被截断（清单建立之前下载的文件只能这样检查）"""
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+                return True
+            if 8 + struct.unpack('<I', header[4:8])[0] > size:
+                return True
+            # 逐块检查，data 块声明的长度不能超出文件
+            offset = 12
+            while offset + 8 <= size:
+                f.seek(offset)
+                chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+                if chunk_id == b'data':
+                    return offset + 8 + chunk_size > size
+                offset += 8 + chunk_size + (chunk_size & 1)
+            return True
+    except (OSError, struct.error):
+        return True
+
+
+class DownloadManifest:
+    """下载清单，可被多个下载线程共享。
+    多进程爬取时工作进程使用 persist=False：save() 不写文件，改动由 pop_changes() 交给父进程 apply_changes() 后保存"""
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH, persist: bool = True) -> None:
+        self.path = path
+        self.persist = persist
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._changes: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self.files = {}
+            return
+        self.files = data.get('files', {}) if data.get('version') == MANIFEST_VERSION else {}
+
+    def save(self) -> None:
+        if not self.persist:
+            return
+        with self._lock:
+            if not self._dirty and os.path.exists(self.path):
+                return
+            payload = {'version': MANIFEST_VERSION, 'files': dict(self.files)}
+            self._dirty = False
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        return self.files.get(filename)
+
+    def record(self, filename: str, path: str, sha256: str, url: Optional[str] = None) -> None:
+        st = audio_stat(path)
+        size = st.st_size if os.path.exists(path) else audio_size(path)
+        with self._lock:
+            self.files[filename] = {'size': size, 'sha256': sha256, 'url': url, 'mtime_ns': st.st_mtime_ns}
+            self._changes[filename] = self.files[filename]
+            self._dirty = True
+
+    def forget(self, filename: str) -> None:
+        with self._lock:
+            if self.files.pop(filename, None) is not None:
+                self._changes[filename] = None
+                self._dirty = True
+
+    def pop_changes(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """上次调用以来的改动 {文件名: 记录，None 表示已移除}"""
+        with self._lock:
+            changes, self._changes = self._changes, {}
+        return changes
+
+    def apply_changes(self, changes: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        with self._lock:
+            for filename, entry in changes.items():
+                if entry is None:
+                    self.files.pop(filename, None)
+                else:
+                    self.files[filename] = entry
+            if changes:
+                self._dirty = True
+
+    def has_complete(self, filename: str, path: str) -> bool:
+        """文件存在且大小与清单一致（不计算哈希，用于下载前跳过已完成的文件）；已压缩或打包的文件比较原大小"""
+        entry = self.files.get(filename)
+        if entry is None:
+            return False
+        try:
+            return audio_size(path) == entry['size']
+        except (OSError, ValueError):
+            return False
+
+    def verify(self, directory: str, deep: bool = True, workers: int = 8,
+               filenames: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """并行校验目录中的 wav 与清单。
+        deep=False 时只比较大小（文件 mtime 与清单一致时视为未改动）；deep=True 时重新计算 SHA-256。
+        清单之外的 wav 按 RIFF 头检查是否截断。返回 {状态: [文件名, ...]}，另含 'partial'（残留的 .part 文件）"""
+        on_disk: Dict[str, os.stat_result] = {}
+        packed: Set[str] = set()  # 以压缩格式或在打包存储中保存的文件
+        partial: List[str] = []
+        if os.path.isdir(directory):
+            with os.scandir(directory) as it:
+                partial = sorted(entry.name for entry in it if entry.name.endswith(PART_SUFFIX))
+            for name, entry in scan_audio(directory).items():
+                on_disk[name] = entry.stat()
+                if not isinstance(entry, os.DirEntry) or entry.name.endswith(COMPRESSED_SUFFIX):
+                    packed.add(name)
+        names = set(self.files) | set(on_disk) if filenames is None else set(filenames)
+
+        def check_packed(name: str, entry: Optional[Dict[str, Any]]) -> str:
+            path = os.path.join(directory, name)
+            try:
+                size = audio_size(path)
+                if entry is not None and size != entry['size']:
+                    return 'size_mismatch'
+                if entry is not None and not deep:
+                    return 'ok'
+                digest = audio_sha256(path)
+            except (OSError, ValueError):
+                return 'truncated'
+            if entry is None:
+                return 'untracked'
+            return 'ok' if digest == entry['sha256'] else 'hash_mismatch'
+
+        def check(name: str) -> str:
+            entry = self.files.get(name)
+            st = on_disk.get(name)
+            path = os.path.join(directory, name)
+            if name in packed:
+                return check_packed(name, entry)
+            if entry is None:
+                if st is None:
+                    return 'missing'
+                return 'truncated' if wav_truncated(path) else 'untracked'
+            if st is None:
+                return 'missing'
+            if st.st_size != entry['size']:
+                return 'size_mismatch'
+            if not deep and st.st_mtime_ns == entry.get('mtime_ns'):
+                return 'ok'
+            if not deep:
+                return 'truncated' if wav_truncated(path) else 'ok'
+            return 'ok' if file_sha256(path) == entry['sha256'] else 'hash_mismatch'
+
+        ordered = sorted(names)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            statuses = list(pool.map(check, ordered))
+        report: Dict[str, List[str]] = {status: [] for status in VERIFY_STATUSES}
+        for name, status in zip(ordered, statuses):
+            report[status].append(name)
+        report['partial'] = partial
+        return report
@@ -0,0 +1,93 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from .extract import extract_voice_data_fast
+    from .page_cache import PageCache
+except ImportError:
+    from extract import extract_voice_data_fast
+    from page_cache import PageCache
+
+# 离线重新提取：用 html/ 中缓存的语音记录页面重新生成 lib/voc_data/voice_data_<干员>.csv，不访问网络。
+# 每个页面在进程池中独立处理；生成的 CSV 与已有文件逐字节相同时不写入，
+# 文件 mtime 不变，语音文本库（lib/ref/store.py）等按 mtime 增量更新的索引不会重建。
+CSV_PREFIX = 'voice_data_'
+
+
+def render_csv(voice_data: List[Dict[str, str]]) -> str:
+    """与爬虫 save_voice_data_to_csv 相同的 CSV 内容"""
+    return pd.DataFrame(voice_data).to_csv(index=False)
+
+
+def csv_language(path: str) -> Optional[str]:
+    """已有 CSV 中记录的提取语言（selected_language 列），没有时返回 None"""
+    try:
+        df = pd.read_csv(path, usecols=['selected_language'], nrows=1, encoding='utf-8')
+    except (OSError, ValueError):
+        return None
+    if df.empty or pd.isna(df['selected_language'].iloc[0]):
+        return None
+    return str(df['selected_language'].iloc[0])
+
+
+def reextract_one(task: Tuple[str, str, str, Optional[str], bool]) -> Dict[str, Any]:
+    """处理一个页面。task = (页面目录, 干员名, CSV目录, 语言, 是否只预览)；
+    语言为 None 时沿用已有 CSV 的语言（没有 CSV 时用中文）。
+    返回 {'name', 'status', 'records', 'language'}，status 为 new / changed / unchanged / no_data / failed"""
+    html_dir, name, out_dir, language, dry_run = task
+    result = {'name': name, 'status': 'failed', 'records': 0, 'language': language}
+    path = os.path.join(out_dir, f"{CSV_PREFIX}{name}.csv")
+    try:
+        html = PageCache(html_dir).read(name)
+        if language is None:
+            language = csv_language(path) or '中文'
+            result['language'] = language
+        voice_data = extract_voice_data_fast(html or '', name, preferred_language=language)
+        if not voice_data:
+            result['status'] = 'no_data'
+            return result
+        result['records'] = len(voice_data)
+        content = render_csv(voice_data)
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                old = f.read()
+        except FileNotFoundError:
+            old = None
+        if old == content:
+            result['status'] = 'unchanged'
+            return result
+        result['status'] = 'new' if old is None else 'changed'
+        if not dry_run:
+            os.makedirs(out_dir, exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def reextract_all(html_dir: str, out_dir: str, language: Optional[str] = None, workers: Optional[int] = None,
+                  names: Optional[Iterable[str]] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """并行处理页面缓存中的全部（或指定）页面，返回汇总：各状态计数、记录数、耗时与逐页结果"""
+    start = time.perf_counter()
+    names = sorted(PageCache(html_dir).names() if names is None else names)
+    tasks = [(html_dir, name, out_dir, language, dry_run) for name in names]
+    if workers == 1 or len(tasks) <= 1:
+        results = [reextract_one(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(reextract_one, tasks, chunksize=8))
+    summary: Dict[str, Any] = {status: 0 for status in ('new', 'changed', 'unchanged', 'no_data', 'failed')}
+    for result in results:
+        summary[result['status']] += 1
+    summary['pages'] = len(results)
+    summary['records'] = sum(r['records'] for r in results)
+    summary['elapsed'] = time.perf_counter() - start
+    summary['results'] = results
+    return summary
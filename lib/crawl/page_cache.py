@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# 干员语音记录页面缓存：html/<干员>_page.html.gz（gzip 压缩）+ html/pages.json（每页的 ETag/Last-Modified）。
+# 再次爬取时发送条件请求（If-None-Match / If-Modified-Since），服务器返回 304 时直接使用缓存，
+# 游戏更新后重新爬取只会传输真正变化的页面。旧版本保存的未压缩 <干员>_page.html 仍可读取，首次写入时替换。
+PAGE_INDEX_VERSION = 1
+PAGE_SUFFIX = '_page.html'
+GZIP_SUFFIX = '.gz'
+
+
+class PageCache:
+    """多进程爬取时工作进程使用 persist=False：save_index() 不写文件，
+    索引改动由 pop_changes() 交给父进程 apply_changes() 后保存（页面文件按干员名区分，可直接并发写入）"""
+
+    def __init__(self, directory: str = 'html', compresslevel: int = 6, persist: bool = True) -> None:
+        self.directory = directory
+        self.compresslevel = compresslevel
+        self.persist = persist
+        self.index_path = os.path.join(directory, 'pages.json')
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self._changed: Set[str] = set()
+        self.stats: Dict[str, int] = {'fetched': 0, 'not_modified': 0, 'unchanged': 0, 'failed': 0,
+                                      'bytes': 0, 'stored_bytes': 0}
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == PAGE_INDEX_VERSION:
+            self.pages = data.get('pages', {})
+
+    def save_index(self) -> None:
+        if not self.persist:
+            return
+        with self._lock:
+            payload = {'version': PAGE_INDEX_VERSION, 'pages': dict(self.pages)}
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}{PAGE_SUFFIX}{GZIP_SUFFIX}")
+
+    def legacy_path_for(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}{PAGE_SUFFIX}")
+
+    def names(self) -> List[str]:
+        """缓存中所有页面的干员名（含旧版未压缩的页面），按名称排序"""
+        found = set()
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                for suffix in (PAGE_SUFFIX + GZIP_SUFFIX, PAGE_SUFFIX):
+                    if filename.endswith(suffix):
+                        found.add(filename[:-len(suffix)])
+                        break
+        return sorted(found)
+
+    def read(self, name: str) -> Optional[str]:
+        """读取缓存的页面，没有缓存时返回 None"""
+        try:
+            with gzip.open(self.path_for(name), 'rb') as f:
+                return f.read().decode('utf-8')
+        except FileNotFoundError:
+            pass
+        try:
+            with open(self.legacy_path_for(name), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name: str, html: str, url: Optional[str] = None, etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> bool:
+        """保存页面与校验信息；内容与已缓存的相同时只更新校验信息，返回内容是否有变化"""
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(name)
+        entry = self.pages.get(name) or {}
+        changed = entry.get('sha256') != digest or not os.path.exists(path)
+        if changed:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                # mtime=0 使相同内容压缩出的文件完全一致
+                with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=self.compresslevel, mtime=0) as gz:
+                    gz.write(data)
+            os.replace(tmp_path, path)
+            legacy = self.legacy_path_for(name)
+            if os.path.exists(legacy):
+                os.remove(legacy)
+        with self._lock:
+            self.pages[name] = {
+                'url': url or entry.get('url'),
+                'etag': etag,
+                'last_modified': last_modified,
+                'sha256': digest,
+                'size': len(data),
+                'stored': os.path.getsize(path),
+                'checked': time.time(),
+            }
+            self._changed.add(name)
+        return changed
+
+    def pop_changes(self) -> Dict[str, Dict[str, Any]]:
+        """上次调用以来更新过的索引项 {干员名: 校验信息}"""
+        with self._lock:
+            changes = {name: dict(self.pages[name]) for name in self._changed if name in self.pages}
+            self._changed = set()
+        return changes
+
+    def apply_changes(self, changes: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self.pages.update(changes)
+
+    def conditional_headers(self, name: str) -> Dict[str, str]:
+        entry = self.pages.get(name)
+        if not entry or self.read(name) is None:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def fetch(self, fetcher, url: str, name: str) -> Tuple[Optional[str], str]:
+        """条件请求获取页面，返回 (HTML, 状态)。状态：
+        'not_modified' 服务器返回 304，使用缓存；'unchanged' 重新下载但内容未变；'fetched' 新页面或内容有变化。
+        请求失败时抛出 requests 异常"""
+        response = fetcher.get(url, headers=self.conditional_headers(name) or None)
+        try:
+            if response.status_code == 304:
+                html = self.read(name)
+                with self._lock:
+                    self.pages[name]['checked'] = time.time()
+                    self._changed.add(name)
+                    self.stats['not_modified'] += 1
+                return html, 'not_modified'
+            response.raise_for_status()
+            html = response.content.decode(response.encoding or 'utf-8', errors='replace')
+        except Exception:
+            with self._lock:
+                self.stats['failed'] += 1
+            raise
+        finally:
+            response.close()
+        changed = self.write(name, html, url=url, etag=response.headers.get('ETag'),
+                             last_modified=response.headers.get('Last-Modified'))
+        with self._lock:
+            self.stats['fetched' if changed else 'unchanged'] += 1
+            self.stats['bytes'] += len(response.content)
+            self.stats['stored_bytes'] += self.pages[name]['stored']
+        return html, 'fetched' if changed else 'unchanged'
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"页面：新增/变化 {s['fetched']}，未变化 {s['unchanged']}，304 {s['not_modified']}，"
+                f"失败 {s['failed']}，传输 {s['bytes'] / 1e6:.1f} MB（压缩保存 {s['stored_bytes'] / 1e6:.1f} MB）")
@@ -0,0 +1,167 @@
+import csv
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+try:
+    from ..ref.audio_codec import scan_audio
+    from .manifest import DownloadManifest
+    from .offline import CSV_PREFIX, render_csv
+except ImportError:
+    from lib.ref.audio_codec import scan_audio
+    from manifest import DownloadManifest
+    from offline import CSV_PREFIX, render_csv
+
+# 增量爬取计划：把每名干员页面上新提取的语音记录（标题、文本 MD5、下载地址）与本地 CSV 和 lib/voc 中的文件逐条比较，
+# 得到最小的工作列表，只执行这些工作：
+#   new_line      本地 CSV 中没有这个标题
+#   changed_text  标题相同但文本变化（文件名中的 MD5 不同），需要下载新文件，旧文件列为 obsolete
+#   changed_url   文件名相同但下载地址变化（例如切换了语言）
+#   missing_file  记录未变化但本地没有完整的音频文件
+# CSV 只在内容变化时重写。
+OTHER_LANGUAGE_SUFFIX = '_其他语种.wav'
+REASONS = ('new_line', 'changed_text', 'changed_url', 'missing_file')
+
+
+def read_local_records(csv_path: str) -> List[Dict[str, str]]:
+    try:
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            return list(csv.DictReader(f))
+    except FileNotFoundError:
+        return []
+
+
+def scan_voc(voc_dir: str) -> Set[str]:
+    """lib/voc 中已有的 wav 文件名（一次目录扫描，供所有干员共用；压缩存储的 .wavz 按 .wav 文件名计入）"""
+    return set(scan_audio(voc_dir))
+
+
+class OperatorPlan:
+    def __init__(self, name: str, language: str) -> None:
+        self.name = name
+        self.language = language
+        self.status = 'up_to_date'  # new_operator / changed / up_to_date / no_data
+        self.records: List[Dict[str, str]] = []
+        self.downloads: List[Dict[str, str]] = []
+        self.reasons: Dict[str, int] = {reason: 0 for reason in REASONS}
+        self.write_csv = False
+        self.obsolete: List[str] = []
+
+    @property
+    def has_work(self) -> bool:
+        return bool(self.downloads or self.write_csv)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'language': self.language,
+            'status': self.status,
+            'records': len(self.records),
+            'write_csv': self.write_csv,
+            'reasons': {k: v for k, v in self.reasons.items() if v},
+            'downloads': [r['local_filename'] for r in self.downloads],
+            'obsolete': self.obsolete,
+        }
+
+
+def _file_present(filename: str, voc_files: Set[str], voc_dir: str,
+                  manifest: Optional[DownloadManifest]) -> bool:
+    fallback = filename[:-4] + OTHER_LANGUAGE_SUFFIX if filename.endswith('.wav') else None
+    for name in (filename, fallback):
+        if name and name in voc_files:
+            # 清单中有记录的文件还要求大小一致（清单之外的旧文件按存在处理）
+            if manifest is None or manifest.get(name) is None:
+                return True
+            return manifest.has_complete(name, os.path.join(voc_dir, name))
+    return False
+
+
+def plan_operator(name: str, records: Optional[List[Dict[str, str]]], language: str, csv_dir: str,
+                  voc_dir: str, voc_files: Set[str], manifest: Optional[DownloadManifest] = None,
+                  max_audio_files: Optional[int] = None) -> OperatorPlan:
+    """比较一名干员的远端记录与本地状态。records 为 None 或空表示页面上没有语音数据。
+    max_audio_files 与原先的下载数量选择一致：只考虑前 N 条记录的音频"""
+    plan = OperatorPlan(name, language)
+    if not records:
+        plan.status = 'no_data'
+        return plan
+    plan.records = records
+
+    csv_path = os.path.join(csv_dir, f"{CSV_PREFIX}{name}.csv")
+    local = read_local_records(csv_path)
+    if not local:
+        plan.status = 'new_operator'
+    local_by_file = {row.get('local_filename'): row for row in local}
+    local_titles = {row.get('title') for row in local}
+
+    wanted = records if max_audio_files is None else records[:max_audio_files]
+    for record in wanted:
+        filename = record['local_filename']
+        old = local_by_file.get(filename)
+        if old is None:
+            reason = 'changed_text' if record['title'] in local_titles else 'new_line'
+        elif old.get('voice_url') != record['voice_url']:
+            reason = 'changed_url'
+        elif not _file_present(filename, voc_files, voc_dir, manifest):
+            reason = 'missing_file'
+        else:
+            continue
+        plan.reasons[reason] += 1
+        plan.downloads.append(record)
+
+    remote_files = {r['local_filename'] for r in records}
+    for filename in sorted(set(local_by_file) - remote_files):
+        if filename and _file_present(filename, voc_files, voc_dir, None):
+            plan.obsolete.append(filename)
+
+    try:
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            plan.write_csv = f.read() != render_csv(records)
+    except FileNotFoundError:
+        plan.write_csv = True
+    if plan.status != 'new_operator' and plan.has_work:
+        plan.status = 'changed'
+    return plan
+
+
+class CrawlPlan:
+    def __init__(self, operators: Optional[Iterable[OperatorPlan]] = None) -> None:
+        self.operators: List[OperatorPlan] = list(operators or [])
+
+    def add(self, plan: OperatorPlan) -> None:
+        self.operators.append(plan)
+
+    def totals(self) -> Dict[str, int]:
+        totals = {status: 0 for status in ('new_operator', 'changed', 'up_to_date', 'no_data')}
+        totals.update({reason: 0 for reason in REASONS})
+        totals.update({'downloads': 0, 'csv_writes': 0, 'obsolete': 0})
+        for plan in self.operators:
+            totals[plan.status] += 1
+            for reason, count in plan.reasons.items():
+                totals[reason] += count
+            totals['downloads'] += len(plan.downloads)
+            totals['csv_writes'] += int(plan.write_csv)
+            totals['obsolete'] += len(plan.obsolete)
+        return totals
+
+    def describe(self, show: int = 20) -> str:
+        t = self.totals()
+        lines = [
+            f"干员 {len(self.operators)} 名：新干员 {t['new_operator']}，有变化 {t['changed']}，"
+            f"无变化 {t['up_to_date']}，无语音数据 {t['no_data']}",
+            f"待下载 {t['downloads']} 个（新增台词 {t['new_line']}，文本变化 {t['changed_text']}，"
+            f"地址变化 {t['changed_url']}，本地缺失 {t['missing_file']}），重写CSV {t['csv_writes']} 个，"
+            f"过期文件 {t['obsolete']} 个",
+        ]
+        for plan in [p for p in self.operators if p.has_work][:show]:
+            reasons = '，'.join(f"{k} {v}" for k, v in plan.reasons.items() if v) or '仅更新CSV'
+            lines.append(f"  - {plan.name} [{plan.language}] {plan.status}: 下载 {len(plan.downloads)} 个（{reasons}）")
+        hidden = sum(1 for p in self.operators if p.has_work) - show
+        if hidden > 0:
+            lines.append(f"  ... 还有 {hidden} 名干员")
+        return '\n'.join(lines)
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'totals': self.totals(), 'operators': [p.to_dict() for p in self.operators]},
+                      f, ensure_ascii=False, indent=1)
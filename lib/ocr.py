@@ -14,36 +14,62 @@ ocr_engine = PaddleOCR(
 )
 print("OCR引擎初始化完成！")
 
-def ocr(start_xy, end_xy):
+def grab_region(start_xy, end_xy):
     """
-    对指定区域进行OCR识别
+    截取屏幕指定区域
     
     Args:
         start_xy (tuple): 开始坐标 (x, y)
         end_xy (tuple): 结束坐标 (x, y)
     
+    Returns:
+        PIL.Image.Image: 区域截图
+    """
+    # 计算截图区域
+    x1, y1 = start_xy
+    x2, y2 = end_xy
+    
+    # 确保坐标顺序正确
+    left = min(x1, x2)
+    top = min(y1, y2)
+    right = max(x1, x2)
+    bottom = max(y1, y2)
+    
+    # 截取屏幕区域
+    return ImageGrab.grab(bbox=(left, top, right, bottom))
+
+def crop_region(image, start_xy, end_xy):
+    """
+    从整张截图中裁剪出区域（与 grab_region 使用相同的坐标约定）
+    
+    Args:
+        image (PIL.Image.Image): 整屏截图
+        start_xy (tuple): 开始坐标 (x, y)
+        end_xy (tuple): 结束坐标 (x, y)
+    
+    Returns:
+        PIL.Image.Image: 区域图像
+    """
+    x1, y1 = start_xy
+    x2, y2 = end_xy
+    return image.crop((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+
+def ocr_image(image):
+    """
+    对一张图像进行OCR识别
+    
+    Args:
+        image (PIL.Image.Image): 待识别图像（屏幕区域截图或离线截图的裁剪）
+    
     Returns:
         str: 识别出的文字
     """
     try:
-        # 计算截图区域
-        x1, y1 = start_xy
-        x2, y2 = end_xy
-        
-        # 确保坐标顺序正确
-        left = min(x1, x2)
-        top = min(y1, y2)
-        right = max(x1, x2)
-        bottom = max(y1, y2)
-        
-        # 截取屏幕区域
-        screenshot = ImageGrab.grab(bbox=(left, top, right, bottom))
-        
         # 保存截图用于OCR识别
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
         ocr_image_path = f"TEMP/ocr_input_{timestamp}.png"
         os.makedirs("TEMP", exist_ok=True)
-        screenshot.save(ocr_image_path)
+        image.save(ocr_image_path)
         
         # 进行OCR识别
         result = ocr_engine.predict(ocr_image_path)
@@ -89,6 +115,26 @@ def ocr(start_xy, end_xy):
         traceback.print_exc()
         return f"OCR识别失败: {str(e)}"
 
+def ocr(start_xy, end_xy):
+    """
+    对指定区域进行OCR识别
+    
+    Args:
+        start_xy (tuple): 开始坐标 (x, y)
+        end_xy (tuple): 结束坐标 (x, y)
+    
+    Returns:
+        str: 识别出的文字
+    """
+    try:
+        screenshot = grab_region(start_xy, end_xy)
+    except Exception as e:
+        print(f"OCR识别出错: {e}")
+        import traceback
+        traceback.print_exc()
+        return f"OCR识别失败: {str(e)}"
+    return ocr_image(screenshot)
+
 def test_ocr():
     """测试OCR功能"""
     print("测试OCR功能...")
@@ -0,0 +1,278 @@
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def is_name_region(name: str) -> bool:
+    """命名约定：包含“名”/"name" 的区域当作角色名"""
+    return ('名' in name) or ('name' in name.lower())
+
+
+def is_content_region(name: str) -> bool:
+    """命名约定：包含“文案”/"text"/“台词”/“对白” 的区域当作文案"""
+    return ('文案' in name) or ('text' in name.lower()) or ('台词' in name) or ('对白' in name)
+
+
+def normalize_line(text: str) -> str:
+    """台词归一化：全半角统一、去空白与标点、英文小写，用于判断OCR结果是否为同一句"""
+    text = unicodedata.normalize('NFKC', text or '')
+    return re.sub(r'[\W_]+', '', text).lower()
+
+
+class RecentLines:
+    """按角色记录最近合成过的台词 -> 音频文件，重复台词直接复用，不再调用TTS"""
+
+    def __init__(self, per_speaker: int = 16) -> None:
+        self.per_speaker = per_speaker
+        self._lines: Dict[str, "OrderedDict[str, str]"] = {}
+
+    def get(self, speaker: str, text: str) -> Optional[str]:
+        lines = self._lines.get(speaker)
+        key = normalize_line(text)
+        if not lines or not key or key not in lines:
+            return None
+        path = lines[key]
+        if not os.path.exists(path):
+            del lines[key]
+            return None
+        lines.move_to_end(key)
+        return path
+
+    def put(self, speaker: str, text: str, audio_path: str) -> None:
+        key = normalize_line(text)
+        if not key:
+            return
+        lines = self._lines.setdefault(speaker, OrderedDict())
+        lines[key] = audio_path
+        lines.move_to_end(key)
+        while len(lines) > self.per_speaker:
+            lines.popitem(last=False)
+
+
+def _default_reference_lookup(char_name: str) -> List[Dict[str, str]]:
+    # 优先使用运行时资源包（不导入 pandas、不扫描目录），未命中时回退到 loader
+    from lib.ref.bundle import load_runtime_bundle
+    bundle = load_runtime_bundle()
+    if bundle is not None:
+        refs = bundle.references(char_name)
+        if refs:
+            return refs
+    from lib.ref.loader import find_audio_with_text_by_char_name
+    return find_audio_with_text_by_char_name(char_name, limit=1)
+
+
+def _default_speaker_resolver(raw_name: str) -> Tuple[Optional[str], float]:
+    from lib.ref.bundle import load_runtime_bundle
+    bundle = load_runtime_bundle()
+    if bundle is not None:
+        name, confidence = bundle.resolve_speaker(raw_name)
+        if name is not None:
+            return name, confidence
+    # 资源包中没有（例如生成后新增的干员）时回退到 loader
+    from lib.ref.loader import resolve_speaker_name
+    return resolve_speaker_name(raw_name)
+
+
+class DubbingPipeline:
+    """与界面无关的配音流水线：区域图像 → OCR → 角色名解析 → 参考音色 → TTS 合成。
+    - ocr_func(image) -> str 负责识别单个区域图像
+    - tts 为 SiliconFlowTTS（或接口兼容的对象），为 None 或无 API Key 时只做识别
+    - on_status(text) 用于向界面反馈阶段状态
+    - speaker_resolver(raw) -> (干员名或None, 置信度) 把OCR角色名对齐到已知干员，容忍形近字误识别
+    """
+
+    def __init__(
+        self,
+        ocr_func: Callable[[Any], str],
+        tts=None,
+        output_dir: str = 'lib/voc_tmp',
+        reference_lookup: Optional[Callable[[str], List[Dict[str, str]]]] = None,
+        on_status: Optional[Callable[[str], None]] = None,
+        speaker_resolver: Optional[Callable[[str], Tuple[Optional[str], float]]] = _default_speaker_resolver,
+    ) -> None:
+        self.ocr_func = ocr_func
+        self.tts = tts
+        self.output_dir = output_dir
+        self.reference_lookup = reference_lookup or _default_reference_lookup
+        self.on_status = on_status
+        self.speaker_resolver = speaker_resolver
+        # 最近一次有效的角色名，用于当本轮未识别到角色名时回退使用
+        self.last_char_name: Optional[str] = None
+        # 重复台词复用与"重播上一句"
+        self.recent_lines = RecentLines()
+        self.last_audio_path: Optional[str] = None
+
+    def _status(self, text: str) -> None:
+        if self.on_status:
+            try:
+                self.on_status(text)
+            except Exception:
+                pass
+
+    @property
+    def tts_available(self) -> bool:
+        return self.tts is not None and bool(getattr(self.tts, 'api_key', None))
+
+    def recognize(self, crops: List[Tuple[Dict[str, Any], Any]]) -> Dict[str, Any]:
+        """对 (region, image) 列表逐个OCR，并按区域命名约定拆出角色名与文案"""
+        texts: Dict[str, str] = {}
+        name_text = None
+        content_text = None
+        all_results = []  # 存储所有区域的识别结果（拼接用）
+
+        for i, (region, image) in enumerate(crops):
+            name = region.get('name', f'区域{i+1}')
+            try:
+                result = self.ocr_func(image)
+                if result:
+                    print(f"[{name}] {result}")
+                    texts[name] = result
+                    all_results.append(result)
+                    if is_name_region(name):
+                        name_text = result.strip()
+                    if is_content_region(name):
+                        content_text = result.strip()
+                else:
+                    print(f"[{name}] 未识别到文字")
+            except Exception as e:
+                print(f"[{name}] 识别失败: {e}")
+
+        # 将所有结果拼接成一个字符串
+        final_text = ' '.join(all_results) if all_results else ''
+        return {
+            'texts': texts,
+            'final_text': final_text,
+            'name_text': name_text,
+            'content_text': content_text,
+        }
+
+    def snap_speaker(self, name_text: str) -> Tuple[str, float]:
+        """把OCR角色名对齐到已知干员；无法对齐时原样返回（置信度 0）"""
+        if not self.speaker_resolver:
+            return name_text, 0.0
+        try:
+            resolved, confidence = self.speaker_resolver(name_text)
+        except Exception as e:
+            print(f"角色名解析失败: {e}")
+            return name_text, 0.0
+        if not resolved:
+            return name_text, confidence
+        if resolved != name_text:
+            print(f"角色名纠正: {name_text} -> {resolved}（置信度 {confidence:.2f}）")
+        return resolved, confidence
+
+    def resolve_speaker(self, name_text: Optional[str]) -> Tuple[Optional[str], bool]:
+        """角色名回退逻辑：若本轮未识别到角色名，则沿用上一次有效角色名。
+        返回 (角色名, 是否为回退值)。"""
+        if name_text:
+            self.last_char_name = name_text
+            return name_text, False
+        if self.last_char_name:
+            print(f"角色名未识别，沿用上一次角色：{self.last_char_name}")
+            return self.last_char_name, True
+        return None, False
+
+    def synthesize(self, name_text: str, content_text: str, result: Dict[str, Any]) -> Optional[str]:
+        """查找参考音频、确保音色并合成，成功时返回输出的 wav 路径"""
+        timings = result['timings']
+
+        # 查找参考音频和文本（limit=1）
+        t0 = time.perf_counter()
+        ref_results = self.reference_lookup(name_text)
+        timings['reference'] = time.perf_counter() - t0
+
+        voice_uri = None
+        if ref_results:
+            self._status("正在上传音色")
+            ref_data = ref_results[0]
+            result['ref_path'] = ref_data['file_path']
+            result['ref_text'] = ref_data['voice_text']
+            # 以角色名为key，上传或复用音色，使用参考文本
+            t0 = time.perf_counter()
+            voice_uri = self.tts.ensure_voice(name_key=name_text, wav_path=ref_data['file_path'], ref_text=ref_data['voice_text'])
+            timings['voice'] = time.perf_counter() - t0
+        result['voice_uri'] = voice_uri
+
+        # 合成
+        self._status("正在tts")
+        t0 = time.perf_counter()
+        audio_bytes = self.tts.synthesize(content_text, voice_uri=voice_uri)
+        timings['tts'] = time.perf_counter() - t0
+        if not audio_bytes:
+            print("TTS生成失败或未返回音频。")
+            return None
+
+        result['audio_bytes'] = len(audio_bytes)
+        os.makedirs(self.output_dir, exist_ok=True)
+        ts = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        out_path = os.path.abspath(os.path.join(self.output_dir, f'tts_{ts}.wav'))
+        with open(out_path, 'wb') as f:
+            f.write(audio_bytes)
+        print(f"TTS已生成: {out_path}")
+        return out_path
+
+    def run(self, crops: List[Tuple[Dict[str, Any], Any]]) -> Dict[str, Any]:
+        """执行一次完整流程，返回包含各阶段结果与耗时（秒）的字典"""
+        started = time.perf_counter()
+        result: Dict[str, Any] = {
+            'texts': {},
+            'final_text': '',
+            'name_text': None,
+            'content_text': None,
+            'speaker': None,
+            'speaker_fallback': False,
+            'speaker_confidence': None,
+            'ref_path': None,
+            'ref_text': None,
+            'voice_uri': None,
+            'audio_path': None,
+            'audio_bytes': 0,
+            'replayed': False,
+            'error': None,
+            'timings': {},
+        }
+
+        t0 = time.perf_counter()
+        recognized = self.recognize(crops)
+        result['timings']['ocr'] = time.perf_counter() - t0
+        result.update(recognized)
+
+        if result['final_text']:
+            print(f"\n完整识别结果: {result['final_text']}")
+        else:
+            print("\n未识别到任何文字")
+
+        name_text = result['name_text']
+        if name_text:
+            t0 = time.perf_counter()
+            name_text, result['speaker_confidence'] = self.snap_speaker(name_text)
+            result['timings']['resolve'] = time.perf_counter() - t0
+        speaker, fallback = self.resolve_speaker(name_text)
+        result['speaker'] = speaker
+        result['speaker_fallback'] = fallback
+
+        # 若具备角色名与文案，尝试TTS；同一角色的重复台词直接复用已合成的音频
+        content_text = result['content_text']
+        if speaker and content_text:
+            cached = self.recent_lines.get(speaker, content_text)
+            if cached:
+                print(f"台词与最近合成的一致，直接重播: {cached}")
+                result['audio_path'] = cached
+                result['replayed'] = True
+            elif self.tts_available:
+                try:
+                    result['audio_path'] = self.synthesize(speaker, content_text, result)
+                except Exception as e:
+                    print(f"TTS流程异常: {e}")
+                    result['error'] = str(e)
+                if result['audio_path']:
+                    self.recent_lines.put(speaker, content_text, result['audio_path'])
+        if result['audio_path']:
+            self.last_audio_path = result['audio_path']
+
+        result['timings']['total'] = time.perf_counter() - started
+        return result
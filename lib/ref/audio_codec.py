@@ -0,0 +1,299 @@
+import io
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    from .audio_pack import AudioPack, PackedClip, open_pack
+    from .cache import BoundedMemo
+except ImportError:
+    from audio_pack import AudioPack, PackedClip, open_pack
+    from cache import BoundedMemo
+
+# lib/voc 音频的无损压缩存储：干员名_标题_MD5.wav -> 干员名_标题_MD5.wavz（文件名其余部分不变）。
+# 16 位 PCM 用二阶固定预测（与 FLAC 的 fixed predictor 相同）得到残差，zigzag 后按字节平面拆开再 zlib 压缩；
+# 其余格式整文件 zlib。RIFF 头与 data 块之后的附加块原样保存，解码结果与原 wav 逐字节相同，
+# 下载清单中的 SHA-256 仍然有效。
+# 索引、资源目录、元数据与下载清单都以 .wav 文件名登记片段；读取时通过 read_audio_bytes() 透明解码，
+# 解码结果缓存在有界 LRU 中（同一参考音频会被反复上传/分析）。
+# 目录下有打包存储（见 audio_pack.py）时，散文件中找不到的片段从 pack 中读取；散文件优先，
+# 因此新下载的文件不必立即打包。
+WAV_SUFFIX = '.wav'
+COMPRESSED_SUFFIX = '.wavz'
+CODEC_MAGIC = b'WAVZ'
+CODEC_VERSION = 1
+MODE_RAW = 0
+MODE_PCM16 = 1
+# magic, 版本, 模式, 声道数, 残差字节数, 原文件大小, 头部长度, 尾部长度
+_HEADER = struct.Struct('<4sBBBBIII')
+
+
+def canonical_name(filename: str) -> Optional[str]:
+    """音频文件名 -> 登记用的 .wav 文件名；不是音频文件（或是隐藏文件）时返回 None"""
+    if filename.startswith('.'):
+        return None
+    if filename.endswith(WAV_SUFFIX):
+        return filename
+    if filename.endswith(COMPRESSED_SUFFIX):
+        return filename[:-len(COMPRESSED_SUFFIX)] + WAV_SUFFIX
+    return None
+
+
+def compressed_path(path: str) -> str:
+    stem = path[:-len(WAV_SUFFIX)] if path.endswith(WAV_SUFFIX) else path
+    return stem + COMPRESSED_SUFFIX
+
+
+def scan_audio(directory: str) -> Dict[str, Union[os.DirEntry, PackedClip]]:
+    """目录中的音频：登记用的 .wav 文件名 -> 实际文件（.wav 优先于 .wavz，散文件优先于打包存储）"""
+    found: Dict[str, Union[os.DirEntry, PackedClip]] = {}
+    if not os.path.isdir(directory):
+        return found
+    loose: Dict[str, os.DirEntry] = {}
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = canonical_name(entry.name)
+            if name is not None and (name not in loose or entry.name == name):
+                loose[name] = entry
+    pack = open_pack(directory)
+    if pack is not None:
+        found.update(pack.clips)
+    found.update(loose)
+    return found
+
+
+def resolve_audio_file(path: str) -> Optional[str]:
+    """登记的 .wav 路径 -> 磁盘上实际存在的文件（原 wav 或压缩文件），都不存在时返回 None"""
+    if os.path.exists(path):
+        return path
+    if path.endswith(WAV_SUFFIX):
+        packed = compressed_path(path)
+        if os.path.exists(packed):
+            return packed
+    return None
+
+
+def find_packed(path: str) -> Optional[Tuple[AudioPack, PackedClip]]:
+    """登记的 .wav 路径在所在目录打包存储中的片段（没有时返回 None）"""
+    if not path.endswith(WAV_SUFFIX):
+        return None
+    pack = open_pack(os.path.dirname(path) or '.')
+    if pack is None:
+        return None
+    clip = pack.get(os.path.basename(path))
+    return None if clip is None else (pack, clip)
+
+
+def audio_exists(path: str) -> bool:
+    return resolve_audio_file(path) is not None or find_packed(path) is not None
+
+
+def audio_stat(path: str):
+    """实际存储的 stat（散文件为 os.stat 结果，打包片段为登记时的大小与 mtime）"""
+    actual = resolve_audio_file(path)
+    if actual is not None:
+        return os.stat(actual)
+    found = find_packed(path)
+    if found is None:
+        raise FileNotFoundError(path)
+    return found[1].stat()
+
+
+def audio_size(path: str) -> int:
+    """对应的原 wav 文件大小（压缩文件只读文件头，打包片段查索引）"""
+    actual = resolve_audio_file(path)
+    if actual is not None:
+        return original_size(actual) if actual.endswith(COMPRESSED_SUFFIX) else os.path.getsize(actual)
+    found = find_packed(path)
+    if found is None:
+        raise FileNotFoundError(path)
+    return found[1].original_size
+
+
+def _pcm16_layout(data: bytes) -> Optional[Tuple[int, int, int]]:
+    """16 位 PCM wav -> (声道数, data 起始偏移, data 长度)；其它格式返回 None"""
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return None
+    offset = 12
+    channels = None
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack_from('<4sI', data, offset)
+        body = offset + 8
+        if chunk_id == b'fmt ' and size >= 16:
+            tag, channels, _, _, block_align, bits = struct.unpack_from('<HHIIHH', data, body)
+            if tag != 1 or bits != 16 or channels < 1 or block_align != 2 * channels:
+                return None
+        elif chunk_id == b'data':
+            if channels is None or body + size > len(data) or size % (2 * channels):
+                return None
+            return channels, body, size
+        offset = body + size + (size & 1)
+    return None
+
+
+def encode_wav(data: bytes, level: int = 6) -> bytes:
+    import numpy as np  # 只在编解码时导入：运行时资源包判断参考音频是否存在不应加载 numpy
+    layout = _pcm16_layout(data)
+    if layout is None:
+        return _HEADER.pack(CODEC_MAGIC, CODEC_VERSION, MODE_RAW, 0, 0, len(data), 0, 0) + zlib.compress(data, level)
+    channels, start, size = layout
+    prefix, suffix = data[:start], data[start + size:]
+    samples = np.frombuffer(data, dtype='<i2', count=size // 2, offset=start).reshape(-1, channels).T.astype(np.int32)
+    residual = np.diff(np.diff(samples, axis=1, prepend=0), axis=1, prepend=0)
+    zigzag = ((residual << 1) ^ (residual >> 31)).astype(np.uint32)
+    width = 2 if zigzag.size == 0 or int(zigzag.max()) <= 0xFFFF else 4
+    # 字节平面：先放全部低字节再放高字节，高字节几乎全为 0，压缩率明显更高
+    planes = zigzag.astype('<u2' if width == 2 else '<u4').reshape(-1).view(np.uint8).reshape(-1, width).T
+    header = _HEADER.pack(CODEC_MAGIC, CODEC_VERSION, MODE_PCM16, channels, width, len(data), len(prefix), len(suffix))
+    return header + prefix + suffix + zlib.compress(planes.tobytes(), level)
+
+
+def decode_wavz(blob: Union[bytes, memoryview]) -> bytes:
+    if len(blob) < _HEADER.size:
+        raise ValueError("压缩音频不完整")
+    magic, version, mode, channels, width, original_size, prefix_len, suffix_len = _HEADER.unpack_from(blob)
+    if magic != CODEC_MAGIC or version != CODEC_VERSION:
+        raise ValueError("不是压缩音频文件或版本不匹配")
+    import numpy as np
+    pos = _HEADER.size
+    payload = pos if mode == MODE_RAW else pos + prefix_len + suffix_len
+    try:
+        body = zlib.decompress(blob[payload:])
+    except zlib.error as e:
+        raise ValueError(f"压缩音频已损坏: {e}") from e
+    if mode == MODE_RAW:
+        data = body
+    else:
+        prefix = bytes(blob[pos:pos + prefix_len])
+        suffix = bytes(blob[pos + prefix_len:pos + prefix_len + suffix_len])
+        planes = np.frombuffer(body, dtype=np.uint8)
+        zigzag = np.ascontiguousarray(planes.reshape(width, -1).T).view('<u2' if width == 2 else '<u4')
+        zigzag = zigzag.reshape(channels, -1).astype(np.int64)
+        residual = (zigzag >> 1) ^ -(zigzag & 1)
+        samples = np.cumsum(np.cumsum(residual, axis=1), axis=1).astype('<i2')
+        data = prefix + samples.T.tobytes() + suffix
+    if len(data) != original_size:
+        raise ValueError("压缩音频解码后的长度与原文件不一致")
+    return data
+
+
+def original_size(path: str) -> int:
+    """压缩文件对应的原 wav 大小（只读文件头）"""
+    with open(path, 'rb') as f:
+        head = f.read(_HEADER.size)
+    if len(head) < _HEADER.size or head[:4] != CODEC_MAGIC:
+        raise ValueError(f"不是压缩音频文件: {path}")
+    return _HEADER.unpack(head)[5]
+
+
+_decode_lock = threading.Lock()
+_decode_totals = {'decodes': 0, 'seconds': 0.0, 'bytes': 0}
+
+
+def _timed_decode(read_blob) -> bytes:
+    start = time.perf_counter()
+    data = decode_wavz(read_blob())
+    elapsed = time.perf_counter() - start
+    with _decode_lock:
+        _decode_totals['decodes'] += 1
+        _decode_totals['seconds'] += elapsed
+        _decode_totals['bytes'] += len(data)
+    return data
+
+
+def decode_stats() -> Dict[str, Any]:
+    """解码次数、总耗时与平均每个片段的解码耗时（毫秒）"""
+    with _decode_lock:
+        stats: Dict[str, Any] = dict(_decode_totals)
+    stats['avg_ms'] = stats['seconds'] * 1000 / stats['decodes'] if stats['decodes'] else 0.0
+    return stats
+
+
+# 解码后的参考音频（约 32 个片段，每个数百 KB）；键包含 mtime 与大小，文件替换后自动失效
+_decoded = BoundedMemo('audio_codec.decoded', maxsize=32)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def read_audio_bytes(path: str, cache: bool = True) -> bytes:
+    """读取登记的 .wav 路径对应的音频，压缩存储时透明解码（结果缓存；批量校验等一次性读取时 cache=False）"""
+    actual = resolve_audio_file(path)
+    if actual is None:
+        found = find_packed(path)
+        if found is None:
+            raise FileNotFoundError(path)
+        pack, clip = found
+        if not clip.compressed:
+            return bytes(pack.view(clip))
+        key = (clip.path, clip.offset, clip.size)
+        compute = lambda: _timed_decode(lambda: pack.view(clip))
+    elif not actual.endswith(COMPRESSED_SUFFIX):
+        return _read_file(actual)
+    else:
+        st = os.stat(actual)
+        key = (actual, st.st_mtime_ns, st.st_size)
+        compute = lambda: _timed_decode(lambda: _read_file(actual))
+    return _decoded.get_or_compute(key, compute) if cache else compute()
+
+
+def open_audio(path: str):
+    """可交给 wave.open 的文件对象：原 wav 直接打开，压缩文件与打包片段读取到内存"""
+    actual = resolve_audio_file(path)
+    if actual is not None and not actual.endswith(COMPRESSED_SUFFIX):
+        return open(actual, 'rb')
+    return io.BytesIO(read_audio_bytes(path))
+
+
+def compress_file(path: str, level: int = 6, keep_original: bool = False) -> Tuple[int, int]:
+    """把一个 wav 压缩为同名 .wavz（解码校验与原文件一致后才删除原文件），返回 (原大小, 压缩后大小)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    blob = encode_wav(data, level)
+    if decode_wavz(blob) != data:
+        raise ValueError(f"压缩校验失败: {path}")
+    target = compressed_path(path)
+    tmp_path = f"{target}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(blob)
+    os.replace(tmp_path, target)
+    if not keep_original:
+        os.remove(path)
+    return len(data), len(blob)
+
+
+def decompress_file(path: str) -> Tuple[int, int]:
+    """把 .wavz 还原为 wav 并删除压缩文件，返回 (压缩大小, 还原后大小)"""
+    with open(path, 'rb') as f:
+        blob = f.read()
+    data = decode_wavz(blob)
+    target = path[:-len(COMPRESSED_SUFFIX)] + WAV_SUFFIX
+    tmp_path = f"{target}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, target)
+    os.remove(path)
+    return len(blob), len(data)
+
+
+def corpus_usage(directory: str) -> Dict[str, int]:
+    """目录中原 wav 与压缩文件的数量和占用字节数"""
+    usage = {'wav_files': 0, 'wav_bytes': 0, 'compressed_files': 0, 'compressed_bytes': 0}
+    if not os.path.isdir(directory):
+        return usage
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            if entry.name.endswith(WAV_SUFFIX):
+                usage['wav_files'] += 1
+                usage['wav_bytes'] += entry.stat().st_size
+            elif entry.name.endswith(COMPRESSED_SUFFIX):
+                usage['compressed_files'] += 1
+                usage['compressed_bytes'] += entry.stat().st_size
+    return usage
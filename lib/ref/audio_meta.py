@@ -0,0 +1,219 @@
+import json
+import os
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .audio_codec import audio_stat, open_audio, scan_audio
+except ImportError:
+    from audio_codec import audio_stat, open_audio, scan_audio
+
+# 参考音频元数据：每个 wav 的时长/采样率/声道（来自文件头）与能量/静音统计（numpy 一次性计算）
+# 查找时只用这里的预计算结果给候选片段打分，不再解码音频
+CLIP_META_VERSION = 1
+DEFAULT_TARGET_DURATION: Tuple[float, float] = (3.0, 10.0)  # 声音克隆参考音频的理想时长（秒）
+FRAME_MS = 20
+SILENCE_DBFS = -45.0
+CLIP_LEVEL = 0.99
+
+
+def read_wav_header(path: str) -> Dict[str, Any]:
+    """只读文件头：时长、采样率、声道、位宽（压缩存储的片段需要先解码）"""
+    with open_audio(path) as f, wave.open(f, 'rb') as w:
+        frames = w.getnframes()
+        rate = w.getframerate()
+        return {
+            'duration': frames / rate if rate else 0.0,
+            'sample_rate': rate,
+            'channels': w.getnchannels(),
+            'sample_width': w.getsampwidth(),
+            'frames': frames,
+        }
+
+
+def _to_float_mono(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    if sample_width == 1:
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        data = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints & 0x800000, ints - (1 << 24), ints)
+        data = ints.astype(np.float32) / float(1 << 23)
+    elif sample_width == 4:
+        data = np.frombuffer(raw, dtype='<i4').astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"不支持的采样位宽: {sample_width}")
+    if channels > 1:
+        data = data[:len(data) - len(data) % channels].reshape(-1, channels).mean(axis=1)
+    return data
+
+
+def analyze_wav(path: str) -> Dict[str, Any]:
+    """文件头信息 + 能量/静音统计（整体响度、峰值、削波比例、静音占比、首尾静音时长）"""
+    meta = read_wav_header(path)
+    with open_audio(path) as f, wave.open(f, 'rb') as w:
+        raw = w.readframes(meta['frames'])
+    samples = _to_float_mono(raw, meta['sample_width'], meta['channels'])
+    if samples.size == 0:
+        meta.update({'rms_dbfs': -120.0, 'peak': 0.0, 'clip_ratio': 0.0, 'silence_ratio': 1.0,
+                     'lead_silence': 0.0, 'trail_silence': 0.0})
+        return meta
+
+    frame_len = max(1, meta['sample_rate'] * FRAME_MS // 1000)
+    n_frames = max(1, samples.size // frame_len)
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len) if samples.size >= frame_len \
+        else samples.reshape(1, -1)
+    frame_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+    voiced = np.flatnonzero(frame_db > SILENCE_DBFS)
+    frame_sec = frames.shape[1] / meta['sample_rate']
+
+    meta.update({
+        'rms_dbfs': float(10.0 * np.log10(np.mean(samples * samples) + 1e-12)),
+        'peak': float(np.max(np.abs(samples))),
+        'clip_ratio': float(np.mean(np.abs(samples) >= CLIP_LEVEL)),
+        'silence_ratio': float(1.0 - voiced.size / frames.shape[0]),
+        'lead_silence': float(voiced[0] * frame_sec) if voiced.size else meta['duration'],
+        'trail_silence': float((frames.shape[0] - 1 - voiced[-1]) * frame_sec) if voiced.size else meta['duration'],
+    })
+    return meta
+
+
+def score_clip(meta: Dict[str, Any], target: Tuple[float, float] = DEFAULT_TARGET_DURATION) -> float:
+    """0~1 的参考音频质量分：时长落在目标窗口内、有效语音多、无削波、响度正常的片段得分高"""
+    if not meta or meta.get('error'):
+        return 0.0
+    lo, hi = target
+    # 去掉首尾静音后的有效时长
+    duration = max(0.0, meta.get('duration', 0.0) - meta.get('lead_silence', 0.0) - meta.get('trail_silence', 0.0))
+    if duration <= 0:
+        return 0.0
+    if duration < lo:
+        duration_score = duration / lo
+    elif duration > hi:
+        duration_score = hi / duration
+    else:
+        duration_score = 1.0
+    speech_score = min(1.0, (1.0 - meta.get('silence_ratio', 0.0)) / 0.7)
+    clip_score = max(0.0, 1.0 - 20.0 * meta.get('clip_ratio', 0.0))
+    rms = meta.get('rms_dbfs', -20.0)
+    level_score = 1.0 if rms >= -35.0 else max(0.2, 1.0 - (-35.0 - rms) / 25.0)
+    return duration_score * (0.5 + 0.5 * speech_score) * (0.5 + 0.5 * clip_score) * level_score
+
+
+def rank_clips(clips: List[Dict[str, Any]], meta_index: Optional['ClipMetaIndex'],
+               target: Optional[Tuple[float, float]] = DEFAULT_TARGET_DURATION) -> List[Dict[str, Any]]:
+    """按质量分降序排列（同分保持原有的文件名顺序）；没有元数据的片段排在其后，分析失败（损坏/截断）的排在最后"""
+    if meta_index is None or target is None or not clips:
+        return list(clips)
+
+    def key(clip):
+        meta = meta_index.get(clip['filename'])
+        if meta is None:
+            return (1, 0.0)
+        if meta.get('error'):
+            return (2, 0.0)
+        return (0, -score_clip(meta, target))
+
+    return sorted(clips, key=key)
+
+
+class ClipMetaIndex:
+    """参考音频元数据索引（JSON 文件，结构与 voices.json 类似）：文件名 -> 元数据。
+    按文件 mtime/大小 增量更新，只分析新增或有变化的 wav。
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.clips: Dict[str, Dict[str, Any]] = {}
+        self.mtime_ns: Optional[int] = None
+        self.load()
+
+    def load(self) -> None:
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            self.clips, self.mtime_ns = {}, None
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.clips = data.get('clips', {}) if data.get('version') == CLIP_META_VERSION else {}
+        self.mtime_ns = mtime_ns
+
+    def refresh(self) -> None:
+        """索引文件被重新生成后重新载入"""
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns != self.mtime_ns:
+            self.load()
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        return self.clips.get(filename)
+
+    def save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CLIP_META_VERSION, 'clips': self.clips}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.mtime_ns = os.stat(self.path).st_mtime_ns
+
+    def update(self, voc_dir: str, workers: int = 4, filenames: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """分析 voc_dir 下新增/变化的 wav，删除已不存在文件的记录。返回 analyzed/unchanged/removed/failed 计数"""
+        stats = {'analyzed': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+        current: Dict[str, os.stat_result] = {}
+        if filenames is None:
+            # .wavz 与打包片段按 .wav 文件名登记，mtime/大小取实际存储的
+            for name, entry in scan_audio(voc_dir).items():
+                current[name] = entry.stat()
+        else:
+            for name in filenames:
+                try:
+                    current[name] = audio_stat(os.path.join(voc_dir, name))
+                except OSError:
+                    pass
+
+        todo = []
+        for name, st in current.items():
+            old = self.clips.get(name)
+            if old and old.get('mtime_ns') == st.st_mtime_ns and old.get('size') == st.st_size:
+                stats['unchanged'] += 1
+            else:
+                todo.append((name, st))
+
+        def work(item):
+            name, st = item
+            try:
+                meta = analyze_wav(os.path.join(voc_dir, name))
+            except (wave.Error, EOFError, ValueError, OSError) as e:
+                meta = {'error': str(e)}
+            meta['mtime_ns'] = st.st_mtime_ns
+            meta['size'] = st.st_size
+            return name, meta
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for name, meta in pool.map(work, todo):
+                self.clips[name] = meta
+                stats['failed' if meta.get('error') else 'analyzed'] += 1
+
+        if filenames is None:
+            for name in set(self.clips) - set(current):
+                del self.clips[name]
+                stats['removed'] += 1
+        return stats
+
+
+def describe(meta: Dict[str, Any]) -> str:
+    if meta.get('error'):
+        return f"无法分析: {meta['error']}"
+    return (f"{meta['duration']:.2f}s {meta['sample_rate']}Hz {meta['channels']}ch "
+            f"响度{meta['rms_dbfs']:.1f}dBFS 静音{meta['silence_ratio'] * 100:.0f}% "
+            f"削波{meta['clip_ratio'] * 100:.2f}%")
+
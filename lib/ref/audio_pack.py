@@ -0,0 +1,300 @@
+import json
+import mmap
+import os
+import threading
+from collections import namedtuple
+from typing import Any, Dict, List, Optional
+
+# lib/voc 的打包存储：数万个小文件合并为 pack/ 下的少数几个大文件，另有一个偏移索引。
+#   pack/voc_0_000.pack, voc_0_001.pack, ... 片段内容首尾相接（原 wav 或 .wavz 压缩数据，原样保存）
+#   pack/index.json                         {"version": 1, "generation": 0,
+#                                            "packs": [{"file": "voc_0_000.pack", "size": 已登记的长度}, ...],
+#                                            "clips": {"干员名_标题_MD5.wav": [pack 序号, 偏移, 长度, 原 wav 大小,
+#                                                                               是否压缩, 源文件 mtime_ns], ...}}
+# 片段按 .wav 文件名（即 干员名/标题/MD5）登记，与散文件相同；读取时 mmap 整个 pack，按偏移切片，不复制。
+# 追加只写在最后一个 pack 的末尾（超过 max_pack_size 时新开一个），数据落盘后才替换索引；
+# 中断留下的未登记尾部在下次追加时截掉。重复追加同名片段时旧数据成为空洞，compact_pack() 重写到
+# 下一代文件名的 pack 中再替换索引，任何时刻中断索引都只引用完整的文件。
+PACK_DIRNAME = 'pack'
+PACK_INDEX = 'index.json'
+PACK_VERSION = 1
+DEFAULT_MAX_PACK_SIZE = 1 << 30
+
+PackStat = namedtuple('PackStat', ['st_size', 'st_mtime_ns'])
+
+
+class PackedClip:
+    """打包存储的一个片段，可替代 os.DirEntry 使用（name / path / stat()）"""
+    __slots__ = ('name', 'path', 'pack', 'offset', 'size', 'original_size', 'compressed', 'mtime_ns')
+
+    def __init__(self, name: str, path: str, pack: int, offset: int, size: int, original_size: int,
+                 compressed: bool, mtime_ns: int) -> None:
+        self.name = name
+        self.path = path  # 所在 pack 文件
+        self.pack = pack
+        self.offset = offset
+        self.size = size
+        self.original_size = original_size
+        self.compressed = compressed
+        self.mtime_ns = mtime_ns
+
+    def stat(self) -> PackStat:
+        return PackStat(self.size, self.mtime_ns)
+
+
+def pack_dir(voc_dir: str) -> str:
+    return os.path.join(voc_dir, PACK_DIRNAME)
+
+
+def pack_index_path(voc_dir: str) -> str:
+    return os.path.join(pack_dir(voc_dir), PACK_INDEX)
+
+
+def _pack_file(generation: int, number: int) -> str:
+    return f"voc_{generation}_{number:03d}.pack"
+
+
+def _read_index(directory: str) -> Dict[str, Any]:
+    with open(os.path.join(directory, PACK_INDEX), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get('version') != PACK_VERSION:
+        raise ValueError(f"不支持的打包索引版本: {index.get('version')}")
+    return index
+
+
+def _write_index(directory: str, index: Dict[str, Any]) -> None:
+    path = os.path.join(directory, PACK_INDEX)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class AudioPack:
+    """只读访问一个 pack 目录；索引文件 mtime 变化时重新加载并重新映射"""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.mtime_ns: Optional[int] = None
+        self.clips: Dict[str, PackedClip] = {}
+        self._maps: List[Optional[mmap.mmap]] = []
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """返回索引是否存在；不存在时清空"""
+        try:
+            mtime_ns = os.stat(os.path.join(self.directory, PACK_INDEX)).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        with self._lock:
+            if mtime_ns == self.mtime_ns:
+                return mtime_ns is not None
+            clips: Dict[str, PackedClip] = {}
+            maps: List[Optional[mmap.mmap]] = []
+            if mtime_ns is not None:
+                index = _read_index(self.directory)
+                paths = [os.path.join(self.directory, pack['file']) for pack in index['packs']]
+                for name, (number, offset, size, original, compressed, clip_mtime) in index['clips'].items():
+                    clips[name] = PackedClip(name, paths[number], number, offset, size, original,
+                                             bool(compressed), clip_mtime)
+                maps = [None] * len(paths)
+            # 旧的映射可能仍被 view() 返回的切片引用，不主动关闭，由引用计数释放
+            self.clips = clips
+            self._maps = maps
+            self.mtime_ns = mtime_ns
+            return mtime_ns is not None
+
+    def get(self, name: str) -> Optional[PackedClip]:
+        self.refresh()
+        return self.clips.get(name)
+
+    def _map(self, clip: PackedClip) -> mmap.mmap:
+        with self._lock:
+            mapped = self._maps[clip.pack] if clip.pack < len(self._maps) else None
+            if mapped is None or mapped.closed:
+                with open(clip.path, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if clip.pack < len(self._maps):
+                    self._maps[clip.pack] = mapped
+            return mapped
+
+    def close(self) -> None:
+        """关闭已建立的映射（仍被 view() 的结果引用的映射保留）；之后的读取会重新映射"""
+        with self._lock:
+            for i, mapped in enumerate(self._maps):
+                if mapped is not None:
+                    try:
+                        mapped.close()
+                    except BufferError:
+                        continue
+                    self._maps[i] = None
+
+    def view(self, clip: PackedClip) -> memoryview:
+        """片段内容的只读视图（直接引用映射内存，不复制）"""
+        mapped = self._map(clip)
+        if clip.offset + clip.size > len(mapped):
+            raise ValueError(f"打包文件不完整: {clip.path}")
+        return memoryview(mapped)[clip.offset:clip.offset + clip.size]
+
+
+_packs: Dict[str, AudioPack] = {}
+_packs_lock = threading.Lock()
+
+
+def open_pack(voc_dir: str) -> Optional[AudioPack]:
+    """voc_dir 下的打包存储（进程内共用一个对象）；没有打包索引时返回 None"""
+    directory = os.path.abspath(pack_dir(voc_dir))
+    with _packs_lock:
+        pack = _packs.get(directory)
+        if pack is None:
+            pack = _packs[directory] = AudioPack(directory)
+    return pack if pack.refresh() else None
+
+
+def pack_generation(voc_dir: str) -> Optional[int]:
+    """打包索引的 mtime（没有打包存储时为 None），用于判断依赖它的缓存是否需要刷新"""
+    try:
+        return os.stat(pack_index_path(voc_dir)).st_mtime_ns
+    except OSError:
+        return None
+
+
+class PackWriter:
+    """向 pack 目录追加片段；commit() 落盘数据后原子替换索引，之前的改动对读取方不可见"""
+
+    def __init__(self, voc_dir: str, max_pack_size: int = DEFAULT_MAX_PACK_SIZE) -> None:
+        self.directory = pack_dir(voc_dir)
+        self.max_pack_size = max_pack_size
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            self.index = _read_index(self.directory)
+        except FileNotFoundError:
+            self.index = {'version': PACK_VERSION, 'generation': 0, 'packs': [], 'clips': {}}
+        self._file = None
+        # 截掉上次中断时写入但未登记的尾部
+        if self.index['packs']:
+            last = self.index['packs'][-1]
+            path = os.path.join(self.directory, last['file'])
+            if os.path.getsize(path) > last['size']:
+                with open(path, 'r+b') as f:
+                    f.truncate(last['size'])
+
+    def entry(self, name: str) -> Optional[PackedClip]:
+        row = self.index['clips'].get(name)
+        if row is None:
+            return None
+        number, offset, size, original, compressed, mtime_ns = row
+        path = os.path.join(self.directory, self.index['packs'][number]['file'])
+        return PackedClip(name, path, number, offset, size, original, bool(compressed), mtime_ns)
+
+    def _target(self, size: int):
+        packs = self.index['packs']
+        if not packs or (packs[-1]['size'] > 0 and packs[-1]['size'] + size > self.max_pack_size):
+            self._close()
+            packs.append({'file': _pack_file(self.index['generation'], len(packs)), 'size': 0})
+        if self._file is None:
+            path = os.path.join(self.directory, packs[-1]['file'])
+            self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+            # 新开的 pack 可能是上次中断时留下的未登记文件
+            self._file.truncate(packs[-1]['size'])
+            self._file.seek(packs[-1]['size'])
+        return self._file
+
+    def add(self, name: str, data: bytes, original_size: int, compressed: bool, mtime_ns: int) -> None:
+        f = self._target(len(data))
+        pack = self.index['packs'][-1]
+        f.write(data)
+        self.index['clips'][name] = [len(self.index['packs']) - 1, pack['size'], len(data), original_size,
+                                     int(compressed), mtime_ns]
+        pack['size'] += len(data)
+
+    def remove(self, name: str) -> bool:
+        return self.index['clips'].pop(name, None) is not None
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def commit(self) -> None:
+        self._close()
+        _write_index(self.directory, self.index)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'PackWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def pack_usage(voc_dir: str) -> Dict[str, int]:
+    """打包存储的片段数、pack 文件总大小与其中不再被索引引用的字节数"""
+    usage = {'clips': 0, 'pack_files': 0, 'pack_bytes': 0, 'dead_bytes': 0}
+    directory = pack_dir(voc_dir)
+    try:
+        index = _read_index(directory)
+    except FileNotFoundError:
+        return usage
+    usage['clips'] = len(index['clips'])
+    usage['pack_files'] = len(index['packs'])
+    usage['pack_bytes'] = sum(pack['size'] for pack in index['packs'])
+    usage['dead_bytes'] = usage['pack_bytes'] - sum(row[2] for row in index['clips'].values())
+    return usage
+
+
+def compact_pack(voc_dir: str, max_pack_size: int = DEFAULT_MAX_PACK_SIZE) -> Dict[str, int]:
+    """按文件名顺序把仍被引用的片段重写到新的 pack 中，回收空洞；返回重写前后的用量"""
+    before = pack_usage(voc_dir)
+    directory = pack_dir(voc_dir)
+    old = _read_index(directory)
+    old_paths = [os.path.join(directory, pack['file']) for pack in old['packs']]
+    generation = old.get('generation', 0) + 1
+    new = {'version': PACK_VERSION, 'generation': generation, 'packs': [], 'clips': {}}
+    out = None
+    handles = [open(path, 'rb') for path in old_paths]
+    try:
+        for name in sorted(old['clips']):
+            number, offset, size, original, compressed, mtime_ns = old['clips'][name]
+            if out is None or (new['packs'][-1]['size'] > 0 and new['packs'][-1]['size'] + size > max_pack_size):
+                if out is not None:
+                    out.flush()
+                    os.fsync(out.fileno())
+                    out.close()
+                new['packs'].append({'file': _pack_file(generation, len(new['packs'])), 'size': 0})
+                out = open(os.path.join(directory, new['packs'][-1]['file']), 'wb')
+            handles[number].seek(offset)
+            data = handles[number].read(size)
+            if len(data) != size:
+                raise ValueError(f"打包文件不完整: {old_paths[number]}")
+            pack = new['packs'][-1]
+            new['clips'][name] = [len(new['packs']) - 1, pack['size'], size, original, compressed, mtime_ns]
+            out.write(data)
+            pack['size'] += size
+        if out is not None:
+            out.flush()
+            os.fsync(out.fileno())
+            out.close()
+            out = None
+    finally:
+        if out is not None:
+            out.close()
+        for handle in handles:
+            handle.close()
+    # 新一代 pack 全部落盘后替换索引，再删除旧文件（仍被其它进程映射时删除可能失败，留待下次）
+    _write_index(directory, new)
+    for path in old_paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return {'before': before['pack_bytes'], 'after': pack_usage(voc_dir)['pack_bytes'],
+            'dead_before': before['dead_bytes']}
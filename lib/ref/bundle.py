@@ -0,0 +1,179 @@
+import json
+import os
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .audio_codec import audio_exists
+    from .audio_pack import pack_index_path
+    from .cache import CHECK_INTERVAL, mtimes
+    from .resolver import SpeakerResolver
+except ImportError:
+    from audio_codec import audio_exists
+    from audio_pack import pack_index_path
+    from cache import CHECK_INTERVAL, mtimes
+    from resolver import SpeakerResolver
+
+# 运行时资源包：启动和首次触发所需的数据预先编译为一个文件，由 build_bundle.py 生成。
+# 加载只需一次读取与 JSON 解析，不导入 pandas/numpy，不读取 CSV/parquet，不扫描目录。
+# 文件结构：MAGIC(4) + 版本(uint32 LE) + 负载长度(uint32 LE) + UTF-8 JSON 负载
+#   operators   [[中文名, 英文名, url], ...]，lib/operators.csv 顺序
+#   aliases     [[别名, 规范干员名], ...]，用于构建 SpeakerResolver
+#   references  {干员名: {'file': 相对资源包目录的路径, 'voice_text': 台词}}，每名干员质量分最高的参考音频
+#   voices      {'base_url': 服务地址, 'voices': {customName: uri}}，TTS 已上传音色快照
+#   sources     {'paths': [相对资源包目录的路径, ...], 'mtimes': [...]}，生成时来源的 mtime；有变化即视为过期
+BUNDLE_MAGIC = b'ARKB'
+BUNDLE_VERSION = 2
+_HEADER = struct.Struct('<4sII')
+
+RUNTIME_BUNDLE_PATH = os.environ.get('ARK_RUNTIME_BUNDLE', os.path.join(os.path.dirname(__file__), 'runtime.bundle'))
+
+_bundle_cache: Dict[str, Tuple[Optional[int], Optional['RuntimeBundle']]] = {}
+
+
+def bundle_sources() -> List[str]:
+    """资源包的来源（与 loader 的默认路径一致）：干员表、语音数据目录、参考音频目录及其打包索引"""
+    lib_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    voc_dir = os.path.join(lib_dir, 'voc')
+    return [os.path.join(lib_dir, 'operators.csv'), os.path.join(lib_dir, 'voc_data'), voc_dir,
+            pack_index_path(voc_dir)]
+
+
+def _relative(path: str, base_dir: str) -> str:
+    path = os.path.abspath(path)
+    try:
+        return os.path.relpath(path, base_dir)
+    except ValueError:
+        return path  # Windows 下跨盘符时保留绝对路径
+
+
+class RuntimeBundle:
+    def __init__(self, payload: Dict[str, Any], base_dir: str) -> None:
+        self.payload = payload
+        self.base_dir = base_dir
+        self.built: float = payload.get('built', 0.0)
+        self.operators: List[List[Optional[str]]] = payload.get('operators', [])
+        self.aliases: List[List[str]] = payload.get('aliases', [])
+        self.voice_snapshot: Dict[str, Any] = payload.get('voices') or {}
+        self._references: Dict[str, Dict[str, str]] = payload.get('references', {})
+        self.sources: Dict[str, List[Any]] = payload.get('sources') or {'paths': [], 'mtimes': []}
+        self.check_interval = CHECK_INTERVAL
+        self._checked: Optional[Tuple[float, bool]] = None  # (检查时间, 是否过期)
+        self.stale_reported = False
+        self._exact: Optional[Dict[str, int]] = None
+        self._resolver: Optional[SpeakerResolver] = None
+
+    @classmethod
+    def load(cls, path: str) -> 'RuntimeBundle':
+        """读取并校验资源包；格式或版本不符时抛出 ValueError"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"资源包不完整: {path}")
+        magic, version, length = _HEADER.unpack_from(data)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"不是运行时资源包: {path}")
+        if version != BUNDLE_VERSION:
+            raise ValueError(f"资源包版本不匹配: {version}（需要 {BUNDLE_VERSION}），请重新运行 build_bundle.py")
+        body = data[_HEADER.size:_HEADER.size + length]
+        if len(body) != length:
+            raise ValueError(f"资源包不完整: {path}")
+        return cls(json.loads(body.decode('utf-8')), os.path.dirname(os.path.abspath(path)))
+
+    @staticmethod
+    def dump(path: str, payload: Dict[str, Any]) -> int:
+        """写入资源包（先写临时文件再替换），返回文件大小"""
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(body)))
+            f.write(body)
+        os.replace(tmp_path, path)
+        return _HEADER.size + len(body)
+
+    def is_stale(self) -> bool:
+        """生成后来源（干员表、语音数据、参考音频）是否有变化；stat 检查至多每 check_interval 秒一次"""
+        now = time.monotonic()
+        checked = self._checked
+        if checked is None or now - checked[0] >= self.check_interval:
+            paths = [os.path.normpath(os.path.join(self.base_dir, p)) for p in self.sources['paths']]
+            checked = self._checked = (now, list(mtimes(paths)) != self.sources['mtimes'])
+        return checked[1]
+
+    def find_operator(self, name: str) -> Optional[Dict[str, Optional[str]]]:
+        """中文名/英文名精确匹配（忽略大小写与首尾空白），中文名优先"""
+        if self._exact is None:
+            exact: Dict[str, int] = {}
+            for column in (0, 1):
+                for i, row in enumerate(self.operators):
+                    if row[column]:
+                        exact.setdefault(row[column].strip().lower(), i)
+            self._exact = exact
+        i = self._exact.get(name.strip().lower())
+        if i is None:
+            return None
+        chinese_name, english_name, url = self.operators[i]
+        return {'chinese_name': chinese_name, 'english_name': english_name, 'url': url}
+
+    def resolve_speaker(self, raw_name: str) -> Tuple[Optional[str], float]:
+        if self._resolver is None:
+            self._resolver = SpeakerResolver((alias, name) for alias, name in self.aliases)
+        return self._resolver.resolve(raw_name)
+
+    def references(self, char_name: str) -> List[Dict[str, str]]:
+        """该干员预先选好的参考音频（与 find_audio_with_text_by_char_name(limit=1) 的返回格式一致）；
+        没有记录或文件已不存在时返回空列表（压缩为 .wavz 或移入打包存储的片段仍算存在，读取时透明解码）"""
+        ref = self._references.get(char_name)
+        if not ref:
+            return []
+        file_path = os.path.normpath(os.path.join(self.base_dir, ref['file']))
+        if not audio_exists(file_path):
+            return []
+        return [{'file_path': file_path, 'voice_text': ref['voice_text']}]
+
+
+def load_runtime_bundle(path: Optional[str] = None) -> Optional[RuntimeBundle]:
+    """加载（并缓存）运行时资源包；未生成、无法读取或已过期（来源在生成后有变化）时返回 None，调用方回退到 loader。
+    资源包文件重新生成后自动重新加载"""
+    path = RUNTIME_BUNDLE_PATH if path is None else path
+    if not path:
+        return None
+    mtime_ns = mtimes((path,))[0]
+    entry = _bundle_cache.get(path)
+    if entry is None or entry[0] != mtime_ns:
+        bundle = None
+        if mtime_ns is not None:
+            try:
+                bundle = RuntimeBundle.load(path)
+            except (OSError, ValueError) as e:
+                print(f"运行时资源包不可用，回退到逐项加载: {e}")
+        entry = _bundle_cache[path] = (mtime_ns, bundle)
+    bundle = entry[1]
+    if bundle is not None and bundle.is_stale():
+        if not bundle.stale_reported:
+            bundle.stale_reported = True
+            print("⚠️ 运行时资源包早于干员表、lib/voc_data 或 lib/voc 的最近改动，暂不使用；请重新运行 python build_bundle.py")
+        return None
+    return bundle
+
+
+def build_payload(bundle_path: str, operators: List[Tuple[str, Optional[str], Optional[str]]],
+                  aliases: List[Tuple[str, str]], references: Dict[str, Dict[str, str]],
+                  voice_snapshot: Optional[Dict[str, Any]] = None,
+                  sources: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """组装资源包负载。references 中的 file_path 转为相对资源包目录的路径；
+    sources 为判断过期的来源路径（默认 bundle_sources()），记录其当前 mtime"""
+    base_dir = os.path.dirname(os.path.abspath(bundle_path))
+    refs = {}
+    for name, ref in references.items():
+        refs[name] = {'file': _relative(ref['file_path'], base_dir), 'voice_text': ref.get('voice_text') or ''}
+    sources = bundle_sources() if sources is None else list(sources)
+    return {
+        'built': time.time(),
+        'operators': [list(row) for row in operators],
+        'aliases': [list(pair) for pair in aliases],
+        'references': refs,
+        'voices': voice_snapshot or {},
+        'sources': {'paths': [_relative(p, base_dir) for p in sources], 'mtimes': list(mtimes(sources))},
+    }
@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# loader 共用的缓存工具：
+#   LazyValue    进程内只初始化一次的值（并发首次调用只加载一次），可选 TTL、文件 mtime 失效与依赖失效
+#   BoundedMemo  有界 LRU 记忆化（函数级结果，例如 干员名 -> 参考音频），可选 TTL 与"代际"失效
+#   mtimes / throttled  代际函数的构件：一组路径的 mtime，以及限制其 stat 频率的包装
+# 所有缓存登记在 _registry 中，cache_stats() 返回各自的命中/未命中/加载次数
+
+# 来源文件 mtime 检查的默认最小间隔（秒）：热路径上不必每次 stat，文件更新后最多延迟这么久生效；0 则每次都检查
+CHECK_INTERVAL = float(os.environ.get('ARK_CACHE_CHECK_INTERVAL', '1.0'))
+
+_registry: Dict[str, Any] = {}
+_registry_lock = threading.Lock()
+_MISSING = object()
+
+
+def _register(name: str, cache: Any) -> None:
+    with _registry_lock:
+        _registry[name] = cache
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """所有已登记缓存的计数：hits / misses / loads（/ evictions / size）"""
+    with _registry_lock:
+        caches = list(_registry.items())
+    return {name: cache.stats() for name, cache in caches}
+
+
+def mtimes(paths: Iterable[str]) -> Tuple[Optional[int], ...]:
+    """各路径的 mtime（纳秒），不存在的为 None"""
+    result = []
+    for path in paths:
+        try:
+            result.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            result.append(None)
+    return tuple(result)
+
+
+def throttled(func: Callable[[], Hashable], interval: float) -> Callable[[], Hashable]:
+    """包装 func：interval 秒内的重复调用直接返回上次的结果（例如每次调用都要 stat 的代际函数）"""
+    last: Optional[Tuple[float, Hashable]] = None
+
+    def wrapper() -> Hashable:
+        nonlocal last
+        now = time.monotonic()
+        checked = last
+        if checked is None or now - checked[0] >= interval:
+            checked = last = (now, func())
+        return checked[1]
+
+    return wrapper
+
+
+class LazyValue:
+    """线程安全的惰性单值缓存。
+    - factory() 只在首次 get() 或失效后调用一次；并发调用方等待同一次加载
+    - ttl: 秒数，超时后下次 get() 重新加载
+    - watch: 文件/目录路径列表，任一 mtime 变化（含出现/消失）时重新加载
+    - check_interval: watch 的 stat 检查至多每隔这么多秒做一次，期间沿用上次的结果（0 为每次 get() 都检查）
+    - depends: 其它 LazyValue，被依赖的值重新加载后本值也重新加载
+    version 在每次（重新）加载与 set() 时加一，可作为依赖本值的缓存的代际
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], ttl: Optional[float] = None,
+                 watch: Optional[Callable[[], Iterable[str]]] = None,
+                 depends: Iterable['LazyValue'] = (), check_interval: float = 0.0) -> None:
+        self.name = name
+        self.factory = factory
+        self.ttl = ttl
+        self.watch = watch
+        self.depends = tuple(depends)
+        self.check_interval = check_interval
+        self.version = 0
+        self._checked: Optional[Tuple[float, Tuple]] = None  # (检查时间, watch 路径的 mtime)
+        # (值, 加载时的 stamp, 加载时间) 作为一个整体替换，无锁读取时不会拿到不同次加载的混合状态
+        self._state: Tuple[Any, Tuple, float] = (_MISSING, (), 0.0)
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        _register(name, self)
+
+    def _current_stamp(self, fresh: bool = False) -> Tuple:
+        watched: Tuple = ()
+        if self.watch:
+            now = time.monotonic()
+            checked = self._checked
+            if fresh or checked is None or now - checked[0] >= self.check_interval:
+                checked = self._checked = (now, mtimes(self.watch()))
+            watched = checked[1]
+        return watched + tuple(dep.version for dep in self.depends)
+
+    def _valid(self, state: Tuple[Any, Tuple, float], stamp: Tuple) -> bool:
+        value, loaded_stamp, loaded_at = state
+        if value is _MISSING:
+            return False
+        if self.ttl is not None and time.monotonic() - loaded_at > self.ttl:
+            return False
+        return stamp == loaded_stamp
+
+    def get(self) -> Any:
+        for dep in self.depends:
+            dep.get()  # 先让依赖项完成自身的失效检查
+        stamp = self._current_stamp()
+        # 只读取一次状态：检查与返回之间并发的 invalidate() 不会让这里返回 _MISSING
+        state = self._state
+        if self._valid(state, stamp):
+            self._hits += 1
+            return state[0]
+        with self._lock:
+            # 加载前重新 stat，记录的 stamp 不会是节流期间的旧结果
+            stamp = self._current_stamp(fresh=True)
+            state = self._state
+            if self._valid(state, stamp):
+                self._hits += 1
+                return state[0]
+            self._misses += 1
+            value = self.factory()
+            self._loads += 1
+            self._state = (value, stamp, time.monotonic())
+            self.version += 1
+            return value
+
+    def peek(self) -> Any:
+        """不触发加载，未加载时返回 None"""
+        value = self._state[0]
+        return None if value is _MISSING else value
+
+    def set(self, value: Any) -> None:
+        """直接替换缓存值（测试或外部已构建好的对象）"""
+        with self._lock:
+            self._state = (value, self._current_stamp(fresh=True), time.monotonic())
+            self.version += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._state = (_MISSING, (), 0.0)
+            self._checked = None
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self._hits, 'misses': self._misses, 'loads': self._loads}
+
+
+class BoundedMemo:
+    """线程安全的有界 LRU 记忆化。
+    - maxsize: 最多保留的条目数，超出时淘汰最久未使用的
+    - ttl: 条目存活秒数
+    - generation(): 返回当前"代际"（例如相关目录的 mtime），与条目记录的不同即视为失效
+    同一 key 的并发未命中只计算一次。
+    """
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: Optional[float] = None,
+                 generation: Optional[Callable[[], Hashable]] = None) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = generation
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, Hashable]]" = OrderedDict()
+        self._inflight: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        self._evictions = 0
+        _register(name, self)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        gen = self.generation() if self.generation else None
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    value, stored_at, stored_gen = entry
+                    expired = self.ttl is not None and time.monotonic() - stored_at > self.ttl
+                    if not expired and stored_gen == gen:
+                        self._entries.move_to_end(key)
+                        self._hits += 1
+                        return value
+                    del self._entries[key]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    self._misses += 1
+                    break
+            # 其它线程正在计算同一个 key：等待后重新查询
+            event.wait()
+
+        try:
+            value = compute()
+            with self._lock:
+                self._loads += 1
+                self._entries[key] = (value, time.monotonic(), gen)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self._hits, 'misses': self._misses, 'loads': self._loads,
+                'evictions': self._evictions, 'size': len(self._entries)}
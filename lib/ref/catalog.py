@@ -0,0 +1,411 @@
+import csv
+import hashlib
+import os
+import sqlite3
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .audio_codec import scan_audio
+    from .audio_meta import analyze_wav
+    from .audio_pack import pack_index_path
+    from .store import operator_from_csv_name, read_voice_csv
+except ImportError:
+    from audio_codec import scan_audio
+    from audio_meta import analyze_wav
+    from audio_pack import pack_index_path
+    from store import operator_from_csv_name, read_voice_csv
+
+# 资源目录（SQLite）：干员表、别名、语音文本、本地参考音频及其元数据汇总到一个文件，由 build_catalog.py 生成
+#   operators(name, english_name, url, page_url, row_order)   lib/operators.csv + parsed_operators.csv
+#   aliases(alias, name)                                      归一化（strip+lower）后的中文名/英文名/页面名 -> 干员名
+#   sources(unit, csv_mtime_ns, csv_size, voc_signature)      每个干员单元的来源指纹，用于按干员增量更新
+#   voice_lines(operator, md5, priority, title, text)         voice_data_<干员>.csv 中的台词
+#   clips(filename, unit, operator, title, md5, file_path, ...) lib/voc 下的 wav 及其音频元数据
+#   clip_keys(prefix, filename)                               与 glob(f"{name}_*.wav") 等价的前缀索引
+#   meta('source_fingerprint')                                全量编译时来源文件/目录的指纹，loader 据此判断是否过期
+CATALOG_SCHEMA_VERSION = 1
+
+META_FIELDS = ('duration', 'sample_rate', 'channels', 'rms_dbfs', 'peak', 'clip_ratio',
+               'silence_ratio', 'lead_silence', 'trail_silence', 'error')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS operators (
+    name TEXT PRIMARY KEY,
+    english_name TEXT,
+    url TEXT,
+    page_url TEXT,
+    row_order INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sources (
+    unit TEXT PRIMARY KEY,
+    csv_mtime_ns INTEGER,
+    csv_size INTEGER,
+    voc_signature TEXT
+);
+CREATE TABLE IF NOT EXISTS voice_lines (
+    operator TEXT NOT NULL,
+    md5 TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    title TEXT,
+    text TEXT NOT NULL,
+    PRIMARY KEY (operator, md5, priority)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS clips (
+    filename TEXT PRIMARY KEY,
+    unit TEXT NOT NULL,
+    operator TEXT,
+    title TEXT,
+    md5 TEXT,
+    file_path TEXT NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER,
+    duration REAL,
+    sample_rate INTEGER,
+    channels INTEGER,
+    rms_dbfs REAL,
+    peak REAL,
+    clip_ratio REAL,
+    silence_ratio REAL,
+    lead_silence REAL,
+    trail_silence REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS clips_unit ON clips (unit);
+CREATE TABLE IF NOT EXISTS clip_keys (
+    prefix TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    PRIMARY KEY (prefix, filename)
+) WITHOUT ROWID;
+"""
+
+_CLIPS_QUERY = """
+SELECT c.filename, c.operator, c.title, c.md5, c.file_path, {meta},
+       (SELECT v.text FROM voice_lines v WHERE v.operator = c.operator AND v.md5 = c.md5
+        ORDER BY v.priority LIMIT 1) AS voice_text
+FROM clip_keys k JOIN clips c ON c.filename = k.filename
+WHERE k.prefix = ?
+ORDER BY k.filename
+""".format(meta=', '.join(f'c.{f}' for f in META_FIELDS))
+
+
+def _normalize_alias(name: str) -> str:
+    return name.strip().lower()
+
+
+def parse_clip_filename(filename: str) -> Dict[str, Optional[str]]:
+    """干员名_标题_MD5.wav -> 分组单元（第一个"_"之前）、干员名、标题、MD5（与 loader.parse_voc_filename 一致）"""
+    stem = filename[:-4] if filename.endswith('.wav') else filename
+    parts = stem.split('_')
+    if len(parts) >= 3:
+        return {'unit': parts[0], 'operator': parts[0], 'title': '_'.join(parts[1:-1]), 'md5': parts[-1]}
+    return {'unit': parts[0], 'operator': None, 'title': None, 'md5': None}
+
+
+def clip_prefixes(filename: str) -> List[str]:
+    """文件名在每个"_"之前的前缀，与 glob(f"{prefix}_*.wav") 的命中条件一致"""
+    stem = filename[:-4] if filename.endswith('.wav') else filename
+    prefixes = []
+    pos = stem.find('_')
+    while pos != -1:
+        prefixes.append(stem[:pos])
+        pos = stem.find('_', pos + 1)
+    return prefixes
+
+
+def _read_csv_rows(path: str) -> List[Dict[str, str]]:
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def _file_signature(path: str) -> Optional[str]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def source_fingerprint(operators_csv: str, parsed_operators_csv: Optional[str], voc_data_dir: str,
+                       voc_dir: str) -> str:
+    """来源的整体指纹：干员表文件与 lib/voc_data、lib/voc 目录（及打包索引）的 mtime/大小。
+    新增或删除 CSV/音频、重新打包都会改变它；与编译时记录的不同即说明资源目录已过期。
+    """
+    paths = (operators_csv, parsed_operators_csv, voc_data_dir, voc_dir, pack_index_path(voc_dir))
+    return '|'.join(str(_file_signature(path) if path else None) for path in paths)
+
+
+class AssetCatalog:
+    """资源目录的编译与查询。查询使用只读连接，每个查询为一次带索引的 SELECT；
+    编译按干员单元比较来源指纹（CSV 的 mtime/大小、该干员全部 wav 的文件名/mtime/大小），只重建有变化的干员。
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # ---------- 查询 ----------
+
+    def _reader(self) -> sqlite3.Connection:
+        if self._conn is None:
+            uri = 'file:' + os.path.abspath(self.db_path).replace('\\', '/') + '?mode=ro'
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return self._conn
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._reader().execute(sql, params).fetchall()
+
+    def find_operator(self, name: str) -> Optional[Dict[str, str]]:
+        """中文名/英文名/页面名的精确匹配（忽略大小写与首尾空白）"""
+        rows = self._query(
+            "SELECT o.name, o.english_name, o.url FROM aliases a JOIN operators o ON o.name = a.name WHERE a.alias = ?",
+            (_normalize_alias(name),))
+        if not rows:
+            return None
+        chinese_name, english_name, url = rows[0]
+        return {'chinese_name': chinese_name, 'english_name': english_name, 'url': url}
+
+    def operators(self) -> List[Dict[str, Optional[str]]]:
+        """按 lib/operators.csv 原有顺序返回干员表"""
+        return [{'chinese_name': n, 'english_name': e, 'url': u}
+                for n, e, u in self._query("SELECT name, english_name, url FROM operators ORDER BY row_order")]
+
+    def voice_text(self, operator: str, md5: str) -> str:
+        rows = self._query(
+            "SELECT text FROM voice_lines WHERE operator = ? AND md5 = ? ORDER BY priority LIMIT 1", (operator, md5))
+        return rows[0][0] if rows else ""
+
+    def clips_for(self, char_name: str) -> List[Dict[str, Any]]:
+        """按文件名排序返回该干员的参考音频（含台词文本与音频元数据）"""
+        columns = ('filename', 'operator', 'title', 'md5', 'file_path') + META_FIELDS + ('voice_text',)
+        clips = []
+        for row in self._query(_CLIPS_QUERY, (char_name,)):
+            clip = dict(zip(columns, row))
+            if clip['duration'] is None and clip['error'] is None:
+                clip['meta'] = None  # 编译时跳过了音频分析
+            else:
+                clip['meta'] = {f: clip[f] for f in META_FIELDS if clip[f] is not None}
+            clips.append(clip)
+        return clips
+
+    def source_fingerprint(self) -> Optional[str]:
+        """最近一次全量编译时记录的来源指纹；从未全量编译过（或由旧版本编译）时为 None"""
+        rows = self._query("SELECT value FROM meta WHERE key = 'source_fingerprint'")
+        return rows[0][0] if rows else None
+
+    def stats(self) -> Dict[str, int]:
+        counts = {}
+        for table in ('operators', 'aliases', 'voice_lines', 'clips'):
+            counts[table] = self._query(f"SELECT COUNT(*) FROM {table}")[0][0]
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------- 编译 ----------
+
+    @staticmethod
+    def _open_writer(db_path: str) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = sqlite3.connect(db_path)
+        conn.executescript(_SCHEMA)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or int(row[0]) != CATALOG_SCHEMA_VERSION:
+            with conn:
+                for table in ('operators', 'aliases', 'sources', 'voice_lines', 'clips', 'clip_keys'):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.execute("DELETE FROM meta")
+                conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(CATALOG_SCHEMA_VERSION),))
+        return conn
+
+    @classmethod
+    def compile(cls, db_path: str, operators_csv: str, parsed_operators_csv: Optional[str], voc_data_dir: str,
+                voc_dir: str, only: Optional[Iterable[str]] = None, analyze_audio: bool = True,
+                workers: int = 4, force: bool = False,
+                known_meta: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, int]:
+        """编译/增量更新资源目录。
+        only: 只检查这些干员单元；force: 忽略来源指纹全部重建；
+        known_meta: 已有的音频元数据（例如 clip_meta.json），文件 mtime/大小一致时直接复用，不再解码。
+        返回统计：operators、units_updated、units_unchanged、units_removed、clips_analyzed、clips_reused
+        """
+        stats = {'operators': 0, 'units_updated': 0, 'units_unchanged': 0, 'units_removed': 0,
+                 'clips_analyzed': 0, 'clips_reused': 0}
+        # 扫描前取指纹：编译期间来源又有变化时，记录的指纹与之后的不同，资源目录被视为过期
+        sources = source_fingerprint(operators_csv, parsed_operators_csv, voc_data_dir, voc_dir)
+        conn = cls._open_writer(db_path)
+        try:
+            with conn:
+                stats['operators'] = cls._compile_operators(conn, operators_csv, parsed_operators_csv, force)
+
+            csvs: Dict[str, str] = {}
+            if os.path.isdir(voc_data_dir):
+                with os.scandir(voc_data_dir) as it:
+                    for entry in it:
+                        unit = operator_from_csv_name(entry.name)
+                        if unit is not None and entry.is_file():
+                            csvs[unit] = entry.path
+            wavs: Dict[str, Dict[str, os.stat_result]] = {}
+            # 压缩存储的 .wavz 按 .wav 文件名登记（stat 为实际文件的）
+            for name, entry in scan_audio(voc_dir).items():
+                unit = parse_clip_filename(name)['unit']
+                wavs.setdefault(unit, {})[name] = entry.stat()
+
+            known = {unit: (m, s, v) for unit, m, s, v in
+                     conn.execute("SELECT unit, csv_mtime_ns, csv_size, voc_signature FROM sources")}
+            units = set(csvs) | set(wavs)
+            if only is not None:
+                only = set(only)
+                units &= only
+                removed = {u for u in known if u in only and u not in units}
+            else:
+                removed = set(known) - units
+
+            for unit in sorted(units):
+                csv_path = csvs.get(unit)
+                csv_stat = os.stat(csv_path) if csv_path else None
+                files = wavs.get(unit, {})
+                signature = hashlib.sha1('\n'.join(
+                    f"{name}:{st.st_mtime_ns}:{st.st_size}" for name, st in sorted(files.items())
+                ).encode('utf-8')).hexdigest()
+                fingerprint = (csv_stat.st_mtime_ns if csv_stat else None, csv_stat.st_size if csv_stat else None, signature)
+                if not force and known.get(unit) == fingerprint:
+                    stats['units_unchanged'] += 1
+                    continue
+                analyzed, reused = cls._compile_unit(conn, unit, csv_path, voc_dir, files, fingerprint,
+                                                     analyze_audio, workers, known_meta or {})
+                stats['units_updated'] += 1
+                stats['clips_analyzed'] += analyzed
+                stats['clips_reused'] += reused
+
+            with conn:
+                for unit in removed:
+                    cls._delete_unit(conn, unit)
+                    conn.execute("DELETE FROM sources WHERE unit = ?", (unit,))
+                    stats['units_removed'] += 1
+                # 只更新部分干员时其它干员可能仍是旧的，保留原先记录的指纹（来源有变化时它本来就已过期）
+                if only is None:
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('source_fingerprint', ?)", (sources,))
+        finally:
+            conn.close()
+        return stats
+
+    @staticmethod
+    def _compile_operators(conn: sqlite3.Connection, operators_csv: str, parsed_operators_csv: Optional[str],
+                           force: bool) -> int:
+        signature = f"{_file_signature(operators_csv)}|{_file_signature(parsed_operators_csv) if parsed_operators_csv else None}"
+        row = conn.execute("SELECT value FROM meta WHERE key = 'operators_signature'").fetchone()
+        if not force and row is not None and row[0] == signature:
+            return conn.execute("SELECT COUNT(*) FROM operators").fetchone()[0]
+
+        conn.execute("DELETE FROM operators")
+        conn.execute("DELETE FROM aliases")
+        operators = []
+        for row_order, row in enumerate(_read_csv_rows(operators_csv)):
+            name = (row.get('chinese_name') or '').strip()
+            if name:
+                operators.append((name, row.get('english_name') or None, row.get('url') or None, row_order))
+        pages = {}
+        for row in _read_csv_rows(parsed_operators_csv) if parsed_operators_csv else []:
+            decoded = (row.get('decoded_name') or '').strip()
+            if decoded:
+                pages[decoded] = row
+        conn.executemany("INSERT OR IGNORE INTO operators VALUES (?, ?, ?, ?, ?)",
+                         ((name, english, url, (pages.get(name) or {}).get('full_url'), order)
+                          for name, english, url, order in operators))
+        # 别名优先级：中文名 > 英文名 > 页面上的显示名（INSERT OR IGNORE 保留先写入的）
+        names = {name for name, _, _, _ in operators}
+        conn.executemany("INSERT OR IGNORE INTO aliases VALUES (?, ?)",
+                         ((_normalize_alias(name), name) for name, _, _, _ in operators))
+        conn.executemany("INSERT OR IGNORE INTO aliases VALUES (?, ?)",
+                         ((_normalize_alias(english), name) for name, english, _, _ in operators if english))
+        for decoded, row in pages.items():
+            if decoded not in names:
+                continue
+            for column in ('display_name', 'title_name'):
+                value = (row.get(column) or '').strip()
+                if value:
+                    conn.execute("INSERT OR IGNORE INTO aliases VALUES (?, ?)", (_normalize_alias(value), decoded))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('operators_signature', ?)", (signature,))
+        return len(operators)
+
+    @staticmethod
+    def _delete_unit(conn: sqlite3.Connection, unit: str) -> None:
+        conn.execute("DELETE FROM voice_lines WHERE operator = ?", (unit,))
+        conn.execute("DELETE FROM clip_keys WHERE filename IN (SELECT filename FROM clips WHERE unit = ?)", (unit,))
+        conn.execute("DELETE FROM clips WHERE unit = ?", (unit,))
+
+    @classmethod
+    def _compile_unit(cls, conn: sqlite3.Connection, unit: str, csv_path: Optional[str], voc_dir: str,
+                      files: Dict[str, os.stat_result], fingerprint: Tuple, analyze_audio: bool, workers: int,
+                      known_meta: Dict[str, Dict[str, Any]]) -> Tuple[int, int]:
+        # 先取出该干员已有的音频元数据，文件未变化时复用
+        previous = {}
+        for row in conn.execute(f"SELECT filename, mtime_ns, size, {', '.join(META_FIELDS)} FROM clips WHERE unit = ?",
+                                (unit,)):
+            previous[row[0]] = (row[1], row[2], dict(zip(META_FIELDS, row[3:])))
+
+        def cached_meta(name: str, st: os.stat_result) -> Optional[Dict[str, Any]]:
+            old = previous.get(name)
+            if old and old[0] == st.st_mtime_ns and old[1] == st.st_size and \
+                    (old[2].get('duration') is not None or old[2].get('error') is not None):
+                return old[2]
+            meta = known_meta.get(name)
+            if meta and meta.get('mtime_ns') == st.st_mtime_ns and meta.get('size') == st.st_size:
+                return meta
+            return None
+
+        metas: Dict[str, Optional[Dict[str, Any]]] = {}
+        todo = []
+        for name, st in files.items():
+            metas[name] = cached_meta(name, st)
+            if metas[name] is None and analyze_audio:
+                todo.append(name)
+
+        def work(name):
+            try:
+                return name, analyze_wav(os.path.join(voc_dir, name))
+            except (wave.Error, EOFError, ValueError, OSError) as e:
+                return name, {'error': str(e)}
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for name, meta in pool.map(work, todo):
+                metas[name] = meta
+        reused = sum(1 for name in files if name not in todo and metas[name] is not None)
+
+        try:
+            lines = read_voice_csv(csv_path) if csv_path else []
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            print(f"读取CSV文件出错: {csv_path}: {e}")
+            lines = []
+
+        with conn:
+            cls._delete_unit(conn, unit)
+            # 同一 md5 重复出现时保留文件中的第一行
+            conn.executemany("INSERT OR IGNORE INTO voice_lines VALUES (?, ?, ?, ?, ?)",
+                             ((unit, md5, priority, title, text) for md5, priority, text, title in lines))
+            for name, st in files.items():
+                parsed = parse_clip_filename(name)
+                meta = metas.get(name) or {}
+                conn.execute(
+                    f"INSERT OR REPLACE INTO clips VALUES (?, ?, ?, ?, ?, ?, ?, ?, {', '.join('?' * len(META_FIELDS))})",
+                    (name, unit, parsed['operator'], parsed['title'], parsed['md5'],
+                     os.path.abspath(os.path.join(voc_dir, name)), st.st_mtime_ns, st.st_size,
+                     *(meta.get(f) for f in META_FIELDS)))
+                conn.executemany("INSERT OR IGNORE INTO clip_keys VALUES (?, ?)",
+                                 ((prefix, name) for prefix in clip_prefixes(name)))
+            conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)", (unit, *fingerprint))
+        return len(todo), reused
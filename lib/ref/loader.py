@@ -1,173 +1,332 @@
 import os
 import json
+import numpy as np
 import pandas as pd
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set, Tuple
 
 ROOT = os.path.dirname(__file__)
 PARQUET_PATH = os.path.join(ROOT, 'table.parquet')
 VOICES_JSON_PATH = os.path.join(ROOT, 'voices.json')
 VOICES_DIR = os.path.join(ROOT, 'voices')
 OPERATORS_CSV_PATH = os.path.join(ROOT, '..', 'operators.csv')
+VOC_DIR = os.path.join(os.path.dirname(ROOT), 'voc')
+VOC_DATA_DIR = os.path.join(os.path.dirname(ROOT), 'voc_data')
+VOICE_TEXT_DB_PATH = os.path.join(ROOT, 'voice_text.sqlite')
+CLIP_META_PATH = os.path.join(ROOT, 'clip_meta.json')
+CATALOG_PATH = os.path.join(ROOT, 'catalog.sqlite')
+PARSED_OPERATORS_CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(ROOT)), 'parsed_operators.csv')
 
-_df_cache: Optional[pd.DataFrame] = None
-_voices_index: Optional[Dict[str, Any]] = None
-_operators_cache: Optional[pd.DataFrame] = None
+# 语音表加载配置：full 与原先一致（全部列、object 类型）；lookup 只保留查找音频所需的列
+TABLE_PROFILES: Dict[str, Dict[str, Any]] = {
+    'full': {'columns': None, 'categorical': False, 'memory_map': False},
+    'compact': {'columns': None, 'categorical': True, 'memory_map': True},
+    'lookup': {'columns': ('id', 'char_id', 'voice_text', 'filename', 'file_url'), 'categorical': True, 'memory_map': True},
+}
+TABLE_PROFILE = os.environ.get('ARK_TABLE_PROFILE', 'lookup')
+CATEGORICAL_MAX_RATIO = 0.5
 
+try:
+    from .audio_codec import read_audio_bytes, scan_audio
+    from .audio_pack import pack_generation, pack_index_path
+    from .cache import CHECK_INTERVAL, BoundedMemo, LazyValue, cache_stats, mtimes, throttled
+except ImportError:
+    from audio_codec import read_audio_bytes, scan_audio
+    from audio_pack import pack_generation, pack_index_path
+    from cache import CHECK_INTERVAL, BoundedMemo, LazyValue, cache_stats, mtimes, throttled
 
-def load_table() -> pd.DataFrame:
-    global _df_cache
-    if _df_cache is None:
-        _df_cache = pd.read_parquet(PARQUET_PATH)
-    return _df_cache
+# 模块级缓存均为 cache.LazyValue / BoundedMemo：并发首次调用只加载一次，来源文件变化后自动重新加载，
+# 命中/未命中计数见 cache_stats()。来源文件的 mtime 至多每 CHECK_INTERVAL 秒（ARK_CACHE_CHECK_INTERVAL）检查一次
+
+
+def read_table_profile(path: str, profile: str = 'full') -> pd.DataFrame:
+    """按加载配置读取语音表（parquet）。
+    - columns: 只读取需要的列（文件中不存在的列忽略）
+    - categorical: 重复度高的字符串列转为 category（唯一值占比不超过 CATEGORICAL_MAX_RATIO）
+    - memory_map: 通过 pyarrow 以内存映射方式读取文件
+    """
+    config = TABLE_PROFILES[profile]
+    columns = config['columns']
+    if columns is not None:
+        import pyarrow.parquet as pq
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    df = pd.read_parquet(path, columns=columns, memory_map=config['memory_map'])
+    if config['categorical']:
+        for column in df.columns:
+            if not pd.api.types.is_string_dtype(df[column]) or df[column].empty:
+                continue
+            try:
+                unique_count = df[column].nunique(dropna=True)
+            except TypeError:
+                continue  # 列表等不可哈希的值（例如 unlock_param）保持原样
+            if unique_count <= len(df) * CATEGORICAL_MAX_RATIO:
+                df[column] = df[column].astype('category')
+    return df
+
+
+# 语音表按加载配置缓存（最多保留 3 种配置），parquet 文件更新后失效
+_tables = BoundedMemo('loader.table', maxsize=len(TABLE_PROFILES),
+                      generation=throttled(lambda: mtimes((PARQUET_PATH,)), CHECK_INTERVAL))
+
+
+def load_table(profile: Optional[str] = None) -> pd.DataFrame:
+    """加载并缓存语音表。profile 默认取 TABLE_PROFILE（可用环境变量 ARK_TABLE_PROFILE 指定）"""
+    profile = profile or TABLE_PROFILE
+    return _tables.get_or_compute(profile, lambda: read_table_profile(PARQUET_PATH, profile))
+
+
+def _read_voices_index() -> Dict[str, Any]:
+    with open(VOICES_JSON_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+_voices_index = LazyValue('loader.voices_index', _read_voices_index, watch=lambda: (VOICES_JSON_PATH,),
+                          check_interval=CHECK_INTERVAL)
 
 
 def load_voices_index() -> Dict[str, Any]:
-    global _voices_index
-    if _voices_index is None:
-        with open(VOICES_JSON_PATH, 'r', encoding='utf-8') as f:
-            _voices_index = json.load(f)
-    return _voices_index
+    return _voices_index.get()
+
+
+def _catalog_sources() -> Tuple[str, ...]:
+    return (OPERATORS_CSV_PATH, PARSED_OPERATORS_CSV_PATH, VOC_DATA_DIR, VOC_DIR, pack_index_path(VOC_DIR))
+
+
+def _open_catalog():
+    if not os.path.exists(CATALOG_PATH):
+        return None
+    try:
+        from .catalog import AssetCatalog, source_fingerprint
+    except ImportError:
+        from catalog import AssetCatalog, source_fingerprint
+    catalog = AssetCatalog(CATALOG_PATH)
+    # 编译后又爬取/打包过（来源指纹不同）时不使用资源目录，避免新下载的干员与台词查不到
+    if catalog.source_fingerprint() != source_fingerprint(OPERATORS_CSV_PATH, PARSED_OPERATORS_CSV_PATH,
+                                                          VOC_DATA_DIR, VOC_DIR):
+        catalog.close()
+        print("⚠️ 资源目录早于干员表、lib/voc_data 或 lib/voc 的最近改动，暂不使用；请重新运行 python build_catalog.py")
+        return None
+    return catalog
+
+
+# 资源目录文件或任一来源变化时重新打开并重新检查指纹
+_catalog = LazyValue('loader.catalog', _open_catalog, watch=lambda: (CATALOG_PATH,) + _catalog_sources(),
+                     check_interval=CHECK_INTERVAL)
+
+
+def load_catalog():
+    """资源目录（lib/ref/catalog.sqlite，由 build_catalog.py 编译）；尚未编译或已过期时返回 None，查询回退到各自的数据源"""
+    return _catalog.get()
+
+
+def _read_operators() -> pd.DataFrame:
+    catalog = load_catalog()
+    if catalog is not None:
+        return pd.DataFrame(catalog.operators(), columns=['chinese_name', 'english_name', 'url'])
+    if os.path.exists(OPERATORS_CSV_PATH):
+        return pd.read_csv(OPERATORS_CSV_PATH, encoding='utf-8-sig')
+    # 如果CSV文件不存在，返回空的DataFrame
+    return pd.DataFrame(columns=['chinese_name', 'english_name', 'url'])
+
+
+_operators_cache = LazyValue('loader.operators', _read_operators, watch=lambda: (OPERATORS_CSV_PATH,),
+                             depends=(_catalog,), check_interval=CHECK_INTERVAL)
 
 
 def load_operators() -> pd.DataFrame:
-    """加载干员中英文对照表"""
-    global _operators_cache
-    if _operators_cache is None:
-        if os.path.exists(OPERATORS_CSV_PATH):
-            _operators_cache = pd.read_csv(OPERATORS_CSV_PATH, encoding='utf-8-sig')
+    """加载干员中英文对照表（干员表或资源目录更新后重新加载）"""
+    return _operators_cache.get()
+
+
+class _OperatorNameIndex:
+    """干员名一次性索引：
+    - 归一化（strip+lower）后的中文名/英文名 -> 行号，精确匹配为一次哈希查找
+    - 单字与二元组(bigram) -> 行号集合，子串匹配先取候选再逐个校验，复杂度与候选数相关
+    匹配优先级与原先的逐列扫描一致：中文精确 > 英文精确 > 中文包含 > 英文包含，同级取表中靠前的行。
+    """
+
+    def __init__(self, operators_df: pd.DataFrame) -> None:
+        self.rows: List[Dict[str, str]] = operators_df[['chinese_name', 'english_name', 'url']].to_dict('records')
+        self.chinese_exact: Dict[str, int] = {}
+        self.english_exact: Dict[str, int] = {}
+        self.chinese_names: List[Optional[str]] = []
+        self.english_names: List[Optional[str]] = []
+        self.chinese_grams: Dict[str, Set[int]] = {}
+        self.english_grams: Dict[str, Set[int]] = {}
+        for i, row in enumerate(self.rows):
+            self.chinese_names.append(self._add(i, row['chinese_name'], self.chinese_exact, self.chinese_grams))
+            self.english_names.append(self._add(i, row['english_name'], self.english_exact, self.english_grams))
+
+    @staticmethod
+    def _grams(text: str) -> Set[str]:
+        grams = set(text)
+        grams.update(text[j:j + 2] for j in range(len(text) - 1))
+        return grams
+
+    def _add(self, i: int, value, exact: Dict[str, int], grams: Dict[str, Set[int]]) -> Optional[str]:
+        if not isinstance(value, str):
+            return None
+        key = value.lower()
+        exact.setdefault(key, i)
+        for gram in self._grams(key):
+            grams.setdefault(gram, set()).add(i)
+        return key
+
+    def _contains(self, key: str, names: List[Optional[str]], grams: Dict[str, Set[int]]) -> Optional[int]:
+        if not key:
+            candidates = range(len(names))
         else:
-            # 如果CSV文件不存在，返回空的DataFrame
-            _operators_cache = pd.DataFrame(columns=['chinese_name', 'english_name', 'url'])
-    return _operators_cache
+            # 以最稀有的 gram 作为候选集，再校验完整子串
+            probe = [key[j:j + 2] for j in range(len(key) - 1)] or [key]
+            sets = [grams.get(g) for g in probe]
+            if any(not s for s in sets):
+                return None
+            candidates = sorted(min(sets, key=len))
+        for i in candidates:
+            name = names[i]
+            if name is not None and key in name:
+                return i
+        return None
+
+    def lookup(self, name: str) -> Optional[Dict[str, str]]:
+        key = name.strip().lower()
+        i = self.chinese_exact.get(key)
+        if i is None:
+            i = self.english_exact.get(key)
+        if i is None:
+            i = self._contains(key, self.chinese_names, self.chinese_grams)
+        if i is None:
+            i = self._contains(key, self.english_names, self.english_grams)
+        return dict(self.rows[i]) if i is not None else None
+
+
+_operator_index = LazyValue('loader.operator_index', lambda: _OperatorNameIndex(load_operators()),
+                            depends=(_operators_cache,))
+
+
+def load_operator_index() -> _OperatorNameIndex:
+    return _operator_index.get()
 
 
 def find_operator_by_name(name: str) -> Optional[Dict[str, str]]:
-    """通过干员名称查找对应的中英文信息"""
-    operators_df = load_operators()
-    if operators_df.empty:
-        return None
-    
-    name_lower = name.strip().lower()
-    
-    # 查找中文名匹配
-    chinese_match = operators_df[operators_df['chinese_name'].str.lower() == name_lower]
-    if not chinese_match.empty:
-        row = chinese_match.iloc[0]
-        return {
-            'chinese_name': row['chinese_name'],
-            'english_name': row['english_name'],
-            'url': row['url']
-        }
-    
-    # 查找英文名匹配
-    english_match = operators_df[operators_df['english_name'].str.lower() == name_lower]
-    if not english_match.empty:
-        row = english_match.iloc[0]
-        return {
-            'chinese_name': row['chinese_name'],
-            'english_name': row['english_name'],
-            'url': row['url']
-        }
-    
-    # 模糊匹配
-    chinese_contains = operators_df[operators_df['chinese_name'].str.lower().str.contains(name_lower, na=False)]
-    english_contains = operators_df[operators_df['english_name'].str.lower().str.contains(name_lower, na=False)]
-    
-    if not chinese_contains.empty:
-        row = chinese_contains.iloc[0]
-        return {
-            'chinese_name': row['chinese_name'],
-            'english_name': row['english_name'],
-            'url': row['url']
-        }
-    
-    if not english_contains.empty:
-        row = english_contains.iloc[0]
-        return {
-            'chinese_name': row['chinese_name'],
-            'english_name': row['english_name'],
-            'url': row['url']
-        }
-    
-    return None
+    """通过干员名称查找对应的中英文信息（精确匹配优先，其次子串匹配）"""
+    catalog = load_catalog()
+    if catalog is not None:
+        # 资源目录的别名表还包含 parsed_operators.csv 中的页面名；没有命中时回退到干员表索引
+        info = catalog.find_operator(name)
+        if info is not None:
+            return info
+    return load_operator_index().lookup(name)
+
+
+def _build_speaker_resolver():
+    try:
+        from .resolver import build_resolver_from_operators
+    except ImportError:
+        from resolver import build_resolver_from_operators
+    return build_resolver_from_operators(load_operators())
+
+
+_speaker_resolver = LazyValue('loader.speaker_resolver', _build_speaker_resolver, depends=(_operators_cache,))
+
+
+def load_speaker_resolver():
+    """基于干员表构建（一次）容错的角色名解析器"""
+    return _speaker_resolver.get()
+
+
+def resolve_speaker_name(raw_name: str):
+    """将OCR识别出的角色名对齐到最接近的已知干员，返回 (干员中文名或None, 置信度)"""
+    return load_speaker_resolver().resolve(raw_name)
+
+
+# char_id 后缀的特殊映射（英文名 -> parquet 中 char_xxx_ 之后的缩写）
+SPECIAL_CHAR_ID_ALIASES = {
+    'silverash': 'svrash',  # 银灰
+    'exusiai': 'angel', # 能天使
+    'bagpipe': 'bpipe',   #风笛
+}
+
+
+def _clean_english_name(english_name: str) -> str:
+    return english_name.lower().replace(' ', '').replace('-', '').replace('_', '')
+
+
+class _CharIdIndex:
+    """parquet 表 char_id 的一次性索引：
+    - 归一化后缀（char_xxx_ 之后的部分，小写）-> char_id 列表，完全匹配为一次哈希查找
+    - 特殊映射缩写 -> 后缀包含该缩写的 char_id 列表
+    - char_id -> 行位置数组，结果为按表中顺序的一次 iloc 切片
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df
+        codes, uniques = pd.factorize(df['char_id'])
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self.positions: Dict[str, np.ndarray] = {}
+        self.by_suffix: Dict[str, List[str]] = {}
+        self.by_alias: Dict[str, List[str]] = {alias: [] for alias in SPECIAL_CHAR_ID_ALIASES.values()}
+        for code, char_id in enumerate(uniques):
+            if not isinstance(char_id, str) or '_' not in char_id:
+                continue
+            self.positions[char_id] = order[bounds[code]:bounds[code + 1]]
+            suffix = char_id.split('_', 2)[-1].lower()
+            self.by_suffix.setdefault(suffix, []).append(char_id)
+            for alias, ids in self.by_alias.items():
+                if alias in suffix:
+                    ids.append(char_id)
+
+    def char_ids(self, english_name: str) -> List[str]:
+        english_name_clean = _clean_english_name(english_name)
+        matched = list(self.by_suffix.get(english_name_clean, []))
+        for eng, alias in SPECIAL_CHAR_ID_ALIASES.items():
+            if eng in english_name_clean:
+                matched.extend(self.by_alias[alias])
+        return matched
+
+    def rows(self, english_name: str) -> Optional[pd.DataFrame]:
+        """按表中原有顺序返回匹配行；没有匹配的 char_id 时返回 None"""
+        char_ids = self.char_ids(english_name)
+        if not char_ids:
+            return None
+        if len(char_ids) == 1:
+            positions = self.positions[char_ids[0]]
+        else:
+            positions = np.unique(np.concatenate([self.positions[c] for c in set(char_ids)]))
+        return self.df.iloc[positions]
+
+
+_char_id_index = LazyValue('loader.char_id_index', lambda: _CharIdIndex(load_table()), watch=lambda: (PARQUET_PATH,),
+                           check_interval=CHECK_INTERVAL)
+
+
+def load_char_id_index() -> _CharIdIndex:
+    return _char_id_index.get()
 
 
 def find_rows_by_char(char_keyword: str) -> pd.DataFrame:
     """支持通过干员中文或英文名的子串查找。
     匹配逻辑：
     1. 用中文名在CSV中找到对应的英文名
-    2. 将CSV中的英文名与parquet文件中char_xxx_后面的内容进行匹配
-    3. 如果CSV中的英文名包含char_xxx_后面的内容，则输出对应的音频路径
+    2. 将CSV中的英文名与parquet文件中char_xxx_后面的内容进行匹配（完全匹配，或特殊映射的缩写）
+    3. 如果匹配成功，则输出对应的音频行
+    char_id 后缀与各干员的行位置在首次调用时预先建立索引（见 _CharIdIndex）。
     """
     df = load_table()
     kw = str(char_keyword).strip().lower()
     if not kw:
         return df.iloc[0:0]
-    
-    def _s(x):
-        return str(x).lower() if pd.notna(x) else ''
+
     # 首先尝试通过CSV查找干员信息
     operator_info = find_operator_by_name(char_keyword)
     if operator_info:
         english_name = operator_info['english_name']
-        if english_name:
-            # 将英文名转换为小写并移除空格，用于匹配
-            english_name_clean = english_name.lower().replace(' ', '').replace('-', '').replace('_', '')
-            
-            # 获取所有唯一的char_id
-            unique_char_ids = df['char_id'].unique()
-            # 查找匹配的char_id
-            matching_char_ids = []
-            for char_id in unique_char_ids:
-                # 提取char_xxx_后面的部分
-                if '_' in char_id:
-                    char_suffix = char_id.split('_', 2)[-1]  # 取最后一部分
-                    char_suffix_clean = char_suffix.lower()
-                    
-                    # 更智能的匹配逻辑
-                    matched = False
-                    
-                    # 1. 完全匹配
-                    if english_name_clean == char_suffix_clean:
-                        matched = True
-                    
-                    # # 2. 包含匹配
-                    # elif english_name_clean in char_suffix_clean or char_suffix_clean in english_name_clean:
-                    #     matched = True
-                    
-                    # # 3. 单词匹配（处理复合词）
-                    # else:
-                    #     english_words = english_name_clean.split()
-                    #     for word in english_words:
-                    #         if len(word) > 2 and word in char_suffix_clean:
-                    #             matched = True
-                    #             break
-                    
-                    # 4. 特殊映射（处理一些特殊情况）
-                    special_mappings = {
-                        'silverash': 'svrash',  # 银灰
-                        'exusiai': 'angel', # 能天使
-                        'bagpipe': 'bpipe',   #风笛
-                    }
-                    for eng, char_suffix_map in special_mappings.items():
-                        if eng in english_name_clean and char_suffix_map in char_suffix_clean:
-                            matched = True
-                            break
-                    
-                    if matched:
-                        matching_char_ids.append(char_id)
-                        
-            
-            # 如果找到匹配的char_id，返回对应的行
-            if matching_char_ids:
-                mask = df['char_id'].isin(matching_char_ids)
-                return df[mask]
-    
-    # 原有的查找逻辑作为后备
-    mask = (
-        df['char_id'] == "failed",
-        df['voice_text'] == "failed"
-    )
+        if isinstance(english_name, str) and english_name:
+            rows = load_char_id_index().rows(english_name)
+            if rows is not None:
+                return rows
+
     return None
 
 
@@ -231,84 +390,219 @@ def find_audio_by_char_name(char_name: str, limit: int = 1, fallback_url: bool =
     return [result['file_path'] for result in results]
 
 
-def find_audio_with_text_by_char_name(char_name: str, limit: int = 1, fallback_url: bool = False) -> List[Dict[str, str]]:
+def find_audio_with_text_by_char_name(char_name: str, limit: int = 1, fallback_url: bool = False,
+                                      rank: bool = True, target_duration: Optional[Tuple[float, float]] = None) -> List[Dict[str, str]]:
     """按干员名查找音频和对应的语音文本，返回包含文件路径和文本的字典列表。
     直接搜索新下载的音频文件（voc目录），不再回退到旧的搜索方式。
+    rank=True 时按预计算的音频元数据挑选质量分最高的参考音频（见 find_new_audio_by_char_name）。
     
     Returns:
         List[Dict[str, str]]: 包含 'file_path' 和 'voice_text' 的字典列表
     """
-    # 直接搜索新下载的音频文件
-    results = find_new_audio_by_char_name(char_name, limit)
-    
-    if not results:
-        print(f"警告：未找到干员 '{char_name}' 对应的新音频文件")
-    
-    return results
+    def compute():
+        # 直接搜索新下载的音频文件
+        results = find_new_audio_by_char_name(char_name, limit, rank=rank, target_duration=target_duration)
+        if not results:
+            print(f"警告：未找到干员 '{char_name}' 对应的新音频文件")
+        return results
+
+    key = (char_name, limit, rank, tuple(target_duration) if target_duration else None)
+    return [dict(item) for item in _reference_memo.get_or_compute(key, compute)]
+
+
+_reference_sources = throttled(lambda: mtimes((VOC_DIR, pack_index_path(VOC_DIR), CATALOG_PATH, CLIP_META_PATH)),
+                               CHECK_INTERVAL)
+
+
+def _reference_generation():
+    # 音频目录/资源目录/元数据文件有变化，或这些对象重新加载（含测试替换）时，已记忆的结果全部作废
+    return _reference_sources() + tuple(cache.version for cache in (_voc_index, _catalog, _clip_meta))
+
+
+# 干员名 -> 参考音频 的查询结果（pipeline 对同一角色会反复查询）
+_reference_memo = BoundedMemo('loader.references', maxsize=512, ttl=300, generation=_reference_generation)
+
+
+def parse_voc_filename(filename: str) -> Dict[str, Optional[str]]:
+    """解析 voc 目录文件名。
+    文件名格式：干员名_标题_MD5.wav
+    例如：阿_干员报到_5274c881a4cf6ffc12a12222b6ddbecf.wav
+    或者：12F_干员报到_e71cd60e6c57a241e7702a0e1864fa47.wav
+    格式不符合预期时 operator/title/md5 为 None。
+    """
+    stem = filename[:-4] if filename.endswith('.wav') else filename
+    parts = stem.split('_')
+    if len(parts) >= 3:
+        # MD5哈希值总是32位十六进制字符
+        return {
+            'filename': filename,
+            'operator': parts[0],  # 第一部分是干员名
+            'title': '_'.join(parts[1:-1]),  # 中间部分是标题（可能包含下划线）
+            'md5': parts[-1],  # 最后一部分是MD5
+        }
+    return {'filename': filename, 'operator': None, 'title': None, 'md5': None}
+
+
+class _VocIndex:
+    """lib/voc 参考音频的内存索引：干员名 -> 按文件名排序的片段列表。
+    与原先的 glob(f"{char_name}_*.wav") 语义一致：文件按其每个"_"之前的前缀登记，
+    因此名称本身带下划线的干员也能命中。目录 mtime 变化时增量重扫（只解析新增文件）。
+    压缩存储的 .wavz 与打包存储（pack/）中的片段按对应的 .wav 文件名登记，file_path 也是 .wav 路径，
+    读取见 load_reference_audio()；打包索引变化同样触发重扫。
+    """
+
+    def __init__(self, voc_dir: str) -> None:
+        self.voc_dir = voc_dir
+        self.mtime_ns: Optional[int] = None
+        self.pack_mtime_ns: Optional[int] = None
+        self.clips: Dict[str, Dict[str, Optional[str]]] = {}  # 文件名 -> 解析结果
+        self.by_prefix: Dict[str, List[Dict[str, Optional[str]]]] = {}
+
+    def refresh(self) -> None:
+        """目录不存在时清空；目录与打包索引 mtime 都未变时不做任何事"""
+        try:
+            mtime_ns = os.stat(self.voc_dir).st_mtime_ns
+        except OSError:
+            self.mtime_ns = None
+            self.clips = {}
+            self.by_prefix = {}
+            return
+        pack_mtime_ns = pack_generation(self.voc_dir)
+        if mtime_ns == self.mtime_ns and pack_mtime_ns == self.pack_mtime_ns:
+            return
+
+        names = set(scan_audio(self.voc_dir))
+        clips = {}
+        for name in names:
+            clip = self.clips.get(name)
+            if clip is None:
+                clip = parse_voc_filename(name)
+                clip['file_path'] = os.path.abspath(os.path.join(self.voc_dir, name))
+            clips[name] = clip
+
+        by_prefix: Dict[str, List[Dict[str, Optional[str]]]] = {}
+        for name in sorted(clips):
+            stem = name[:-4]
+            pos = stem.find('_')
+            while pos != -1:
+                by_prefix.setdefault(stem[:pos], []).append(clips[name])
+                pos = stem.find('_', pos + 1)
+        self.clips = clips
+        self.by_prefix = by_prefix
+        self.mtime_ns = mtime_ns
+        self.pack_mtime_ns = pack_mtime_ns
 
+    def lookup(self, char_name: str) -> List[Dict[str, Optional[str]]]:
+        self.refresh()
+        return self.by_prefix.get(char_name, [])
 
-def find_new_audio_by_char_name(char_name: str, limit: int = 1) -> List[Dict[str, str]]:
+
+# 索引对象自身按目录 mtime 增量刷新，这里只保证进程内只创建一次
+_voc_index = LazyValue('loader.voc_index', lambda: _VocIndex(VOC_DIR))
+
+
+def load_voc_index() -> _VocIndex:
+    return _voc_index.get()
+
+
+def _open_clip_meta():
+    try:
+        from .audio_meta import ClipMetaIndex
+    except ImportError:
+        from audio_meta import ClipMetaIndex
+    return ClipMetaIndex(CLIP_META_PATH)
+
+
+_clip_meta = LazyValue('loader.clip_meta', _open_clip_meta, watch=lambda: (CLIP_META_PATH,),
+                       check_interval=CHECK_INTERVAL)
+
+
+def load_clip_meta():
+    """参考音频元数据索引（lib/ref/clip_meta.json，由 build_clip_meta.py 生成）；文件更新后自动重新载入"""
+    return _clip_meta.get()
+
+
+def find_new_audio_by_char_name(char_name: str, limit: int = 1, rank: bool = True,
+                                target_duration: Optional[Tuple[float, float]] = None) -> List[Dict[str, str]]:
     """根据干员中文名搜索新下载的音频文件（lib/voc目录）
     
     Args:
         char_name: 干员中文名
         limit: 返回结果数量限制
+        rank: 是否按预计算的音频元数据（时长、静音、削波、响度）给片段打分排序；
+              没有元数据的片段排在有元数据的片段之后，仍按文件名顺序
+        target_duration: 理想参考音频时长窗口（秒），默认 audio_meta.DEFAULT_TARGET_DURATION
     
     Returns:
         List[Dict[str, str]]: 包含 'file_path' 和 'voice_text' 的字典列表
     """
-    import os
-    import glob
-    
-    # 检查lib/voc目录是否存在
-    voc_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'voc')
-    if not os.path.exists(voc_dir):
-        return []
-    
-    # 搜索以干员名开头的音频文件
-    pattern = os.path.join(voc_dir, f"{char_name}_*.wav")
-    matching_files = glob.glob(pattern)
-    
-    if not matching_files:
-        return []
-    
-    # 按文件名排序，确保结果一致
-    matching_files.sort()
+    # 以文件名排序的索引查找，与原先 glob + sort 的结果一致
+    catalog = load_catalog()
+    matching_clips = catalog.clips_for(char_name) if catalog is not None else []
+    if matching_clips:
+        # 资源目录一次查询同时给出文件、台词文本与音频元数据
+        meta_index = {c['filename']: c['meta'] for c in matching_clips if c['meta'] is not None}
+    else:
+        # 没有资源目录，或资源目录中没有该干员（例如编译后才下载）：查 lib/voc 索引
+        matching_clips = load_voc_index().lookup(char_name)
+        meta_index = None
+    if rank and matching_clips:
+        try:
+            from .audio_meta import rank_clips, DEFAULT_TARGET_DURATION
+        except ImportError:
+            from audio_meta import rank_clips, DEFAULT_TARGET_DURATION
+        matching_clips = rank_clips(matching_clips, meta_index if meta_index is not None else load_clip_meta(),
+                                    target_duration or DEFAULT_TARGET_DURATION)
     
     results = []
-    for file_path in matching_files[:limit]:
-        # 从文件名中提取信息
-        filename = os.path.basename(file_path)
-        
-        # 文件名格式：干员名_标题_MD5.wav
-        # 例如：阿_干员报到_5274c881a4cf6ffc12a12222b6ddbecf.wav
-        # 或者：12F_干员报到_e71cd60e6c57a241e7702a0e1864fa47.wav
-        parts = filename.replace('.wav', '').split('_')
-        if len(parts) >= 3:
-            # MD5哈希值总是32位十六进制字符
-            md5_hash = parts[-1]  # 最后一部分是MD5
-            operator_name = parts[0]  # 第一部分是干员名
-            title = '_'.join(parts[1:-1])  # 中间部分是标题（可能包含下划线）
-            
+    for clip in matching_clips[:limit]:
+        if clip['md5'] is not None:
             # 尝试从对应的CSV文件中获取中文文本
-            chinese_text = get_chinese_text_from_csv(operator_name, md5_hash)
+            if 'voice_text' in clip:
+                chinese_text = clip['voice_text']
+            else:
+                chinese_text = get_chinese_text_from_csv(clip['operator'], clip['md5'])
             
             results.append({
-                'file_path': os.path.abspath(file_path),
-                'voice_text': chinese_text or f"{operator_name}_{title}"
+                'file_path': clip['file_path'],
+                'voice_text': chinese_text or f"{clip['operator']}_{clip['title']}"
             })
         else:
             # 如果文件名格式不符合预期，使用文件名作为文本
             results.append({
-                'file_path': os.path.abspath(file_path),
-                'voice_text': filename.replace('.wav', '')
+                'file_path': clip['file_path'],
+                'voice_text': clip['filename'][:-4]
             })
     
     return results
 
 
+def load_reference_audio(file_path: str) -> bytes:
+    """读取参考音频（find_* 返回的 file_path）；压缩存储的片段透明解码（结果有缓存），打包片段经 mmap 读取"""
+    return read_audio_bytes(file_path)
+
+
+def _open_voice_text_store():
+    try:
+        from .store import VoiceTextStore
+    except ImportError:
+        from store import VoiceTextStore
+    return VoiceTextStore(VOICE_TEXT_DB_PATH, VOC_DATA_DIR)
+
+
+_voice_text_store = LazyValue('loader.voice_text_store', _open_voice_text_store)
+
+
+def load_voice_text_store():
+    """语音文本库（lib/voc_data 下各CSV汇总的 SQLite 索引），首次使用时增量同步"""
+    return _voice_text_store.get()
+
+
 def get_chinese_text_from_csv(operator_name: str, md5_hash: str) -> str:
-    """从CSV文件中根据干员名和MD5哈希值获取文本（支持多语言）
+    """根据干员名和MD5哈希值获取文本（支持多语言）
+    
+    文本来自 lib/voc_data/voice_data_<干员名>.csv，优先匹配 selected_text_md5，
+    其次匹配旧字段 chinese_text_md5；实际查询走汇总后的语音文本库，不再逐次读取CSV。
     
     Args:
         operator_name: 干员名
@@ -317,40 +611,14 @@ def get_chinese_text_from_csv(operator_name: str, md5_hash: str) -> str:
     Returns:
         str: 文本内容，如果没找到则返回空字符串
     """
-    import os
-    
-    # 构建CSV文件路径 - 现在在 lib/voc_data 目录下
-    csv_file = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)), 
-        'voc_data', 
-        f'voice_data_{operator_name}.csv'
-    )
-    
-    if not os.path.exists(csv_file):
-        return ""
-    
     try:
-        # 读取CSV文件
-        df = pd.read_csv(csv_file)
-        
-        # 查找匹配的行 - 同时支持新旧字段名
-        # 优先使用新的 selected_text_md5，如果没有则回退到 chinese_text_md5
-        matching_rows = None
-        
-        # 首先尝试新的字段名
-        if 'selected_text_md5' in df.columns:
-            matching_rows = df[df['selected_text_md5'] == md5_hash]
-        
-        # 如果没找到，尝试旧的字段名
-        if (matching_rows is None or matching_rows.empty) and 'chinese_text_md5' in df.columns:
-            matching_rows = df[df['chinese_text_md5'] == md5_hash]
-        
-        if matching_rows is not None and not matching_rows.empty:
-            # 返回文本内容（可能是中文、英语、日语等）
-            return matching_rows.iloc[0]['chinese_text']
-        
-        return ""
-        
+        catalog = load_catalog()
+        if catalog is not None:
+            text = catalog.voice_text(operator_name, md5_hash)
+            if text:
+                return text
+        # 资源目录中没有时（编译后新增的台词）再查语音文本库
+        return load_voice_text_store().get(operator_name, md5_hash)
     except Exception as e:
-        print(f"读取CSV文件出错: {e}")
-        return "" 
\ No newline at end of file
+        print(f"读取语音文本库出错: {e}")
+        return ""
@@ -0,0 +1,144 @@
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 常见形近字/易混字符组：同组内互相替换的代价较低
+CONFUSABLE_GROUPS = [
+    "己已巳", "未末", "士土", "人入八", "日曰", "天夭", "拔拨", "戊戌戍", "刀力", "王玉主",
+    "大太犬", "木本术", "白自", "干千于", "贝见", "鸟乌", "折拆", "休体", "免兔", "辨辩辫",
+    "候侯", "往住", "今令", "斯期", "特持", "莱菜", "蕾雷", "拉垃",
+    "伊尹", "夜液", "薇微", "诗时", "塞赛", "琳淋", "澄橙", "灵炅",
+    "0OoО", "1lI|", "5S", "8B", "2Z", "6b", "9g",
+]
+CONFUSABLE_COST = 0.3
+DEFAULT_MIN_CONFIDENCE = 0.6
+
+_CONFUSABLE: Dict[str, Set[str]] = {}
+for _group in CONFUSABLE_GROUPS:
+    for _ch in _group:
+        _CONFUSABLE.setdefault(_ch, set()).update(c for c in _group if c != _ch)
+
+
+def clean_ocr_name(raw: str) -> str:
+    """去除OCR名牌中的空白与标点（保留括号内的职业后缀，例如 阿米娅(近卫)）"""
+    text = unicodedata.normalize('NFKC', raw or '').strip()
+    text = re.sub(r'[^\w()]+', '', text)
+    return text.lower()
+
+
+def substitution_cost(a: str, b: str) -> float:
+    if a == b:
+        return 0.0
+    if b in _CONFUSABLE.get(a, ()):
+        return CONFUSABLE_COST
+    return 1.0
+
+
+def weighted_edit_distance(a: str, b: str) -> float:
+    """编辑距离，形近字替换按 CONFUSABLE_COST 计"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [float(i)]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1.0,
+                current[j - 1] + 1.0,
+                previous[j - 1] + substitution_cost(ca, cb),
+            ))
+        previous = current
+    return previous[-1]
+
+
+class SpeakerResolver:
+    """把OCR识别出的角色名对齐到最接近的已知干员。
+    - 归一化后的中文名/英文别名精确命中：置信度 1.0
+    - 否则用单字+二元组倒排索引取候选，按形近字加权编辑距离打分
+    - 相同原始输入的结果记忆在有界 memo 中
+    """
+
+    def __init__(self, names: Iterable[Tuple[str, str]], min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+                 max_candidates: int = 24, memo_size: int = 1024) -> None:
+        """names: (别名, 规范干员名) 列表；规范名本身也应作为别名出现"""
+        self.min_confidence = min_confidence
+        self.max_candidates = max_candidates
+        self.memo_size = memo_size
+        self.aliases: List[Tuple[str, str]] = []  # (归一化别名, 规范名)
+        self.exact: Dict[str, str] = {}
+        self.grams: Dict[str, Set[int]] = {}
+        for alias, canonical in names:
+            key = clean_ocr_name(alias)
+            if not key or key in self.exact:
+                continue
+            self.exact[key] = canonical
+            idx = len(self.aliases)
+            self.aliases.append((key, canonical))
+            for gram in self._grams(key):
+                self.grams.setdefault(gram, set()).add(idx)
+        self._memo: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+
+    @staticmethod
+    def _grams(text: str) -> Set[str]:
+        grams = set()
+        for ch in text:
+            grams.add(ch)
+            # 形近字映射到组内代表字，使误识别的字也能召回候选
+            for alt in _CONFUSABLE.get(ch, ()):
+                grams.add(alt)
+        grams.update(text[j:j + 2] for j in range(len(text) - 1))
+        return grams
+
+    def _candidates(self, key: str) -> List[int]:
+        votes: Dict[int, int] = {}
+        for gram in self._grams(key):
+            for idx in self.grams.get(gram, ()):
+                votes[idx] = votes.get(idx, 0) + 1
+        ranked = sorted(votes.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [idx for idx, _ in ranked[:self.max_candidates]]
+
+    def _resolve_uncached(self, key: str) -> Tuple[Optional[str], float]:
+        if not key:
+            return None, 0.0
+        if key in self.exact:
+            return self.exact[key], 1.0
+        best_name, best_conf = None, 0.0
+        for idx in self._candidates(key):
+            alias, canonical = self.aliases[idx]
+            dist = weighted_edit_distance(key, alias)
+            conf = 1.0 - dist / max(len(key), len(alias))
+            if conf > best_conf:
+                best_name, best_conf = canonical, conf
+        if best_conf < self.min_confidence:
+            return None, best_conf
+        return best_name, best_conf
+
+    def resolve(self, raw: str) -> Tuple[Optional[str], float]:
+        """返回 (干员名, 置信度)；低于阈值时干员名为 None"""
+        key = clean_ocr_name(raw)
+        cached = self._memo.get(key)
+        if cached is not None:
+            self._memo.move_to_end(key)
+            return cached
+        result = self._resolve_uncached(key)
+        self._memo[key] = result
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        return result
+
+
+def operator_aliases(operators_df) -> List[Tuple[str, str]]:
+    """以 operators.csv 的中文名为规范名，英文名作为别名"""
+    names = []
+    for chinese, english in zip(operators_df['chinese_name'], operators_df['english_name']):
+        if not isinstance(chinese, str):
+            continue
+        names.append((chinese, chinese))
+        if isinstance(english, str):
+            names.append((english, chinese))
+    return names
+
+
+def build_resolver_from_operators(operators_df) -> SpeakerResolver:
+    return SpeakerResolver(operator_aliases(operators_df))
@@ -0,0 +1,172 @@
+import csv
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 语音文本库（SQLite）：把 lib/voc_data/voice_data_<干员>.csv 汇总为一个按 (干员, md5) 索引的文件
+#   sources(operator, path, mtime_ns, size)   每个CSV的来源信息，用于增量重建
+#   texts(operator, md5, priority, text)      priority 0 = selected_text_md5，1 = chinese_text_md5（旧字段）
+STORE_SCHEMA_VERSION = 1
+CSV_PREFIX = 'voice_data_'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sources (
+    operator TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS texts (
+    operator TEXT NOT NULL,
+    md5 TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (operator, md5, priority)
+) WITHOUT ROWID;
+"""
+
+
+def operator_from_csv_name(filename: str) -> Optional[str]:
+    """voice_data_12F.csv -> 12F；不是语音数据CSV时返回 None"""
+    if not filename.startswith(CSV_PREFIX) or not filename.endswith('.csv'):
+        return None
+    return filename[len(CSV_PREFIX):-4]
+
+
+def read_voice_csv(path: str) -> List[Tuple[str, int, str, Optional[str]]]:
+    """读取单个语音数据CSV，返回 (md5, priority, text, title) 列表，保持文件中的行序"""
+    rows = []
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            text = row.get('chinese_text') or ''
+            for priority, column in enumerate(('selected_text_md5', 'chinese_text_md5')):
+                md5 = row.get(column)
+                if md5:
+                    rows.append((md5, priority, text, row.get('title')))
+    return rows
+
+
+class VoiceTextStore:
+    """按 (干员, md5) 查询语音文本的持久化索引。
+    - 首次使用时同步：只重新读取 mtime/大小 发生变化的CSV，删除已不存在的CSV对应的数据
+    - 同步后整表载入内存字典，查找为 O(1)；查不到时只检查该干员一个CSV是否有更新
+    """
+
+    def __init__(self, db_path: str, csv_dir: str) -> None:
+        self.db_path = db_path
+        self.csv_dir = csv_dir
+        self._lock = threading.Lock()
+        self._texts: Optional[Dict[Tuple[str, str], str]] = None
+        self._sources: Dict[str, Tuple[int, int]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(_SCHEMA)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or int(row[0]) != STORE_SCHEMA_VERSION:
+            with conn:
+                conn.execute("DELETE FROM texts")
+                conn.execute("DELETE FROM sources")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(STORE_SCHEMA_VERSION),))
+        return conn
+
+    def _scan_csvs(self) -> Dict[str, str]:
+        found = {}
+        if not os.path.isdir(self.csv_dir):
+            return found
+        with os.scandir(self.csv_dir) as it:
+            for entry in it:
+                operator = operator_from_csv_name(entry.name)
+                if operator is not None and entry.is_file():
+                    found[operator] = entry.path
+        return found
+
+    @staticmethod
+    def _ingest(conn: sqlite3.Connection, operator: str, path: str, stat: os.stat_result) -> int:
+        try:
+            rows = read_voice_csv(path)
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            print(f"读取CSV文件出错: {path}: {e}")
+            rows = []
+        conn.execute("DELETE FROM texts WHERE operator = ?", (operator,))
+        # 同一 md5 重复出现时保留文件中的第一行，与原先 iloc[0] 的行为一致
+        conn.executemany("INSERT OR IGNORE INTO texts VALUES (?, ?, ?, ?)",
+                         ((operator, md5, priority, text) for md5, priority, text, _ in rows))
+        conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                     (operator, path, stat.st_mtime_ns, stat.st_size))
+        return len(rows)
+
+    def sync(self, operators: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """增量同步。operators 为 None 时扫描整个目录，否则只检查给定干员。
+        返回统计：updated（重新读取的CSV数）、removed（删除的干员数）、unchanged"""
+        stats = {'updated': 0, 'removed': 0, 'unchanged': 0}
+        if operators is None:
+            csvs = self._scan_csvs()
+        else:
+            csvs = {op: os.path.join(self.csv_dir, f"{CSV_PREFIX}{op}.csv") for op in operators}
+        conn = self._connect()
+        try:
+            known = {op: (mtime_ns, size) for op, mtime_ns, size in
+                     conn.execute("SELECT operator, mtime_ns, size FROM sources")}
+            with conn:
+                for operator, path in csvs.items():
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        if operator in known:
+                            conn.execute("DELETE FROM texts WHERE operator = ?", (operator,))
+                            conn.execute("DELETE FROM sources WHERE operator = ?", (operator,))
+                            known.pop(operator)
+                            stats['removed'] += 1
+                        continue
+                    if known.get(operator) == (stat.st_mtime_ns, stat.st_size):
+                        stats['unchanged'] += 1
+                        continue
+                    self._ingest(conn, operator, path, stat)
+                    known[operator] = (stat.st_mtime_ns, stat.st_size)
+                    stats['updated'] += 1
+                if operators is None:
+                    for operator in set(known) - set(csvs):
+                        conn.execute("DELETE FROM texts WHERE operator = ?", (operator,))
+                        conn.execute("DELETE FROM sources WHERE operator = ?", (operator,))
+                        known.pop(operator)
+                        stats['removed'] += 1
+            if stats['updated'] or stats['removed'] or self._texts is None:
+                self._load(conn, known)
+        finally:
+            conn.close()
+        return stats
+
+    def _load(self, conn: sqlite3.Connection, sources: Dict[str, Tuple[int, int]]) -> None:
+        texts: Dict[Tuple[str, str], str] = {}
+        # 按 priority 降序写入，使 selected_text_md5 覆盖旧字段的同名 md5
+        for operator, md5, text in conn.execute(
+                "SELECT operator, md5, text FROM texts ORDER BY priority DESC"):
+            texts[(operator, md5)] = text
+        self._texts = texts
+        self._sources = dict(sources)
+
+    def get(self, operator: str, md5: str) -> str:
+        """返回文本，没找到时返回空字符串"""
+        with self._lock:
+            if self._texts is None:
+                self.sync()
+            text = self._texts.get((operator, md5))
+            if text is None:
+                # 未命中时只检查这一个CSV是否新增或更新过
+                path = os.path.join(self.csv_dir, f"{CSV_PREFIX}{operator}.csv")
+                try:
+                    stat = os.stat(path)
+                    current = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    current = None
+                if current != self._sources.get(operator):
+                    self.sync([operator])
+                    text = self._texts.get((operator, md5))
+            return text or ""
+
+    def __len__(self) -> int:
+        return len(self._texts or {})
@@ -0,0 +1,144 @@
+import io
+import json
+import os
+import queue
+import threading
+import time
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SESSION_FORMAT_VERSION = 1
+
+# 会话存档结构（zip）：
+#   session.json              会话元数据（版本、创建时间、区域配置）
+#   events/00000.json         每次触发的时间戳、区域与流水线输出
+#   crops/00000_0.png         每次触发的各区域截图（PNG 本身已压缩，按 STORED 写入）
+
+# 录制时保留的流水线输出字段（音频字节本身不入档）
+RECORDED_RESULT_FIELDS = (
+    'texts', 'final_text', 'name_text', 'content_text', 'speaker', 'speaker_fallback', 'speaker_confidence',
+    'ref_path', 'voice_uri', 'audio_bytes', 'replayed', 'error', 'timings',
+)
+
+
+class SessionRecorder:
+    """将每次触发的区域截图、时间戳与流水线输出写入会话存档，供 replay_session.py 回放"""
+
+    def __init__(self, path: str, regions: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._count = 0
+        self._queue: Optional[queue.Queue] = None
+        self._worker: Optional[threading.Thread] = None
+        meta = {
+            'version': SESSION_FORMAT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'started': self._started,
+            'regions': regions or [],
+        }
+        self._zip.writestr('session.json', json.dumps(meta, ensure_ascii=False, indent=2))
+        print(f"会话录制已开启: {path}")
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def record(self, trigger_time: float, crops: List[Tuple[Dict[str, Any], Any]], result: Dict[str, Any]) -> None:
+        """记录一次触发。trigger_time 为 time.time() 时间戳，crops 为 (region, PIL.Image) 列表"""
+        with self._lock:
+            if self._zip is None:
+                return
+            index = self._count
+            crop_entries = []
+            for i, (region, image) in enumerate(crops):
+                name = f"crops/{index:05d}_{i}.png"
+                buf = io.BytesIO()
+                image.save(buf, format='PNG')
+                self._zip.writestr(name, buf.getvalue(), compress_type=zipfile.ZIP_STORED)
+                crop_entries.append({'region': region, 'file': name})
+            event = {
+                'index': index,
+                't': trigger_time - self._started,
+                'crops': crop_entries,
+                'result': {k: result.get(k) for k in RECORDED_RESULT_FIELDS},
+            }
+            self._zip.writestr(f"events/{index:05d}.json", json.dumps(event, ensure_ascii=False))
+            self._count += 1
+
+    def record_async(self, trigger_time: float, crops: List[Tuple[Dict[str, Any], Any]],
+                     result: Dict[str, Any]) -> None:
+        """交给后台线程记录（PNG 编码与写入不占用触发线程）；按提交顺序写入，close() 时等待全部写完"""
+        with self._lock:
+            if self._zip is None:
+                return
+            if self._queue is None:
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(target=self._drain, daemon=True)
+                self._worker.start()
+        self._queue.put((trigger_time, crops, result))
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self.record(*item)
+            except Exception as e:
+                print(f"会话录制失败: {e}")
+
+    def close(self) -> None:
+        # 先等后台线程写完已提交的事件（record() 需要同一把锁，不能持锁等待）
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+                print(f"会话录制已保存: {self.path}（{self._count} 次触发）")
+
+
+class SessionArchive:
+    """只读打开会话存档"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._zip = zipfile.ZipFile(path, 'r')
+        self.meta: Dict[str, Any] = json.loads(self._zip.read('session.json').decode('utf-8'))
+        if self.meta.get('version', 0) > SESSION_FORMAT_VERSION:
+            raise ValueError(f"不支持的会话存档版本: {self.meta.get('version')}")
+        self._event_names = sorted(n for n in self._zip.namelist() if n.startswith('events/'))
+
+    def __len__(self) -> int:
+        return len(self._event_names)
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        """按触发顺序返回事件字典（不含图像）"""
+        for name in self._event_names:
+            yield json.loads(self._zip.read(name).decode('utf-8'))
+
+    def load_crops(self, event: Dict[str, Any]) -> List[Tuple[Dict[str, Any], Any]]:
+        """加载事件对应的 (region, PIL.Image) 列表"""
+        from PIL import Image
+        crops = []
+        for entry in event.get('crops', []):
+            image = Image.open(io.BytesIO(self._zip.read(entry['file'])))
+            image.load()
+            crops.append((entry['region'], image))
+        return crops
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self) -> 'SessionArchive':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
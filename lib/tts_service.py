@@ -3,11 +3,17 @@ import re
 import base64
 import hashlib
 import logging
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 import requests
 
+try:
+    from .ref.audio_codec import audio_exists, read_audio_bytes
+except ImportError:
+    from ref.audio_codec import audio_exists, read_audio_bytes
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,19 +59,28 @@ class SiliconFlowTTS:
     - 若无 API Key 或请求失败，方法返回 None
     """
 
-    def __init__(self) -> None:
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 voice_snapshot: Optional[Dict[str, Any]] = None) -> None:
+        """base_url / api_key 显式传入时优先于环境变量（例如无界面批处理指向本地替身服务）。
+        voice_snapshot 为运行时资源包中的音色快照 {'base_url': ..., 'voices': {customName: uri}}：
+        服务地址一致时立即可用，音色列表改为在后台线程刷新，不阻塞启动。"""
         # 优先从 .env 映射加载
         _load_env_from_dotenv_if_needed()
 
-        self.base_url: str = os.getenv("TTS_SERVICE_URL_SiliconFlow", "https://api.siliconflow.cn/v1").strip()
-        self.api_key: str = os.getenv("TTS_SERVICE_API_KEY", "").strip()
+        self.base_url: str = (base_url or os.getenv("TTS_SERVICE_URL_SiliconFlow", "https://api.siliconflow.cn/v1")).strip().rstrip('/')
+        self.api_key: str = (api_key if api_key is not None else os.getenv("TTS_SERVICE_API_KEY", "")).strip()
         self.model: str = os.getenv("TTS_MODEL", "FunAudioLLM/CosyVoice2-0.5B").strip()
 
         self.headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
         self.role_name: Dict[str, str] = {}  # hashed_name -> uri
 
         if self.api_key:
-            self._fetch_custom_voices()
+            snapshot_url = (voice_snapshot or {}).get('base_url', '').rstrip('/')
+            if snapshot_url == self.base_url and voice_snapshot.get('voices'):
+                self.role_name.update(voice_snapshot['voices'])
+                threading.Thread(target=self._fetch_custom_voices, daemon=True).start()
+            else:
+                self._fetch_custom_voices()
         else:
             logger.warning("未检测到 TTS_SERVICE_API_KEY，将无法调用硅基流动 TTS。")
 
@@ -119,16 +134,15 @@ class SiliconFlowTTS:
             return self.role_name[hashed]
 
         try:
-            wav_file = Path(wav_path)
-            if not wav_file.exists():
-                logger.warning(f"参考音频不存在: {wav_file}")
+            # 参考音频可能以压缩格式（.wavz）存储，读取时透明解码为原 wav
+            if not audio_exists(wav_path):
+                logger.warning(f"参考音频不存在: {wav_path}")
                 return None
 
             # 读取参考文本
             ref_text = (ref_text or "在一无所知中, 梦里的一天结束了，一个新的轮回便会开始").strip()
 
-            with open(wav_file, 'rb') as f:
-                audio_data = f.read()
+            audio_data = read_audio_bytes(wav_path)
             base64_str = base64.b64encode(audio_data).decode('utf-8')
             audio_base64 = f"data:audio/wav;base64,{base64_str}"
 
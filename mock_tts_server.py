@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地硅基流动兼容替身服务：实现 /audio/voice/list、/uploads/audio/voice、/audio/speech，
+支持可配置的延迟、抖动、错误率与分块响应，返回合成的 WAV/PCM，用于离线压测与延迟基准。
+"""
+
+import argparse
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+import wave
+from array import array
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+
+class MockTTSConfig:
+    """替身服务行为配置（时间单位：秒）"""
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.05,
+        error_rate: float = 0.0,
+        chunked: bool = False,
+        chunk_size: int = 8192,
+        chunk_delay: float = 0.0,
+        seconds_per_char: float = 0.15,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunked = chunked
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.seconds_per_char = seconds_per_char
+        self.seed = seed
+
+
+@lru_cache(maxsize=64)
+def _tone_second(sample_rate: int, freq: int) -> bytes:
+    """一秒整数频率正弦波（首尾相位连续，可直接拼接）"""
+    step = 2 * math.pi * freq / sample_rate
+    return array('h', (int(12000 * math.sin(step * i)) for i in range(sample_rate))).tobytes()
+
+
+def synth_pcm(duration: float, sample_rate: int, freq: float = 440.0) -> bytes:
+    """生成 16bit 单声道正弦波 PCM（带淡入淡出，避免爆音）"""
+    n = max(1, int(duration * sample_rate))
+    tone = _tone_second(sample_rate, int(freq))
+    samples = array('h')
+    samples.frombytes((tone * (n // sample_rate + 1))[:n * 2])
+    fade = max(1, min(n // 10, sample_rate // 50))
+    for i in range(min(fade, n)):
+        gain = i / fade
+        samples[i] = int(samples[i] * gain)
+        samples[n - 1 - i] = int(samples[n - 1 - i] * gain)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def synth_wav(duration: float, sample_rate: int, freq: float = 440.0) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(synth_pcm(duration, sample_rate, freq))
+    return buf.getvalue()
+
+
+def _parse_multipart(content_type: str, body: bytes) -> Dict[str, str]:
+    """解析 multipart/form-data（仅文本字段，足以覆盖音色上传接口）"""
+    message = BytesParser(policy=default_policy).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        if name:
+            payload = part.get_payload(decode=True) or b''
+            fields[name] = payload.decode('utf-8', errors='replace')
+    return fields
+
+
+class MockTTSServer:
+    """可在测试/基准脚本中内嵌启动的替身服务"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, config: Optional[MockTTSConfig] = None) -> None:
+        self.config = config or MockTTSConfig()
+        self.voices: Dict[str, str] = {}  # customName -> uri
+        self.stats: Dict[str, int] = {'list': 0, 'upload': 0, 'speech': 0, 'errors': 0, 'not_found': 0}
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'MockTTSServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'MockTTSServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _delay_and_fail(self) -> bool:
+        """按配置休眠（延迟±抖动），并按错误率决定本次是否失败"""
+        with self._lock:
+            delay = self.config.latency + self._rng.uniform(-self.config.jitter, self.config.jitter)
+            failed = self._rng.random() < self.config.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return failed
+
+    def handle(self, method: str, path: str, headers, body: bytes) -> Tuple[int, str, bytes]:
+        """返回 (状态码, Content-Type, 响应体)"""
+        path = path.split('?', 1)[0]
+        if path.startswith('/v1/'):
+            path = path[3:]
+
+        if method == 'GET' and path == '/audio/voice/list':
+            self._count('list')
+            if self._delay_and_fail():
+                return self._error()
+            with self._lock:
+                results = [{'customName': name, 'uri': uri} for name, uri in self.voices.items()]
+            return 200, 'application/json', json.dumps({'results': results}).encode('utf-8')
+
+        if method == 'POST' and path == '/uploads/audio/voice':
+            self._count('upload')
+            fields = _parse_multipart(headers.get('Content-Type', ''), body)
+            if self._delay_and_fail():
+                return self._error()
+            name = fields.get('customName')
+            if not name or not fields.get('audio'):
+                return 400, 'application/json', b'{"message": "customName and audio are required"}'
+            with self._lock:
+                uri = self.voices.setdefault(name, f"speech:mock:{name}:{len(self.voices)}")
+            return 200, 'application/json', json.dumps({'uri': uri}).encode('utf-8')
+
+        if method == 'POST' and path == '/audio/speech':
+            self._count('speech')
+            try:
+                payload = json.loads(body.decode('utf-8') or '{}')
+            except ValueError:
+                return 400, 'application/json', b'{"message": "invalid json"}'
+            if self._delay_and_fail():
+                return self._error()
+            text = str(payload.get('input', ''))
+            fmt = payload.get('response_format', 'wav')
+            sample_rate = int(payload.get('sample_rate') or 44100)
+            duration = max(0.3, len(text) * self.config.seconds_per_char)
+            # 不同音色使用不同音高，便于人工试听区分
+            freq = 220.0 + (sum(map(ord, str(payload.get('voice', '')))) % 440)
+            if fmt == 'pcm':
+                return 200, 'audio/pcm', synth_pcm(duration, sample_rate, freq)
+            return 200, 'audio/wav', synth_wav(duration, sample_rate, freq)
+
+        self._count('not_found')
+        return 404, 'application/json', b'{"message": "not found"}'
+
+    def _error(self) -> Tuple[int, str, bytes]:
+        self._count('errors')
+        return 503, 'application/json', b'{"message": "mock injected error"}'
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _dispatch(self, method: str) -> None:
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, content_type, data = server.handle(method, self.path, self.headers, body)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                if server.config.chunked and status == 200:
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    size = max(1, server.config.chunk_size)
+                    for start in range(0, len(data), size):
+                        chunk = data[start:start + size]
+                        self.wfile.write(f"{len(chunk):X}\r\n".encode('ascii') + chunk + b"\r\n")
+                        self.wfile.flush()
+                        if server.config.chunk_delay > 0:
+                            time.sleep(server.config.chunk_delay)
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="硅基流动兼容的本地替身 TTS 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="基础延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.05, help="延迟抖动（±秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="注入错误的比例（0~1）")
+    parser.add_argument("--chunked", action="store_true", help="使用分块传输返回响应体")
+    parser.add_argument("--chunk-size", type=int, default=8192)
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="分块之间的间隔（秒）")
+    parser.add_argument("--seconds-per-char", type=float, default=0.15, help="合成音频时长（秒/字）")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子（可复现的抖动与错误）")
+
+    args = parser.parse_args()
+    config = MockTTSConfig(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        chunked=args.chunked, chunk_size=args.chunk_size, chunk_delay=args.chunk_delay,
+        seconds_per_char=args.seconds_per_char, seed=args.seed,
+    )
+    server = MockTTSServer(args.host, args.port, config)
+    print(f"替身 TTS 服务已启动: {server.url}")
+    print(f"  延迟 {config.latency}s ±{config.jitter}s, 错误率 {config.error_rate}, 分块 {config.chunked}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n已停止，请求统计: {server.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
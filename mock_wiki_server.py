@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地替身 wiki 服务：按路径返回预置的页面/音频（或 --root 目录下的文件），
+支持可配置的延迟、限流注入（429 + Retry-After）、传输中断注入、Range 断点续传
+与条件请求（ETag / Last-Modified，未变化时返回 304），
+用于离线测试与基准爬虫的下载引擎。
+"""
+
+import argparse
+import email.utils
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+
+def voice_record_page(operator_name: str, voice_key: str, lines: List[Tuple[str, str, Dict[str, str]]],
+                      padding: int = 200) -> str:
+    """生成与 prts.wiki 语音记录页面结构一致的 HTML。
+    lines: [(标题, 语音文件名, {语言: 台词})]；padding 为页面其余部分（导航、脚本、表格）的重复次数"""
+    noise = [
+        f'<div class="nav-item"><!----><a href="/w/{i}">链接&nbsp;{i}</a><span>说明 &amp; 注释</span></div>'
+        f'<table class="wikitable"><tr><td>{i}</td><td><div>格子</div></td></tr></table>'
+        for i in range(padding)]
+    items = []
+    for index, (title, filename, texts) in enumerate(lines, 1):
+        details = ''.join(
+            f'<div class="voice-detail" data-kind-name="{kind}"><span>{text}</span><!-- 注释 --></div>'
+            for kind, text in texts.items())
+        items.append(
+            f'<div class="voice-data-item fade" data-title="{title}" data-voice-index="{index}" '
+            f'data-voice-filename="{filename}" data-cond="">\n  <div class="voice-title">{title}</div>\n'
+            f'  <div class="voice-details">{details}</div>\n</div>')
+    return (
+        f'<!DOCTYPE html><html><head><title>{operator_name}/语音记录</title>'
+        f'<script>var tpl = "<div id=\'x\'></div></div>";</script></head><body>'
+        f'<div id="content">{"".join(noise[:padding // 2])}'
+        f'<div id="voice-data-root" data-voice-key="{voice_key}" data-voice-base="/assets/audio">'
+        + '\n'.join(items) +
+        f'</div>{"".join(noise[padding // 2:])}</div></body></html>')
+
+
+class MockWikiConfig:
+    """替身服务行为配置（时间单位：秒）"""
+
+    def __init__(self, latency: float = 0.0, throttle: int = 0, retry_after: Optional[str] = '1',
+                 interrupt: int = 0, ranges: bool = True, validators: bool = True) -> None:
+        self.latency = latency
+        self.throttle = throttle          # 每个路径的前 N 次请求返回 429
+        self.retry_after = retry_after    # 429 响应的 Retry-After 头（None 表示不带）
+        self.interrupt = interrupt        # 每个路径的前 N 次成功响应只发送一半内容后断开连接
+        self.ranges = ranges              # 是否支持 Range 请求
+        self.validators = validators      # 是否返回 ETag/Last-Modified 并响应条件请求
+
+
+class MockWikiServer:
+    """可在测试/基准脚本中内嵌启动的替身服务"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8766, files: Optional[Dict[str, bytes]] = None,
+                 root: Optional[str] = None, config: Optional[MockWikiConfig] = None) -> None:
+        self.config = config or MockWikiConfig()
+        self.files: Dict[str, bytes] = dict(files or {})
+        self.root = root
+        self.stats: Dict[str, int] = {'requests': 0, 'ok': 0, 'partial': 0, 'throttled': 0, 'not_found': 0,
+                                      'interrupted': 0, 'not_modified': 0}
+        self.log: List[Tuple[float, str, int]] = []  # (时间, 路径, 状态码)
+        self._seen: Dict[str, int] = {}
+        self._served: Dict[str, int] = {}
+        self.modified: Dict[str, float] = {}  # 路径 -> 修改时间（Last-Modified），未设置时使用启动时间
+        self._started = time.time()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockWikiServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'MockWikiServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _body(self, path: str) -> Optional[bytes]:
+        if path in self.files:
+            return self.files[path]
+        if self.root:
+            root = os.path.abspath(self.root)
+            local = os.path.normpath(os.path.join(root, path.lstrip('/')))
+            if local.startswith(root) and os.path.isfile(local):
+                with open(local, 'rb') as f:
+                    return f.read()
+        return None
+
+    def handle(self, path: str, headers) -> Tuple[int, Dict[str, str], bytes, bool]:
+        """返回 (状态码, 响应头, 响应体, 是否中途断开)"""
+        path = unquote(urlsplit(path).path)
+        with self._lock:
+            self.stats['requests'] += 1
+            seen = self._seen.get(path, 0)
+            self._seen[path] = seen + 1
+        if self.config.latency > 0:
+            time.sleep(self.config.latency)
+
+        if seen < self.config.throttle:
+            extra = {'Retry-After': self.config.retry_after} if self.config.retry_after is not None else {}
+            return self._finish(path, 429, extra, b'Too Many Requests', 'throttled')
+        body = self._body(path)
+        if body is None:
+            return self._finish(path, 404, {}, b'Not Found', 'not_found')
+
+        status, extra, stat = 200, {'Accept-Ranges': 'bytes'} if self.config.ranges else {}, 'ok'
+        if self.config.validators:
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            last_modified = email.utils.formatdate(self.modified.get(path, self._started), usegmt=True)
+            validators = {'ETag': etag, 'Last-Modified': last_modified}
+            if_none_match = headers.get('If-None-Match')
+            if_modified_since = headers.get('If-Modified-Since')
+            if (if_none_match == etag) or (if_none_match is None and if_modified_since == last_modified):
+                return self._finish(path, 304, validators, b'', 'not_modified')
+            extra.update(validators)
+        range_header = headers.get('Range') if self.config.ranges else None
+        if range_header and range_header.startswith('bytes=') and range_header.endswith('-'):
+            start = int(range_header[6:-1])
+            if start >= len(body):
+                return self._finish(path, 416, {'Content-Range': f'bytes */{len(body)}'}, b'', 'partial')
+            extra['Content-Range'] = f'bytes {start}-{len(body) - 1}/{len(body)}'
+            status, stat, body = 206, 'partial', body[start:]
+        with self._lock:
+            served = self._served.get(path, 0)
+            self._served[path] = served + 1
+        if served < self.config.interrupt:
+            with self._lock:
+                self.stats['interrupted'] += 1
+            return self._finish(path, status, extra, body, stat, interrupted=True)
+        return self._finish(path, status, extra, body, stat)
+
+    def _finish(self, path: str, status: int, headers: Dict[str, str], body: bytes,
+                stat: str, interrupted: bool = False) -> Tuple[int, Dict[str, str], bytes, bool]:
+        with self._lock:
+            self.stats[stat] += 1
+            self.log.append((time.monotonic(), path, status))
+        return status, headers, body, interrupted
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, headers, data, interrupted = server.handle(self.path, self.headers)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                if interrupted:
+                    # 模拟传输中断：只发送一半内容就关闭连接
+                    self.wfile.write(data[:len(data) // 2])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫测试用的本地替身 wiki 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--root", default=".", help="按请求路径返回该目录下的文件")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的延迟（秒）")
+    parser.add_argument("--throttle", type=int, default=0, help="每个路径的前 N 次请求返回 429")
+    parser.add_argument("--retry-after", default='1', help="429 响应的 Retry-After 头")
+    parser.add_argument("--interrupt", type=int, default=0, help="每个路径的前 N 次响应中途断开")
+    parser.add_argument("--no-ranges", action="store_true", help="不支持 Range 请求")
+
+    args = parser.parse_args()
+    config = MockWikiConfig(latency=args.latency, throttle=args.throttle, retry_after=args.retry_after,
+                            interrupt=args.interrupt, ranges=not args.no_ranges)
+    server = MockWikiServer(args.host, args.port, root=args.root, config=config)
+    print(f"替身 wiki 服务已启动: {server.url}（根目录 {os.path.abspath(args.root)}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n已停止，请求统计: {server.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+音频打包：把 lib/voc 中的散文件（wav / .wavz）追加到 lib/voc/pack/ 下的少数几个大文件中，另存偏移索引。
+参考音频索引、资源检查、元数据与下载校验都能直接使用打包存储（读取时 mmap，不复制）；散文件优先，
+新下载的文件可以随时再次运行本工具增量追加（内容未变的片段跳过）。
+  --remove   打包（索引落盘）后删除已打包的散文件
+  --unpack   把打包的片段还原为散文件（--remove 时随后删除打包存储）
+  --compact  重写打包文件，回收重复追加留下的空洞
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+from lib.ref.audio_codec import (COMPRESSED_SUFFIX, canonical_name, compressed_path, encode_wav,
+                                 decode_wavz, original_size)
+from lib.ref.audio_pack import DEFAULT_MAX_PACK_SIZE, PackWriter, compact_pack, open_pack, pack_dir, pack_usage
+
+
+def format_size(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+def loose_audio(voc_dir: str):
+    """目录中的散文件：登记用的 .wav 文件名 -> DirEntry（.wav 优先于 .wavz）"""
+    found = {}
+    with os.scandir(voc_dir) as it:
+        for entry in it:
+            name = canonical_name(entry.name)
+            if name is not None and entry.is_file() and (name not in found or entry.name == name):
+                found[name] = entry
+    return found
+
+
+def describe_usage(voc_dir: str) -> str:
+    usage = pack_usage(voc_dir)
+    loose = loose_audio(voc_dir)
+    text = (f"散文件 {len(loose)} 个，打包 {usage['clips']} 个片段 / {usage['pack_files']} 个文件 "
+            f"{format_size(usage['pack_bytes'])}")
+    if usage['dead_bytes']:
+        text += f"（空洞 {format_size(usage['dead_bytes'])}）"
+    return text
+
+
+def pack(voc_dir: str, max_pack_size: int, compress: bool, remove: bool) -> int:
+    loose = loose_audio(voc_dir)
+    added = skipped = 0
+    written = 0
+    packed = []
+    with PackWriter(voc_dir, max_pack_size) as writer:
+        for name in sorted(loose):
+            entry = loose[name]
+            st = entry.stat()
+            is_compressed = entry.name.endswith(COMPRESSED_SUFFIX)
+            size = original_size(entry.path) if is_compressed else st.st_size
+            old = writer.entry(name)
+            if old is not None and old.mtime_ns == st.st_mtime_ns and old.original_size == size:
+                skipped += 1
+                packed.append(name)
+                continue
+            with open(entry.path, 'rb') as f:
+                data = f.read()
+            if not is_compressed:
+                size = len(data)
+                if compress:
+                    blob = encode_wav(data)
+                    if decode_wavz(blob) != data:
+                        print(f"❌ 压缩校验失败，按原 wav 打包: {name}")
+                    else:
+                        data, is_compressed = blob, True
+            writer.add(name, data, size, is_compressed, st.st_mtime_ns)
+            written += len(data)
+            added += 1
+            packed.append(name)
+        writer.commit()
+    print(f"追加 {added} 个片段（{format_size(written)}），跳过未变化的 {skipped} 个")
+
+    if remove:
+        removed = 0
+        for name in packed:
+            path = os.path.join(voc_dir, name)
+            for candidate in (path, compressed_path(path)):
+                try:
+                    os.remove(candidate)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        print(f"✅ 已删除 {removed} 个已打包的散文件")
+    return 0
+
+
+def unpack(voc_dir: str, remove: bool) -> int:
+    store = open_pack(voc_dir)
+    if store is None:
+        print("没有打包存储，无需还原")
+        return 0
+    loose = loose_audio(voc_dir)
+    restored = kept = 0
+    for name, clip in sorted(store.clips.items()):
+        if name in loose:
+            kept += 1
+            continue
+        path = os.path.join(voc_dir, name)
+        target = compressed_path(path) if clip.compressed else path
+        tmp_path = target + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(store.view(clip))
+        os.utime(tmp_path, ns=(clip.mtime_ns, clip.mtime_ns))
+        os.replace(tmp_path, target)
+        restored += 1
+    print(f"还原 {restored} 个片段，{kept} 个已有散文件（散文件优先，未覆盖）")
+    if remove:
+        # 释放映射后再删除（Windows 下映射中的文件不能删除）
+        store.close()
+        shutil.rmtree(pack_dir(voc_dir))
+        print("✅ 已删除打包存储")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lib/voc 音频打包/还原")
+    parser.add_argument("--voc-dir", default=os.path.join("lib", "voc"), help="音频目录（默认 lib/voc）")
+    parser.add_argument("--unpack", action="store_true", help="把打包的片段还原为散文件")
+    parser.add_argument("--compact", action="store_true", help="重写打包文件，回收空洞")
+    parser.add_argument("--remove", action="store_true", help="打包后删除散文件；--unpack 时还原后删除打包存储")
+    parser.add_argument("--compress", action="store_true", help="打包时把 wav 无损压缩（同 compress_voc.py）")
+    parser.add_argument("--max-pack-size", type=int, default=DEFAULT_MAX_PACK_SIZE >> 20, metavar="MB",
+                        help=f"单个打包文件的大小上限（默认 {DEFAULT_MAX_PACK_SIZE >> 20}MB）")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.voc_dir):
+        print(f"❌ 音频目录不存在: {args.voc_dir}")
+        return 1
+    max_pack_size = max(1, args.max_pack_size) << 20
+
+    print(f"处理前: {describe_usage(args.voc_dir)}")
+    t0 = time.perf_counter()
+    if args.unpack:
+        status = unpack(args.voc_dir, args.remove)
+    elif args.compact:
+        if open_pack(args.voc_dir) is None:
+            print("没有打包存储，无需整理")
+            return 0
+        result = compact_pack(args.voc_dir, max_pack_size)
+        print(f"✅ 整理完成: {format_size(result['before'])} -> {format_size(result['after'])}")
+        status = 0
+    else:
+        status = pack(args.voc_dir, max_pack_size, args.compress, args.remove)
+    print(f"耗时 {time.perf_counter() - t0:.1f}s")
+    print(f"处理后: {describe_usage(args.voc_dir)}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线重新提取语音数据：用 html/ 中缓存的语音记录页面并行重新生成 lib/voc_data/voice_data_<干员>.csv，
+不访问网络。提取逻辑或语言选择变化后使用；内容未变化的 CSV 不会被重写。
+"""
+
+import argparse
+import os
+import sys
+
+from lib.crawl.extract import LANG_MAP_DISPLAY_TO_KIND
+from lib.crawl.offline import reextract_all
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从缓存的页面离线重新生成语音数据CSV")
+    parser.add_argument("--html-dir", default="html", help="页面缓存目录（默认 html）")
+    parser.add_argument("--output", default=os.path.join("lib", "voc_data"), help="CSV 目录（默认 lib/voc_data）")
+    parser.add_argument("--language", default=None, choices=sorted(LANG_MAP_DISPLAY_TO_KIND),
+                        help="提取语言（默认沿用各 CSV 已记录的语言，没有时为中文）")
+    parser.add_argument("--only", nargs="*", default=None, help="只处理这些干员")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行进程数")
+    parser.add_argument("--dry-run", action="store_true", help="只报告会变化的 CSV，不写入")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.html_dir):
+        print(f"❌ 页面缓存目录不存在: {args.html_dir}")
+        return 1
+
+    summary = reextract_all(args.html_dir, args.output, language=args.language, workers=args.workers,
+                            names=args.only, dry_run=args.dry_run)
+    for result in summary['results']:
+        if result['status'] in ('new', 'changed'):
+            print(f"  {'新增' if result['status'] == 'new' else '更新'}: {result['name']} "
+                  f"[{result['language']}] {result['records']} 条")
+        elif result['status'] == 'no_data':
+            print(f"  ⚠️ 没有语音数据: {result['name']}")
+        elif result['status'] == 'failed':
+            print(f"  ❌ 失败: {result['name']}: {result.get('error')}")
+
+    action = "将会" if args.dry_run else "已"
+    print(f"{'✅' if not summary['failed'] else '❌'} 页面 {summary['pages']} 个，记录 {summary['records']} 条，"
+          f"耗时 {summary['elapsed']:.1f}s")
+    print(f"   {action}新增 {summary['new']}，{action}更新 {summary['changed']}，未变化 {summary['unchanged']}，"
+          f"无数据 {summary['no_data']}，失败 {summary['failed']}")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会话回放：将 app.py --record 录制的会话存档按原始（或加速）节奏推过配音流水线，
+统计从触发到拿到音频（time-to-first-audio）的分布，用于对比不同版本的端到端延迟。
+默认对进程内的 mock_tts_server 替身服务回放；对真实服务回放需明确指定 --endpoint。
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from lib.bench import summarize_latencies, format_latency_summary
+from lib.pipeline import DubbingPipeline
+from lib.session import SessionArchive
+
+
+def replay(archive: SessionArchive, pipeline: DubbingPipeline, speed: float = 1.0, use_recorded_text: bool = True) -> List[Dict]:
+    """按录制的触发时间回放。speed>0 时按 t/speed 调度，speed<=0 时不等待。
+    触发被前一次处理阻塞时，排队时间计入 time-to-first-audio（与应用内串行处理一致）。"""
+    records = []
+    replay_start = time.perf_counter()
+    for event in archive.events():
+        now = time.perf_counter()
+        if speed > 0:
+            scheduled = replay_start + event['t'] / speed
+            if scheduled > now:
+                time.sleep(scheduled - now)
+        else:
+            scheduled = now
+
+        if use_recorded_text:
+            # 直接使用录制时的OCR结果，回放结果确定且无需加载OCR模型；
+            # 未命名区域按流水线的默认名（区域1、区域2…）登记在 texts 中
+            texts = event['result'].get('texts') or {}
+            crops = [(entry['region'], texts.get(entry['region'].get('name', f'区域{i+1}'), ''))
+                     for i, entry in enumerate(event['crops'])]
+        else:
+            crops = archive.load_crops(event)
+
+        result = pipeline.run(crops)
+        done = time.perf_counter()
+        ttfa = done - scheduled if result['audio_path'] else None
+        records.append({
+            'index': event['index'],
+            't': event['t'],
+            'queue_delay': max(0.0, done - scheduled - result['timings']['total']),
+            'ttfa': ttfa,
+            'speaker': result['speaker'],
+            'recorded_speaker': event['result'].get('speaker'),
+            'content_text': result['content_text'],
+            'audio_bytes': result['audio_bytes'],
+            'error': result['error'],
+            'timings': result['timings'],
+        })
+    return records
+
+
+def summarize_replay(records: List[Dict]) -> Dict:
+    stages = sorted({stage for r in records for stage in r['timings']})
+    return {
+        'triggers': len(records),
+        'with_audio': sum(1 for r in records if r['ttfa'] is not None),
+        'speaker_mismatch': sum(1 for r in records if r['speaker'] != r['recorded_speaker']),
+        'ttfa': summarize_latencies(r['ttfa'] for r in records),
+        'queue_delay': summarize_latencies(r['queue_delay'] for r in records),
+        'stages': {stage: summarize_latencies(r['timings'].get(stage) for r in records) for stage in stages},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话回放与端到端延迟基准")
+    parser.add_argument("archive", help="app.py --record 生成的会话存档")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放倍速（1=原始节奏，0=不等待）")
+    parser.add_argument("--ocr", choices=["recorded", "live"], default="recorded", help="recorded: 使用录制的OCR文本；live: 对存档截图重新OCR")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--endpoint", default=None,
+                        help="对真实/外部 TTS 服务回放（默认在进程内启动替身服务，不产生费用、结果可复现）")
+    target.add_argument("--mock", action="store_true", help="使用进程内替身服务（默认行为）")
+    parser.add_argument("--api-key", default=None, help="TTS API Key（仅 --endpoint 时使用，默认读取 .env / 环境变量）")
+    parser.add_argument("--mock-latency", type=float, default=0.2, help="替身服务的基础延迟（秒）")
+    parser.add_argument("--output", default=None, help="逐次触发结果输出（JSONL）")
+    parser.add_argument("--summary", default=None, help="汇总结果输出（JSON），便于对比不同版本")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        print(f"❌ 会话存档不存在: {args.archive}")
+        return 1
+
+    server = None
+    endpoint, api_key = args.endpoint, args.api_key
+    if not endpoint:
+        # 未明确指定服务地址时不访问线上服务（也不读取环境中的 API Key）
+        from mock_tts_server import MockTTSServer, MockTTSConfig
+        server = MockTTSServer(port=0, config=MockTTSConfig(latency=args.mock_latency, seed=0)).start()
+        endpoint, api_key = server.url, "mock"
+        print(f"已启动进程内替身服务: {endpoint}")
+
+    from lib.tts_service import SiliconFlowTTS
+    tts = SiliconFlowTTS(base_url=endpoint, api_key=api_key)
+    if not tts.api_key:
+        print("⚠️ 未配置 TTS API Key，仅回放识别部分，不统计 time-to-first-audio")
+
+    if args.ocr == "live":
+        from lib.ocr import ocr_image
+        ocr_func = ocr_image
+    else:
+        ocr_func = lambda text: text
+
+    with SessionArchive(args.archive) as archive, tempfile.TemporaryDirectory() as out_dir:
+        print(f"会话: {archive.meta.get('created')}，共 {len(archive)} 次触发，倍速 {args.speed}")
+        pipeline = DubbingPipeline(ocr_func=ocr_func, tts=tts, output_dir=out_dir)
+        try:
+            records = replay(archive, pipeline, speed=args.speed, use_recorded_text=(args.ocr == "recorded"))
+        finally:
+            if server:
+                server.stop()
+
+    summary = summarize_replay(records)
+    print(f"\n{'='*60}")
+    print("📊 回放统计")
+    print(f"{'='*60}")
+    print(f"触发次数: {summary['triggers']}，生成音频: {summary['with_audio']}，角色与录制不一致: {summary['speaker_mismatch']}")
+    print(f"time-to-first-audio: {format_latency_summary(summary['ttfa'])}")
+    print(f"排队等待: {format_latency_summary(summary['queue_delay'])}")
+    for stage, stats in summary['stages'].items():
+        print(f"  {stage:<10} {format_latency_summary(stats)}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print(f"✅ 逐次结果已保存到 {args.output}")
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"✅ 汇总已保存到 {args.summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按任务清单无人值守地爬取干员语音（适合每晚定时刷新）：不需要交互输入，
+任务分配给多个工作进程并行执行，所有进程共用同一组按主机限速；
+结果记入爬取日志，并按任务顺序合并，输出与进程数和完成顺序无关。
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List
+
+import crawl_all_operators_audio_flexible as crawler
+from lib.crawl.fetch import FetchStats, Fetcher, SharedHostRateLimiter
+from lib.crawl.jobs import DEFAULT_JOB_MANIFEST, CrawlJob, build_jobs, load_job_manifest, manifest_digest
+from lib.crawl.journal import DEFAULT_JOURNAL_PATH, CrawlJournal
+from lib.crawl.manifest import DownloadManifest
+from lib.crawl.page_cache import PageCache
+from lib.crawl.planner import CrawlPlan, scan_voc
+
+CSV_DIR = os.path.join("lib", "voc_data")
+VOC_FILES = None  # 工作进程内 lib/voc 的文件名集合
+
+
+def init_worker(limiter):
+    """工作进程初始化：使用共享限速；下载清单与页面索引只记录改动，由父进程合并保存"""
+    global VOC_FILES
+    crawler.FETCHER = Fetcher(limiter=limiter)
+    crawler.MANIFEST = DownloadManifest(persist=False)
+    crawler.PAGE_CACHE = PageCache("html", persist=False)
+    VOC_FILES = scan_voc("lib/voc")
+
+
+def run_job(job: Dict[str, Any], dry_run: bool = False) -> Dict[str, Any]:
+    """在工作进程中执行一个任务，返回记录、下载结果以及需要父进程合并的清单/索引改动"""
+    result: Dict[str, Any] = {'index': job['index'], 'name': job['name'], 'language': job['language'],
+                              'status': 'failed', 'result': {}, 'records': [], 'plan': None, 'pid': os.getpid()}
+    operator = {'display_name': job['name'], 'full_url': job['url']}
+    try:
+        outcome = crawler.process_operator(operator, download_audio=True, max_audio_files=job['max_audio_files'],
+                                           preferred_language=job['language'], voc_files=VOC_FILES,
+                                           dry_run=dry_run, compress=job.get('compress', False))
+    except Exception as e:
+        print(f"❌ 处理 {job['name']} 时出错: {e}")
+        outcome = None
+    if outcome:
+        voice_data, info = outcome
+        info = info or {}
+        result['plan'] = info.get('plan')
+        if voice_data:
+            result['status'] = 'done'
+            result['records'] = voice_data
+            result['result'] = {k: v for k, v in info.items() if k != 'plan'}
+            if result['plan'] is not None:
+                result['result']['plan'] = result['plan'].status
+    result['manifest_changes'] = crawler.MANIFEST.pop_changes()
+    result['page_changes'] = crawler.PAGE_CACHE.pop_changes()
+    result['fetch_stats'] = crawler.FETCHER.stats.snapshot()
+    result['page_stats'] = dict(crawler.PAGE_CACHE.stats)
+    return result
+
+
+def execute(jobs: List[CrawlJob], workers: int, limiter, on_result: Callable[[Dict[str, Any]], None],
+            dry_run: bool = False) -> None:
+    """执行任务；结果按完成顺序交给 on_result（在父进程中调用）"""
+    tasks = [job.to_dict() for job in jobs]
+    if workers <= 1 or len(tasks) <= 1:
+        init_worker(limiter)
+        for task in tasks:
+            on_result(run_job(task, dry_run))
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(limiter,)) as pool:
+        futures = {pool.submit(run_job, task, dry_run): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                task = futures[future]
+                print(f"❌ 工作进程执行 {task['name']} 失败: {e}")
+                result = {'index': task['index'], 'name': task['name'], 'language': task['language'],
+                          'status': 'failed', 'result': {}, 'records': [], 'plan': None}
+            on_result(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按任务清单无人值守地爬取干员语音（多进程、共享限速）")
+    parser.add_argument("manifest", nargs="?", default="crawl_jobs.json", help="任务清单 JSON（默认 crawl_jobs.json）")
+    parser.add_argument("--init", action="store_true", help="生成一份爬取全部干员的任务清单模板后退出")
+    parser.add_argument("--workers", type=int, default=4, help="工作进程数（默认 4；限速由所有进程共享）")
+    parser.add_argument("--resume", action="store_true", help="继续上次中断的爬取（任务清单需未改变）")
+    parser.add_argument("--dry-run", action="store_true", help="只报告增量计划，不写CSV、不下载音频")
+    parser.add_argument("--plan-output", default=None, help="把增量计划保存为 JSON 文件")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help=f"爬取日志路径（默认 {DEFAULT_JOURNAL_PATH}）")
+    parser.add_argument("--report", default=None, help="把每个任务的结果（按任务顺序）保存为 JSON 文件")
+    args = parser.parse_args()
+
+    if args.init:
+        if os.path.exists(args.manifest):
+            print(f"❌ {args.manifest} 已存在，不会覆盖")
+            return 1
+        with open(args.manifest, 'w', encoding='utf-8') as f:
+            json.dump(DEFAULT_JOB_MANIFEST, f, ensure_ascii=False, indent=2)
+        print(f"✅ 已生成任务清单模板: {args.manifest}")
+        return 0
+
+    try:
+        manifest = load_job_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ 无法读取任务清单 {args.manifest}: {e}")
+        return 2
+    digest = manifest_digest(manifest)
+
+    operators = crawler.parse_html_links(manifest['source'])
+    jobs, missing = build_jobs(manifest, operators, CSV_DIR)
+    if missing:
+        print(f"⚠️ 以下干员在 {manifest['source']} 中找不到，已跳过: {', '.join(missing)}")
+    if not jobs:
+        print("无待处理干员，程序结束。")
+        return 0
+    job_order = [job.name for job in jobs]
+    position = {name: i for i, name in enumerate(job_order)}
+
+    journal = CrawlJournal(args.journal)
+    run_id = None
+    if not args.dry_run:
+        resumed = journal.unfinished_run() if args.resume else None
+        if resumed is not None:
+            if resumed.get('settings', {}).get('job_digest') != digest:
+                print(f"❌ 上次未完成的爬取 {resumed['run']} 使用的任务清单与当前不同，无法继续")
+                return 2
+            run_id = resumed['run']
+            done_names = journal.completed(run_id)
+            jobs = [job for job in jobs if job.name not in done_names]
+            print(f"继续爬取 {run_id}：已完成 {len(done_names)} 名，剩余 {len(jobs)} 名")
+        else:
+            if args.resume:
+                print("爬取日志中没有未完成的爬取，将开始新的爬取。")
+            run_id = journal.start_run({'job_manifest': os.path.abspath(args.manifest), 'job_digest': digest,
+                                        'workers': args.workers})
+    print(f"本次共 {len(jobs)} 个任务，{args.workers} 个工作进程")
+
+    store = DownloadManifest()
+    page_cache = PageCache("html")
+    crawl_plan = CrawlPlan()
+    fetch_snapshots: Dict[int, Dict[str, Any]] = {}
+    page_snapshots: Dict[int, Dict[str, int]] = {}
+    results: Dict[int, Dict[str, Any]] = {}
+
+    def on_result(result: Dict[str, Any]) -> None:
+        store.apply_changes(result.get('manifest_changes', {}))
+        page_cache.apply_changes(result.get('page_changes', {}))
+        store.save()
+        page_cache.save_index()
+        if 'pid' in result:
+            fetch_snapshots[result['pid']] = result['fetch_stats']
+            page_snapshots[result['pid']] = result['page_stats']
+        if result['plan'] is not None:
+            crawl_plan.add(result['plan'])
+        if run_id is not None:
+            journal.record_operator(run_id, result['name'], result['language'], result['status'],
+                                    result=result['result'], records=result['records'])
+        results[result['index']] = {k: result[k] for k in ('name', 'language', 'status', 'result')}
+        mark = '✅' if result['status'] == 'done' else '❌'
+        print(f"{mark} [{len(results)}/{len(jobs)}] {result['name']} [{result['language']}] "
+              f"{len(result['records'])} 条记录")
+
+    limiter = SharedHostRateLimiter()
+    execute(jobs, args.workers, limiter, on_result, dry_run=args.dry_run)
+
+    # 按任务顺序排列计划，与完成顺序无关
+    crawl_plan.operators.sort(key=lambda plan: position[plan.name])
+    print(crawl_plan.describe())
+    if args.plan_output:
+        crawl_plan.save(args.plan_output)
+        print(f"✅ 增量计划已保存到 {args.plan_output}")
+
+    fetch_stats = FetchStats()
+    for snapshot in fetch_snapshots.values():
+        fetch_stats.absorb(snapshot)
+    for snapshot in page_snapshots.values():
+        for key, value in snapshot.items():
+            page_cache.stats[key] += value
+    print(f"下载引擎: {fetch_stats.summary()}")
+    print(page_cache.summary())
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump([results[i] for i in sorted(results)], f, ensure_ascii=False, indent=1)
+        print(f"✅ 任务结果已保存到 {args.report}")
+    if args.dry_run:
+        print("\n预览模式：未写入CSV，未下载音频。")
+        return 0
+
+    run_summary = journal.run_summary(run_id)
+    journal.finish_run(run_id, {k: v for k, v in run_summary.items() if k != 'failed_operators'})
+    journal.close()
+    total_csv_file = os.path.join(CSV_DIR, "all_voice_data_complete.csv")
+    os.makedirs(CSV_DIR, exist_ok=True)
+    total_records = journal.materialize(run_id, total_csv_file, order=job_order)
+    # 汇总 CSV 已生成，删去更早的已完成 run，避免日志无限增长
+    journal.compact(keep_run=run_id)
+    print(f"✅ 完成 {run_summary['done']} 名干员，共 {total_records} 条语音记录，已保存到 {total_csv_file}")
+    if run_summary['failed_operators']:
+        print(f"❌ 有 {run_summary['failed']} 名干员处理失败: {', '.join(run_summary['failed_operators'])}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+find_rows_by_char 匹配基准：对比原先逐个 char_id 循环 + isin 与预建后缀索引
+默认生成与语音表规模相当的合成表（lib/operators.csv 中每名干员 40 条），存在 lib/ref/table.parquet 时使用真实表
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join('lib', 'ref'))
+
+import loader
+
+
+def legacy_rows(df, english_name):
+    """原实现的 char_id 匹配部分（用作对照）"""
+    english_name_clean = english_name.lower().replace(' ', '').replace('-', '').replace('_', '')
+    matching_char_ids = []
+    for char_id in df['char_id'].unique():
+        if '_' in char_id:
+            char_suffix_clean = char_id.split('_', 2)[-1].lower()
+            matched = english_name_clean == char_suffix_clean
+            special_mappings = {'silverash': 'svrash', 'exusiai': 'angel', 'bagpipe': 'bpipe'}
+            for eng, char_suffix_map in special_mappings.items():
+                if eng in english_name_clean and char_suffix_map in char_suffix_clean:
+                    matched = True
+                    break
+            if matched:
+                matching_char_ids.append(char_id)
+    if matching_char_ids:
+        return df[df['char_id'].isin(matching_char_ids)]
+    return None
+
+
+def synthetic_table(english_names, per_operator=40):
+    rows = []
+    for i, name in enumerate(english_names):
+        suffix = loader._clean_english_name(name)
+        suffix = {'silverash': 'svrash', 'exusiai': 'angel', 'bagpipe': 'bpipe'}.get(suffix, suffix)
+        for j in range(per_operator):
+            rows.append({'char_id': f"char_{i:03d}_{suffix}", 'voice_text': f"{name} {j}"})
+    # 打乱行序，模拟不同干员的行交错出现
+    return pd.DataFrame(rows).sample(frac=1.0, random_state=0).reset_index(drop=True)
+
+
+def main():
+    english_names = [n for n in loader.load_operators()['english_name'] if isinstance(n, str)]
+    if os.path.exists(loader.PARQUET_PATH):
+        df = loader.load_table()
+    else:
+        df = synthetic_table(english_names)
+    print(f"表行数: {len(df)}，char_id 数: {df['char_id'].nunique()}，查询数: {len(english_names)}")
+
+    t0 = time.perf_counter()
+    legacy = [legacy_rows(df, n) for n in english_names]
+    legacy_time = (time.perf_counter() - t0) / len(english_names)
+
+    t0 = time.perf_counter()
+    index = loader._CharIdIndex(df)
+    build_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    results = [index.rows(n) for n in english_names]
+    index_time = (time.perf_counter() - t0) / len(english_names)
+
+    def same(a, b):
+        if a is None or b is None:
+            return a is None and b is None
+        return a.index.equals(b.index)
+
+    mismatches = [n for n, a, b in zip(english_names, legacy, results) if not same(a, b)]
+    print(f"原实现:   {legacy_time * 1000:.2f} ms/次")
+    print(f"索引构建: {build_time * 1000:.1f} ms")
+    print(f"索引查找: {index_time * 1e6:.1f} µs/次")
+    print(f"加速比:   {legacy_time / max(index_time, 1e-9):.0f}x")
+    print(f"结果不一致: {len(mismatches)} 个 {mismatches[:5]}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
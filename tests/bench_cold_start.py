@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动基准：在全新子进程中测量 "导入流水线 → 第一句配音完成" 的耗时（假OCR、假TTS），
+对比逐项加载（pandas + CSV + 扫描 voc 目录）与运行时资源包。
+默认在临时目录生成参考音频（lib/operators.csv 中每名干员 20 个文件）。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+CHILD = r'''
+import time
+t0 = time.perf_counter()
+import json, os, sys
+sys.path.insert(0, {repo!r})
+from lib.pipeline import DubbingPipeline
+if {legacy!r}:
+    from lib.ref import loader
+    loader.VOC_DIR = {voc_dir!r}
+
+class FakeTTS:
+    api_key = "fake"
+    def ensure_voice(self, name_key, wav_path, ref_text=None):
+        return "speech:" + name_key
+    def synthesize(self, text, voice_uri=None):
+        return b"RIFF-fake-audio"
+
+pipeline = DubbingPipeline(ocr_func=lambda image: image, tts=FakeTTS(), output_dir={out_dir!r})
+result = pipeline.run([({{"name": "角色名"}}, "阿米娅"), ({{"name": "文案"}}, "博士，您工作辛苦了。")])
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"elapsed": elapsed, "ref_path": result["ref_path"], "pandas": "pandas" in sys.modules}}))
+'''
+
+
+def run_child(voc_dir, out_dir, bundle_path):
+    env = dict(os.environ)
+    env['ARK_RUNTIME_BUNDLE'] = bundle_path or ''
+    code = CHILD.format(repo=REPO, legacy=not bundle_path, voc_dir=voc_dir, out_dir=out_dir)
+    proc = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动基准")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--per-operator", type=int, default=20)
+    args = parser.parse_args()
+
+    from lib.ref import loader
+    from lib.ref.bundle import RuntimeBundle, build_payload
+    from lib.ref.resolver import operator_aliases
+
+    with tempfile.TemporaryDirectory() as tmp:
+        voc_dir = os.path.join(tmp, 'voc')
+        out_dir = os.path.join(tmp, 'out')
+        os.makedirs(voc_dir)
+        operators_df = loader.load_operators()
+        names = [n for n in operators_df['chinese_name'] if isinstance(n, str)]
+        for name in names:
+            for i in range(args.per_operator):
+                open(os.path.join(voc_dir, f"{name}_语音{i:02d}_{i:032x}.wav"), 'wb').close()
+
+        loader.VOC_DIR = voc_dir
+        references = {}
+        for name in names:
+            refs = loader.find_new_audio_by_char_name(name, limit=1)
+            if refs:
+                references[name] = refs[0]
+        operators = [(c, e if isinstance(e, str) else None, u if isinstance(u, str) else None)
+                     for c, e, u in zip(operators_df['chinese_name'], operators_df['english_name'], operators_df['url'])
+                     if isinstance(c, str)]
+        bundle_path = os.path.join(tmp, 'runtime.bundle')
+        size = RuntimeBundle.dump(bundle_path, build_payload(bundle_path, operators, operator_aliases(operators_df), references))
+        print(f"干员 {len(names)}，参考音频 {len(names) * args.per_operator}，资源包 {size / 1024:.1f} KiB")
+
+        results = {}
+        for label, path in (('逐项加载', None), ('运行时资源包', bundle_path)):
+            runs = [run_child(voc_dir, out_dir, path) for _ in range(args.runs)]
+            assert all(r['ref_path'] for r in runs), runs
+            results[label] = runs
+            times = [r['elapsed'] * 1000 for r in runs]
+            print(f"{label:8s} 首句耗时 中位数 {statistics.median(times):.0f} ms（最小 {min(times):.0f} / 最大 {max(times):.0f}），"
+                  f"导入 pandas: {runs[0]['pandas']}")
+        same = {r['ref_path'] for r in results['逐项加载']} == {r['ref_path'] for r in results['运行时资源包']}
+        print(f"参考音频一致: {same}")
+        return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语音记录页面提取基准：对比整页 BeautifulSoup(html.parser) 与只解析 voice-data-root 子树（lxml）的每页耗时，
+并逐条核对两者的提取结果。默认读取 html/ 下缓存的页面，没有缓存时生成与 prts.wiki 结构相同的页面
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from lib.crawl.extract import extract_voice_data_bs4, extract_voice_data_fast
+from lib.crawl.page_cache import PageCache
+from lib.bench import format_latency_summary, summarize_latencies
+from mock_wiki_server import voice_record_page
+
+
+def synthetic_pages(count, lines, padding):
+    rng = random.Random(0)
+    pages = []
+    for i in range(count):
+        name = f"干员{i:03d}"
+        records = [(f"语音{j}", f"CN_{j:03d}",
+                    {'中文': f"博士，第{j}句台词" + "。" * rng.randint(0, 20), '日文': f"ドクター{j}"})
+                   for j in range(lines)]
+        pages.append((name, voice_record_page(name, f"char_{i:03d}_test", records, padding=padding)))
+    return pages
+
+
+def time_parser(func, pages, language):
+    times, results = [], []
+    for name, html in pages:
+        t0 = time.perf_counter()
+        results.append(func(html, name, language))
+        times.append(time.perf_counter() - t0)
+    return times, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="语音记录页面提取基准")
+    parser.add_argument("--html-dir", default="html", help="页面缓存目录（默认 html）")
+    parser.add_argument("--limit", type=int, default=50, help="最多使用的页面数")
+    parser.add_argument("--language", default="中文")
+    parser.add_argument("--lines", type=int, default=40, help="生成页面时每页的语音条数")
+    parser.add_argument("--padding", type=int, default=1500, help="生成页面时页面其余部分的规模")
+    args = parser.parse_args()
+
+    cache = PageCache(args.html_dir)
+    names = cache.names()[:args.limit]
+    if names:
+        pages = [(name, cache.read(name)) for name in names]
+        source = f"{args.html_dir}/ 缓存页面"
+    else:
+        pages = synthetic_pages(args.limit, args.lines, args.padding)
+        source = "生成页面"
+    size = sum(len(html.encode('utf-8')) for _, html in pages) / len(pages)
+    print(f"{source} {len(pages)} 个，平均 {size / 1024:.0f} KB/页，语言 {args.language}")
+
+    bs4_times, bs4_results = time_parser(extract_voice_data_bs4, pages, args.language)
+    fast_times, fast_results = time_parser(extract_voice_data_fast, pages, args.language)
+    print(f"BeautifulSoup 整页: {format_latency_summary(summarize_latencies(bs4_times))}")
+    print(f"voice-data-root:    {format_latency_summary(summarize_latencies(fast_times))}")
+    print(f"加速: {sum(bs4_times) / sum(fast_times):.1f}x")
+
+    mismatches = [name for (name, _), a, b in zip(pages, bs4_results, fast_results) if a != b]
+    records = sum(len(r or []) for r in fast_results)
+    print(f"记录数: {records}，结果不一致的页面: {len(mismatches)} 个 {mismatches[:5]}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
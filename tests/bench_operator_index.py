@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+干员名查找微基准：对比预建索引与原先逐列 pandas 扫描的实现（lib/operators.csv 全部干员）
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join('lib', 'ref'))
+
+import loader
+
+
+def legacy_find_operator_by_name(operators_df, name):
+    """原实现：每次查找最多四次整表布尔扫描（用作对照）"""
+    if operators_df.empty:
+        return None
+    name_lower = name.strip().lower()
+    for column in ('chinese_name', 'english_name'):
+        match = operators_df[operators_df[column].str.lower() == name_lower]
+        if not match.empty:
+            row = match.iloc[0]
+            return {'chinese_name': row['chinese_name'], 'english_name': row['english_name'], 'url': row['url']}
+    for column in ('chinese_name', 'english_name'):
+        match = operators_df[operators_df[column].str.lower().str.contains(name_lower, na=False, regex=False)]
+        if not match.empty:
+            row = match.iloc[0]
+            return {'chinese_name': row['chinese_name'], 'english_name': row['english_name'], 'url': row['url']}
+    return None
+
+
+def build_queries(df):
+    queries = []
+    for _, row in df.iterrows():
+        queries.append(row['chinese_name'])
+        if isinstance(row['english_name'], str):
+            queries.append(row['english_name'].upper())
+        # 子串查询（模拟OCR截断）
+        queries.append(str(row['chinese_name'])[:2])
+    queries.extend(["不存在的干员", "zzz"])
+    return queries
+
+
+def _same(a, b):
+    if a is None or b is None:
+        return a is b
+    return all((a[k] == b[k]) or (pd.isna(a[k]) and pd.isna(b[k])) for k in ('chinese_name', 'english_name', 'url'))
+
+
+def main():
+    df = loader.load_operators()
+    queries = build_queries(df)
+    print(f"干员数: {len(df)}，查询数: {len(queries)}")
+
+    t0 = time.perf_counter()
+    index = loader.load_operator_index()
+    build_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    legacy_results = [legacy_find_operator_by_name(df, q) for q in queries]
+    legacy_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index_results = [index.lookup(q) for q in queries]
+    index_time = time.perf_counter() - t0
+
+    mismatches = [q for q, a, b in zip(queries, legacy_results, index_results) if not _same(a, b)]
+    print(f"索引构建: {build_time * 1000:.2f} ms")
+    print(f"原实现:   {legacy_time * 1000:.1f} ms 总计, {legacy_time / len(queries) * 1e6:.1f} µs/次")
+    print(f"索引:     {index_time * 1000:.2f} ms 总计, {index_time / len(queries) * 1e6:.2f} µs/次")
+    print(f"加速比:   {legacy_time / max(index_time, 1e-9):.0f}x")
+    print(f"结果不一致: {len(mismatches)} 个 {mismatches[:10]}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语音表加载配置基准：比较 full / compact / lookup 三种配置的加载耗时与 memory_usage(deep=True)
+存在 lib/ref/table.parquet 时使用真实表，否则生成列结构相近的合成表（lib/operators.csv 中每名干员 40 条）
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join('lib', 'ref'))
+
+import loader
+
+PLACE_TYPES = ['HOME_PLACE', 'GACHA', 'BATTLE', 'ANY', 'BUILDING']
+TITLES = ['任命助理', '交谈1', '交谈2', '交谈3', '晋升后交谈1', '信赖提升后交谈1', '闲置', '干员报到', '观看作战记录', '精英化晋升1']
+
+
+def synthetic_table(per_operator=40):
+    rows = []
+    names = [n for n in loader.load_operators()['english_name'] if isinstance(n, str)]
+    for i, name in enumerate(names):
+        char_id = f"char_{i:03d}_{loader._clean_english_name(name)}"
+        for j in range(per_operator):
+            title = TITLES[j % len(TITLES)]
+            filename = f"{char_id}_CN_{j:03d}.wav"
+            rows.append({
+                'id': f"{char_id}_CN_{j:03d}",
+                'char_id': char_id,
+                'voice_title': title,
+                'voice_text': f"{name} 的第{j}条语音：博士，今天也请多多指教，这是一段用于测量内存占用的示例台词。",
+                'voice_index': j,
+                'lock_description': '信赖提升至100%后解锁' if j % 3 else '',
+                'place_type': PLACE_TYPES[j % len(PLACE_TYPES)],
+                'unlock_type': 'FAVOR' if j % 3 else 'DIRECT',
+                'unlock_param': [j % 3, 100] if j % 3 else [],
+                'filename': filename,
+                'file_url': f"https://torappu.prts.wiki/assets/audio/voice_cn/{char_id}/cn_{j:03d}.wav",
+            })
+    return pd.DataFrame(rows)
+
+
+def measure(path, profile):
+    t0 = time.perf_counter()
+    df = loader.read_table_profile(path, profile)
+    elapsed = time.perf_counter() - t0
+    return df, elapsed, int(df.memory_usage(deep=True).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="语音表加载配置基准")
+    parser.add_argument("--parquet", default=None, help="parquet 文件（默认 lib/ref/table.parquet，不存在时生成合成表）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.parquet or loader.PARQUET_PATH
+        if not os.path.exists(path):
+            path = os.path.join(tmp, 'table.parquet')
+            synthetic_table().to_parquet(path, index=False)
+            print(f"使用合成表: {path}")
+
+        baseline = None
+        for profile in ('full', 'compact', 'lookup'):
+            df, elapsed, footprint = measure(path, profile)
+            baseline = baseline or footprint
+            categories = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+            print(f"{profile:8s} 行数 {len(df)}，列数 {len(df.columns)}，加载 {elapsed * 1000:.1f} ms，"
+                  f"内存 {footprint / 1024 / 1024:.2f} MiB（{footprint / baseline * 100:.0f}%），category 列: {categories}")
+
+        # lookup 配置下的查找结果与 full 一致
+        full = loader.read_table_profile(path, 'full')
+        lookup = loader.read_table_profile(path, 'lookup')
+        names = [n for n in loader.load_operators()['english_name'] if isinstance(n, str)]
+        a, b = loader._CharIdIndex(full), loader._CharIdIndex(lookup)
+        mismatches = []
+        for n in names:
+            ra, rb = a.rows(n), b.rows(n)
+            if (ra is None) != (rb is None) or (ra is not None and ra['voice_text'].tolist() != rb['voice_text'].tolist()):
+                mismatches.append(n)
+        print(f"查找结果不一致: {len(mismatches)} 个 {mismatches[:5]}")
+        return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
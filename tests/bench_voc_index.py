@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+参考音频索引基准：对比每次 glob+sort 与内存索引（冷构建 / 热查找）
+默认在临时目录生成与当前语料规模相当的空文件（388 名干员 × 40 条），也可用 --voc-dir 指向真实 lib/voc
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join('lib', 'ref'))
+
+import pandas as pd
+
+import loader
+
+
+def make_corpus(directory, operators, per_operator):
+    for name in operators:
+        for i in range(per_operator):
+            md5 = f"{hash((name, i)) & ((1 << 128) - 1):032x}"
+            open(os.path.join(directory, f"{name}_语音{i:02d}_{md5}.wav"), 'wb').close()
+
+
+def glob_lookup(voc_dir, char_name):
+    files = glob.glob(os.path.join(voc_dir, f"{char_name}_*.wav"))
+    files.sort()
+    return files
+
+
+def run(voc_dir, names, rounds):
+    t0 = time.perf_counter()
+    for name in names:
+        glob_lookup(voc_dir, name)
+    glob_time = (time.perf_counter() - t0) / len(names)
+
+    index = loader._VocIndex(voc_dir)
+    t0 = time.perf_counter()
+    index.refresh()
+    build_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for name in names:
+            index.lookup(name)
+    hot_time = (time.perf_counter() - t0) / (len(names) * rounds)
+
+    mismatches = [n for n in names if [c['file_path'] for c in index.lookup(n)] != [os.path.abspath(p) for p in glob_lookup(voc_dir, n)]]
+    print(f"文件数: {len(index.clips)}，查询干员数: {len(names)}")
+    print(f"glob+sort:  {glob_time * 1000:.2f} ms/次")
+    print(f"索引冷构建: {build_time * 1000:.1f} ms")
+    print(f"索引热查找: {hot_time * 1e6:.2f} µs/次（含目录 mtime 检查）")
+    print(f"结果不一致: {len(mismatches)} 个 {mismatches[:5]}")
+    return 1 if mismatches else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="参考音频索引基准")
+    parser.add_argument("--voc-dir", default=None, help="真实的 voc 目录（默认生成临时语料）")
+    parser.add_argument("--per-operator", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    operators = [n for n in pd.read_csv(loader.OPERATORS_CSV_PATH, encoding='utf-8-sig')['chinese_name'] if isinstance(n, str)]
+    if args.voc_dir:
+        return run(args.voc_dir, operators, args.rounds)
+    with tempfile.TemporaryDirectory() as tmp:
+        make_corpus(tmp, operators, args.per_operator)
+        return run(tmp, operators, args.rounds)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
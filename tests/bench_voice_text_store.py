@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语音文本查询基准：对比每次 pd.read_csv 过滤与语音文本库（冷同步 / 无变化同步 / 热查询）
+默认以 tests/voice_data_12F.csv 为模板，在临时目录生成与当前语料规模相当的CSV（388 名干员）
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join('lib', 'ref'))
+
+from store import VoiceTextStore
+
+TEMPLATE_CSV = os.path.join(os.path.dirname(__file__), 'voice_data_12F.csv')
+
+
+def legacy_lookup(csv_dir, operator_name, md5_hash):
+    """原实现：每次查询读取整个CSV并过滤（用作对照）"""
+    csv_file = os.path.join(csv_dir, f'voice_data_{operator_name}.csv')
+    if not os.path.exists(csv_file):
+        return ""
+    df = pd.read_csv(csv_file)
+    matching_rows = None
+    if 'selected_text_md5' in df.columns:
+        matching_rows = df[df['selected_text_md5'] == md5_hash]
+    if (matching_rows is None or matching_rows.empty) and 'chinese_text_md5' in df.columns:
+        matching_rows = df[df['chinese_text_md5'] == md5_hash]
+    if matching_rows is not None and not matching_rows.empty:
+        return matching_rows.iloc[0]['chinese_text']
+    return ""
+
+
+def make_corpus(directory, operators):
+    template = pd.read_csv(TEMPLATE_CSV)
+    queries = []
+    for i in range(operators):
+        name = f"干员{i:03d}"
+        df = template.copy()
+        df['operator_name'] = name
+        df['chinese_text'] = df['chinese_text'].astype(str) + f"（{name}）"
+        df['selected_text_md5'] = [hashlib.md5(t.encode('utf-8')).hexdigest() for t in df['chinese_text']]
+        df.to_csv(os.path.join(directory, f"voice_data_{name}.csv"), index=False, encoding='utf-8')
+        queries.extend((name, md5) for md5 in df['selected_text_md5'][:3])
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="语音文本查询基准")
+    parser.add_argument("--operators", type=int, default=388)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queries = make_corpus(tmp, args.operators)
+        db_path = os.path.join(tmp, 'voice_text.sqlite')
+
+        t0 = time.perf_counter()
+        legacy = [legacy_lookup(tmp, op, md5) for op, md5 in queries]
+        legacy_time = (time.perf_counter() - t0) / len(queries)
+
+        t0 = time.perf_counter()
+        store = VoiceTextStore(db_path, tmp)
+        store.sync()
+        cold_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        warm = VoiceTextStore(db_path, tmp)
+        warm.sync()
+        warm_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        results = [store.get(op, md5) for op, md5 in queries]
+        hot_time = (time.perf_counter() - t0) / len(queries)
+
+        mismatches = [q for q, a, b in zip(queries, legacy, results) if a != b]
+        print(f"CSV数: {args.operators}，文本条数: {len(store)}，查询数: {len(queries)}")
+        print(f"pd.read_csv:      {legacy_time * 1000:.2f} ms/次")
+        print(f"冷同步(建库):     {cold_time * 1000:.1f} ms")
+        print(f"无变化同步+载入:  {warm_time * 1000:.1f} ms")
+        print(f"热查询:           {hot_time * 1e6:.2f} µs/次")
+        print(f"结果不一致: {len(mismatches)} 个 {mismatches[:5]}")
+        return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试触发准入控制（合并连按、阶段耗时估算）
+"""
+
+import threading
+
+from lib.admission import AdmissionController
+
+
+def test_burst_is_coalesced():
+    """测试流水线忙时的连按合并为最新一次"""
+    print("=== 测试触发合并 ===")
+    release = threading.Event()
+    runs = []
+
+    def run(trigger_time):
+        runs.append(trigger_time)
+        release.wait(2)
+        return {'timings': {'ocr': 0.1, 'total': 0.3}}
+
+    admission = AdmissionController(run)
+    assert admission.submit(1.0) == 'accepted'
+    assert admission.submit(2.0) == 'queued'
+    assert admission.submit(3.0) == 'coalesced'
+    assert admission.submit(4.0) == 'coalesced'
+    release.set()
+    assert admission.wait_idle(timeout=5)
+
+    stats = admission.snapshot()
+    print(f"统计: {stats}")
+    # 首次触发 + 合并后的最新一次
+    assert runs == [1.0, 4.0]
+    assert stats['coalesced'] == 2 and stats['completed'] == 2
+    assert abs(stats['stage_ewma']['total'] - 0.3) < 1e-9
+
+
+def test_accept_when_idle():
+    """测试空闲时每次触发都被受理"""
+    admission = AdmissionController(lambda t: None)
+    for _ in range(3):
+        assert admission.submit() == 'accepted'
+        assert admission.wait_idle(timeout=5)
+    assert admission.snapshot()['accepted'] == 3
+
+
+def test_estimated_wait():
+    """测试按阶段耗时估算排队等待"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def run(trigger_time):
+        started.set()
+        release.wait(2)
+
+    admission = AdmissionController(run)
+    admission.observe({'total': 5.0})
+    admission.submit()
+    started.wait(2)
+    wait = admission.estimated_wait()
+    print(f"预计等待: {wait:.2f}s")
+    assert 4.0 < wait <= 5.0
+    release.set()
+    admission.wait_idle(timeout=5)
+    assert admission.estimated_wait() == 0.0
+
+
+def test_reject_over_budget():
+    """测试满载且预计等待超过 max_wait 时拒绝触发，低于时仍排队合并；max_wait=None 时不拒绝"""
+    print("=== 测试等待预算 ===")
+    for max_wait, expected in ((1.0, 'rejected'), (None, 'queued')):
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+
+        def run(trigger_time):
+            runs.append(trigger_time)
+            started.set()
+            release.wait(2)
+
+        admission = AdmissionController(run, alpha=1.0, max_wait=max_wait)
+        admission.observe({'total': 5.0})
+        assert admission.submit(1.0) == 'accepted'
+        started.wait(2)
+        assert admission.submit(2.0) == expected
+
+        # 耗时估计下降到预算以内后，同样的触发被排队/合并
+        admission.observe({'total': 0.5})
+        assert admission.submit(3.0) == ('queued' if expected == 'rejected' else 'coalesced')
+        release.set()
+        assert admission.wait_idle(timeout=5)
+
+        stats = admission.snapshot()
+        print(f"max_wait={max_wait}: {stats}")
+        assert runs == [1.0, 3.0]
+        assert stats['rejected'] == (1 if max_wait is not None else 0) and stats['completed'] == 2
+
+
+if __name__ == "__main__":
+    test_burst_is_coalesced()
+    test_accept_when_idle()
+    test_estimated_wait()
+    test_reject_over_budget()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试音频无损压缩存储（编解码逐字节还原、压缩/还原文件）以及索引、元数据、下载清单对 .wavz 的支持
+"""
+
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import wave
+
+import numpy as np
+
+sys.path.append(os.path.join('lib', 'ref'))
+
+import loader
+from audio_codec import (COMPRESSED_SUFFIX, _decoded, compress_file, corpus_usage, decode_wavz,
+                         decompress_file, encode_wav, read_audio_bytes, resolve_audio_file, scan_audio)
+from audio_meta import analyze_wav
+from lib.crawl.manifest import DownloadManifest
+
+RATE = 16000
+
+
+def _wav_bytes(samples, channels=1, width=2):
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(width)
+        w.setframerate(RATE)
+        w.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+def _speech_like(seconds, channels=1, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(RATE * seconds)) / RATE
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    mono = tone + 0.01 * rng.standard_normal(t.size)
+    pcm = (np.clip(mono, -1, 1) * 32767).astype('<i2')
+    return np.repeat(pcm, channels) if channels > 1 else pcm
+
+
+def test_roundtrip():
+    """测试编解码逐字节还原：单声道、立体声、极端采样值、附加块、非 16 位格式"""
+    print("=== 测试编解码 ===")
+    extreme = np.array([32767, -32768] * 500 + [0, -1, 1], dtype='<i2')
+    cases = {
+        'mono': _wav_bytes(_speech_like(2.0)),
+        'stereo': _wav_bytes(_speech_like(1.0, channels=2), channels=2),
+        'extreme': _wav_bytes(extreme),
+        'empty': _wav_bytes(np.zeros(0, dtype='<i2')),
+        'trailing_chunk': _wav_bytes(_speech_like(0.5)) + b'LIST\x04\x00\x00\x00abcd',
+        '8bit': _wav_bytes(np.arange(4000, dtype=np.uint8), width=1),
+        'not_wav': b'hello world' * 100,
+    }
+    for name, data in cases.items():
+        blob = encode_wav(data)
+        assert decode_wavz(blob) == data, name
+        print(f"{name}: {len(data)} -> {len(blob)}")
+    assert len(encode_wav(cases['mono'])) < len(cases['mono']) * 0.8
+
+    try:
+        decode_wavz(b'RIFF' + b'\x00' * 40)
+    except ValueError as e:
+        print(f"拒绝: {e}")
+    else:
+        raise AssertionError("应拒绝非压缩文件")
+
+
+def test_compress_files_and_readers():
+    """测试压缩/还原文件，以及索引、参考音频读取、元数据与下载清单使用压缩文件"""
+    print("=== 测试压缩存储 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        voc_dir = os.path.join(tmp, 'voc')
+        os.makedirs(voc_dir)
+        names = [f'阿米娅_标题{i}_{i:032d}.wav' for i in range(3)]
+        originals = {}
+        manifest = DownloadManifest(os.path.join(tmp, 'manifest.json'))
+        for i, name in enumerate(names):
+            data = _wav_bytes(_speech_like(1.0 + i, seed=i))
+            path = os.path.join(voc_dir, name)
+            with open(path, 'wb') as f:
+                f.write(data)
+            originals[name] = data
+            manifest.record(name, path, hashlib.sha256(data).hexdigest())
+        before = corpus_usage(voc_dir)
+
+        for name in names[:2]:
+            original, packed = compress_file(os.path.join(voc_dir, name))
+            assert packed < original
+        after = corpus_usage(voc_dir)
+        print(f"占用: {before} -> {after}")
+        assert after['wav_files'] == 1 and after['compressed_files'] == 2
+        assert after['wav_bytes'] + after['compressed_bytes'] < before['wav_bytes']
+
+        # 各处都以 .wav 文件名登记
+        assert sorted(scan_audio(voc_dir)) == sorted(names)
+        path0 = os.path.join(voc_dir, names[0])
+        assert resolve_audio_file(path0).endswith(COMPRESSED_SUFFIX)
+        clips = loader._VocIndex(voc_dir).lookup('阿米娅')
+        assert [clip['filename'] for clip in clips] == names
+        for clip in clips:
+            assert loader.load_reference_audio(clip['file_path']) == originals[clip['filename']]
+
+        # 解码结果缓存
+        hits = _decoded.stats()['hits']
+        assert read_audio_bytes(path0) == originals[names[0]]
+        assert _decoded.stats()['hits'] == hits + 1
+
+        meta = analyze_wav(path0)
+        assert abs(meta['duration'] - 1.0) < 1e-6
+
+        assert manifest.has_complete(names[0], path0)
+        report = manifest.verify(voc_dir, deep=True)
+        print(report)
+        assert report['ok'] == sorted(names)
+
+        # 压缩文件被改动后深度校验能发现
+        packed_path = resolve_audio_file(os.path.join(voc_dir, names[1]))
+        with open(packed_path, 'rb') as f:
+            blob = bytearray(f.read())
+        with open(packed_path, 'wb') as f:
+            f.write(bytes(blob[:-1]) + bytes([blob[-1] ^ 0xFF]))
+        report = manifest.verify(voc_dir, deep=True)
+        assert names[1] in report['truncated'] + report['hash_mismatch']
+
+        decompress_file(resolve_audio_file(path0))
+        with open(path0, 'rb') as f:
+            assert f.read() == originals[names[0]]
+        assert corpus_usage(voc_dir)['compressed_files'] == 1
+
+
+if __name__ == "__main__":
+    test_roundtrip()
+    test_compress_files_and_readers()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试参考音频元数据（wav 文件头 + 能量/静音统计）与按质量分挑选参考音频
+"""
+
+import sys
+import os
+import wave
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.join('lib', 'ref'))
+
+import loader
+from audio_meta import ClipMetaIndex, analyze_wav, rank_clips, score_clip
+
+RATE = 16000
+
+
+def _write_wav(path, seconds, amplitude=0.3, silent_tail=0.0, channels=1):
+    t = np.arange(int(RATE * seconds)) / RATE
+    tone = amplitude * np.sin(2 * np.pi * 220 * t)
+    samples = np.concatenate([tone, np.zeros(int(RATE * silent_tail))])
+    pcm = (np.clip(samples, -1, 1) * 32767).astype('<i2')
+    if channels > 1:
+        pcm = np.repeat(pcm, channels)
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(pcm.tobytes())
+
+
+def test_analyze_and_rank():
+    """测试统计结果与排序：时长合适、有效语音多的片段优先"""
+    print("=== 测试参考音频元数据 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        voc_dir = os.path.join(tmp, 'voc')
+        os.makedirs(voc_dir)
+        # 文件名顺序：a(太短) < b(大段静音) < c(合适) < d(太长) < e(削波)
+        _write_wav(os.path.join(voc_dir, '阿_a_00000000000000000000000000000001.wav'), 1.0)
+        _write_wav(os.path.join(voc_dir, '阿_b_00000000000000000000000000000002.wav'), 2.0, silent_tail=6.0)
+        _write_wav(os.path.join(voc_dir, '阿_c_00000000000000000000000000000003.wav'), 6.0, channels=2)
+        _write_wav(os.path.join(voc_dir, '阿_d_00000000000000000000000000000004.wav'), 30.0)
+        _write_wav(os.path.join(voc_dir, '阿_e_00000000000000000000000000000005.wav'), 6.0, amplitude=2.0)
+
+        meta = analyze_wav(os.path.join(voc_dir, '阿_b_00000000000000000000000000000002.wav'))
+        print(f"b: {meta}")
+        assert abs(meta['duration'] - 8.0) < 1e-6 and meta['channels'] == 1
+        assert 0.7 < meta['silence_ratio'] < 0.8 and abs(meta['trail_silence'] - 6.0) < 0.05
+
+        index = ClipMetaIndex(os.path.join(tmp, 'clip_meta.json'))
+        stats = index.update(voc_dir, workers=2)
+        index.save()
+        assert stats['analyzed'] == 5
+        assert ClipMetaIndex(index.path).update(voc_dir)['unchanged'] == 5
+
+        clips = loader._VocIndex(voc_dir).lookup('阿')
+        ranked = [c['title'] for c in rank_clips(clips, index)]
+        print(f"排序: {ranked}")
+        assert ranked[0] == 'c' and set(ranked[-2:]) == {'a', 'd'}
+        assert score_clip(index.get(clips[4]['filename'])) < score_clip(index.get(clips[2]['filename']))
+
+        # loader 查找时按质量分挑选（不解码音频）
+        loader._voc_index.set(loader._VocIndex(voc_dir))
+        loader._clip_meta.set(index)
+        try:
+            best = loader.find_new_audio_by_char_name('阿', limit=1)
+            assert best[0]['file_path'].endswith('阿_c_00000000000000000000000000000003.wav')
+            first = loader.find_new_audio_by_char_name('阿', limit=1, rank=False)
+            assert first[0]['file_path'].endswith('阿_a_00000000000000000000000000000001.wav')
+        finally:
+            loader._voc_index.invalidate()
+            loader._clip_meta.invalidate()
+
+
+def test_rank_broken_clips_last():
+    """测试分析失败的片段排在没有元数据的片段之后"""
+    clips = [{'filename': name} for name in ('a.wav', 'b.wav', 'c.wav')]
+    meta_index = {'b.wav': {'error': 'truncated'}, 'c.wav': {'duration': 5.0}}
+    ranked = [c['filename'] for c in rank_clips(clips, meta_index)]
+    print(f"排序: {ranked}")
+    assert ranked == ['c.wav', 'a.wav', 'b.wav']
+
+
+if __name__ == "__main__":
+    test_analyze_and_rank()
+    test_rank_broken_clips_last()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试音频打包存储（追加、中断后的尾部截断、整理）以及索引、参考音频读取、下载校验与打包工具
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join('lib', 'ref'))
+
+import loader
+import pack_voc
+from audio_codec import audio_exists, read_audio_bytes, scan_audio
+from audio_pack import PackWriter, compact_pack, open_pack, pack_dir, pack_usage
+from audio_meta import analyze_wav
+from lib.crawl.manifest import DownloadManifest
+from mock_tts_server import synth_wav
+
+NAMES = [f'阿米娅_标题{i}_{i:032d}.wav' for i in range(4)]
+
+
+def _write_corpus(voc_dir):
+    originals = {}
+    for i, name in enumerate(NAMES):
+        data = synth_wav(0.5 + 0.25 * i, 16000)
+        with open(os.path.join(voc_dir, name), 'wb') as f:
+            f.write(data)
+        originals[name] = data
+    return originals
+
+
+def test_pack_writer_and_reader():
+    """测试追加、读取（mmap 视图）、中断留下的尾部被截掉、重复追加后的整理"""
+    print("=== 测试打包存储 ===")
+    with tempfile.TemporaryDirectory() as voc_dir:
+        originals = _write_corpus(voc_dir)
+        with PackWriter(voc_dir, max_pack_size=40000) as writer:
+            for name in NAMES[:3]:
+                writer.add(name, originals[name], len(originals[name]), False, 0)
+            writer.commit()
+        usage = pack_usage(voc_dir)
+        print(usage)
+        assert usage['clips'] == 3 and usage['pack_files'] >= 2 and usage['dead_bytes'] == 0
+
+        store = open_pack(voc_dir)
+        for name in NAMES[:3]:
+            assert bytes(store.view(store.get(name))) == originals[name]
+
+        # 写入后未提交（模拟中断）：读取方看不到，下次追加从已登记的长度继续
+        writer = PackWriter(voc_dir, max_pack_size=40000)
+        writer.add(NAMES[3], b'garbage' * 100, 700, False, 0)
+        writer.close()
+        assert open_pack(voc_dir).get(NAMES[3]) is None
+        with PackWriter(voc_dir, max_pack_size=40000) as writer:
+            writer.add(NAMES[3], originals[NAMES[3]], len(originals[NAMES[3]]), False, 0)
+            writer.add(NAMES[0], originals[NAMES[0]], len(originals[NAMES[0]]), False, 1)  # 重复追加
+            writer.commit()
+        usage = pack_usage(voc_dir)
+        assert usage['clips'] == 4 and usage['dead_bytes'] == len(originals[NAMES[0]])
+        actual = sum(os.path.getsize(os.path.join(pack_dir(voc_dir), f))
+                     for f in os.listdir(pack_dir(voc_dir)) if f.endswith('.pack'))
+        assert actual == usage['pack_bytes']
+
+        result = compact_pack(voc_dir, max_pack_size=40000)
+        print(result)
+        assert result['after'] == result['before'] - len(originals[NAMES[0]])
+        assert pack_usage(voc_dir)['dead_bytes'] == 0
+        store = open_pack(voc_dir)
+        for name in NAMES:
+            assert bytes(store.view(store.get(name))) == originals[name]
+        store.close()
+
+
+def test_readers_and_tool():
+    """测试打包后删除散文件：索引、参考音频读取、元数据与下载校验都使用打包存储；增量追加与还原"""
+    print("=== 测试打包工具 ===")
+    with tempfile.TemporaryDirectory() as voc_dir:
+        originals = _write_corpus(voc_dir)
+        manifest = DownloadManifest(os.path.join(voc_dir, '..', os.path.basename(voc_dir) + '.json'))
+        for name, data in originals.items():
+            manifest.record(name, os.path.join(voc_dir, name), hashlib.sha256(data).hexdigest())
+
+        pack_voc.pack(voc_dir, 1 << 20, compress=False, remove=False)
+        pack_voc.pack(voc_dir, 1 << 20, compress=True, remove=True)  # 未变化的片段跳过
+        assert pack_usage(voc_dir)['dead_bytes'] == 0
+        assert [name for name in os.listdir(voc_dir)] == ['pack']
+
+        assert sorted(scan_audio(voc_dir)) == NAMES
+        clips = loader._VocIndex(voc_dir).lookup('阿米娅')
+        assert [clip['filename'] for clip in clips] == NAMES
+        for clip in clips:
+            assert audio_exists(clip['file_path'])
+            assert loader.load_reference_audio(clip['file_path']) == originals[clip['filename']]
+        assert abs(analyze_wav(os.path.join(voc_dir, NAMES[0]))['duration'] - 0.5) < 1e-6
+
+        report = manifest.verify(voc_dir, deep=True)
+        assert report['ok'] == NAMES
+        assert manifest.has_complete(NAMES[1], os.path.join(voc_dir, NAMES[1]))
+
+        # 新下载的散文件优先，增量追加只写入它
+        new_name = '阿米娅_新台词_ffffffffffffffffffffffffffffffff.wav'
+        new_data = synth_wav(0.3, 16000)
+        with open(os.path.join(voc_dir, new_name), 'wb') as f:
+            f.write(new_data)
+        index = loader._VocIndex(voc_dir)
+        assert len(index.lookup('阿米娅')) == 5
+        pack_voc.pack(voc_dir, 1 << 20, compress=False, remove=True)
+        assert pack_usage(voc_dir)['clips'] == 5
+        assert read_audio_bytes(os.path.join(voc_dir, new_name)) == new_data
+
+        pack_voc.unpack(voc_dir, remove=True)
+        assert not os.path.exists(pack_dir(voc_dir))
+        assert sorted(scan_audio(voc_dir)) == sorted(NAMES + [new_name])
+        with open(os.path.join(voc_dir, NAMES[2]), 'rb') as f:
+            assert f.read() == originals[NAMES[2]]
+        assert read_audio_bytes(os.path.join(voc_dir, NAMES[3])) == originals[NAMES[3]]
+
+
+if __name__ == "__main__":
+    test_pack_writer_and_reader()
+    test_readers_and_tool()
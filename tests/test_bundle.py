@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试运行时资源包（写入/读取、版本校验、参考音频相对路径、角色名解析）
+"""
+
+import os
+import struct
+import tempfile
+
+from lib.ref.audio_codec import compress_file, read_audio_bytes
+from lib.ref.audio_pack import PACK_DIRNAME
+from lib import pipeline
+from lib.ref import bundle as bundle_module
+from lib.ref.bundle import BUNDLE_MAGIC, RuntimeBundle, build_payload, load_runtime_bundle
+from mock_tts_server import synth_wav
+from pack_voc import pack
+
+
+def _bundle_with_reference(tmp):
+    """写入一个真实的参考音频和引用它的资源包，返回 (资源包, 参考音频路径, 原始内容)"""
+    wav = os.path.join(tmp, 'voc', '阿米娅_干员报到_00000000000000000000000000000001.wav')
+    os.makedirs(os.path.dirname(wav))
+    data = synth_wav(0.5, 16000)
+    with open(wav, 'wb') as f:
+        f.write(data)
+    path = os.path.join(tmp, 'runtime.bundle')
+    RuntimeBundle.dump(path, build_payload(path, operators=[('阿米娅', 'Amiya', 'u1')], aliases=[],
+                                           references={'阿米娅': {'file_path': wav, 'voice_text': '台词'}}))
+    return RuntimeBundle.load(path), wav, data
+
+
+def test_bundle_roundtrip():
+    """测试资源包内容与查询"""
+    print("=== 测试运行时资源包 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = os.path.join(tmp, 'voc', '阿米娅_干员报到_x.wav')
+        os.makedirs(os.path.dirname(wav))
+        open(wav, 'wb').close()
+        path = os.path.join(tmp, 'runtime.bundle')
+        payload = build_payload(
+            path,
+            operators=[('阿米娅', 'Amiya', 'u1'), ('银灰', 'SilverAsh', 'u2')],
+            aliases=[('阿米娅', '阿米娅'), ('Amiya', '阿米娅'), ('银灰', '银灰'), ('SilverAsh', '银灰')],
+            references={'阿米娅': {'file_path': wav, 'voice_text': '博士，我是阿米娅。'}},
+            voice_snapshot={'base_url': 'http://127.0.0.1:8765/v1', 'voices': {'abc': 'speech:abc'}},
+        )
+        size = RuntimeBundle.dump(path, payload)
+        print(f"资源包大小: {size} B")
+
+        bundle = load_runtime_bundle(path)
+        assert bundle is load_runtime_bundle(path)  # 进程内只加载一次
+        assert bundle._references['阿米娅']['file'] == os.path.join('voc', '阿米娅_干员报到_x.wav')
+        refs = bundle.references('阿米娅')
+        assert refs == [{'file_path': wav, 'voice_text': '博士，我是阿米娅。'}]
+        assert bundle.references('银灰') == []
+        assert bundle.find_operator(' silverash ')['chinese_name'] == '银灰'
+        assert bundle.resolve_speaker('阿米娅')[0] == '阿米娅'
+        assert bundle.voice_snapshot['voices'] == {'abc': 'speech:abc'}
+
+        # 参考音频被删除后不再返回（调用方回退到 loader）
+        os.remove(wav)
+        assert bundle.references('阿米娅') == []
+
+
+def test_bundle_compressed_reference():
+    """测试参考音频压缩为 .wavz 后资源包仍返回它（不回退到 loader）"""
+    print("=== 测试压缩的参考音频 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle, wav, data = _bundle_with_reference(tmp)
+        compress_file(wav)
+        assert not os.path.exists(wav)
+        refs = bundle.references('阿米娅')
+        assert refs == [{'file_path': wav, 'voice_text': '台词'}]
+        assert read_audio_bytes(refs[0]['file_path']) == data
+
+
+def test_bundle_packed_reference():
+    """测试参考音频移入打包存储（散文件已删除）后资源包仍返回它"""
+    print("=== 测试打包的参考音频 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle, wav, data = _bundle_with_reference(tmp)
+        pack(os.path.dirname(wav), 1 << 20, compress=True, remove=True)
+        assert os.listdir(os.path.dirname(wav)) == [PACK_DIRNAME]
+        refs = bundle.references('阿米娅')
+        assert refs == [{'file_path': wav, 'voice_text': '台词'}]
+        assert read_audio_bytes(refs[0]['file_path']) == data
+
+
+def test_bundle_stale_sources():
+    """测试来源在生成后有变化时不再使用资源包，重新生成后恢复；资源包解析不出的角色名回退到 loader"""
+    print("=== 测试资源包过期 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        operators_csv = os.path.join(tmp, 'operators.csv')
+        voc_dir = os.path.join(tmp, 'voc')
+        os.makedirs(voc_dir)
+        with open(operators_csv, 'w', encoding='utf-8') as f:
+            f.write('chinese_name,english_name,url\n阿米娅,Amiya,u1\n')
+        path = os.path.join(tmp, 'runtime.bundle')
+
+        def build():
+            RuntimeBundle.dump(path, build_payload(path, operators=[('阿米娅', 'Amiya', 'u1')],
+                                                   aliases=[('阿米娅', '阿米娅')], references={},
+                                                   sources=[operators_csv, voc_dir]))
+
+        build()
+        bundle = load_runtime_bundle(path)
+        assert bundle is not None and not bundle.is_stale()
+        assert bundle.sources['paths'] == ['operators.csv', 'voc']
+
+        # 爬取了新干员但没有重新生成资源包
+        bundle.check_interval = 0
+        with open(operators_csv, 'a', encoding='utf-8') as f:
+            f.write('银灰,SilverAsh,u2\n')
+        os.utime(operators_csv, ns=(0, 10 ** 9))
+        assert bundle.is_stale()
+        assert load_runtime_bundle(path) is None
+
+        build()
+        os.utime(path, ns=(0, 2 * 10 ** 9))  # 保证资源包 mtime 变化
+        fresh = load_runtime_bundle(path)
+        assert fresh is not None and fresh is not bundle
+
+        # 资源包有效但解析不出时由 loader 解析
+        saved = bundle_module.RUNTIME_BUNDLE_PATH
+        bundle_module.RUNTIME_BUNDLE_PATH = path
+        try:
+            assert fresh.resolve_speaker('银灰')[0] is None
+            assert pipeline._default_speaker_resolver('银灰')[0] == '银灰'
+            assert pipeline._default_speaker_resolver('阿米娅')[0] == '阿米娅'
+        finally:
+            bundle_module.RUNTIME_BUNDLE_PATH = saved
+
+
+def test_bundle_version_check():
+    """测试格式与版本不符时拒绝加载"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'old.bundle')
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sII', BUNDLE_MAGIC, 999, 2) + b'{}')
+        try:
+            RuntimeBundle.load(path)
+            assert False, "版本不符应报错"
+        except ValueError as e:
+            print(f"版本校验: {e}")
+        assert load_runtime_bundle(path) is None
+        assert load_runtime_bundle('') is None
+
+
+if __name__ == "__main__":
+    test_bundle_roundtrip()
+    test_bundle_compressed_reference()
+    test_bundle_packed_reference()
+    test_bundle_stale_sources()
+    test_bundle_version_check()
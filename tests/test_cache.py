@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 loader 缓存层（并发只加载一次、文件变化失效、依赖失效、LRU 淘汰与计数）
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.append(os.path.join('lib', 'ref'))
+
+import cache
+from cache import BoundedMemo, LazyValue, cache_stats, mtimes, throttled
+
+
+def test_lazy_value_loads_once():
+    """测试并发首次调用只加载一次"""
+    print("=== 测试并发初始化 ===")
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    value = LazyValue('test.once', factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(value.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"加载次数: {len(calls)}, 计数: {value.stats()}")
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert value.stats()['loads'] == 1
+    assert 'test.once' in cache_stats()
+
+
+def test_lazy_value_watch_and_depends():
+    """测试文件 mtime 变化与依赖项重新加载时失效"""
+    print("=== 测试文件变化与依赖失效 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.txt')
+
+        def read():
+            if not os.path.exists(path):
+                return None
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+
+        base = LazyValue('test.watch', read, watch=lambda: (path,))
+        derived = LazyValue('test.derived', lambda: (base.get() or '').upper(), depends=(base,))
+        assert base.get() is None and derived.get() == ''
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('a')
+        assert base.get() == 'a' and derived.get() == 'A'
+
+        os.utime(path, ns=(0, 10 ** 9))  # 保证 mtime 变化
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('b')
+        os.utime(path, ns=(0, 2 * 10 ** 9))
+        assert derived.get() == 'B'
+        loads = derived.stats()['loads']
+        assert derived.get() == 'B' and derived.stats()['loads'] == loads
+
+        base.set('c')
+        assert derived.get() == 'C'
+        base.invalidate()
+        assert base.get() == 'b'
+
+
+def test_lazy_value_concurrent_invalidate():
+    """测试快路径检查通过后、返回之前被 invalidate()，get() 仍返回加载出的值"""
+    print("=== 测试并发失效 ===")
+    value = LazyValue('test.invalidate', lambda: 'v', ttl=60)
+    assert value.get() == 'v'
+
+    class InvalidatingClock:
+        """TTL 检查读取时钟时模拟另一个线程调用 invalidate()"""
+        armed = True
+
+        def monotonic(self):
+            if self.armed:
+                self.armed = False
+                value.invalidate()
+            return time.monotonic()
+
+    real_time = cache.time
+    cache.time = InvalidatingClock()
+    try:
+        result = value.get()
+    finally:
+        cache.time = real_time
+    assert result == 'v'
+    assert value.get() == 'v' and value.stats()['loads'] == 2
+
+
+def test_check_interval():
+    """测试 watch 的 stat 检查节流：间隔内沿用上次结果，invalidate() 后立即重新检查；throttled 包装同理"""
+    print("=== 测试检查节流 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.txt')
+        stats = []
+
+        def watch():
+            stats.append(1)
+            return (path,)
+
+        value = LazyValue('test.interval', lambda: os.path.exists(path), watch=watch, check_interval=60)
+        assert value.get() is False
+        checks = len(stats)
+        for _ in range(10):
+            assert value.get() is False
+        assert len(stats) == checks  # 间隔内不再 stat
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('a')
+        assert value.get() is False  # 节流期间尚未发现变化
+        version = value.version
+        value.invalidate()
+        assert value.get() is True and value.version == version + 1
+
+        calls = []
+        generation = throttled(lambda: calls.append(1) or mtimes((path,)), 60)
+        assert generation() == generation() == mtimes((path,))
+        assert len(calls) == 1
+        assert throttled(lambda: calls.append(1), 0)() is None and len(calls) == 2
+
+
+def test_bounded_memo():
+    """测试 LRU 淘汰、代际失效与同 key 并发只计算一次"""
+    print("=== 测试有界记忆化 ===")
+    generation = [0]
+    memo = BoundedMemo('test.memo', maxsize=2, generation=lambda: generation[0])
+    assert memo.get_or_compute('a', lambda: 1) == 1
+    assert memo.get_or_compute('b', lambda: 2) == 2
+    assert memo.get_or_compute('a', lambda: -1) == 1      # 命中，a 成为最近使用
+    assert memo.get_or_compute('c', lambda: 3) == 3       # 淘汰 b
+    assert memo.get_or_compute('b', lambda: 20) == 20
+    print(f"计数: {memo.stats()}")
+    assert memo.stats()['evictions'] == 2 and memo.stats()['size'] == 2
+
+    generation[0] += 1
+    assert memo.get_or_compute('b', lambda: 200) == 200
+
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'x'
+
+    threads = [threading.Thread(target=memo.get_or_compute, args=('slow', slow)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    test_lazy_value_loads_once()
+    test_lazy_value_watch_and_depends()
+    test_lazy_value_concurrent_invalidate()
+    test_check_interval()
+    test_bounded_memo()
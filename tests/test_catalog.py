@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试资源目录（干员、别名、语音文本、参考音频与元数据汇总为一个 SQLite 文件，按干员增量更新）
+"""
+
+import sys
+import os
+import csv
+import wave
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.join('lib', 'ref'))
+
+import loader
+from catalog import AssetCatalog
+
+RATE = 16000
+
+
+def _write_wav(path, seconds):
+    t = np.arange(int(RATE * seconds)) / RATE
+    pcm = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(pcm.tobytes())
+
+
+def _write_csv(path, fields, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _make_sources(tmp):
+    paths = {
+        'operators': os.path.join(tmp, 'operators.csv'),
+        'parsed': os.path.join(tmp, 'parsed_operators.csv'),
+        'voc_data': os.path.join(tmp, 'voc_data'),
+        'voc': os.path.join(tmp, 'voc'),
+        'db': os.path.join(tmp, 'catalog.sqlite'),
+    }
+    os.makedirs(paths['voc_data'])
+    os.makedirs(paths['voc'])
+    _write_csv(paths['operators'], ['chinese_name', 'english_name', 'url'], [
+        {'chinese_name': '阿米娅', 'english_name': 'Amiya', 'url': 'https://prts.wiki/w/阿米娅'},
+        {'chinese_name': '银灰', 'english_name': 'SilverAsh', 'url': 'https://prts.wiki/w/银灰'},
+    ])
+    _write_csv(paths['parsed'], ['url_encoded_name', 'decoded_name', 'title_name', 'display_name', 'full_url'], [
+        {'url_encoded_name': 'x', 'decoded_name': '银灰', 'title_name': '银灰', 'display_name': '银灰(精二)',
+         'full_url': 'https://prts.wiki/w/银灰/语音记录'},
+    ])
+    fields = ['operator_name', 'title', 'chinese_text', 'selected_text_md5']
+    _write_csv(os.path.join(paths['voc_data'], 'voice_data_阿米娅.csv'), fields, [
+        {'operator_name': '阿米娅', 'title': '干员报到', 'chinese_text': '博士，我是阿米娅。', 'selected_text_md5': 'a' * 32},
+    ])
+    _write_csv(os.path.join(paths['voc_data'], 'voice_data_银灰.csv'), fields, [
+        {'operator_name': '银灰', 'title': '干员报到', 'chinese_text': '盟友，你来了。', 'selected_text_md5': 'b' * 32},
+    ])
+    _write_wav(os.path.join(paths['voc'], f"阿米娅_干员报到_{'a' * 32}.wav"), 4.0)
+    _write_wav(os.path.join(paths['voc'], f"阿米娅_闲置_{'c' * 32}.wav"), 0.5)
+    _write_wav(os.path.join(paths['voc'], f"银灰_干员报到_{'b' * 32}.wav"), 5.0)
+    return paths
+
+
+def _compile(paths, **kwargs):
+    return AssetCatalog.compile(paths['db'], paths['operators'], paths['parsed'], paths['voc_data'], paths['voc'],
+                                workers=2, **kwargs)
+
+
+def test_catalog_compile_and_query():
+    """测试编译结果与各类查询"""
+    print("=== 测试资源目录 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _make_sources(tmp)
+        stats = _compile(paths)
+        print(f"首次编译: {stats}")
+        assert stats['operators'] == 2 and stats['units_updated'] == 2 and stats['clips_analyzed'] == 3
+
+        catalog = AssetCatalog(paths['db'])
+        try:
+            assert catalog.find_operator(' AMIYA ')['chinese_name'] == '阿米娅'
+            assert catalog.find_operator('银灰(精二)')['english_name'] == 'SilverAsh'   # 页面显示名
+            assert catalog.find_operator('不存在') is None
+            assert [o['chinese_name'] for o in catalog.operators()] == ['阿米娅', '银灰']
+            assert catalog.voice_text('银灰', 'b' * 32) == '盟友，你来了。'
+
+            clips = catalog.clips_for('阿米娅')
+            assert [c['title'] for c in clips] == ['干员报到', '闲置']
+            assert clips[0]['voice_text'] == '博士，我是阿米娅。' and clips[1]['voice_text'] is None
+            assert abs(clips[0]['meta']['duration'] - 4.0) < 1e-6
+
+            # 无变化时不重建；只修改一名干员的CSV时只更新该干员
+            assert _compile(paths)['units_unchanged'] == 2
+            _write_csv(os.path.join(paths['voc_data'], 'voice_data_银灰.csv'),
+                       ['operator_name', 'title', 'chinese_text', 'selected_text_md5'],
+                       [{'operator_name': '银灰', 'title': '干员报到', 'chinese_text': '盟友，欢迎。', 'selected_text_md5': 'b' * 32}])
+            stats = _compile(paths)
+            print(f"增量编译: {stats}")
+            assert stats['units_updated'] == 1 and stats['units_unchanged'] == 1 and stats['clips_reused'] == 1
+            assert stats['clips_analyzed'] == 0
+            assert catalog.voice_text('银灰', 'b' * 32) == '盟友，欢迎。'
+
+            os.remove(os.path.join(paths['voc'], f"阿米娅_闲置_{'c' * 32}.wav"))
+            assert _compile(paths, only=['阿米娅'])['units_updated'] == 1
+            assert len(catalog.clips_for('阿米娅')) == 1
+        finally:
+            catalog.close()
+
+
+def test_loader_uses_catalog():
+    """测试 loader 在资源目录存在时走资源目录查询"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _make_sources(tmp)
+        _compile(paths)
+        catalog = AssetCatalog(paths['db'])
+        loader._catalog.set(catalog)
+        try:
+            results = loader.find_new_audio_by_char_name('阿米娅', limit=2)
+            print(f"loader: {results}")
+            assert results[0]['voice_text'] == '博士，我是阿米娅。'
+            assert results[1]['voice_text'] == '阿米娅_闲置'        # 没有台词时用 干员名_标题
+            assert loader.get_chinese_text_from_csv('银灰', 'b' * 32) == '盟友，你来了。'
+            assert loader.find_operator_by_name('银灰(精二)')['chinese_name'] == '银灰'
+        finally:
+            catalog.close()
+            loader._catalog.invalidate()
+
+
+def test_loader_catalog_staleness():
+    """测试编译后又下载新干员时：资源目录过期不再使用，查询回退到 lib/voc 索引与语音文本库；重新编译后恢复"""
+    print("=== 测试资源目录过期 ===")
+    names = ('CATALOG_PATH', 'OPERATORS_CSV_PATH', 'PARSED_OPERATORS_CSV_PATH', 'VOC_DATA_DIR', 'VOC_DIR',
+             'VOICE_TEXT_DB_PATH', 'CLIP_META_PATH')
+    saved = {name: getattr(loader, name) for name in names}
+    caches = (loader._catalog, loader._voc_index, loader._voice_text_store, loader._clip_meta)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _make_sources(tmp)
+        _compile(paths)
+        loader.CATALOG_PATH = paths['db']
+        loader.OPERATORS_CSV_PATH = paths['operators']
+        loader.PARSED_OPERATORS_CSV_PATH = paths['parsed']
+        loader.VOC_DATA_DIR = paths['voc_data']
+        loader.VOC_DIR = paths['voc']
+        loader.VOICE_TEXT_DB_PATH = os.path.join(tmp, 'voice_text.sqlite')
+        loader.CLIP_META_PATH = os.path.join(tmp, 'clip_meta.json')
+        for cache in caches:
+            cache.invalidate()
+        loader._reference_memo.clear()
+        check_interval = loader._catalog.check_interval
+        loader._catalog.check_interval = 0  # 来源变化后立即重新检查指纹
+        try:
+            catalog = loader.load_catalog()
+            assert catalog is not None
+            assert loader.find_new_audio_by_char_name('能天使') == []
+
+            # 编译后才爬取的干员
+            _write_csv(os.path.join(paths['voc_data'], 'voice_data_能天使.csv'),
+                       ['operator_name', 'title', 'chinese_text', 'selected_text_md5'],
+                       [{'operator_name': '能天使', 'title': '干员报到', 'chinese_text': '能天使，到！', 'selected_text_md5': 'd' * 32}])
+            _write_wav(os.path.join(paths['voc'], f"能天使_干员报到_{'d' * 32}.wav"), 3.0)
+
+            # 仍在使用旧资源目录对象时，未命中也回退到 lib/voc 索引与语音文本库
+            assert catalog.clips_for('能天使') == []
+            assert loader.get_chinese_text_from_csv('能天使', 'd' * 32) == '能天使，到！'
+
+            assert loader.load_catalog() is None
+            results = loader.find_new_audio_by_char_name('能天使')
+            print(f"过期后: {results}")
+            assert results[0]['voice_text'] == '能天使，到！'
+
+            _compile(paths)
+            catalog = loader.load_catalog()
+            assert catalog is not None and len(catalog.clips_for('能天使')) == 1
+            assert loader.find_new_audio_by_char_name('阿米娅')[0]['voice_text'] == '博士，我是阿米娅。'
+        finally:
+            loader._catalog.check_interval = check_interval
+            catalog = loader._catalog.peek()
+            if catalog is not None:
+                catalog.close()
+            for name, value in saved.items():
+                setattr(loader, name, value)
+            for cache in caches:
+                cache.invalidate()
+            loader._reference_memo.clear()
+
+
+if __name__ == "__main__":
+    test_catalog_compile_and_query()
+    test_loader_uses_catalog()
+    test_loader_catalog_staleness()
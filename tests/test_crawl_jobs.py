@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试无人值守爬取（任务清单检查与展开、多进程共享限速、多进程执行与按任务顺序的确定性合并）
+"""
+
+import builtins
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lib.crawl.jobs import CrawlJob, build_jobs, validate_job_manifest
+import crawl_all_operators_audio_flexible as crawler
+from lib.crawl.fetch import Fetcher, HostRateLimiter, SharedHostRateLimiter
+from lib.crawl.journal import CrawlJournal
+from lib.crawl.manifest import DownloadManifest
+from lib.crawl.page_cache import PageCache
+from mock_wiki_server import MockWikiServer, voice_record_page
+from run_crawl_jobs import execute
+
+NAMES = ['阿米娅', '12F', '银灰', '能天使']
+LIMITER = None
+
+
+def test_job_manifest():
+    """测试任务清单的默认值、格式检查与任务展开"""
+    print("=== 测试任务清单 ===")
+    operators = [{'display_name': name, 'full_url': f'https://prts.wiki/w/{name}/语音记录'} for name in NAMES]
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'voice_data_银灰.csv'), 'w', encoding='utf-8') as f:
+            f.write('operator_name,selected_language\n银灰,日语\n')
+
+        jobs, missing = build_jobs(validate_job_manifest({}), operators, tmp)
+        assert [job.name for job in jobs] == NAMES and not missing
+        assert [job.language for job in jobs] == ['中文', '中文', '日语', '中文']
+        assert all(job.max_audio_files is None for job in jobs)
+
+        manifest = validate_job_manifest({
+            'defaults': {'max_audio_files': 5},
+            'operators': ['银灰', {'name': '12F', 'language': '英语', 'max_audio_files': 0}, '不存在', '阿米娅'],
+            'exclude': ['阿米娅'],
+        })
+        jobs, missing = build_jobs(manifest, operators, tmp)
+        print([job.to_dict() for job in jobs])
+        assert [(job.index, job.name, job.language, job.max_audio_files) for job in jobs] == [
+            (0, '银灰', '日语', 5), (1, '12F', '英语', 0)]
+        assert missing == ['不存在']
+
+    for bad in ({'operators': 'some'}, {'defaults': {'language': '法语'}},
+                {'operators': [{'name': '12F', 'max_audio_files': -1}]}, {'operators': [{}]}, []):
+        try:
+            validate_job_manifest(bad)
+        except ValueError as e:
+            print(f"拒绝: {e}")
+        else:
+            raise AssertionError(f"应拒绝 {bad}")
+
+
+def _init(limiter):
+    global LIMITER
+    LIMITER = limiter
+
+
+def _acquire(_):
+    for _ in range(5):
+        LIMITER.acquire('http://127.0.0.1/x')
+    return True
+
+
+def test_shared_rate_limit():
+    """测试多个进程共用同一个令牌桶：合计速率不超过限速"""
+    print("=== 测试多进程共享限速 ===")
+    limiter = SharedHostRateLimiter({'127.0.0.1': (20.0, 1)})
+    start = time.monotonic()
+    with ProcessPoolExecutor(max_workers=3, initializer=_init, initargs=(limiter,)) as pool:
+        assert all(pool.map(_acquire, range(3)))
+    elapsed = time.monotonic() - start
+    print(f"3 个进程各 5 个请求，耗时 {elapsed:.2f}s")
+    # 15 个请求、突发 1、合计每秒 20 个：至少 (15 - 1) / 20 秒；各进程独立限速时只需约 0.2 秒
+    assert elapsed >= 0.65
+
+
+def test_execute_deterministic_merge():
+    """测试多进程执行任务，结果按任务顺序合并后与单进程完全一致"""
+    print("=== 测试多进程执行 ===")
+    files = {}
+    for i, name in enumerate(NAMES):
+        lines = [(f'语音{j}', f'CN_{j:03d}', {'中文': f'{name}的台词{j}'}) for j in range(2 + i)]
+        files[f'/w/{name}/语音记录'] = voice_record_page(name, f'char_{i:03d}', lines, padding=10).encode('utf-8')
+
+    cwd = os.getcwd()
+    outputs = []
+    with MockWikiServer(port=0, files=files) as server:
+        for workers in (1, 3):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                try:
+                    jobs = [CrawlJob(i, name, f"{server.url}/w/{name}/语音记录", '中文', 0)
+                            for i, name in enumerate(NAMES)]
+                    journal = CrawlJournal('journal.jsonl')
+                    run_id = journal.start_run()
+                    results = []
+
+                    def on_result(result):
+                        results.append(result)
+                        journal.record_operator(run_id, result['name'], result['language'], result['status'],
+                                                records=result['records'])
+
+                    limiter = SharedHostRateLimiter({'127.0.0.1': (50.0, 5)})
+                    execute(jobs, workers, limiter, on_result)
+                    assert sorted(r['index'] for r in results) == [0, 1, 2, 3]
+                    assert all(r['status'] == 'done' for r in results)
+                    assert {name for r in results for name in r['page_changes']} == set(NAMES)
+                    assert os.path.exists(os.path.join('lib', 'voc_data', 'voice_data_能天使.csv'))
+
+                    assert journal.materialize(run_id, 'all.csv', order=NAMES) == 2 + 3 + 4 + 5
+                    journal.close()
+                    with open('all.csv', encoding='utf-8') as f:
+                        outputs.append(f.read())
+                finally:
+                    os.chdir(cwd)
+    assert outputs[0] == outputs[1]
+    assert outputs[0].splitlines()[1].startswith('阿米娅,')
+
+
+def test_crawler_main_max_audio_files():
+    """测试交互式脚本用 --max-audio-files 跳过询问：开始新的 run，逐名记入日志并生成汇总CSV"""
+    print("=== 测试 --max-audio-files ===")
+    files = {}
+    for i, name in enumerate(NAMES[:2]):
+        lines = [(f'语音{j}', f'CN_{j:03d}', {'中文': f'{name}的台词{j}'}) for j in range(2)]
+        files[f'/w/{name}/语音记录'] = voice_record_page(name, f'char_{i:03d}', lines, padding=10).encode('utf-8')
+
+    saved = (crawler.FETCHER, crawler.MANIFEST, crawler.PAGE_CACHE, crawler.parse_html_links, sys.argv,
+             builtins.input)
+    cwd = os.getcwd()
+    with MockWikiServer(port=0, files=files) as server, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            crawler.FETCHER = Fetcher(limiter=HostRateLimiter({'127.0.0.1': (1000.0, 100)}), backoff=0.01)
+            crawler.MANIFEST = DownloadManifest(os.path.join(tmp, 'manifest.json'))
+            crawler.PAGE_CACHE = PageCache(os.path.join(tmp, 'html'))
+            crawler.parse_html_links = lambda _: [{'display_name': name, 'full_url': f"{server.url}/w/{name}/语音记录"}
+                                                  for name in NAMES[:2]]
+            sys.argv = ['crawl_all_operators_audio_flexible.py', '--max-audio-files', '0']
+
+            def no_input(*_):
+                raise AssertionError("不应交互询问")
+            builtins.input = no_input
+
+            crawler.main()
+            journal = CrawlJournal()
+            assert journal.unfinished_run() is None
+            runs = [e for e in journal.entries() if e['type'] == 'run_start']
+            assert len(runs) == 1 and runs[0]['settings'] == {'max_audio_files': 0}
+            assert journal.completed(runs[0]['run']) == set(NAMES[:2])
+            total = os.path.join('lib', 'voc_data', 'all_voice_data_complete.csv')
+            with open(total, encoding='utf-8') as f:
+                assert len(f.read().splitlines()) == 1 + 4
+        finally:
+            (crawler.FETCHER, crawler.MANIFEST, crawler.PAGE_CACHE, crawler.parse_html_links, sys.argv,
+             builtins.input) = saved
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_job_manifest()
+    test_shared_rate_limit()
+    test_execute_deterministic_merge()
+    test_crawler_main_max_audio_files()
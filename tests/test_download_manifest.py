@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试原子下载、断点续传与下载清单校验
+"""
+
+import hashlib
+import os
+import tempfile
+
+import requests
+
+import crawl_all_operators_audio_flexible as crawler
+from lib.crawl.fetch import Fetcher, HostRateLimiter
+from lib.crawl.manifest import DownloadManifest, PART_SUFFIX, wav_truncated
+from mock_tts_server import synth_wav
+from mock_wiki_server import MockWikiConfig, MockWikiServer
+
+
+def _fetcher():
+    return Fetcher(limiter=HostRateLimiter({'127.0.0.1': (1000.0, 100)}), backoff=0.01, max_retries=2)
+
+
+def test_resume_after_interrupt():
+    """测试传输中断后用 Range 续传，最终文件完整且哈希一致"""
+    print("=== 测试断点续传 ===")
+    data = synth_wav(5.0, 16000)  # 中断前至少写入一个完整的块
+    with MockWikiServer(port=0, files={'/a.wav': data}, config=MockWikiConfig(interrupt=1)) as server:
+        fetcher = _fetcher()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'a.wav')
+            size, digest = fetcher.download(f"{server.url}/a.wav", path)
+            print(f"服务端统计: {server.stats}, 客户端: {fetcher.stats.summary()}")
+            assert size == len(data) and digest == hashlib.sha256(data).hexdigest()
+            with open(path, 'rb') as f:
+                assert f.read() == data
+            assert not os.path.exists(path + PART_SUFFIX)
+            assert server.stats['interrupted'] == 1 and server.stats['partial'] == 1
+
+
+def test_failed_download_leaves_no_final_file():
+    """测试中断且重试用尽时只留下 .part，不会出现截断的最终文件"""
+    print("=== 测试原子改名 ===")
+    data = synth_wav(0.5, 16000)
+    config = MockWikiConfig(interrupt=10, ranges=False)
+    with MockWikiServer(port=0, files={'/b.wav': data}, config=config) as server:
+        fetcher = _fetcher()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'b.wav')
+            try:
+                fetcher.download(f"{server.url}/b.wav", path)
+                raise AssertionError("应当下载失败")
+            except (requests.exceptions.RequestException, OSError) as e:
+                print(f"预期的失败: {type(e).__name__}")
+            assert not os.path.exists(path)
+            assert fetcher.stats.snapshot()['failed'] == 1
+
+
+def test_manifest_verify():
+    """测试清单校验：大小/哈希不符、截断、清单外文件与残留 .part"""
+    print("=== 测试清单校验 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        voc = os.path.join(tmp, 'voc')
+        os.makedirs(voc)
+        manifest = DownloadManifest(os.path.join(tmp, 'manifest.json'))
+        for name in ('good.wav', 'short.wav', 'flipped.wav', 'gone.wav'):
+            path = os.path.join(voc, name)
+            with open(path, 'wb') as f:
+                f.write(synth_wav(0.2, 8000))
+            with open(path, 'rb') as f:
+                manifest.record(name, path, hashlib.sha256(f.read()).hexdigest())
+        manifest.save()
+
+        with open(os.path.join(voc, 'short.wav'), 'r+b') as f:
+            f.truncate(100)
+        with open(os.path.join(voc, 'flipped.wav'), 'r+b') as f:
+            f.seek(200)
+            f.write(b'\xff\xff')
+        os.remove(os.path.join(voc, 'gone.wav'))
+        legacy = synth_wav(0.2, 8000)
+        with open(os.path.join(voc, 'legacy.wav'), 'wb') as f:
+            f.write(legacy)
+        with open(os.path.join(voc, 'legacy_cut.wav'), 'wb') as f:
+            f.write(legacy[:len(legacy) // 2])
+        open(os.path.join(voc, 'c.wav' + PART_SUFFIX), 'wb').close()
+
+        report = DownloadManifest(manifest.path).verify(voc, workers=4)
+        print(f"校验结果: { {k: v for k, v in report.items() if v} }")
+        assert report['ok'] == ['good.wav']
+        assert report['size_mismatch'] == ['short.wav']
+        assert report['hash_mismatch'] == ['flipped.wav']
+        assert report['missing'] == ['gone.wav']
+        assert report['untracked'] == ['legacy.wav']
+        assert report['truncated'] == ['legacy_cut.wav']
+        assert report['partial'] == ['c.wav' + PART_SUFFIX]
+
+        quick = manifest.verify(voc, deep=False)
+        assert 'flipped.wav' in quick['ok']  # 只比较大小时无法发现内容变化
+        assert wav_truncated(os.path.join(voc, 'legacy_cut.wav'))
+        assert not wav_truncated(os.path.join(voc, 'legacy.wav'))
+
+
+def test_download_compress_failure_keeps_wav():
+    """测试下载后压缩校验失败时保留原 wav，下载仍算成功且不尝试其他语种"""
+    print("=== 测试压缩失败回退 ===")
+    data = synth_wav(0.5, 16000)
+
+    def failing_compress(path, *args, **kwargs):
+        raise ValueError(f"压缩校验失败: {path}")
+
+    with MockWikiServer(port=0, files={'/a.wav': data}) as server:
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            compress_file = crawler.compress_file
+            os.chdir(tmp)
+            crawler.compress_file = failing_compress
+            try:
+                manifest = DownloadManifest(os.path.join(tmp, 'manifest.json'))
+                name = '阿米娅_干员报到_a.wav'
+                ok, kind = crawler.download_voice_file(f"{server.url}/a.wav", name, voice_key='x', title='干员报到',
+                                                       fetcher=_fetcher(), manifest=manifest, compress=True)
+                assert (ok, kind) == (True, 'chinese')
+                path = os.path.join('lib', 'voc', name)
+                with open(path, 'rb') as f:
+                    assert f.read() == data
+                assert manifest.has_complete(name, path)
+                assert os.listdir(os.path.join('lib', 'voc')) == [name]
+            finally:
+                crawler.compress_file = compress_file
+                os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_resume_after_interrupt()
+    test_failed_download_leaves_no_final_file()
+    test_manifest_verify()
+    test_download_compress_failure_keeps_wav()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试语音记录页面的快速提取（只解析 voice-data-root）与整页 BeautifulSoup 解析结果一致
+"""
+
+from lib.crawl.extract import _slice_root, extract_voice_data_bs4, extract_voice_data_fast
+from mock_wiki_server import voice_record_page
+
+LINES = [
+    ('任命助理', 'CN_001', {'中文': '博士，<b>您</b>工作辛苦了 &amp; <i>注意</i>休息。', '日文': 'ドクター、お疲れ様です。'}),
+    ('交谈1', 'CN_002', {'中文': '  嗯？\n  博士&nbsp;有事吗？ ', '英文': 'Doctor?'}),
+    ('标题/带"符号"', 'CN_003', {'中文': '', '日文': ''}),
+    ('闲置', 'CN_004', {}),
+]
+
+
+def test_same_records_as_bs4():
+    """测试各语言下两种解析方式的记录逐条一致"""
+    print("=== 测试提取结果一致 ===")
+    page = voice_record_page('阿米娅', 'char_002_amiya', LINES, padding=50)
+    for language in ('中文', '日语', '英语'):
+        expected = extract_voice_data_bs4(page, '阿米娅', language)
+        actual = extract_voice_data_fast(page, '阿米娅', language)
+        print(f"{language}: {[r['chinese_text'] for r in actual]}")
+        assert actual == expected and len(actual) == len(LINES)
+    assert extract_voice_data_fast(page, '阿米娅', '日语')[1]['chinese_text'] == '嗯？\n  博士\xa0有事吗？'
+
+
+def test_slice_and_fallback():
+    """测试子树截取（跳过脚本/注释中的 div）、整页回退与没有 voice-data-root 的页面"""
+    print("=== 测试截取与回退 ===")
+    page = voice_record_page('12F', 'char_009_12fce', LINES[:1], padding=5)
+    snippet = _slice_root(page)
+    assert snippet.startswith('<div id="voice-data-root"') and snippet.endswith('</div>')
+    assert '<script' not in snippet and 'nav-item' not in snippet
+
+    # 页面被截断、div 不配对时解析整页
+    broken = page[:page.index('</div>', page.index('voice-data-item')) + 6]
+    assert _slice_root(broken) is None
+    assert extract_voice_data_fast(broken, '12F') == extract_voice_data_bs4(broken, '12F')
+
+    assert extract_voice_data_fast('<html><body><div id="content"></div></body></html>', '12F') is None
+    assert extract_voice_data_bs4('<html><body><div id="content"></div></body></html>', '12F') is None
+
+
+if __name__ == "__main__":
+    test_same_records_as_bs4()
+    test_slice_and_fallback()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试爬虫下载引擎（令牌桶限速、Retry-After、并发下载与统计）
+"""
+
+import os
+import tempfile
+import time
+
+from lib.crawl.fetch import Fetcher, HostRateLimiter, TokenBucket, parse_retry_after, run_parallel
+from mock_wiki_server import MockWikiConfig, MockWikiServer
+
+
+def test_token_bucket():
+    """测试令牌桶的突发容量、平均速率与暂停"""
+    print("=== 测试令牌桶 ===")
+    clock = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=2, clock=lambda: clock[0], sleep=lambda s: None)
+    waits = [bucket.acquire() for _ in range(4)]
+    print(f"等待: {waits}")
+    assert waits[:2] == [0.0, 0.0]
+    assert abs(waits[2] - 0.5) < 1e-9 and abs(waits[3] - 1.0) < 1e-9
+
+    clock[0] = 10.0  # 空闲足够久，令牌回满
+    assert bucket.acquire() == 0.0
+    bucket.pause(5.0)
+    assert bucket.acquire() >= 5.0
+
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('Thu, 01 Jan 1970 00:00:10 GMT', now=4.0) == 6.0
+    assert parse_retry_after('soon') is None
+
+
+def test_concurrent_download_with_throttle():
+    """测试并发下载、按主机限速与 429 重试"""
+    print("=== 测试并发下载 ===")
+    files = {f'/audio/{i}.wav': bytes([i]) * 1000 for i in range(8)}
+    config = MockWikiConfig(throttle=1, retry_after='0')
+    with MockWikiServer(port=0, files=files, config=config) as server:
+        limiter = HostRateLimiter({'127.0.0.1': (20.0, 2)})
+        fetcher = Fetcher(limiter=limiter, backoff=0.01)
+        with tempfile.TemporaryDirectory() as tmp:
+            def work(i):
+                return fetcher.download(f"{server.url}/audio/{i}.wav", os.path.join(tmp, f'{i}.wav'))
+
+            start = time.monotonic()
+            results = run_parallel(work, range(8), workers=4)
+            elapsed = time.monotonic() - start
+            sizes = [size for size, _ in results]
+            print(f"结果: {sizes}, 耗时 {elapsed:.2f}s, {fetcher.stats.summary()}")
+            assert sizes == [1000] * 8
+            with open(os.path.join(tmp, '3.wav'), 'rb') as f:
+                assert f.read() == bytes([3]) * 1000
+
+        stats = fetcher.stats.snapshot()
+        assert stats['ok'] == 8 and stats['throttled'] == 8 and stats['requests'] == 16
+        # 16 个请求、突发 2、每秒 20 个：至少需要 (16 - 2) / 20 秒
+        assert elapsed >= 0.65
+
+        missing = run_parallel(lambda i: fetcher.download(f"{server.url}/missing", os.path.join(tmp, 'x')), [0])
+        assert isinstance(missing[0], Exception) and fetcher.stats.snapshot()['failed'] == 1
+
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_concurrent_download_with_throttle()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试爬取日志（逐名干员追加、中断后继续、跳过写了一半的行、流式生成汇总CSV）
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from lib.crawl.journal import CrawlJournal
+
+
+def _records(name, count):
+    return [{'operator_name': name, 'title': f'语音{i}', 'chinese_text': f'{name}的台词{i}, "引号"',
+             'local_filename': f'{name}_语音{i}.wav'} for i in range(count)]
+
+
+def test_resume_after_crash():
+    """测试中断（最后一行不完整）后继续同一个 run"""
+    print("=== 测试中断后继续 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journal.jsonl')
+        journal = CrawlJournal(path)
+        run_id = journal.start_run({'max_audio_files': 5})
+        journal.record_operator(run_id, '阿米娅', '中文', 'done', result={'success_count': 3}, records=_records('阿米娅', 3))
+        journal.record_operator(run_id, '12F', '中文', 'failed')
+        journal.close()
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"type": "operator", "run": "')  # 写到一半时崩溃
+
+        journal = CrawlJournal(path)
+        resumed = journal.unfinished_run()
+        assert resumed['run'] == run_id and resumed['settings'] == {'max_audio_files': 5}
+        assert journal.completed(run_id) == {'阿米娅'}
+
+        journal.record_operator(run_id, '12F', '中文', 'done', result={'success_count': 2}, records=_records('12F', 2))
+        journal.record_operator(run_id, '银灰', '日语', 'failed')
+        summary = journal.run_summary(run_id)
+        print(summary)
+        assert summary['done'] == 2 and summary['records'] == 5
+        assert summary['failed_operators'] == ['银灰'] and summary['result_totals']['success_count'] == 5
+        journal.finish_run(run_id, summary)
+        assert journal.unfinished_run() is None
+
+        out = os.path.join(tmp, 'all.csv')
+        assert journal.materialize(run_id, out) == 5
+        df = pd.read_csv(out)
+        assert list(df['operator_name']) == ['阿米娅'] * 3 + ['12F'] * 2
+        assert df['chinese_text'][0] == '阿米娅的台词0, "引号"'
+        journal.close()
+
+
+def test_runs_are_separate():
+    """测试新的 run 只汇总自己的结果"""
+    print("=== 测试多次爬取 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = CrawlJournal(os.path.join(tmp, 'journal.jsonl'))
+        first = journal.start_run()
+        journal.record_operator(first, '阿米娅', '中文', 'done', records=_records('阿米娅', 2))
+        journal.finish_run(first)
+        second = journal.start_run()
+        journal.record_operator(second, '12F', '中文', 'done', records=_records('12F', 1))
+        assert journal.unfinished_run()['run'] == second
+        assert journal.completed(second) == {'12F'}
+        assert journal.materialize(second, os.path.join(tmp, 'all.csv')) == 1
+        assert journal.materialize('不存在', os.path.join(tmp, 'none.csv')) == 0
+        assert not os.path.exists(os.path.join(tmp, 'none.csv'))
+        journal.close()
+
+
+def test_compact_keeps_last_finished_and_unfinished_runs():
+    """compact 只保留最后一个完成的 run 与未完成的 run，且不影响继续爬取与生成CSV"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journal.jsonl')
+        journal = CrawlJournal(path)
+        runs = []
+        for i in range(3):
+            run_id = journal.start_run({'round': i})
+            journal.record_operator(run_id, '阿米娅', '中文', 'done', records=_records('阿米娅', 2))
+            journal.finish_run(run_id)
+            runs.append(run_id)
+        pending = journal.start_run({'round': 3})
+        journal.record_operator(pending, '12F', '中文', 'done', records=_records('12F', 1))
+        size_before = os.path.getsize(path)
+
+        assert journal.compact() == 2
+        assert os.path.getsize(path) < size_before
+        assert {entry['run'] for entry in journal.entries()} == {runs[-1], pending}
+        assert journal.unfinished_run()['run'] == pending
+        assert journal.completed(pending) == {'12F'}
+        assert journal.materialize(runs[-1], os.path.join(tmp, 'all.csv')) == 2
+        assert journal.compact() == 0
+
+        # 压缩后继续追加仍然写入新文件
+        journal.record_operator(pending, '银灰', '日语', 'done', records=_records('银灰', 1))
+        journal.finish_run(pending)
+        assert journal.compact(keep_run=pending) == 1
+        assert {entry['run'] for entry in journal.entries()} == {pending}
+        assert journal.completed(pending) == {'12F', '银灰'}
+        assert not os.path.exists(path + '.tmp')
+        journal.close()
+
+
+if __name__ == "__main__":
+    test_resume_after_crash()
+    test_runs_are_separate()
+    test_compact_keeps_last_finished_and_unfinished_runs()
@@ -8,7 +8,9 @@ import sys
 import os
 sys.path.append(os.path.join('lib', 'ref'))
 
-from loader import find_operator_by_name, find_rows_by_char, find_audio_by_char_name
+from loader import find_operator_by_name, find_rows_by_char, find_audio_by_char_name, _OperatorNameIndex, _CharIdIndex, read_table_profile
+import tempfile
+import pandas as pd
 
 def test_operator_lookup():
     """测试干员查找功能"""
@@ -33,6 +35,61 @@ def test_operator_lookup():
         else:
             print(f"✗ '{name}' -> 未找到")
 
+def test_operator_index_priority():
+    """测试干员名索引的匹配优先级"""
+    print("\n=== 测试干员名索引 ===")
+    df = pd.DataFrame([
+        {'chinese_name': '星熊', 'english_name': 'Hoshiguma', 'url': 'u1'},
+        {'chinese_name': '斩业星熊', 'english_name': 'Hoshiguma the Breacher', 'url': 'u2'},
+        {'chinese_name': '遥', 'english_name': None, 'url': 'u3'},
+    ])
+    index = _OperatorNameIndex(df)
+    assert index.lookup('星熊')['url'] == 'u1'              # 中文精确
+    assert index.lookup(' HOSHIGUMA ')['url'] == 'u1'       # 英文精确（忽略大小写与空白）
+    assert index.lookup('斩业')['url'] == 'u2'              # 中文包含
+    assert index.lookup('breacher')['url'] == 'u2'          # 英文包含
+    assert index.lookup('遥')['url'] == 'u3'
+    assert index.lookup('不存在') is None
+    assert index.lookup('(') is None                        # 按字面量匹配，不作正则解析
+
+def test_char_id_index():
+    """测试 char_id 后缀索引（完全匹配、特殊映射、保持表中行序）"""
+    print("\n=== 测试 char_id 后缀索引 ===")
+    df = pd.DataFrame({
+        'char_id': ['char_002_amiya', 'char_172_svrash', 'char_002_amiya', 'char_103_angel',
+                    'char_1001_amiya2', 'char_222_bpipe', 'token', 'char_172_svrash'],
+        'voice_text': [f'line{i}' for i in range(8)],
+    }, index=[10, 11, 12, 13, 14, 15, 16, 17])
+    index = _CharIdIndex(df)
+    assert list(index.rows('Amiya').index) == [10, 12]
+    assert list(index.rows('SilverAsh').index) == [11, 17]       # 特殊映射 silverash -> svrash
+    assert list(index.rows('Exusiai the New Covenant').index) == [13]
+    assert list(index.rows('Bag-pipe').index) == [15]            # 英文名去掉空格/连字符后匹配
+    assert index.rows('Hoshiguma') is None
+
+def test_table_profiles():
+    """测试语音表加载配置（列裁剪、category 转换）"""
+    print("\n=== 测试语音表加载配置 ===")
+    df = pd.DataFrame({
+        'id': [f'v{i}' for i in range(6)],
+        'char_id': ['char_002_amiya'] * 3 + ['char_172_svrash'] * 3,
+        'voice_text': [f'line{i}' for i in range(6)],
+        'place_type': ['HOME_PLACE'] * 6,
+        'unlock_param': [[1, 2], [], [3], [], [], [4]],
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'table.parquet')
+        df.to_parquet(path, index=False)
+        full = read_table_profile(path, 'full')
+        assert list(full.columns) == list(df.columns)
+        compact = read_table_profile(path, 'compact')
+        assert isinstance(compact['place_type'].dtype, pd.CategoricalDtype)
+        assert not isinstance(compact['voice_text'].dtype, pd.CategoricalDtype)  # 唯一值多的列保持字符串
+        lookup = read_table_profile(path, 'lookup')
+        assert list(lookup.columns) == ['id', 'char_id', 'voice_text']    # 文件中没有的列忽略
+        assert list(_CharIdIndex(lookup).rows('Amiya')['voice_text']) == ['line0', 'line1', 'line2']
+        print(f"full {full.memory_usage(deep=True).sum()} B -> lookup {lookup.memory_usage(deep=True).sum()} B")
+
 def test_char_search():
     """测试干员语音搜索功能"""
     print("\n=== 测试干员语音搜索功能 ===")
@@ -71,5 +128,8 @@ def test_audio_search():
 
 if __name__ == "__main__":
     test_operator_lookup()
+    test_operator_index_priority()
+    test_char_id_index()
+    test_table_profiles()
     test_char_search()
     test_audio_search() 
\ No newline at end of file
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试本地替身 TTS 服务与 SiliconFlowTTS 客户端的兼容性
+"""
+
+import io
+import os
+import tempfile
+import wave
+
+from lib.tts_service import SiliconFlowTTS
+from mock_tts_server import MockTTSServer, MockTTSConfig, synth_wav
+
+
+def test_upload_and_speech():
+    """测试音色上传、音色列表与合成"""
+    print("=== 测试替身TTS服务 ===")
+    with MockTTSServer(port=0, config=MockTTSConfig(latency=0.0, jitter=0.0, seed=0)) as server:
+        with tempfile.TemporaryDirectory() as tmp:
+            ref_path = os.path.join(tmp, "ref.wav")
+            with open(ref_path, 'wb') as f:
+                f.write(synth_wav(0.5, 16000))
+
+            tts = SiliconFlowTTS(base_url=server.url, api_key="mock")
+            uri = tts.ensure_voice(name_key="阿米娅", wav_path=ref_path, ref_text="博士")
+            print(f"音色URI: {uri}")
+            assert uri and uri.startswith("speech:mock:")
+
+            audio = tts.synthesize("博士，您工作辛苦了。", voice_uri=uri, sample_rate=16000)
+            with wave.open(io.BytesIO(audio), 'rb') as w:
+                assert w.getframerate() == 16000
+                assert w.getnframes() > 0
+
+            # 新客户端启动时能从音色列表拿到已上传的音色
+            assert SiliconFlowTTS(base_url=server.url, api_key="mock").role_name == tts.role_name
+        print(f"请求统计: {server.stats}")
+
+
+def test_error_and_chunked():
+    """测试错误注入与分块响应"""
+    with MockTTSServer(port=0, config=MockTTSConfig(latency=0.0, jitter=0.0, error_rate=1.0)) as server:
+        tts = SiliconFlowTTS(base_url=server.url, api_key="mock")
+        assert tts.synthesize("失败") is None
+
+    config = MockTTSConfig(latency=0.0, jitter=0.0, chunked=True, chunk_size=1024)
+    with MockTTSServer(port=0, config=config) as server:
+        tts = SiliconFlowTTS(base_url=server.url, api_key="mock")
+        audio = tts.synthesize("分块响应", response_format='pcm', sample_rate=8000)
+        assert audio and len(audio) % 2 == 0
+
+
+if __name__ == "__main__":
+    test_upload_and_speech()
+    test_error_and_chunked()
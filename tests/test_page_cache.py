@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试语音记录页面缓存（条件请求、304 使用缓存、压缩保存、兼容旧版未压缩页面）
+"""
+
+import os
+import tempfile
+
+from lib.crawl.fetch import Fetcher, HostRateLimiter
+from lib.crawl.page_cache import PageCache
+from mock_wiki_server import MockWikiConfig, MockWikiServer
+
+PAGE = '<html><body><div id="voice-data-root">{}</div></body></html>'
+
+
+def _fetcher():
+    return Fetcher(limiter=HostRateLimiter({'127.0.0.1': (1000.0, 100)}), backoff=0.01)
+
+
+def test_conditional_requests():
+    """测试首次下载、304 与页面变化后的重新下载"""
+    print("=== 测试条件请求 ===")
+    files = {'/w/阿米娅/语音记录': PAGE.format('博士，' * 500).encode('utf-8')}
+    with MockWikiServer(port=0, files=files) as server, tempfile.TemporaryDirectory() as tmp:
+        url = f"{server.url}/w/阿米娅/语音记录"
+        cache = PageCache(tmp)
+        html, status = cache.fetch(_fetcher(), url, '阿米娅')
+        cache.save_index()
+        assert status == 'fetched' and '博士' in html
+        stored = os.path.getsize(cache.path_for('阿米娅'))
+        print(f"原始 {len(html.encode('utf-8'))} 字节，压缩保存 {stored} 字节")
+        assert stored < len(html.encode('utf-8')) / 5
+
+        # 新进程重新载入索引，发送条件请求
+        cache = PageCache(tmp)
+        html2, status = cache.fetch(_fetcher(), url, '阿米娅')
+        assert status == 'not_modified' and html2 == html
+        assert server.stats['not_modified'] == 1
+
+        server.files['/w/阿米娅/语音记录'] = PAGE.format('新台词').encode('utf-8')
+        html3, status = cache.fetch(_fetcher(), url, '阿米娅')
+        assert status == 'fetched' and '新台词' in html3 and cache.read('阿米娅') == html3
+        print(cache.summary())
+
+
+def test_last_modified_and_legacy_pages():
+    """测试只有 Last-Modified 时的条件请求，以及旧版未压缩页面的读取与替换"""
+    print("=== 测试 Last-Modified 与旧版页面 ===")
+    files = {'/w/12F/语音记录': PAGE.format('12F').encode('utf-8')}
+    with MockWikiServer(port=0, files=files) as server, tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, '12F_page.html')
+        with open(legacy, 'w', encoding='utf-8') as f:
+            f.write('旧页面')
+        cache = PageCache(tmp)
+        assert cache.names() == ['12F'] and cache.read('12F') == '旧页面'
+        assert cache.conditional_headers('12F') == {}  # 旧页面没有校验信息，先完整下载一次
+
+        url = f"{server.url}/w/12F/语音记录"
+        _, status = cache.fetch(_fetcher(), url, '12F')
+        assert status == 'fetched' and not os.path.exists(legacy)
+        cache.pages['12F']['etag'] = None
+        _, status = cache.fetch(_fetcher(), url, '12F')
+        assert status == 'not_modified'
+
+    config = MockWikiConfig(validators=False)
+    with MockWikiServer(port=0, files=files, config=config) as server, tempfile.TemporaryDirectory() as tmp:
+        cache = PageCache(tmp)
+        url = f"{server.url}/w/12F/语音记录"
+        assert cache.fetch(_fetcher(), url, '12F')[1] == 'fetched'
+        assert cache.fetch(_fetcher(), url, '12F')[1] == 'unchanged'  # 服务器不支持条件请求时比较内容哈希
+
+
+if __name__ == "__main__":
+    test_conditional_requests()
+    test_last_modified_and_legacy_pages()
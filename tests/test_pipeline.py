@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试无界面配音流水线（使用假OCR与假TTS，不依赖屏幕和网络）
+"""
+
+import os
+import tempfile
+
+from lib.pipeline import DubbingPipeline
+
+
+class FakeTTS:
+    api_key = "fake"
+
+    def __init__(self):
+        self.uploads = []
+        self.calls = []
+
+    def ensure_voice(self, name_key, wav_path, ref_text=None):
+        self.uploads.append((name_key, wav_path, ref_text))
+        return f"speech:{name_key}"
+
+    def synthesize(self, text, voice_uri=None):
+        self.calls.append((text, voice_uri))
+        return b"RIFF-fake-audio"
+
+
+REGIONS = [
+    {"name": "角色名", "start": [0, 0], "end": [10, 10]},
+    {"name": "文案", "start": [0, 10], "end": [10, 20]},
+]
+
+
+def fake_lookup(char_name):
+    return [{'file_path': f'/voc/{char_name}_干员报到_x.wav', 'voice_text': f'{char_name}的参考文本'}]
+
+
+def test_pipeline_flow():
+    """测试识别、角色名回退与合成输出"""
+    print("=== 测试无界面配音流水线 ===")
+    tts = FakeTTS()
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline = DubbingPipeline(ocr_func=lambda image: image, tts=tts, output_dir=tmp, reference_lookup=fake_lookup)
+
+        result = pipeline.run([(REGIONS[0], "阿米娅"), (REGIONS[1], "博士，您工作辛苦了。")])
+        print(f"第一帧: 角色={result['speaker']} 耗时={result['timings']}")
+        assert result['speaker'] == "阿米娅"
+        assert result['voice_uri'] == "speech:阿米娅"
+        assert result['audio_path'] and os.path.exists(result['audio_path'])
+        assert 'ocr' in result['timings'] and 'tts' in result['timings']
+
+        # 本帧角色名为空，沿用上一次角色
+        result = pipeline.run([(REGIONS[0], ""), (REGIONS[1], "继续前进吧。")])
+        print(f"第二帧: 角色={result['speaker']} 回退={result['speaker_fallback']}")
+        assert result['speaker'] == "阿米娅" and result['speaker_fallback']
+        assert tts.calls[-1] == ("继续前进吧。", "speech:阿米娅")
+
+
+def test_pipeline_without_tts():
+    """测试无TTS时只做识别"""
+    pipeline = DubbingPipeline(ocr_func=lambda image: image, tts=None)
+    result = pipeline.run([(REGIONS[0], "银灰"), (REGIONS[1], "盟友，你来了。")])
+    print(f"无TTS: {result['final_text']}")
+    assert result['final_text'] == "银灰 盟友，你来了。"
+    assert result['audio_path'] is None
+
+
+def test_duplicate_line_replayed():
+    """测试同一角色的重复台词直接复用已合成音频"""
+    print("=== 测试重复台词复用 ===")
+    tts = FakeTTS()
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline = DubbingPipeline(ocr_func=lambda image: image, tts=tts, output_dir=tmp, reference_lookup=fake_lookup)
+        first = pipeline.run([(REGIONS[0], "能天使"), (REGIONS[1], "老板，安排点差事给我们吧~")])
+        # OCR结果空白与标点略有差异，仍视为同一句
+        second = pipeline.run([(REGIONS[0], "能天使"), (REGIONS[1], "老板 安排点差事给我们吧")])
+        print(f"首次: {first['audio_path']}, 复用: {second['replayed']}")
+        assert second['replayed'] and second['audio_path'] == first['audio_path']
+        assert len(tts.calls) == 1
+        assert pipeline.last_audio_path == first['audio_path']
+
+        # 不同角色说同一句仍需合成
+        third = pipeline.run([(REGIONS[0], "德克萨斯"), (REGIONS[1], "老板，安排点差事给我们吧~")])
+        assert not third['replayed'] and len(tts.calls) == 2
+
+
+if __name__ == "__main__":
+    test_pipeline_flow()
+    test_pipeline_without_tts()
+    test_duplicate_line_replayed()
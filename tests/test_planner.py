@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试增量爬取计划（新干员、新增台词、文本变化与过期文件、地址变化、本地缺失、无变化、下载数量限制）
+"""
+
+import os
+import tempfile
+
+from lib.crawl.extract import build_record
+from lib.crawl.manifest import DownloadManifest
+from lib.crawl.offline import render_csv
+from lib.crawl.planner import CrawlPlan, plan_operator, scan_voc
+
+
+def _records(name, texts, language='中文'):
+    return [build_record(name, 'char_002_amiya', title, f'CN_{i:03d}', f'CN_{i:03d}.wav', '中文', text, language)
+            for i, (title, text) in enumerate(texts)]
+
+
+def _write_local(csv_dir, voc_dir, name, records):
+    os.makedirs(csv_dir, exist_ok=True)
+    os.makedirs(voc_dir, exist_ok=True)
+    with open(os.path.join(csv_dir, f'voice_data_{name}.csv'), 'w', encoding='utf-8', newline='') as f:
+        f.write(render_csv(records))
+    for record in records:
+        with open(os.path.join(voc_dir, record['local_filename']), 'wb') as f:
+            f.write(b'RIFF')
+
+
+def test_plan_operator():
+    """测试逐条比较得到的工作列表"""
+    print("=== 测试增量计划 ===")
+    texts = [('任命助理', '博士，您工作辛苦了。'), ('交谈1', '嗯？'), ('交谈2', '有事吗？')]
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir, voc_dir = os.path.join(tmp, 'voc_data'), os.path.join(tmp, 'voc')
+        records = _records('阿米娅', texts)
+
+        plan = plan_operator('阿米娅', records, '中文', csv_dir, voc_dir, scan_voc(voc_dir))
+        assert plan.status == 'new_operator' and plan.write_csv and len(plan.downloads) == 3
+        assert plan.reasons['new_line'] == 3
+
+        _write_local(csv_dir, voc_dir, '阿米娅', records)
+        plan = plan_operator('阿米娅', records, '中文', csv_dir, voc_dir, scan_voc(voc_dir))
+        assert plan.status == 'up_to_date' and not plan.has_work and not plan.obsolete
+
+        # 新增一条台词、修改一条文本
+        changed = _records('阿米娅', [texts[0], ('交谈1', '嗯？博士？'), texts[2], ('交谈3', '新台词')])
+        plan = plan_operator('阿米娅', changed, '中文', csv_dir, voc_dir, scan_voc(voc_dir))
+        print(plan.to_dict())
+        assert plan.status == 'changed' and plan.write_csv
+        assert plan.reasons['new_line'] == 1 and plan.reasons['changed_text'] == 1
+        assert [r['title'] for r in plan.downloads] == ['交谈1', '交谈3']
+        assert plan.obsolete == [records[1]['local_filename']]
+
+        # 本地文件缺失；其他语种的同名文件视为已存在
+        os.remove(os.path.join(voc_dir, records[0]['local_filename']))
+        os.rename(os.path.join(voc_dir, records[2]['local_filename']),
+                  os.path.join(voc_dir, records[2]['local_filename'].replace('.wav', '_其他语种.wav')))
+        plan = plan_operator('阿米娅', records, '中文', csv_dir, voc_dir, scan_voc(voc_dir))
+        assert plan.reasons['missing_file'] == 1 and plan.downloads == [records[0]] and not plan.write_csv
+
+        # 清单中大小不一致的文件也需要重新下载
+        manifest = DownloadManifest(os.path.join(tmp, 'manifest.json'))
+        path = os.path.join(voc_dir, records[1]['local_filename'])
+        manifest.record(records[1]['local_filename'], path, 'x' * 64, records[1]['voice_url'])
+        with open(path, 'ab') as f:
+            f.write(b'extra')
+        plan = plan_operator('阿米娅', records, '中文', csv_dir, voc_dir, scan_voc(voc_dir), manifest=manifest)
+        assert [r['title'] for r in plan.downloads] == ['任命助理', '交谈1']
+
+        # 切换语言：文件名不变，下载地址变化
+        japanese = _records('阿米娅', texts, language='日语')
+        for record in japanese:
+            record['voice_url'] = record['voice_url'].replace('voice_cn', 'voice')
+        plan = plan_operator('阿米娅', japanese, '日语', csv_dir, voc_dir, scan_voc(voc_dir), max_audio_files=2)
+        assert plan.reasons['changed_url'] == 2 and len(plan.downloads) == 2 and plan.write_csv
+
+        assert plan_operator('阿米娅', None, '中文', csv_dir, voc_dir, set()).status == 'no_data'
+
+
+def test_crawl_plan_summary():
+    """测试汇总与 JSON 输出"""
+    print("=== 测试计划汇总 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        crawl_plan = CrawlPlan()
+        crawl_plan.add(plan_operator('12F', _records('12F', [('任命助理', '你好')]), '中文', tmp, tmp, set()))
+        crawl_plan.add(plan_operator('银灰', None, '中文', tmp, tmp, set()))
+        totals = crawl_plan.totals()
+        assert totals['new_operator'] == 1 and totals['no_data'] == 1 and totals['downloads'] == 1
+        text = crawl_plan.describe()
+        print(text)
+        assert '12F' in text and '银灰' not in text
+        path = os.path.join(tmp, 'plan.json')
+        crawl_plan.save(path)
+        assert os.path.getsize(path) > 0
+
+
+if __name__ == "__main__":
+    test_plan_operator()
+    test_crawl_plan_summary()
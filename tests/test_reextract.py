@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试离线重新提取语音数据CSV（进程池并行、内容未变化时不重写、沿用/切换语言、预览模式）
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from lib.crawl.offline import reextract_all
+from lib.crawl.page_cache import PageCache
+from mock_wiki_server import voice_record_page
+
+
+def _pages(html_dir):
+    cache = PageCache(html_dir)
+    for i, name in enumerate(('阿米娅', '12F', '银灰')):
+        lines = [(f'语音{j}', f'CN_{j:03d}', {'中文': f'{name}的台词{j}', '日文': f'{name}のセリフ{j}'})
+                 for j in range(3 + i)]
+        cache.write(name, voice_record_page(name, f'char_{i:03d}', lines, padding=10))
+    cache.write('空页面', '<html><body>没有语音</body></html>')
+    cache.save_index()
+
+
+def test_reextract():
+    """测试首次生成、重复运行不重写与语言切换"""
+    print("=== 测试离线重新提取 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        html_dir, out_dir = os.path.join(tmp, 'html'), os.path.join(tmp, 'voc_data')
+        _pages(html_dir)
+
+        summary = reextract_all(html_dir, out_dir, workers=2)
+        print({k: v for k, v in summary.items() if k != 'results'})
+        assert summary['new'] == 3 and summary['no_data'] == 1 and summary['records'] == 3 + 4 + 5
+        df = pd.read_csv(os.path.join(out_dir, 'voice_data_银灰.csv'))
+        assert list(df['chinese_text']) == [f'银灰的台词{j}' for j in range(5)]
+
+        path = os.path.join(out_dir, 'voice_data_12F.csv')
+        mtime = os.stat(path).st_mtime_ns
+        summary = reextract_all(html_dir, out_dir, workers=2)
+        assert summary['unchanged'] == 3 and summary['new'] == summary['changed'] == 0
+        assert os.stat(path).st_mtime_ns == mtime
+
+        preview = reextract_all(html_dir, out_dir, language='日语', workers=1, dry_run=True)
+        assert preview['changed'] == 3 and os.stat(path).st_mtime_ns == mtime
+
+        summary = reextract_all(html_dir, out_dir, language='日语', workers=2, names=['12F'])
+        assert summary['changed'] == 1 and summary['pages'] == 1
+        df = pd.read_csv(path)
+        assert df['chinese_text'][0] == '12Fのセリフ0' and df['selected_language'][0] == '日语'
+
+        # 不指定语言时沿用 CSV 已记录的语言
+        summary = reextract_all(html_dir, out_dir, workers=1, names=['12F'])
+        assert summary['unchanged'] == 1 and summary['results'][0]['language'] == '日语'
+
+
+if __name__ == "__main__":
+    test_reextract()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试容错角色名解析（形近字、多余标点、漏字）
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join('lib', 'ref'))
+
+from loader import load_speaker_resolver, resolve_speaker_name
+from resolver import CONFUSABLE_COST, substitution_cost, weighted_edit_distance
+
+
+def test_resolve_ocr_errors():
+    """测试常见OCR错误能对齐到正确干员"""
+    print("=== 测试容错角色名解析 ===")
+    cases = [
+        ("阿米娅", "阿米娅"),        # 精确
+        ("阿米娅：", "阿米娅"),      # 多余标点
+        (" 能天使 ", "能天使"),      # 多余空白
+        ("米娅", "阿米娅"),          # 漏字
+        ("德克萨期", "德克萨斯"),    # 形近字
+        ("拉晋兰德", "拉普兰德"),    # 误识别一个字
+        ("silverash", "银灰"),       # 英文别名
+    ]
+    for raw, expected in cases:
+        name, confidence = resolve_speaker_name(raw)
+        print(f"'{raw}' -> {name} ({confidence:.2f})")
+        assert name == expected, (raw, name)
+
+    name, confidence = resolve_speaker_name("完全不相干的文字")
+    print(f"无关文本 -> {name} ({confidence:.2f})")
+    assert name is None
+
+
+def test_confusable_weighting():
+    """测试形近字替换代价低于普通替换"""
+    assert weighted_edit_distance("德克萨期", "德克萨斯") < weighted_edit_distance("德克萨吗", "德克萨斯")
+    # 只有字形相近的字才降低代价，字形不同的常见名字用字按普通替换计
+    assert substitution_cost("斯", "期") == CONFUSABLE_COST
+    for a, b in ("娅娘", "艾文", "茜西", "丝终", "尔示", "莫英"):
+        assert substitution_cost(a, b) == 1.0, (a, b)
+
+
+def test_resolve_budget():
+    """测试单次解析耗时（未命中 memo 时）"""
+    resolver = load_speaker_resolver()
+    queries = [f"阿米{ch}" for ch in "甲乙丙丁戊己庚辛壬癸"]
+    t0 = time.perf_counter()
+    for q in queries:
+        resolver._resolve_uncached(q)
+    per_call = (time.perf_counter() - t0) / len(queries)
+    print(f"单次解析: {per_call * 1e6:.0f} µs")
+    assert per_call < 0.005
+
+
+if __name__ == "__main__":
+    test_resolve_ocr_errors()
+    test_confusable_weighting()
+    test_resolve_budget()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试会话录制与回放
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from PIL import Image
+
+from lib.pipeline import DubbingPipeline
+from lib.session import SessionRecorder, SessionArchive
+import replay_session
+from replay_session import replay, summarize_replay
+
+REGIONS = [
+    {"name": "角色名", "start": [0, 0], "end": [40, 20]},
+    {"name": "文案", "start": [0, 20], "end": [40, 40]},
+]
+
+
+class FakeTTS:
+    api_key = "fake"
+
+    def ensure_voice(self, name_key, wav_path, ref_text=None):
+        return f"speech:{name_key}"
+
+    def synthesize(self, text, voice_uri=None):
+        return b"RIFF-fake-audio"
+
+
+def test_record_and_replay():
+    """测试录制后按录制文本回放"""
+    print("=== 测试会话录制与回放 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.zip")
+        recorder = SessionRecorder(path, regions=REGIONS)
+        lines = [("阿米娅", "博士，您工作辛苦了。"), ("", "我们走吧。")]
+        for i, (name, text) in enumerate(lines):
+            crops = [(REGIONS[0], Image.new('RGB', (40, 20))), (REGIONS[1], Image.new('RGB', (40, 20)))]
+            result = {
+                'texts': {"角色名": name, "文案": text} if name else {"文案": text},
+                'speaker': "阿米娅",
+                'content_text': text,
+                'timings': {'ocr': 0.1, 'total': 0.5},
+            }
+            recorder.record(recorder._started + i * 0.01, crops, result)
+        recorder.close()
+
+        with SessionArchive(path) as archive:
+            assert len(archive) == 2
+            event = next(archive.events())
+            crops = archive.load_crops(event)
+            assert crops[0][1].size == (40, 20)
+
+            pipeline = DubbingPipeline(
+                ocr_func=lambda text: text, tts=FakeTTS(), output_dir=tmp,
+                reference_lookup=lambda name: [],
+            )
+            records = replay(archive, pipeline, speed=0)
+
+        summary = summarize_replay(records)
+        print(f"回放统计: {summary['ttfa']}")
+        assert summary['triggers'] == 2
+        assert summary['with_audio'] == 2
+        assert summary['speaker_mismatch'] == 0
+
+
+def test_replay_unnamed_regions():
+    """测试未命名区域：按流水线默认名（区域1、区域2）取回录制的文本"""
+    print("=== 测试未命名区域回放 ===")
+    regions = [{"start": [0, 0], "end": [40, 20]}, {"start": [0, 20], "end": [40, 40]}]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.zip")
+        recorder = SessionRecorder(path, regions=regions)
+        crops = [(region, Image.new('RGB', (40, 20))) for region in regions]
+        recorder.record(recorder._started, crops, {'texts': {"区域1": "第一行", "区域2": "第二行"}})
+        recorder.close()
+
+        seen = []
+
+        def ocr(text):
+            seen.append(text)
+            return text
+
+        with SessionArchive(path) as archive:
+            pipeline = DubbingPipeline(ocr_func=ocr, tts=None, output_dir=tmp, reference_lookup=lambda name: [])
+            records = replay(archive, pipeline, speed=0)
+        assert seen == ["第一行", "第二行"]
+        assert len(records) == 1
+
+
+def test_replay_main_defaults_to_mock():
+    """测试不指定 --endpoint 时对进程内替身服务回放，不使用环境中的 API Key"""
+    print("=== 测试回放默认使用替身服务 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.zip")
+        recorder = SessionRecorder(path, regions=REGIONS)
+        crops = [(region, Image.new('RGB', (40, 20))) for region in REGIONS]
+        recorder.record(recorder._started, crops, {'texts': {"角色名": "阿米娅", "文案": "我们走吧。"}, 'speaker': "阿米娅"})
+        recorder.close()
+
+        summary_path = os.path.join(tmp, "summary.json")
+        argv = sys.argv
+        env_key = os.environ.get('SILICONFLOW_API_KEY')
+        os.environ['SILICONFLOW_API_KEY'] = 'should-not-be-used'
+        sys.argv = ['replay_session.py', path, '--speed', '0', '--mock-latency', '0', '--summary', summary_path]
+        try:
+            assert replay_session.main() == 0
+        finally:
+            sys.argv = argv
+            if env_key is None:
+                os.environ.pop('SILICONFLOW_API_KEY', None)
+            else:
+                os.environ['SILICONFLOW_API_KEY'] = env_key
+        with open(summary_path, encoding='utf-8') as f:
+            summary = json.load(f)
+        assert summary['triggers'] == 1 and summary['with_audio'] == 1
+
+
+def test_record_async():
+    """测试后台录制：按提交顺序写入，close() 等待全部写完"""
+    print("=== 测试后台录制 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.zip")
+        recorder = SessionRecorder(path, regions=REGIONS)
+        for i in range(20):
+            crops = [(REGIONS[1], Image.new('RGB', (40, 20)))]
+            recorder.record_async(recorder._started + i * 0.01, crops, {'content_text': f"第{i}句"})
+        recorder.close()
+        recorder.record_async(recorder._started, [], {})  # 关闭后提交的事件被忽略
+
+        with SessionArchive(path) as archive:
+            events = list(archive.events())
+        assert [e['result']['content_text'] for e in events] == [f"第{i}句" for i in range(20)]
+        assert [e['index'] for e in events] == list(range(20))
+
+
+if __name__ == "__main__":
+    test_record_and_replay()
+    test_replay_unnamed_regions()
+    test_replay_main_defaults_to_mock()
+    test_record_async()
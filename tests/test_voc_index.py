@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试参考音频内存索引（与 glob 前缀语义一致、目录变化后增量刷新）
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join('lib', 'ref'))
+
+from loader import _VocIndex
+
+
+def _touch(directory, name):
+    open(os.path.join(directory, name), 'wb').close()
+
+
+def test_voc_index_lookup_and_refresh():
+    """测试索引查找与刷新"""
+    print("=== 测试参考音频索引 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        _touch(tmp, "阿_闲置_9440b2c32ed37f5a2b3793ca1fcea1a3.wav")
+        _touch(tmp, "阿_干员报到_5274c881a4cf6ffc12a12222b6ddbecf.wav")
+        _touch(tmp, "阿米娅_干员报到_e71cd60e6c57a241e7702a0e1864fa47.wav")
+        _touch(tmp, "W_Ex_选中_0123456789abcdef0123456789abcdef.wav")
+        _touch(tmp, "阿_说明.txt")
+
+        index = _VocIndex(tmp)
+        clips = index.lookup("阿")
+        print([c['filename'] for c in clips])
+        # 按文件名排序，且不会把"阿米娅"的文件算给"阿"
+        assert [c['title'] for c in clips] == ["干员报到", "闲置"]
+        assert clips[0]['md5'] == "5274c881a4cf6ffc12a12222b6ddbecf"
+        # 名称带下划线的干员与 glob 前缀语义一致
+        assert len(index.lookup("W_Ex")) == 1 and len(index.lookup("W")) == 1
+
+        _touch(tmp, "阿_交谈1_00000000000000000000000000000000.wav")
+        os.utime(tmp, ns=(0, index.mtime_ns + 1_000_000))
+        assert len(index.lookup("阿")) == 3
+        assert index.lookup("不存在") == []
+
+
+if __name__ == "__main__":
+    test_voc_index_lookup_and_refresh()
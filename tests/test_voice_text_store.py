@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试语音文本库（CSV 汇总为 SQLite 索引、按 (干员, md5) 查询、增量重建）
+"""
+
+import sys
+import os
+import csv
+import tempfile
+sys.path.append(os.path.join('lib', 'ref'))
+
+from store import VoiceTextStore
+
+FIELDS = ['operator_name', 'title', 'chinese_text', 'selected_text_md5', 'chinese_text_md5']
+
+
+def _write_csv(directory, operator, rows, fields=FIELDS):
+    path = os.path.join(directory, f"voice_data_{operator}.csv")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: v for k, v in row.items() if k in fields})
+    return path
+
+
+def test_voice_text_store_lookup_and_incremental_sync():
+    """测试查询优先级与增量同步"""
+    print("=== 测试语音文本库 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = os.path.join(tmp, 'voc_data')
+        os.makedirs(csv_dir)
+        _write_csv(csv_dir, '阿', [
+            {'operator_name': '阿', 'title': '干员报到', 'chinese_text': '报到文本', 'selected_text_md5': 'aaa', 'chinese_text_md5': 'old'},
+            {'operator_name': '阿', 'title': '闲置', 'chinese_text': '闲置文本', 'selected_text_md5': 'old', 'chinese_text_md5': 'bbb'},
+        ])
+        # 只有旧字段的CSV
+        _write_csv(csv_dir, '12F', [
+            {'operator_name': '12F', 'title': '交谈1', 'chinese_text': '旧格式文本', 'chinese_text_md5': 'ccc'},
+        ], fields=['operator_name', 'title', 'chinese_text', 'chinese_text_md5'])
+
+        db_path = os.path.join(tmp, 'voice_text.sqlite')
+        store = VoiceTextStore(db_path, csv_dir)
+        assert store.get('阿', 'aaa') == '报到文本'
+        # selected_text_md5 优先于旧字段 chinese_text_md5
+        assert store.get('阿', 'old') == '闲置文本'
+        assert store.get('12F', 'ccc') == '旧格式文本'
+        assert store.get('不存在', 'aaa') == ''
+
+        # 未变化的CSV不会重新读取（新实例复用已有数据库）
+        stats = VoiceTextStore(db_path, csv_dir).sync()
+        print(f"无变化同步: {stats}")
+        assert stats == {'updated': 0, 'removed': 0, 'unchanged': 2}
+
+        # 新增干员的CSV在查不到时按需同步
+        _write_csv(csv_dir, '银灰', [
+            {'operator_name': '银灰', 'title': '干员报到', 'chinese_text': '盟友', 'selected_text_md5': 'ddd'},
+        ])
+        assert store.get('银灰', 'ddd') == '盟友'
+
+        os.remove(os.path.join(csv_dir, 'voice_data_12F.csv'))
+        stats = store.sync()
+        print(f"删除后同步: {stats}")
+        assert stats['removed'] == 1 and store.get('12F', 'ccc') == ''
+
+
+if __name__ == "__main__":
+    test_voice_text_store_lookup_and_incremental_sync()
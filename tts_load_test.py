@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TTS 客户端压测：以固定并发通过 SiliconFlowTTS 发起合成请求，统计吞吐量与尾延迟。
+未指定 --endpoint 时自动在进程内启动 mock_tts_server 替身服务。
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.bench import summarize_latencies, format_latency_summary
+from lib.tts_service import SiliconFlowTTS
+
+SAMPLE_LINES = [
+    "博士，您工作辛苦了。",
+    "消磨时间尚有更好的方法。",
+    "老板，安排点差事给我们吧~",
+    "我仍会保护你的安全，博士。",
+    "在一无所知中, 梦里的一天结束了，一个新的轮回便会开始",
+]
+
+
+def run_load(tts: SiliconFlowTTS, requests_total: int, concurrency: int, voice_uri=None):
+    """执行压测，返回 (逐请求耗时列表, 失败次数, 总耗时)"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def _one(i: int) -> None:
+        nonlocal errors
+        text = SAMPLE_LINES[i % len(SAMPLE_LINES)]
+        t0 = time.perf_counter()
+        audio = tts.synthesize(text, voice_uri=voice_uri)
+        elapsed = time.perf_counter() - t0
+        with lock:
+            if audio:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_one, range(requests_total)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS 客户端吞吐量与尾延迟压测")
+    parser.add_argument("--endpoint", default=None, help="TTS 服务地址（默认启动进程内替身服务）")
+    parser.add_argument("--api-key", default="mock", help="TTS API Key")
+    parser.add_argument("--requests", type=int, default=100, help="请求总数")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发数")
+    parser.add_argument("--latency", type=float, default=0.2, help="内置替身服务的基础延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.05, help="内置替身服务的延迟抖动（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="内置替身服务的错误率")
+    parser.add_argument("--chunked", action="store_true", help="内置替身服务使用分块响应")
+    parser.add_argument("--voice-wav", default=None, help="先上传该参考音频并使用其音色合成")
+    parser.add_argument("--summary", default=None, help="汇总结果输出（JSON）")
+
+    args = parser.parse_args()
+
+    server = None
+    endpoint = args.endpoint
+    if not endpoint:
+        from mock_tts_server import MockTTSServer, MockTTSConfig
+        config = MockTTSConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, chunked=args.chunked, seed=0)
+        server = MockTTSServer(port=0, config=config).start()
+        endpoint = server.url
+        print(f"已启动进程内替身服务: {endpoint}")
+
+    try:
+        tts = SiliconFlowTTS(base_url=endpoint, api_key=args.api_key)
+        voice_uri = None
+        if args.voice_wav:
+            voice_uri = tts.ensure_voice(name_key=args.voice_wav, wav_path=args.voice_wav)
+            print(f"参考音色: {voice_uri}")
+
+        print(f"开始压测: {args.requests} 个请求，并发 {args.concurrency}")
+        latencies, errors, elapsed = run_load(tts, args.requests, args.concurrency, voice_uri=voice_uri)
+    finally:
+        if server:
+            server.stop()
+
+    summary = {
+        'endpoint': endpoint,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'succeeded': len(latencies),
+        'errors': errors,
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'latency': summarize_latencies(latencies),
+    }
+    print(f"\n{'='*60}")
+    print("📊 压测结果")
+    print(f"{'='*60}")
+    print(f"成功: {summary['succeeded']}/{args.requests}，失败: {errors}，耗时: {elapsed:.2f}s")
+    print(f"吞吐量: {summary['throughput']:.2f} req/s")
+    print(f"延迟: {format_latency_summary(summary['latency'])}")
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"✅ 汇总已保存到 {args.summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
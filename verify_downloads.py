@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下载校验：按下载清单（lib/voc_manifest.json）并行检查 lib/voc 中的音频。
+清单中的文件比较大小与 SHA-256（--quick 只比较大小），清单之外的 wav 按 RIFF 头检查是否截断。
+--fix 删除损坏/截断的文件与残留的 .part，资源检查与下次爬取会把它们当作缺失重新下载；
+--adopt 把检查通过的清单外文件加入清单。压缩（.wavz）与打包存储中的片段按原 wav 校验，
+--fix 时删除对应的压缩文件或把片段移出打包索引。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from lib.crawl.manifest import DEFAULT_MANIFEST_PATH, DownloadManifest, audio_sha256
+from lib.ref.audio_codec import resolve_audio_file
+from lib.ref.audio_pack import PackWriter
+
+BAD_STATUSES = ('size_mismatch', 'hash_mismatch', 'truncated')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按下载清单校验音频文件")
+    parser.add_argument("--voc-dir", default=os.path.join("lib", "voc"), help="音频目录（默认 lib/voc）")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH, help="下载清单（默认 lib/voc_manifest.json）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行校验线程数")
+    parser.add_argument("--quick", action="store_true", help="只比较文件大小，不计算哈希")
+    parser.add_argument("--fix", action="store_true", help="删除损坏的文件和残留的 .part 文件")
+    parser.add_argument("--adopt", action="store_true", help="把完整的清单外文件加入清单")
+    parser.add_argument("--show", type=int, default=20, help="每类最多列出的文件数")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.voc_dir):
+        print(f"❌ 音频目录不存在: {args.voc_dir}")
+        return 1
+
+    manifest = DownloadManifest(args.manifest)
+    t0 = time.perf_counter()
+    report = manifest.verify(args.voc_dir, deep=not args.quick, workers=args.workers)
+    elapsed = time.perf_counter() - t0
+    checked = sum(len(names) for status, names in report.items() if status != 'partial')
+    print(f"校验 {checked} 个文件（清单 {len(manifest.files)} 条，{'仅大小' if args.quick else 'SHA-256'}），"
+          f"耗时 {elapsed:.1f}s")
+    for status, names in report.items():
+        if not names:
+            continue
+        print(f"  {status}: {len(names)}")
+        if status != 'ok':
+            for name in names[:args.show]:
+                print(f"    - {name}")
+            if len(names) > args.show:
+                print(f"    ... 还有 {len(names) - args.show} 个")
+
+    if args.fix:
+        removed = 0
+        unpacked = []
+        for status in BAD_STATUSES + ('partial',):
+            for name in report[status]:
+                path = os.path.join(args.voc_dir, name)
+                actual = path if status == 'partial' else resolve_audio_file(path)
+                if actual is None:
+                    unpacked.append(name)
+                else:
+                    try:
+                        os.remove(actual)
+                        removed += 1
+                    except OSError as e:
+                        print(f"❌ 删除失败: {name}: {e}")
+                manifest.forget(name)
+        if unpacked:
+            with PackWriter(args.voc_dir) as writer:
+                removed += sum(writer.remove(name) for name in unpacked)
+                writer.commit()
+        for name in report['missing']:
+            manifest.forget(name)
+        print(f"✅ 已删除 {removed} 个损坏或未完成的文件，重新运行爬虫即可补齐")
+
+    if args.adopt:
+        for name in report['untracked']:
+            path = os.path.join(args.voc_dir, name)
+            manifest.record(name, path, audio_sha256(path))
+        print(f"✅ 已将 {len(report['untracked'])} 个文件加入清单")
+
+    if args.fix or args.adopt:
+        manifest.save()
+        print(f"✅ 清单已保存: {args.manifest}")
+
+    bad = sum(len(report[status]) for status in BAD_STATUSES)
+    return 1 if bad and not args.fix else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())